@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.accounts'  # Changed from 'accounts' to 'apps.accounts'
\ No newline at end of file
+    name = 'apps.accounts'  # Changed from 'accounts' to 'apps.accounts'
+
+    def ready(self):
+        # Dashboard counter signals
+        import apps.accounts.signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,117 @@
+# backend/apps/accounts/customer_directory.py
+"""
+Keyset-paginated staff customer directory.
+
+CustomerManagementView used to prefetch every non-deleted booking and every
+saved address of every matching customer, then keep 100 customers, 5 bookings
+and 3 addresses each in Python, so a page got heavier with every booking a
+VIP ever made.
+
+A page is now three queries of bounded width:
+- up to `limit` + 1 customers after the cursor, newest first (ORDER BY id DESC,
+  so the cursor is just the last user id and the seek uses the primary key);
+- the latest RECENT_BOOKINGS bookings per customer on the page, picked in the
+  database with ROW_NUMBER() OVER (PARTITION BY customer_id ORDER BY
+  created_at DESC), only the columns the directory shows;
+- the top SAVED_ADDRESSES active addresses per customer, the same way.
+"""
+from django.contrib.auth.models import User
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from apps.bookings.pagination import (
+    InvalidCursor,
+    decode_cursor as _decode,
+    encode_cursor as _encode,
+)
+from .search import search_customers
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+RECENT_BOOKINGS = 5
+SAVED_ADDRESSES = 3
+
+
+def encode_cursor(last_id):
+    return _encode({'id': last_id})
+
+
+def decode_cursor(cursor):
+    """Opaque cursor -> last user id seen; InvalidCursor if it was tampered with."""
+    last_id = _decode(cursor).get('id')
+    if not isinstance(last_id, int):
+        raise InvalidCursor(cursor)
+    return last_id
+
+
+def filtered_customers(search='', vip=''):
+    customers = User.objects.filter(customer_profile__isnull=False)
+    if vip == 'true':
+        customers = customers.filter(customer_profile__is_vip=True)
+    elif vip == 'false':
+        customers = customers.filter(customer_profile__is_vip=False)
+    if search:
+        # Indexed search documents (accounts/search.py) instead of four
+        # unindexable __icontains filters; scoped so the VIP filter applies
+        # before the match limit
+        customers = customers.filter(id__in=search_customers(search, scope=customers))
+    return customers
+
+
+def _top_n_per_user(queryset, user_field, order_by, n):
+    """Rows ranked 1..n within each user's partition, grouped by user id."""
+    ranked = queryset.annotate(
+        row_number=Window(RowNumber(), partition_by=[F(user_field)], order_by=order_by)
+    ).filter(row_number__lte=n).order_by(user_field, 'row_number')
+
+    grouped = {}
+    for row in ranked:
+        grouped.setdefault(getattr(row, user_field), []).append(row)
+    return grouped
+
+
+def recent_bookings_by_customer(user_ids, n=RECENT_BOOKINGS):
+    from apps.bookings.models import Booking
+
+    bookings = Booking.objects.filter(
+        customer_id__in=user_ids, deleted_at__isnull=True,
+    ).only(
+        'id', 'customer_id', 'booking_number', 'service_type', 'status',
+        'total_price_cents', 'created_at',
+    )
+    return _top_n_per_user(
+        bookings, 'customer_id', [F('created_at').desc(), F('id').desc()], n,
+    )
+
+
+def top_addresses_by_customer(user_ids, n=SAVED_ADDRESSES):
+    from apps.customers.models import SavedAddress
+
+    addresses = SavedAddress.objects.filter(
+        user_id__in=user_ids, is_active=True,
+    ).only('id', 'user_id', 'address_line_1', 'city', 'state', 'times_used')
+    return _top_n_per_user(
+        addresses, 'user_id', [F('times_used').desc(), F('id')], n,
+    )
+
+
+def customer_directory_page(search='', vip='', cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """(customers, bookings_by_user, addresses_by_user, next_cursor) for one page."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    customers = filtered_customers(search, vip).select_related('customer_profile')
+    if cursor:
+        customers = customers.filter(id__lt=decode_cursor(cursor))
+
+    page = list(customers.order_by('-id')[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1].id) if len(page) > limit else None
+    page = page[:limit]
+
+    user_ids = [user.id for user in page]
+    if not user_ids:
+        return page, {}, {}, None
+    return (
+        page,
+        recent_bookings_by_customer(user_ids),
+        top_addresses_by_customer(user_ids),
+        next_cursor,
+    )
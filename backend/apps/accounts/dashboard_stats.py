@@ -0,0 +1,182 @@
+# backend/apps/accounts/dashboard_stats.py
+"""
+Materialized counters for the staff dashboard.
+
+StaffDashboardView used to run ~12 COUNT(*) queries plus a revenue SUM over
+bookings, payments and customer profiles on every refresh, and staff keep the
+page open all day on auto-refresh. The numbers now live in DashboardStat rows:
+
+    booking.<status>   non-deleted bookings per status
+    payment.<status>   payments linked to a booking, per status
+    revenue.cents      succeeded linked payments on non-deleted bookings
+    customers.total    customer profiles
+    customers.vip      VIP customer profiles
+
+The signals in accounts/signals.py turn each Booking / Payment / CustomerProfile
+transition into deltas (via the _original_* fields the models track) and apply
+them with UPDATE ... SET value = value + n in the same transaction as the
+change, so a rolled-back checkout is never counted. Each key is spread over
+SHARDS rows and a delta lands on a random one, so concurrent checkouts don't
+queue on a single row lock; readers sum the shards in one GROUP BY.
+
+Bulk queryset .update() calls bypass the signals. Those call apply_deltas()
+themselves or schedule a recount, and recount_dashboard_stats (Celery beat)
+rebuilds every counter from the source tables to correct any drift.
+"""
+import logging
+import random
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+
+logger = logging.getLogger(__name__)
+
+SHARDS = 8
+
+BOOKING_KEY = 'booking.{}'
+PAYMENT_KEY = 'payment.{}'
+REVENUE_KEY = 'revenue.cents'
+CUSTOMERS_KEY = 'customers.total'
+VIP_KEY = 'customers.vip'
+
+
+def apply_deltas(deltas):
+    """Add {key: n} to the counters inside the caller's transaction.
+
+    Keys are updated in sorted order so two transactions touching the same
+    counters always take the row locks in the same order. Counters that have
+    never been recounted have no rows yet; their deltas are dropped and the
+    first recount picks the change up from the source tables.
+    """
+    from .models import DashboardStat
+
+    for key in sorted(deltas):
+        delta = deltas[key]
+        if not delta:
+            continue
+        DashboardStat.objects.filter(key=key, shard=random.randrange(SHARDS)).update(
+            value=F('value') + delta
+        )
+
+
+def succeeded_revenue_cents(booking_id):
+    """Revenue currently attributed to one booking (0 if it has none)."""
+    from apps.payments.models import Payment
+
+    return Payment.objects.filter(booking_id=booking_id, status='succeeded').aggregate(
+        total=Sum('amount_cents')
+    )['total'] or 0
+
+
+def booking_is_visible(booking_id):
+    """Linked to a booking that still shows on the dashboard (not soft-deleted)."""
+    from apps.bookings.models import Booking
+
+    if booking_id is None:
+        return False
+    return Booking.objects.filter(pk=booking_id, deleted_at__isnull=True).exists()
+
+
+def payment_contribution(status, booking_id, amount_cents):
+    """The counters one payment row adds to, as a Counter."""
+    contribution = Counter()
+    if booking_id is None:
+        return contribution
+    contribution[PAYMENT_KEY.format(status)] += 1
+    if status == 'succeeded' and booking_is_visible(booking_id):
+        contribution[REVENUE_KEY] += amount_cents or 0
+    return contribution
+
+
+def compute_dashboard_stats():
+    """Every counter, computed from the source tables."""
+    from apps.bookings.models import Booking
+    from apps.customers.models import CustomerProfile
+    from apps.payments.models import Payment
+
+    values = {BOOKING_KEY.format(s): 0 for s, _ in Booking.STATUS_CHOICES}
+    values.update({PAYMENT_KEY.format(s): 0 for s, _ in Payment.STATUS_CHOICES})
+
+    bookings = (
+        Booking.objects.filter(deleted_at__isnull=True)
+        .values('status').annotate(n=Count('id')).order_by()
+    )
+    for row in bookings:
+        values[BOOKING_KEY.format(row['status'])] = row['n']
+
+    payments = (
+        Payment.objects.filter(booking__isnull=False)
+        .values('status').annotate(n=Count('id')).order_by()
+    )
+    for row in payments:
+        values[PAYMENT_KEY.format(row['status'])] = row['n']
+
+    values[REVENUE_KEY] = Payment.objects.filter(
+        status='succeeded', booking__isnull=False, booking__deleted_at__isnull=True
+    ).aggregate(total=Sum('amount_cents'))['total'] or 0
+
+    customers = CustomerProfile.objects.aggregate(
+        total=Count('id'), vip=Count('id', filter=Q(is_vip=True))
+    )
+    values[CUSTOMERS_KEY] = customers['total']
+    values[VIP_KEY] = customers['vip']
+    return values
+
+
+def recount_dashboard_stats():
+    """Rebuild every counter from the source tables; returns the drift found.
+
+    The counter rows are locked first, so a transaction that already applied a
+    delta is committed (and visible to the recount) before we read, and one
+    that applies a delta later waits and lands on top of the recounted value.
+    Rows are updated in place rather than replaced for the same reason.
+    """
+    from .models import DashboardStat
+
+    with transaction.atomic():
+        current = Counter()
+        for key, value in (
+            DashboardStat.objects.select_for_update()
+            .order_by('key', 'shard').values_list('key', 'value')
+        ):
+            current[key] += value
+
+        values = compute_dashboard_stats()
+
+        DashboardStat.objects.bulk_create(
+            [DashboardStat(key=key, shard=shard) for key in values for shard in range(SHARDS)],
+            ignore_conflicts=True,
+        )
+        for key, value in values.items():
+            if current.get(key) == value:
+                continue
+            DashboardStat.objects.filter(key=key).update(
+                value=Case(When(shard=0, then=Value(value)), default=Value(0))
+            )
+
+    drift = {key: value - current.get(key, 0) for key, value in values.items() if current.get(key, 0) != value}
+    if drift and current:
+        logger.warning(f"Dashboard counters drifted, corrected: {drift}")
+    return drift
+
+
+def get_dashboard_stats():
+    """{key: value} for every counter in one query.
+
+    The first read after a deploy (or on an empty database) populates the
+    table with a recount.
+    """
+    from .models import DashboardStat
+
+    def read():
+        return {
+            row['key']: row['total']
+            for row in DashboardStat.objects.values('key').annotate(total=Sum('value')).order_by()
+        }
+
+    stats = read()
+    if not stats:
+        recount_dashboard_stats()
+        stats = read()
+    return stats
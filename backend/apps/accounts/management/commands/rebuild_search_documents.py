@@ -0,0 +1,31 @@
+# backend/apps/accounts/management/commands/rebuild_search_documents.py
+"""
+Rebuild the staff search documents (accounts/search.py) from scratch.
+
+The signals keep documents current; run this after bulk imports or raw SQL
+edits to bookings, guest checkouts, addresses or customer accounts.
+
+Usage:
+    python manage.py rebuild_search_documents
+    python manage.py rebuild_search_documents --bookings-only
+"""
+from django.core.management.base import BaseCommand
+
+from apps.accounts.search import refresh_booking_documents, refresh_customer_documents
+
+
+class Command(BaseCommand):
+    help = 'Rebuild staff search documents for all bookings and customers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings-only', action='store_true')
+        parser.add_argument('--customers-only', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['customers_only']:
+            count = refresh_booking_documents()
+            self.stdout.write(f'Indexed {count} booking(s)')
+        if not options['bookings_only']:
+            count = refresh_customer_documents()
+            self.stdout.write(f'Indexed {count} customer(s)')
+        self.stdout.write(self.style.SUCCESS('Search documents rebuilt'))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_staffaction_action_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50)),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'accounts_dashboard_stat',
+                'constraints': [models.UniqueConstraint(fields=('key', 'shard'), name='dashboard_stat_key_shard_uniq')],
+            },
+        ),
+    ]
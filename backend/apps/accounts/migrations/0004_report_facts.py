@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_dashboardstat'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportRollupState',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_full_rebuild_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'accounts_report_rollup_state',
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerReportFact',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='report_fact', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('booking_count', models.PositiveIntegerField(default=0)),
+                ('total_spent_cents', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'accounts_customer_report_fact',
+                'indexes': [models.Index(fields=['-booking_count'], name='customer_fact_count_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyBookingFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('service_type', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('booking_count', models.PositiveIntegerField(default=0)),
+                ('total_price_cents', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'accounts_daily_booking_fact',
+                'constraints': [models.UniqueConstraint(fields=('date', 'service_type', 'status'), name='daily_booking_fact_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenueFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('service_type', models.CharField(max_length=20)),
+                ('payment_count', models.PositiveIntegerField(default=0)),
+                ('revenue_cents', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'accounts_daily_revenue_fact',
+                'constraints': [models.UniqueConstraint(fields=('date', 'service_type'), name='daily_revenue_fact_uniq')],
+            },
+        ),
+    ]
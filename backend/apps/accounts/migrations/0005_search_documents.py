@@ -0,0 +1,181 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:25
+
+import re
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "CREATE INDEX IF NOT EXISTS accounts_booking_search_tsv_idx ON accounts_booking_search "
+    "USING gin (to_tsvector('simple', document))",
+    'CREATE INDEX IF NOT EXISTS accounts_booking_search_trgm_idx ON accounts_booking_search '
+    'USING gin (document gin_trgm_ops)',
+    "CREATE INDEX IF NOT EXISTS accounts_customer_search_tsv_idx ON accounts_customer_search "
+    "USING gin (to_tsvector('simple', document))",
+    'CREATE INDEX IF NOT EXISTS accounts_customer_search_trgm_idx ON accounts_customer_search '
+    'USING gin (document gin_trgm_ops)',
+]
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS accounts_booking_search_tsv_idx',
+    'DROP INDEX IF EXISTS accounts_booking_search_trgm_idx',
+    'DROP INDEX IF EXISTS accounts_customer_search_tsv_idx',
+    'DROP INDEX IF EXISTS accounts_customer_search_trgm_idx',
+]
+
+
+def _sqlite_fts(table):
+    """FTS5 shadow of `table`.document, kept in sync by triggers."""
+    fts = f'{table}_fts'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(document, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, document) VALUES (new.id, new.document); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, document) VALUES ('delete', old.id, old.document); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, document) VALUES ('delete', old.id, old.document); "
+        f"INSERT INTO {fts}(rowid, document) VALUES (new.id, new.document); END",
+    ]
+
+
+def _sqlite_fts_drop(table):
+    return [
+        f'DROP TRIGGER IF EXISTS {table}_ai',
+        f'DROP TRIGGER IF EXISTS {table}_ad',
+        f'DROP TRIGGER IF EXISTS {table}_au',
+        f'DROP TABLE IF EXISTS {table}_fts',
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    elif vendor == 'sqlite':
+        statements = _sqlite_fts('accounts_booking_search') + _sqlite_fts('accounts_customer_search')
+    else:
+        statements = []
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_REVERSE
+    elif vendor == 'sqlite':
+        statements = _sqlite_fts_drop('accounts_booking_search') + _sqlite_fts_drop('accounts_customer_search')
+    else:
+        statements = []
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+# Frozen copy of the document format in apps/accounts/search.py at the time of
+# this migration; the migration must not import live code.
+BOOKING_DOCUMENT_FIELDS = (
+    'id', 'booking_number', 'created_at',
+    'customer__first_name', 'customer__last_name', 'customer__email',
+    'customer__customer_profile__phone',
+    'guest_checkout__first_name', 'guest_checkout__last_name',
+    'guest_checkout__email', 'guest_checkout__phone',
+    'pickup_address__address_line_1', 'pickup_address__zip_code',
+    'delivery_address__address_line_1', 'delivery_address__zip_code',
+)
+CUSTOMER_DOCUMENT_FIELDS = ('id', 'first_name', 'last_name', 'email', 'customer_profile__phone')
+_WORD_RE = re.compile(r'[^\w]+', re.UNICODE)
+
+
+def _normalize(*parts):
+    words = []
+    for part in parts:
+        if not part:
+            continue
+        for word in _WORD_RE.split(str(part).lower()):
+            if word and word not in words:
+                words.append(word)
+    return ' '.join(words)
+
+
+def _digits(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def backfill_search_documents(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    BookingSearchDocument = apps.get_model('accounts', 'BookingSearchDocument')
+    CustomerSearchDocument = apps.get_model('accounts', 'CustomerSearchDocument')
+
+    batch = []
+    for row in Booking.objects.values(*BOOKING_DOCUMENT_FIELDS).order_by().iterator(chunk_size=2000):
+        number = row['booking_number'] or ''
+        batch.append(BookingSearchDocument(
+            booking_id=row['id'],
+            booking_created_at=row['created_at'],
+            document=_normalize(
+                number, _digits(number).lstrip('0'),
+                row['customer__first_name'], row['customer__last_name'], row['customer__email'],
+                _digits(row['customer__customer_profile__phone']),
+                row['guest_checkout__first_name'], row['guest_checkout__last_name'],
+                row['guest_checkout__email'], _digits(row['guest_checkout__phone']),
+                row['pickup_address__address_line_1'], row['pickup_address__zip_code'],
+                row['delivery_address__address_line_1'], row['delivery_address__zip_code'],
+            ),
+        ))
+        if len(batch) >= 500:
+            BookingSearchDocument.objects.bulk_create(batch)
+            batch = []
+    BookingSearchDocument.objects.bulk_create(batch)
+
+    customers = User.objects.filter(customer_profile__isnull=False)
+    CustomerSearchDocument.objects.bulk_create(
+        [
+            CustomerSearchDocument(user_id=row['id'], document=_normalize(
+                row['first_name'], row['last_name'], row['email'], _digits(row['customer_profile__phone']),
+            ))
+            for row in customers.values(*CUSTOMER_DOCUMENT_FIELDS).order_by().iterator(chunk_size=2000)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_report_facts'),
+        ('bookings', '0017_booking_bookings_updated_idx'),
+        ('customers', '0005_customerpaymentmethod_payment_method_user_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document', models.TextField()),
+                ('booking_created_at', models.DateTimeField()),
+                ('booking', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='bookings.booking')),
+            ],
+            options={
+                'db_table': 'accounts_booking_search',
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document', models.TextField()),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'accounts_customer_search',
+            },
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
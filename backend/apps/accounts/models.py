@@ -182,4 +182,136 @@ class StaffAction(models.Model):
             user_agent=user_agent,
             customer_id=customer_id,
             booking_id=booking_id
-        )
\ No newline at end of file
+        )
+
+class DashboardStat(models.Model):
+    """One shard of a materialized staff dashboard counter.
+
+    Kept current by F() deltas from the Booking / Payment / CustomerProfile
+    signals (see accounts/dashboard_stats.py) and rebuilt periodically by
+    recount_dashboard_stats. A counter's value is the sum of its shards;
+    spreading each key over several rows keeps concurrent checkouts from
+    queueing on one hot row.
+    """
+
+    key = models.CharField(max_length=50)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'accounts_dashboard_stat'
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'shard'], name='dashboard_stat_key_shard_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.key}[{self.shard}] = {self.value}"
+
+
+class DailyBookingFact(models.Model):
+    """Non-deleted bookings created on one day, per service type and status.
+
+    Rollup for StaffReportsView, rebuilt for dirty days by
+    refresh_report_facts (see accounts/report_facts.py).
+    """
+
+    date = models.DateField()
+    service_type = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    booking_count = models.PositiveIntegerField(default=0)
+    total_price_cents = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'accounts_daily_booking_fact'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'service_type', 'status'], name='daily_booking_fact_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.service_type}/{self.status}: {self.booking_count}"
+
+
+class DailyRevenueFact(models.Model):
+    """Succeeded payments (linked to non-deleted bookings) taken on one day,
+    per booking service type."""
+
+    date = models.DateField()
+    service_type = models.CharField(max_length=20)
+    payment_count = models.PositiveIntegerField(default=0)
+    revenue_cents = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'accounts_daily_revenue_fact'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'service_type'], name='daily_revenue_fact_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.service_type}: {self.revenue_cents}"
+
+
+class CustomerReportFact(models.Model):
+    """Per-customer booking totals for the reports' top-customers table."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='report_fact')
+    booking_count = models.PositiveIntegerField(default=0)
+    total_spent_cents = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'accounts_customer_report_fact'
+        indexes = [
+            models.Index(fields=['-booking_count'], name='customer_fact_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.booking_count}"
+
+
+class ReportRollupState(models.Model):
+    """Single row: how far refresh_report_facts has rolled up (id=1)."""
+
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    watermark = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    last_full_rebuild_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'accounts_report_rollup_state'
+
+    def __str__(self):
+        return f"Report facts as of {self.refreshed_at}"
+
+
+class BookingSearchDocument(models.Model):
+    """Normalized search text for one booking (staff lookup).
+
+    Indexed outside the ORM (migration 0005): tsvector GIN + pg_trgm on
+    PostgreSQL, an FTS5 shadow table elsewhere. See accounts/search.py.
+    """
+
+    booking = models.OneToOneField('bookings.Booking', on_delete=models.CASCADE,
+                                   related_name='search_document')
+    document = models.TextField()
+    booking_created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'accounts_booking_search'
+
+    def __str__(self):
+        return f"Search document for booking {self.booking_id}"
+
+
+class CustomerSearchDocument(models.Model):
+    """Normalized search text for one customer account (staff lookup)."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='search_document')
+    document = models.TextField()
+
+    class Meta:
+        db_table = 'accounts_customer_search'
+
+    def __str__(self):
+        return f"Search document for customer {self.user_id}"
@@ -0,0 +1,228 @@
+# backend/apps/accounts/report_facts.py
+"""
+Daily rollups behind StaffReportsView.
+
+The reports page used to run ~20 aggregates over the full bookings and
+payments tables on every load (TruncDate/TruncMonth groupings, per-status
+counts, Avg, and a top-customers annotate joining every customer to every
+booking), so it got slower with every booking taken. It now reads three small
+tables instead:
+
+    DailyBookingFact     date x service_type x status -> count, total price
+    DailyRevenueFact     date x service_type -> succeeded payments, revenue
+    CustomerReportFact   customer -> booking count, amount spent
+
+refresh_report_facts() keeps them current. Rows whose updated_at is past the
+stored watermark mark their day (by created_at) and customer dirty, and only
+those days/customers are recomputed from the source tables. The watermark is
+moved to the start of the run minus WATERMARK_OVERLAP, so rows committed by
+transactions still open while we scanned are picked up next time; recomputing
+a day twice is harmless.
+
+Hard deletes don't leave an updated_at behind, so a nightly full rebuild
+(full=True) resets everything.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# Days / customers per recompute query, to keep IN lists and OR chains bounded
+CHUNK_SIZE = 200
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _day_ranges(days):
+    """Collapse dates into (start, end) datetime ranges of consecutive days."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return [(_day_start(start), _day_start(end)) for start, end in ranges]
+
+
+def _created_on(days):
+    """Q matching rows created on any of `days`, as index-friendly ranges."""
+    q = Q()
+    for start, end in _day_ranges(days):
+        q |= Q(created_at__gte=start, created_at__lt=end)
+    return q
+
+
+def _chunks(items):
+    items = sorted(items)
+    for i in range(0, len(items), CHUNK_SIZE):
+        yield items[i:i + CHUNK_SIZE]
+
+
+def _rebuild_booking_facts(days=None):
+    from apps.bookings.models import Booking
+    from .models import DailyBookingFact
+
+    bookings = Booking.objects.filter(deleted_at__isnull=True)
+    facts = DailyBookingFact.objects.all()
+    if days is not None:
+        bookings = bookings.filter(_created_on(days))
+        facts = facts.filter(date__in=days)
+
+    rows = (
+        bookings.annotate(day=TruncDate('created_at'))
+        .values('day', 'service_type', 'status')
+        .annotate(n=Count('id'), total=Sum('total_price_cents'))
+        .order_by()
+    )
+    new_facts = [
+        DailyBookingFact(
+            date=row['day'], service_type=row['service_type'], status=row['status'],
+            booking_count=row['n'], total_price_cents=row['total'] or 0,
+        )
+        for row in rows
+    ]
+    facts.delete()
+    DailyBookingFact.objects.bulk_create(new_facts, batch_size=500)
+
+
+def _rebuild_revenue_facts(days=None):
+    from apps.payments.models import Payment
+    from .models import DailyRevenueFact
+
+    payments = Payment.objects.filter(
+        status='succeeded', booking__isnull=False, booking__deleted_at__isnull=True
+    )
+    facts = DailyRevenueFact.objects.all()
+    if days is not None:
+        payments = payments.filter(_created_on(days))
+        facts = facts.filter(date__in=days)
+
+    rows = (
+        payments.annotate(day=TruncDate('created_at'))
+        .values('day', 'booking__service_type')
+        .annotate(n=Count('id'), total=Sum('amount_cents'))
+        .order_by()
+    )
+    new_facts = [
+        DailyRevenueFact(
+            date=row['day'], service_type=row['booking__service_type'],
+            payment_count=row['n'], revenue_cents=row['total'] or 0,
+        )
+        for row in rows
+    ]
+    facts.delete()
+    DailyRevenueFact.objects.bulk_create(new_facts, batch_size=500)
+
+
+def _rebuild_customer_facts(user_ids=None):
+    from apps.bookings.models import Booking
+    from .models import CustomerReportFact
+
+    bookings = Booking.objects.filter(customer__isnull=False)
+    facts = CustomerReportFact.objects.all()
+    if user_ids is not None:
+        bookings = bookings.filter(customer_id__in=user_ids)
+        facts = facts.filter(user_id__in=user_ids)
+
+    rows = (
+        bookings.values('customer_id')
+        .annotate(
+            n=Count('id', filter=Q(deleted_at__isnull=True)),
+            spent=Sum('total_price_cents', filter=Q(status__in=['paid', 'completed'])),
+        )
+        .order_by()
+    )
+    new_facts = [
+        CustomerReportFact(
+            user_id=row['customer_id'], booking_count=row['n'], total_spent_cents=row['spent'] or 0,
+        )
+        for row in rows
+        if row['n']
+    ]
+    facts.delete()
+    CustomerReportFact.objects.bulk_create(new_facts, batch_size=500)
+
+
+def _dirty_since(watermark):
+    """(booking days, revenue days, customer ids) touched after `watermark`."""
+    from apps.bookings.models import Booking
+    from apps.payments.models import Payment
+
+    def days(queryset):
+        return set(
+            queryset.annotate(day=TruncDate('created_at'))
+            .values_list('day', flat=True).order_by().distinct()
+        )
+
+    changed_bookings = Booking.objects.filter(updated_at__gt=watermark)
+    booking_days = days(changed_bookings)
+    # A payment's revenue also moves when its booking is (un)deleted
+    revenue_days = days(Payment.objects.filter(updated_at__gt=watermark)) | days(
+        Payment.objects.filter(booking__in=changed_bookings.values('pk'))
+    )
+    customer_ids = set(
+        changed_bookings.filter(customer__isnull=False)
+        .values_list('customer_id', flat=True).order_by().distinct()
+    )
+    return booking_days, revenue_days, customer_ids
+
+
+def refresh_report_facts(full=False):
+    """Bring the report fact tables up to date; returns what was recomputed."""
+    from .models import ReportRollupState
+
+    started = timezone.now()
+    state, _ = ReportRollupState.objects.get_or_create(pk=1)
+    full = full or state.watermark is None
+
+    if full:
+        with transaction.atomic():
+            _rebuild_booking_facts()
+            _rebuild_revenue_facts()
+            _rebuild_customer_facts()
+        result = {'full': True}
+        state.last_full_rebuild_at = started
+    else:
+        booking_days, revenue_days, customer_ids = _dirty_since(state.watermark)
+        for days in _chunks(booking_days):
+            with transaction.atomic():
+                _rebuild_booking_facts(days)
+        for days in _chunks(revenue_days):
+            with transaction.atomic():
+                _rebuild_revenue_facts(days)
+        for user_ids in _chunks(customer_ids):
+            with transaction.atomic():
+                _rebuild_customer_facts(user_ids)
+        result = {
+            'full': False,
+            'booking_days': len(booking_days),
+            'revenue_days': len(revenue_days),
+            'customers': len(customer_ids),
+        }
+
+    state.watermark = started - WATERMARK_OVERLAP
+    state.refreshed_at = started
+    state.save()
+    logger.info(f"Report facts refreshed: {result}")
+    return result
+
+
+def report_facts_as_of():
+    """When the facts were last refreshed, building them first if never done."""
+    from .models import ReportRollupState
+
+    refreshed_at = (
+        ReportRollupState.objects.filter(pk=1).values_list('refreshed_at', flat=True).first()
+    )
+    if refreshed_at is None:
+        refresh_report_facts(full=True)
+        refreshed_at = ReportRollupState.objects.values_list('refreshed_at', flat=True).get(pk=1)
+    return refreshed_at
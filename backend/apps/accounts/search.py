@@ -0,0 +1,232 @@
+# backend/apps/accounts/search.py
+"""
+Indexed staff search over bookings and customers.
+
+Staff lookup used to OR seven `__icontains` filters across bookings, users and
+guest checkouts, which no index can serve, so every phone-call search was a
+sequential scan of all three tables. Each booking and customer now has a
+maintained search document: lowercase words of booking number, names, emails,
+phone (digits only) and, for bookings, pickup/delivery street and ZIP.
+
+Indexes (created by migration accounts 0005, outside the ORM):
+- PostgreSQL: GIN on to_tsvector('simple', document) for word-prefix queries,
+  and GIN gin_trgm_ops on document so fragments inside a word (the middle of a
+  phone number or email) still hit an index.
+- SQLite (tests/dev): an FTS5 table kept in sync by triggers.
+
+search_bookings() / search_customers() return ids ranked best-first. Every
+query word must match as a prefix, so 'jane 1001' finds Jane Doe moving from
+ZIP 10011; a query that is just a phone number, however it is punctuated, is
+matched as its digits. Pass the view's filtered queryset as `scope` so the
+filters apply before SEARCH_LIMIT, not after it.
+
+Documents are refreshed by the signals in accounts/signals.py; changes that
+fan out to many bookings (a customer renaming themselves) are refreshed by the
+refresh_search_documents task. `manage.py rebuild_search_documents` rebuilds
+everything.
+"""
+import logging
+import re
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on ranked matches handed back to a list view
+SEARCH_LIMIT = 200
+# Shortest query word we use for the trigram (infix) fallback on PostgreSQL
+TRIGRAM_MIN_LENGTH = 3
+
+_WORD_RE = re.compile(r'[^\w]+', re.UNICODE)
+# '(631) 595-5100', '631.595.5100', '+1 631 595 5100'
+_PHONE_QUERY_RE = re.compile(r'^\+?[\d\s().-]+$')
+PHONE_MIN_DIGITS = 7
+
+BOOKING_FTS_TABLE = 'accounts_booking_search_fts'
+CUSTOMER_FTS_TABLE = 'accounts_customer_search_fts'
+
+BOOKING_DOCUMENT_FIELDS = (
+    'id', 'booking_number', 'created_at',
+    'customer__first_name', 'customer__last_name', 'customer__email',
+    'customer__customer_profile__phone',
+    'guest_checkout__first_name', 'guest_checkout__last_name',
+    'guest_checkout__email', 'guest_checkout__phone',
+    'pickup_address__address_line_1', 'pickup_address__zip_code',
+    'delivery_address__address_line_1', 'delivery_address__zip_code',
+)
+CUSTOMER_DOCUMENT_FIELDS = (
+    'id', 'first_name', 'last_name', 'email', 'customer_profile__phone',
+)
+
+
+def normalize(*parts):
+    """Lowercase words of `parts`, deduplicated, in first-seen order."""
+    words = []
+    for part in parts:
+        if not part:
+            continue
+        for word in _WORD_RE.split(str(part).lower()):
+            if word and word not in words:
+                words.append(word)
+    return ' '.join(words)
+
+
+def _digits(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def booking_document(row):
+    """Search text for one row of Booking.values(*BOOKING_DOCUMENT_FIELDS)."""
+    number = row['booking_number'] or ''
+    # 'TT-000123' is also findable as '123'
+    number_digits = _digits(number).lstrip('0')
+    return normalize(
+        number, number_digits,
+        row['customer__first_name'], row['customer__last_name'], row['customer__email'],
+        _digits(row['customer__customer_profile__phone']),
+        row['guest_checkout__first_name'], row['guest_checkout__last_name'],
+        row['guest_checkout__email'], _digits(row['guest_checkout__phone']),
+        row['pickup_address__address_line_1'], row['pickup_address__zip_code'],
+        row['delivery_address__address_line_1'], row['delivery_address__zip_code'],
+    )
+
+
+def customer_document(row):
+    """Search text for one row of User.values(*CUSTOMER_DOCUMENT_FIELDS)."""
+    return normalize(
+        row['first_name'], row['last_name'], row['email'],
+        _digits(row['customer_profile__phone']),
+    )
+
+
+def refresh_booking_documents(booking_ids=None):
+    """Recompute the documents of the given bookings (all if None)."""
+    from apps.bookings.models import Booking
+    from .models import BookingSearchDocument
+
+    bookings = Booking.objects.all()
+    if booking_ids is not None:
+        bookings = bookings.filter(pk__in=list(booking_ids))
+
+    count = 0
+    rows = bookings.values(*BOOKING_DOCUMENT_FIELDS).order_by().iterator(chunk_size=2000)
+    batch = []
+    for row in rows:
+        batch.append(BookingSearchDocument(
+            booking_id=row['id'], document=booking_document(row),
+            booking_created_at=row['created_at'],
+        ))
+        if len(batch) >= 500:
+            count += _upsert(BookingSearchDocument, batch, 'booking', ['document', 'booking_created_at'])
+            batch = []
+    if batch:
+        count += _upsert(BookingSearchDocument, batch, 'booking', ['document', 'booking_created_at'])
+    return count
+
+
+def refresh_customer_documents(user_ids=None):
+    """Recompute the documents of the given customer accounts (all if None)."""
+    from django.contrib.auth.models import User
+    from .models import CustomerSearchDocument
+
+    users = User.objects.filter(customer_profile__isnull=False)
+    if user_ids is not None:
+        users = users.filter(pk__in=list(user_ids))
+
+    documents = [
+        CustomerSearchDocument(user_id=row['id'], document=customer_document(row))
+        for row in users.values(*CUSTOMER_DOCUMENT_FIELDS).order_by()
+    ]
+    return _upsert(CustomerSearchDocument, documents, 'user', ['document']) if documents else 0
+
+
+def _upsert(model, documents, unique_field, update_fields):
+    model.objects.bulk_create(
+        documents, update_conflicts=True,
+        unique_fields=[unique_field], update_fields=update_fields,
+    )
+    return len(documents)
+
+
+def _query_words(query):
+    query = (query or '').strip()
+    digits = _digits(query)
+    # Phones are indexed as one run of digits (see booking_document)
+    if len(digits) >= PHONE_MIN_DIGITS and digits != query and _PHONE_QUERY_RE.match(query):
+        return [digits]
+    return normalize(query).split()
+
+
+def _ranked_ids(table, fts_table, key_column, tiebreak, query, limit, scope=None):
+    words = _query_words(query)
+    if not words:
+        return []
+
+    # Restrict to the caller's filtered rows inside the ranked query, so the
+    # LIMIT counts only rows the caller will actually show
+    scope_sql, scope_params = '', []
+    if scope is not None:
+        subquery, scope_params = scope.order_by().values('pk').query.sql_with_params()
+        scope_sql = f' AND {{column}} IN ({subquery})'
+        scope_params = list(scope_params)
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{w}:*' for w in words)
+        # The phrase as typed, for fragments inside a word ('4567' of a phone)
+        fragment = ' '.join(words)
+        use_trigram = len(fragment) >= TRIGRAM_MIN_LENGTH
+        sql = (
+            f"SELECT {key_column} FROM {table} "
+            f"WHERE (to_tsvector('simple', document) @@ to_tsquery('simple', %s)"
+            + (" OR document LIKE %s" if use_trigram else "")
+            + ")" + scope_sql.format(column=key_column)
+            + f" ORDER BY ts_rank(to_tsvector('simple', document), to_tsquery('simple', %s)) DESC"
+            + (f", {tiebreak}" if tiebreak else "")
+            + " LIMIT %s"
+        )
+        params = [tsquery] + ([f'%{fragment}%'] if use_trigram else []) + scope_params + [tsquery, limit]
+    elif connection.vendor == 'sqlite':
+        match = ' '.join(f'"{w}"*' for w in words)
+        sql = (
+            f"SELECT d.{key_column} FROM {fts_table} f JOIN {table} d ON d.id = f.rowid "
+            f"WHERE {fts_table} MATCH %s" + scope_sql.format(column=f'd.{key_column}')
+            + f" ORDER BY bm25({fts_table})"
+            + (f", d.{tiebreak}" if tiebreak else "")
+            + " LIMIT %s"
+        )
+        params = [match] + scope_params + [limit]
+    else:
+        # No full-text support: every word as a substring of the document
+        where = ' AND '.join(['document LIKE %s'] * len(words))
+        sql = f"SELECT {key_column} FROM {table} WHERE {where}{scope_sql.format(column=key_column)} LIMIT %s"
+        params = [f'%{w}%' for w in words] + scope_params + [limit]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_bookings(query, limit=SEARCH_LIMIT, scope=None):
+    """Booking ids matching every word of `query` as a prefix, best first.
+
+    `scope` is an optional Booking queryset the matches must belong to.
+    """
+    from apps.bookings.models import Booking
+
+    pk_field = Booking._meta.pk
+    ids = _ranked_ids(
+        'accounts_booking_search', BOOKING_FTS_TABLE, 'booking_id',
+        'booking_created_at DESC', query, limit, scope=scope,
+    )
+    return [pk_field.to_python(pk) for pk in ids]
+
+
+def search_customers(query, limit=SEARCH_LIMIT, scope=None):
+    """Customer user ids matching every word of `query` as a prefix, best first.
+
+    `scope` is an optional User queryset the matches must belong to.
+    """
+    return _ranked_ids(
+        'accounts_customer_search', CUSTOMER_FTS_TABLE, 'user_id', 'user_id DESC', query, limit,
+        scope=scope,
+    )
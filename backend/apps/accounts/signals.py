@@ -0,0 +1,150 @@
+import logging
+from collections import Counter
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.accounts.dashboard_stats import (
+    BOOKING_KEY,
+    CUSTOMERS_KEY,
+    REVENUE_KEY,
+    VIP_KEY,
+    apply_deltas,
+    payment_contribution,
+    succeeded_revenue_cents,
+)
+from apps.accounts.search import refresh_booking_documents, refresh_customer_documents
+from apps.bookings.models import Address, Booking, GuestCheckout
+from apps.customers.models import CustomerProfile
+from apps.payments.models import Payment
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Booking, dispatch_uid='dashboard_stats_booking_save')
+def booking_counters(sender, instance, created, **kwargs):
+    """Move the booking between status counters; soft-delete hides its revenue."""
+    deltas = Counter()
+    was_visible = not created and instance._original_deleted_at is None
+    is_visible = instance.deleted_at is None
+
+    if was_visible:
+        deltas[BOOKING_KEY.format(instance._original_status)] -= 1
+    if is_visible:
+        deltas[BOOKING_KEY.format(instance.status)] += 1
+    if not created and was_visible != is_visible:
+        revenue = succeeded_revenue_cents(instance.pk)
+        deltas[REVENUE_KEY] += revenue if is_visible else -revenue
+
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Booking, dispatch_uid='dashboard_stats_booking_delete')
+def booking_counters_deleted(sender, instance, **kwargs):
+    # Payments PROTECT their booking, so only the status counter moves
+    if instance.deleted_at is None:
+        apply_deltas({BOOKING_KEY.format(instance.status): -1})
+
+
+@receiver(post_save, sender=Payment, dispatch_uid='dashboard_stats_payment_save')
+def payment_counters(sender, instance, created, **kwargs):
+    """Apply a payment's status / booking link / amount change to the counters."""
+    new = (instance.status, instance.booking_id, instance.amount_cents)
+    old = None if created else (
+        instance._original_status, instance._original_booking_id, instance._original_amount_cents,
+    )
+    if new == old:
+        return
+
+    deltas = payment_contribution(*new)
+    if old is not None:
+        deltas.subtract(payment_contribution(*old))
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Payment, dispatch_uid='dashboard_stats_payment_delete')
+def payment_counters_deleted(sender, instance, **kwargs):
+    deltas = Counter()
+    deltas.subtract(payment_contribution(instance.status, instance.booking_id, instance.amount_cents))
+    apply_deltas(deltas)
+
+
+@receiver(post_save, sender=CustomerProfile, dispatch_uid='dashboard_stats_customer_save')
+def customer_counters(sender, instance, created, **kwargs):
+    deltas = Counter()
+    if created:
+        deltas[CUSTOMERS_KEY] += 1
+        deltas[VIP_KEY] += int(instance.is_vip)
+    elif instance._original_is_vip != instance.is_vip:
+        deltas[VIP_KEY] += 1 if instance.is_vip else -1
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=CustomerProfile, dispatch_uid='dashboard_stats_customer_delete')
+def customer_counters_deleted(sender, instance, **kwargs):
+    apply_deltas({CUSTOMERS_KEY: -1, VIP_KEY: -int(instance.is_vip)})
+
+
+# ---------------------------------------------------------------------------
+# Staff search documents (accounts/search.py)
+# ---------------------------------------------------------------------------
+
+BOOKING_SEARCH_FIELDS = {
+    'booking_number', 'customer', 'guest_checkout', 'pickup_address', 'delivery_address',
+}
+USER_SEARCH_FIELDS = {'first_name', 'last_name', 'email'}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=Booking, dispatch_uid='search_document_booking_save')
+def booking_search_document(sender, instance, created, update_fields=None, **kwargs):
+    if created or _touches(update_fields, BOOKING_SEARCH_FIELDS):
+        refresh_booking_documents([instance.pk])
+
+
+@receiver(post_save, sender=GuestCheckout, dispatch_uid='search_document_guest_save')
+def guest_search_document(sender, instance, created, **kwargs):
+    # A new guest checkout has no booking yet; the booking's own save indexes it
+    if not created:
+        refresh_booking_documents(Booking.objects.filter(guest_checkout=instance).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Address, dispatch_uid='search_document_address_save')
+def address_search_document(sender, instance, created, **kwargs):
+    if not created:
+        refresh_booking_documents(
+            Booking.objects.filter(pickup_address=instance).values_list('pk', flat=True).union(
+                Booking.objects.filter(delivery_address=instance).values_list('pk', flat=True)
+            )
+        )
+
+
+def _customer_search_changed(user_id):
+    """Refresh a customer's document; re-index their bookings if it changed.
+
+    A customer can have hundreds of bookings, so those are refreshed by a
+    task after commit rather than inside the request.
+    """
+    from apps.accounts.models import CustomerSearchDocument
+    from apps.accounts.tasks import refresh_customer_booking_documents
+
+    documents = CustomerSearchDocument.objects.filter(user_id=user_id).values_list('document', flat=True)
+    before = documents.first()
+    refresh_customer_documents([user_id])
+    if documents.first() != before:
+        transaction.on_commit(lambda: refresh_customer_booking_documents.delay(user_id))
+
+
+@receiver(post_save, sender=User, dispatch_uid='search_document_user_save')
+def user_search_document(sender, instance, created, update_fields=None, **kwargs):
+    # Logins save last_login only; profiles are indexed when they are created
+    if not created and _touches(update_fields, USER_SEARCH_FIELDS):
+        _customer_search_changed(instance.pk)
+
+
+@receiver(post_save, sender=CustomerProfile, dispatch_uid='search_document_customer_save')
+def customer_search_document(sender, instance, created, **kwargs):
+    _customer_search_changed(instance.user_id)
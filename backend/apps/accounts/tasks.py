@@ -0,0 +1,63 @@
+# apps/accounts/tasks.py
+from celery import shared_task
+from django.db import OperationalError
+import logging
+
+logger = logging.getLogger(__name__)
+
+RECOUNT_LOCK_TIMEOUT = 300
+REPORT_FACTS_LOCK_TIMEOUT = 1800
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def recount_dashboard_stats():
+    """Rebuild the staff dashboard counters from the source tables.
+
+    Runs on beat to correct drift from writes that bypass the signals (bulk
+    admin actions, manual SQL), and after those bulk actions themselves.
+    """
+    from django.core.cache import cache
+    from .dashboard_stats import recount_dashboard_stats as recount
+
+    lock_id = 'dashboard_stats_recount_lock'
+    if not cache.add(lock_id, '1', timeout=RECOUNT_LOCK_TIMEOUT):
+        logger.info("recount_dashboard_stats already running, skipping")
+        return {'skipped': True}
+
+    try:
+        drift = recount()
+    finally:
+        cache.delete(lock_id)
+
+    return {'skipped': False, 'drift': drift}
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def refresh_report_facts(full=False):
+    """Recompute the dirty days of the staff report rollups (full=True: everything)."""
+    from django.core.cache import cache
+    from .report_facts import refresh_report_facts as refresh
+
+    lock_id = 'report_facts_refresh_lock'
+    if not cache.add(lock_id, '1', timeout=REPORT_FACTS_LOCK_TIMEOUT):
+        logger.info("refresh_report_facts already running, skipping")
+        return {'skipped': True}
+
+    try:
+        result = refresh(full=full)
+    finally:
+        cache.delete(lock_id)
+
+    return {'skipped': False, **result}
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def refresh_customer_booking_documents(user_id):
+    """Re-index one customer's bookings after their name, email or phone changed."""
+    from apps.bookings.models import Booking
+    from .search import refresh_booking_documents
+
+    refreshed = refresh_booking_documents(
+        Booking.objects.filter(customer_id=user_id).values_list('pk', flat=True)
+    )
+    return {'user_id': user_id, 'refreshed': refreshed}
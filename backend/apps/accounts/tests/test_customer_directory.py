@@ -0,0 +1,122 @@
+# backend/apps/accounts/tests/test_customer_directory.py
+"""
+Staff customer directory: keyset pages, windowed recent bookings/addresses.
+"""
+import pytest
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.customer_directory import decode_cursor, encode_cursor, InvalidCursor
+from apps.accounts.models import StaffProfile
+from apps.bookings.models import Address, Booking
+from apps.customers.models import CustomerProfile, SavedAddress
+
+
+@pytest.fixture
+def staff_client(db):
+    user = User.objects.create_user(
+        username='dirstaff', email='dirstaff@example.com', password='x',
+        first_name='Dir', last_name='Staff',
+    )
+    StaffProfile.objects.create(user=user, role='staff', phone='5550000005')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _customer(n, vip=False):
+    user = User.objects.create_user(
+        username=f'dircust{n}', email=f'dircust{n}@example.com', password='x',
+        first_name='Customer', last_name=str(n),
+    )
+    CustomerProfile.objects.create(user=user, is_vip=vip)
+    return user
+
+
+def _bookings(user, count):
+    pickup = Address.objects.create(address_line_1='1 Test St', city='New York', state='NY', zip_code='10001')
+    delivery = Address.objects.create(address_line_1='2 Test Ave', city='New York', state='NY', zip_code='10002')
+    return [
+        Booking.objects.create(
+            customer=user, service_type='mini_move',
+            pickup_address=pickup, delivery_address=delivery,
+            pickup_date=timezone.now().date() + timedelta(days=3),
+        )
+        for _ in range(count)
+    ]
+
+
+def _addresses(user, usage):
+    for i, times_used in enumerate(usage):
+        SavedAddress.objects.create(
+            user=user, nickname=f'addr{i}', address_line_1=f'{i} Main St',
+            city='New York', state='NY', zip_code='10001', times_used=times_used,
+        )
+
+
+@pytest.mark.django_db
+class TestCustomerDirectory:
+
+    def test_pages_follow_next_cursor(self, staff_client):
+        users = [_customer(n) for n in range(5)]
+
+        first = staff_client.get('/api/staff/customers/', {'limit': 2}).data
+        second = staff_client.get('/api/staff/customers/', {'limit': 2, 'cursor': first['next_cursor']}).data
+        third = staff_client.get('/api/staff/customers/', {'limit': 2, 'cursor': second['next_cursor']}).data
+
+        seen = [c['id'] for page in (first, second, third) for c in page['customers']]
+        assert seen == [u.id for u in reversed(users)]
+        assert third['next_cursor'] is None
+        assert first['total_count'] == 5
+
+    def test_recent_bookings_and_addresses_are_capped(self, staff_client):
+        vip = _customer(1, vip=True)
+        bookings = _bookings(vip, 8)
+        Booking.objects.filter(pk=bookings[-1].pk).update(deleted_at=timezone.now())
+        _addresses(vip, [1, 9, 4, 7])
+
+        customer = staff_client.get('/api/staff/customers/').data['customers'][0]
+
+        assert len(customer['recent_bookings']) == 5
+        assert customer['recent_bookings'][0]['booking_number'] == bookings[-2].booking_number
+        assert [a['address_line_1'] for a in customer['saved_addresses']] == [
+            '1 Main St', '3 Main St', '2 Main St',
+        ]
+
+    def test_query_count_does_not_grow_with_bookings(self, staff_client):
+        for n in range(3):
+            _bookings(_customer(n), 2)
+        with CaptureQueriesContext(connection) as small:
+            staff_client.get('/api/staff/customers/')
+
+        for n in range(3, 6):
+            _bookings(_customer(n), 6)
+        with CaptureQueriesContext(connection) as large:
+            staff_client.get('/api/staff/customers/')
+
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_vip_filter_and_search(self, staff_client):
+        _customer(1)
+        vip = _customer(2, vip=True)
+
+        data = staff_client.get('/api/staff/customers/', {'vip': 'true'}).data
+        assert [c['id'] for c in data['customers']] == [vip.id]
+
+        data = staff_client.get('/api/staff/customers/', {'search': 'dircust1@'}).data
+        assert data['total_count'] == 1
+
+    def test_invalid_cursor_is_rejected(self, staff_client):
+        response = staff_client.get('/api/staff/customers/', {'cursor': 'not-a-cursor'})
+        assert response.status_code == 400
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor('42'))
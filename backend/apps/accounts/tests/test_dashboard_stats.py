@@ -0,0 +1,162 @@
+# backend/apps/accounts/tests/test_dashboard_stats.py
+"""
+Materialized staff dashboard counters: deltas from signals, recount, one-query read.
+"""
+import pytest
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.dashboard_stats import (
+    compute_dashboard_stats,
+    get_dashboard_stats,
+    recount_dashboard_stats,
+)
+from apps.accounts.models import DashboardStat, StaffProfile
+from apps.bookings.models import Address, Booking, GuestCheckout
+from apps.customers.models import CustomerProfile
+from apps.payments.models import Payment
+
+
+@pytest.fixture
+def make_booking(db):
+    def _make(**extra):
+        guest = GuestCheckout.objects.create(
+            first_name='Stats', last_name='Test', email='stats@example.com', phone='5551234567',
+        )
+        return Booking.objects.create(
+            guest_checkout=guest,
+            service_type='mini_move',
+            pickup_address=Address.objects.create(
+                address_line_1='1 Test St', city='New York', state='NY', zip_code='10001'),
+            delivery_address=Address.objects.create(
+                address_line_1='2 Test Ave', city='New York', state='NY', zip_code='10002'),
+            pickup_date=timezone.now().date() + timedelta(days=3),
+            **extra,
+        )
+    return _make
+
+
+@pytest.fixture
+def populated(db):
+    """Counters exist (as after the first dashboard read in production)."""
+    recount_dashboard_stats()
+
+
+def _assert_matches_source():
+    stats = get_dashboard_stats()
+    for key, value in compute_dashboard_stats().items():
+        assert stats.get(key, 0) == value, key
+
+
+@pytest.mark.django_db
+class TestCounterDeltas:
+
+    def test_booking_lifecycle(self, populated, make_booking):
+        booking = make_booking()
+        assert get_dashboard_stats()['booking.pending'] == 1
+
+        booking.status = 'paid'
+        booking.save()
+        stats = get_dashboard_stats()
+        assert stats['booking.pending'] == 0
+        assert stats['booking.paid'] == 1
+
+        booking.deleted_at = timezone.now()
+        booking.save()
+        assert get_dashboard_stats()['booking.paid'] == 0
+        _assert_matches_source()
+
+    def test_payment_transitions_and_revenue(self, populated, make_booking):
+        booking = make_booking()
+        payment = Payment.objects.create(booking=booking, amount_cents=12500, status='pending')
+        assert get_dashboard_stats()['payment.pending'] == 1
+
+        payment.status = 'succeeded'
+        payment.save()
+        stats = get_dashboard_stats()
+        assert stats['payment.pending'] == 0
+        assert stats['payment.succeeded'] == 1
+        assert stats['revenue.cents'] == 12500
+
+        booking.deleted_at = timezone.now()
+        booking.save()
+        assert get_dashboard_stats()['revenue.cents'] == 0
+
+        booking.deleted_at = None
+        booking.save()
+        assert get_dashboard_stats()['revenue.cents'] == 12500
+        _assert_matches_source()
+
+    def test_unlinked_payment_counts_once_linked(self, populated, make_booking):
+        payment = Payment.objects.create(amount_cents=5000, status='succeeded')
+        assert get_dashboard_stats()['payment.succeeded'] == 0
+
+        payment.booking = make_booking()
+        payment.save()
+        stats = get_dashboard_stats()
+        assert stats['payment.succeeded'] == 1
+        assert stats['revenue.cents'] == 5000
+
+    def test_customer_and_vip_counters(self, populated):
+        user = User.objects.create_user(username='statscust', email='c@example.com', password='x')
+        profile = CustomerProfile.objects.create(user=user)
+        assert get_dashboard_stats()['customers.total'] == 1
+
+        profile.is_vip = True
+        profile.save()
+        assert get_dashboard_stats()['customers.vip'] == 1
+
+        user.delete()
+        stats = get_dashboard_stats()
+        assert stats['customers.total'] == 0
+        assert stats['customers.vip'] == 0
+
+
+@pytest.mark.django_db
+class TestRecount:
+
+    def test_first_read_populates_counters(self, make_booking):
+        make_booking(status='confirmed')
+        assert not DashboardStat.objects.exists()
+
+        assert get_dashboard_stats()['booking.confirmed'] == 1
+
+    def test_recount_corrects_bulk_update_drift(self, populated, make_booking):
+        booking = make_booking()
+        Booking.objects.filter(pk=booking.pk).update(status='completed')
+
+        drift = recount_dashboard_stats()
+
+        assert drift == {'booking.pending': -1, 'booking.completed': 1}
+        _assert_matches_source()
+
+    def test_recount_without_drift_reports_nothing(self, populated, make_booking):
+        make_booking()
+        assert recount_dashboard_stats() == {}
+
+
+@pytest.mark.django_db
+def test_dashboard_reads_counters_in_one_query(populated, make_booking):
+    user = User.objects.create_user(
+        username='statsstaff', email='staff@example.com', password='x',
+        first_name='Stats', last_name='Staff',
+    )
+    StaffProfile.objects.create(user=user, role='staff', phone='5550000003')
+    make_booking(status='paid')
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/api/staff/dashboard/')
+
+    assert response.status_code == 200
+    assert response.data['booking_stats']['total_bookings'] == 1
+    assert response.data['booking_stats']['paid_bookings'] == 1
+    stat_queries = [q for q in ctx.captured_queries if 'accounts_dashboard_stat' in q['sql']]
+    assert len(stat_queries) == 1
+    assert not any('COUNT(' in q['sql'] for q in ctx.captured_queries)
@@ -0,0 +1,152 @@
+# backend/apps/accounts/tests/test_report_facts.py
+"""
+Report rollups: dirty-day refresh from updated_at watermarks, and
+StaffReportsView reading the fact tables.
+"""
+import pytest
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.dashboard_stats import recount_dashboard_stats
+from apps.accounts.models import (
+    CustomerReportFact,
+    DailyBookingFact,
+    DailyRevenueFact,
+    ReportRollupState,
+    StaffProfile,
+)
+from apps.accounts.report_facts import refresh_report_facts
+from apps.bookings.models import Address, Booking, GuestCheckout
+from apps.customers.models import CustomerProfile
+from apps.payments.models import Payment
+
+
+@pytest.fixture
+def make_booking(db):
+    def _make(customer=None, days_ago=0, **extra):
+        if customer is None:
+            extra['guest_checkout'] = GuestCheckout.objects.create(
+                first_name='Report', last_name='Test', email='report@example.com', phone='5551234567',
+            )
+        booking = Booking.objects.create(
+            customer=customer,
+            service_type='mini_move',
+            pickup_address=Address.objects.create(
+                address_line_1='1 Test St', city='New York', state='NY', zip_code='10001'),
+            delivery_address=Address.objects.create(
+                address_line_1='2 Test Ave', city='New York', state='NY', zip_code='10002'),
+            pickup_date=timezone.now().date() + timedelta(days=3),
+            **extra,
+        )
+        if days_ago:
+            Booking.objects.filter(pk=booking.pk).update(
+                created_at=timezone.now() - timedelta(days=days_ago)
+            )
+            booking.refresh_from_db()
+        return booking
+    return _make
+
+
+def _pay(booking, cents, status='succeeded'):
+    return Payment.objects.create(booking=booking, amount_cents=cents, status=status)
+
+
+def _settle_watermark():
+    """Pretend the last refresh ran after everything created so far."""
+    ReportRollupState.objects.filter(pk=1).update(watermark=timezone.now())
+
+
+@pytest.mark.django_db
+class TestRefreshReportFacts:
+
+    def test_first_refresh_is_full(self, make_booking):
+        booking = make_booking(status='paid')
+        _pay(booking, 10000)
+
+        assert refresh_report_facts() == {'full': True}
+
+        fact = DailyBookingFact.objects.get()
+        assert (fact.status, fact.booking_count) == ('paid', 1)
+        assert DailyRevenueFact.objects.get().revenue_cents == 10000
+
+    def test_only_dirty_days_are_recomputed(self, make_booking):
+        old = make_booking(days_ago=40)
+        make_booking(days_ago=10)
+        refresh_report_facts()
+        _settle_watermark()
+
+        old.status = 'confirmed'
+        old.save()
+        result = refresh_report_facts()
+
+        assert result == {'full': False, 'booking_days': 1, 'revenue_days': 0, 'customers': 0}
+        assert DailyBookingFact.objects.get(date=timezone.localdate(old.created_at)).status == 'confirmed'
+        assert DailyBookingFact.objects.count() == 2
+
+    def test_soft_deleting_a_booking_removes_its_revenue(self, make_booking):
+        booking = make_booking(status='paid', days_ago=5)
+        _pay(booking, 25000)
+        refresh_report_facts()
+        _settle_watermark()
+
+        booking.deleted_at = timezone.now()
+        booking.save()
+        result = refresh_report_facts()
+
+        assert result['revenue_days'] == 1
+        assert not DailyRevenueFact.objects.exists()
+        assert not DailyBookingFact.objects.exists()
+
+    def test_customer_facts_follow_their_bookings(self, make_booking):
+        user = User.objects.create_user(username='reportcust', email='rc@example.com', password='x')
+        make_booking(customer=user, status='completed', total_price_cents=30000)
+        refresh_report_facts()
+        _settle_watermark()
+
+        make_booking(customer=user, status='pending')
+        refresh_report_facts()
+
+        fact = CustomerReportFact.objects.get(user=user)
+        assert fact.booking_count == 2
+
+
+@pytest.mark.django_db
+def test_reports_view_reads_fact_tables(make_booking):
+    staff = User.objects.create_user(
+        username='reportstaff', email='staff@example.com', password='x',
+        first_name='Report', last_name='Staff',
+    )
+    StaffProfile.objects.create(user=staff, role='admin', phone='5550000004')
+    customer = User.objects.create_user(
+        username='topcust', email='top@example.com', password='x', first_name='Top', last_name='Customer',
+    )
+    CustomerProfile.objects.create(user=customer)
+    paid = make_booking(customer=customer, status='paid')
+    _pay(paid, paid.total_price_cents)
+    make_booking(status='cancelled', days_ago=3)
+    refresh_report_facts()
+    recount_dashboard_stats()
+
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get('/api/staff/reports/')
+
+    assert response.status_code == 200
+    data = response.data
+    assert data['bookings']['total'] == 2
+    assert data['bookings']['by_status']['paid'] == 1
+    assert data['bookings']['by_status']['cancelled'] == 1
+    assert data['revenue']['total_all_time'] == paid.total_price_cents / 100
+    assert data['revenue']['last_30_days'] == paid.total_price_cents / 100
+    assert data['performance']['cancellation_rate'] == 50.0
+    assert data['customers']['top_customers'][0]['email'] == 'top@example.com'
+    assert not any(
+        'bookings_booking' in q['sql'] or 'payments_payment' in q['sql']
+        for q in ctx.captured_queries
+    )
@@ -0,0 +1,170 @@
+# backend/apps/accounts/tests/test_search.py
+"""
+Staff search documents: maintained by signals, ranked prefix search (FTS5 here,
+tsvector/pg_trgm on PostgreSQL).
+"""
+import importlib
+
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import BookingSearchDocument, CustomerSearchDocument, StaffProfile
+from apps.accounts.search import normalize, search_bookings, search_customers
+from apps.bookings.models import Address, Booking, GuestCheckout
+from apps.customers.models import CustomerProfile
+
+
+@pytest.fixture
+def make_booking(db):
+    def _make(guest_name=('Jane', 'Doe'), email='jane.doe@example.com', zip_code='10011',
+              phone='(555) 123-4567', customer=None):
+        extra = {}
+        if customer is None:
+            extra['guest_checkout'] = GuestCheckout.objects.create(
+                first_name=guest_name[0], last_name=guest_name[1], email=email, phone=phone,
+            )
+        return Booking.objects.create(
+            customer=customer,
+            service_type='mini_move',
+            pickup_address=Address.objects.create(
+                address_line_1='350 Hudson Street', city='New York', state='NY', zip_code=zip_code),
+            delivery_address=Address.objects.create(
+                address_line_1='2 Test Ave', city='New York', state='NY', zip_code='10002'),
+            pickup_date=timezone.now().date() + timedelta(days=3),
+            **extra,
+        )
+    return _make
+
+
+def test_normalize_splits_words_and_dedupes():
+    assert normalize('Jane.Doe@Example.com', 'jane', None) == 'jane doe example com'
+
+
+@pytest.mark.django_db
+class TestSearchDocuments:
+
+    def test_booking_is_indexed_on_create(self, make_booking):
+        booking = make_booking()
+        document = BookingSearchDocument.objects.get(booking=booking).document
+
+        assert 'jane' in document.split()
+        assert '5551234567' in document.split()
+        assert '10011' in document.split()
+
+    @pytest.mark.parametrize('query', [
+        'jane', 'JANE DO', 'jane.doe@exam', '555123', 'hudson 1001',
+    ])
+    def test_prefix_queries_find_the_booking(self, make_booking, query):
+        booking = make_booking()
+        make_booking(guest_name=('Other', 'Person'), email='other@example.org', zip_code='07030',
+                     phone='2015550000')
+
+        assert search_bookings(query) == [booking.pk]
+
+    @pytest.mark.parametrize('query', ['(555) 123-4567', '555-123-4567', '555.123.4567', '555 123 4567'])
+    def test_formatted_phone_queries_find_the_booking(self, make_booking, query):
+        booking = make_booking(phone='5551234567')
+
+        assert search_bookings(query) == [booking.pk]
+
+    def test_scope_applies_before_the_limit(self, make_booking):
+        pending = make_booking()
+        # Newer, so they outrank the pending booking on equal scores
+        cancelled = [make_booking() for _ in range(3)]
+        Booking.objects.filter(pk__in=[b.pk for b in cancelled]).update(status='cancelled')
+
+        assert pending.pk not in search_bookings('jane', limit=3)
+        assert search_bookings('jane', limit=3, scope=Booking.objects.filter(status='pending')) == [pending.pk]
+
+    def test_booking_number_with_or_without_padding(self, make_booking):
+        booking = make_booking()
+        digits = booking.booking_number.split('-')[1].lstrip('0')
+
+        assert search_bookings(booking.booking_number) == [booking.pk]
+        assert booking.pk in search_bookings(digits)
+
+    def test_guest_edit_reindexes_booking(self, make_booking):
+        booking = make_booking()
+        guest = booking.guest_checkout
+        guest.last_name = 'Smithers'
+        guest.save()
+
+        assert search_bookings('smither') == [booking.pk]
+
+    def test_customer_rename_reindexes_their_bookings(self, make_booking, django_capture_on_commit_callbacks):
+        user = User.objects.create_user(
+            username='searchcust', email='alex@example.com', password='x', first_name='Alex', last_name='Kim',
+        )
+        CustomerProfile.objects.create(user=user, phone='2125550199')
+        booking = make_booking(customer=user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.last_name = 'Rivera'
+            user.save()
+
+        assert search_customers('alex riv') == [user.pk]
+        assert search_bookings('rivera') == [booking.pk]
+
+    def test_migration_backfill_matches_live_documents(self, make_booking):
+        user = User.objects.create_user(username='backfill', email='sam@example.com', password='x', first_name='Sam')
+        CustomerProfile.objects.create(user=user, phone='2125550100')
+        bookings = [make_booking(), make_booking(customer=user)]
+        expected = dict(BookingSearchDocument.objects.values_list('booking_id', 'document'))
+        expected_customer = CustomerSearchDocument.objects.get(user=user).document
+        BookingSearchDocument.objects.all().delete()
+        CustomerSearchDocument.objects.all().delete()
+
+        migration = importlib.import_module('apps.accounts.migrations.0005_search_documents')
+        migration.backfill_search_documents(apps, None)
+
+        assert dict(BookingSearchDocument.objects.values_list('booking_id', 'document')) == expected
+        assert CustomerSearchDocument.objects.get(user=user).document == expected_customer
+        assert search_bookings('sam') == [bookings[1].pk]
+
+    def test_rebuild_command(self, make_booking):
+        booking = make_booking()
+        BookingSearchDocument.objects.all().delete()
+
+        call_command('rebuild_search_documents', stdout=StringIO())
+
+        assert search_bookings('jane') == [booking.pk]
+
+
+@pytest.mark.django_db
+def test_staff_booking_list_uses_search(make_booking):
+    staff = User.objects.create_user(username='searchstaff', email='ss@example.com', password='x')
+    StaffProfile.objects.create(user=staff, role='staff', phone='5550000006')
+    booking = make_booking()
+    make_booking(guest_name=('Other', 'Person'), email='other@example.org')
+    client = APIClient()
+    client.force_authenticate(user=staff)
+
+    response = client.get('/api/staff/bookings/', {'search': 'jane'})
+
+    assert response.status_code == 200
+    assert [b['id'] for b in response.data['bookings']] == [str(booking.pk)]
+    assert response.data['total_count'] == 1
+
+
+@pytest.mark.django_db
+def test_staff_booking_list_filters_before_search_limit(make_booking, monkeypatch):
+    from apps.accounts import views
+    monkeypatch.setattr(views, 'search_bookings', lambda query, scope=None: search_bookings(query, 1, scope))
+    staff = User.objects.create_user(username='searchstaff2', email='ss2@example.com', password='x')
+    StaffProfile.objects.create(user=staff, role='staff', phone='5550000007')
+    booking = make_booking()
+    other = make_booking()
+    Booking.objects.filter(pk=other.pk).update(status='cancelled')
+    client = APIClient()
+    client.force_authenticate(user=staff)
+
+    response = client.get('/api/staff/bookings/', {'search': '(555) 123-4567', 'status': 'pending'})
+
+    assert [b['id'] for b in response.data['bookings']] == [str(booking.pk)]
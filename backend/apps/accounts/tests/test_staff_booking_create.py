@@ -93,7 +93,7 @@ def _booking_payload(mini_move_package, **overrides):
 @pytest.mark.django_db
 class TestStaffBookingCreate:
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_create_booking_success(self, mock_checkout, mock_email, staff_client, mini_move_package):
         """Staff can create a booking and get a checkout URL back."""
@@ -126,7 +126,7 @@ class TestStaffBookingCreate:
         # Verify email was sent
         mock_email.assert_called_once()
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_create_booking_with_custom_price(self, mock_checkout, mock_email, staff_client, mini_move_package):
         """Staff can override the auto-calculated price."""
@@ -173,7 +173,7 @@ class TestStaffBookingCreate:
         )
         assert response.status_code == 403
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_create_booking_missing_required_fields(self, mock_checkout, mock_email, staff_client, mini_move_package):
         """Missing required fields should return 400."""
@@ -184,7 +184,7 @@ class TestStaffBookingCreate:
         )
         assert response.status_code == 400
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_create_booking_invalid_service_type(self, mock_checkout, mock_email, staff_client, mini_move_package):
         """Invalid service type should return 400."""
@@ -273,7 +273,7 @@ class TestStaffResendPaymentLink:
         )
         assert response.status_code in (401, 403)
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_resend_invalidates_old_payments(self, mock_checkout, mock_email, staff_client, pending_staff_booking):
         """Resending should mark old Payment records as failed."""
@@ -388,7 +388,7 @@ def service_restricted_discount(db):
 @pytest.mark.django_db
 class TestStaffBookingCreateWithDiscount:
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_create_booking_with_discount_code(
         self, mock_checkout, mock_email, staff_client, mini_move_package, percentage_discount
@@ -416,7 +416,7 @@ class TestStaffBookingCreateWithDiscount:
         assert response.data['booking'].get('discount_code') == 'STAFF20'
         assert response.data['booking'].get('discount_amount_dollars') is not None
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_discount_records_usage(
         self, mock_checkout, mock_email, staff_client, mini_move_package, percentage_discount
@@ -442,7 +442,7 @@ class TestStaffBookingCreateWithDiscount:
         percentage_discount.refresh_from_db()
         assert percentage_discount.times_used == 1
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_invalid_discount_code_silently_ignored(
         self, mock_checkout, mock_email, staff_client, mini_move_package
@@ -465,7 +465,7 @@ class TestStaffBookingCreateWithDiscount:
         assert booking.discount_code is None
         assert booking.discount_amount_cents == 0
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_discount_code_case_insensitive(
         self, mock_checkout, mock_email, staff_client, mini_move_package, percentage_discount
@@ -487,7 +487,7 @@ class TestStaffBookingCreateWithDiscount:
         booking = Booking.objects.get(booking_number=response.data['booking']['booking_number'])
         assert booking.discount_code == percentage_discount
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_custom_total_overrides_discount(
         self, mock_checkout, mock_email, staff_client, mini_move_package, percentage_discount
@@ -516,7 +516,7 @@ class TestStaffBookingCreateWithDiscount:
         # But discount is still recorded for tracking
         assert booking.discount_code == percentage_discount
 
-    @patch('apps.customers.emails.send_payment_link_email', return_value=True)
+    @patch('apps.accounts.views.send_payment_link_email', return_value=True)
     @patch('apps.payments.services.StripePaymentService.create_checkout_session')
     def test_no_discount_code_field_works(
         self, mock_checkout, mock_email, staff_client, mini_move_package
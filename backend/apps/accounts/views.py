@@ -9,10 +9,25 @@ from django.middleware.csrf import get_token
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count, Prefetch
 from django_ratelimit.decorators import ratelimit
+from .customer_directory import (
+    DEFAULT_PAGE_SIZE,
+    InvalidCursor,
+    customer_directory_page,
+    filtered_customers,
+)
+from .dashboard_stats import (
+    BOOKING_KEY,
+    CUSTOMERS_KEY,
+    PAYMENT_KEY,
+    REVENUE_KEY,
+    VIP_KEY,
+    apply_deltas,
+    get_dashboard_stats,
+)
 from .models import StaffProfile, StaffAction
 from .permissions import IsStaffMember
+from .search import search_bookings
 from .serializers import (
     StaffLoginSerializer,
     StaffProfileSerializer,
@@ -21,6 +36,7 @@ from .serializers import (
 )
 from django.db import transaction
 from apps.bookings.models import Booking
+from apps.bookings.pagination import page_size, paginate_newest_first
 from apps.bookings.serializers import StaffBookingCreateSerializer
 from apps.customers.models import CustomerProfile
 from apps.customers.emails import send_payment_link_email
@@ -132,25 +148,26 @@ class StaffDashboardView(APIView):
             request=request
         )
         
-        # Get booking statistics
-        total_bookings = Booking.objects.filter(deleted_at__isnull=True).count()
-        pending_bookings = Booking.objects.filter(status='pending', deleted_at__isnull=True).count()
-        confirmed_bookings = Booking.objects.filter(status='confirmed', deleted_at__isnull=True).count()
-        paid_bookings = Booking.objects.filter(status='paid', deleted_at__isnull=True).count()
-        completed_bookings = Booking.objects.filter(status='completed', deleted_at__isnull=True).count()
-        
-        # Get payment statistics (exclude unlinked payments from counts)
-        total_payments = Payment.objects.filter(status='succeeded', booking__isnull=False).count()
-        pending_payments = Payment.objects.filter(status='pending', booking__isnull=False).count()
-        failed_payments = Payment.objects.filter(status='failed', booking__isnull=False).count()
-
-        # Calculate revenue (only payments linked to non-deleted bookings)
-        from django.db.models import Sum
-        total_revenue_cents = Payment.objects.filter(
-            status='succeeded', booking__isnull=False, booking__deleted_at__isnull=True
-        ).aggregate(
-            total=Sum('amount_cents')
-        )['total'] or 0
+        # Counters are materialized in DashboardStat (one query, see
+        # accounts/dashboard_stats.py) instead of ~12 COUNT(*)s per refresh
+        stats = get_dashboard_stats()
+        booking_counts = {
+            status: stats.get(BOOKING_KEY.format(status), 0)
+            for status, _ in Booking.STATUS_CHOICES
+        }
+        total_bookings = sum(booking_counts.values())
+        pending_bookings = booking_counts['pending']
+        confirmed_bookings = booking_counts['confirmed']
+        paid_bookings = booking_counts['paid']
+        completed_bookings = booking_counts['completed']
+
+        # Payment statistics (unlinked payments are not counted)
+        total_payments = stats.get(PAYMENT_KEY.format('succeeded'), 0)
+        pending_payments = stats.get(PAYMENT_KEY.format('pending'), 0)
+        failed_payments = stats.get(PAYMENT_KEY.format('failed'), 0)
+
+        # Revenue (only payments linked to non-deleted bookings)
+        total_revenue_cents = stats.get(REVENUE_KEY, 0)
         
         # Get recent bookings needing attention
         urgent_bookings = Booking.objects.filter(
@@ -158,9 +175,9 @@ class StaffDashboardView(APIView):
             deleted_at__isnull=True
         ).select_related('customer', 'guest_checkout').order_by('pickup_date', 'created_at')[:10]
         
-        # Get customer statistics
-        total_customers = CustomerProfile.objects.count()
-        vip_customers = CustomerProfile.objects.filter(is_vip=True).count()
+        # Customer statistics
+        total_customers = stats.get(CUSTOMERS_KEY, 0)
+        vip_customers = stats.get(VIP_KEY, 0)
         
         return Response({
             'staff_info': {
@@ -219,51 +236,26 @@ class CustomerManagementView(APIView):
         # Get query parameters
         search = request.query_params.get('search', '')
         vip = request.query_params.get('vip', '')
-        
-        # Start with all customer profiles, prefetch related data to avoid N+1
-        from apps.customers.models import SavedAddress
-        customers = User.objects.filter(
-            customer_profile__isnull=False,
-        ).select_related(
-            'customer_profile',
-        ).prefetch_related(
-            Prefetch(
-                'bookings',
-                queryset=Booking.objects.filter(
-                    deleted_at__isnull=True,
-                ).order_by('-created_at'),
-                to_attr='prefetched_bookings',
-            ),
-            Prefetch(
-                'saved_addresses',
-                queryset=SavedAddress.objects.filter(
-                    is_active=True,
-                ).order_by('-times_used'),
-                to_attr='prefetched_addresses',
-            ),
-        )
+        cursor = request.query_params.get('cursor') or None
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Apply search filter
-        if search:
-            customers = customers.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search) |
-                Q(customer_profile__phone__icontains=search)
+        # Keyset page + windowed recent bookings/addresses (accounts/customer_directory.py)
+        try:
+            customers, bookings_by_user, addresses_by_user, next_cursor = customer_directory_page(
+                search=search, vip=vip, cursor=cursor, limit=limit,
             )
-
-        # Apply VIP filter
-        if vip == 'true':
-            customers = customers.filter(customer_profile__is_vip=True)
-        elif vip == 'false':
-            customers = customers.filter(customer_profile__is_vip=False)
+        except InvalidCursor:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Serialize customer data
         customer_data = []
-        for user in customers[:100]:  # Limit to 100 results
+        for user in customers:
             profile = user.customer_profile
-            recent_bookings = user.prefetched_bookings[:5]
-            saved_addrs = user.prefetched_addresses[:3]
+            recent_bookings = bookings_by_user.get(user.id, [])
+            saved_addrs = addresses_by_user.get(user.id, [])
 
             customer_data.append({
                 'id': user.id,
@@ -295,7 +287,8 @@ class CustomerManagementView(APIView):
         
         return Response({
             'customers': customer_data,
-            'total_count': customers.count(),
+            'total_count': filtered_customers(search, vip).count(),
+            'next_cursor': next_cursor,
             'filters': {
                 'search': search,
                 'vip': vip
@@ -406,17 +399,16 @@ class BookingManagementView(APIView):
         end_date = request.query_params.get('end_date', None)
         search = request.query_params.get('search', None)
         
-        # ✅ OPTIMIZED: Added select_related to avoid N+1 queries
+        cursor = request.query_params.get('cursor') or None
+        try:
+            limit = page_size(request.query_params.get('limit'))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Only the columns the list renders (BookingQuerySet.for_list)
         bookings = Booking.objects.filter(
             deleted_at__isnull=True
-        ).select_related(
-            'customer',
-            'customer__customer_profile',
-            'guest_checkout',
-            'mini_move_package',
-            'pickup_address',
-            'delivery_address'
-        ).order_by('-created_at')
+        ).for_list(with_customer=True)
         
         if status_filter:
             bookings = bookings.filter(status=status_filter)
@@ -435,20 +427,24 @@ class BookingManagementView(APIView):
         elif end_date:
             bookings = bookings.filter(pickup_date__lte=end_date)
         
+        next_cursor = None
         if search:
-            bookings = bookings.filter(
-                Q(booking_number__icontains=search) |
-                Q(customer__email__icontains=search) |
-                Q(guest_checkout__email__icontains=search) |
-                Q(customer__first_name__icontains=search) |
-                Q(customer__last_name__icontains=search) |
-                Q(guest_checkout__first_name__icontains=search) |
-                Q(guest_checkout__last_name__icontains=search)
-            )
+            # Indexed search documents (accounts/search.py), best match first
+            ranked_ids = search_bookings(search, scope=bookings)
+            bookings = bookings.filter(pk__in=ranked_ids)
+            rank = {pk: i for i, pk in enumerate(ranked_ids)}
+            page = sorted(bookings, key=lambda b: rank[b.pk])[:limit]
+        else:
+            try:
+                cursor_page = paginate_newest_first(bookings, cursor=cursor, limit=limit)
+            except InvalidCursor:
+                return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+            page, next_cursor = cursor_page.items, cursor_page.next_cursor
+        payment_statuses = self._get_payment_statuses(page)
         
         # Serialize bookings
         booking_data = []
-        for booking in bookings[:50]:  # Limit to 50 results
+        for booking in page:
             booking_data.append({
                 'id': str(booking.id),
                 'booking_number': booking.booking_number,
@@ -459,7 +455,7 @@ class BookingManagementView(APIView):
                 'pickup_time': booking.get_pickup_time_display(),
                 'status': booking.get_status_display(),
                 'total_price_dollars': booking.total_price_dollars,
-                'payment_status': self._get_payment_status(booking),
+                'payment_status': payment_statuses.get(booking.pk, 'not_created'),
                 'created_at': booking.created_at,
                 'coi_required': booking.coi_required
             })
@@ -467,6 +463,7 @@ class BookingManagementView(APIView):
         return Response({
             'bookings': booking_data,
             'total_count': bookings.count(),
+            'next_cursor': next_cursor,
             'filters': {
                 'status': status_filter,
                 'date': date_filter,
@@ -476,10 +473,15 @@ class BookingManagementView(APIView):
             }
         })
     
-    def _get_payment_status(self, booking):
-        """Get payment status for booking"""
-        payment = booking.payments.first()
-        return payment.status if payment else 'not_created'
+    def _get_payment_statuses(self, bookings):
+        """{booking id: status of its first payment} for a page, in one query
+        (was booking.payments.first() per row)."""
+        statuses = {}
+        for booking_id, payment_status in Payment.objects.filter(
+            booking__in=[b.pk for b in bookings]
+        ).order_by('booking_id', 'pk').values_list('booking_id', 'status'):
+            statuses.setdefault(booking_id, payment_status)
+        return statuses
 
 @method_decorator(ratelimit(key='user', rate='20/m', method='GET', block=True), name='get')
 @method_decorator(ratelimit(key='user', rate='10/m', method='PATCH', block=True), name='patch')
@@ -789,113 +791,103 @@ class StaffReportsView(APIView):
     permission_classes = [IsStaffMember]
 
     def get(self, request):
-        from django.db.models import Sum, Avg
-        from django.db.models.functions import TruncDate, TruncMonth
+        from django.db.models import Sum
+        from django.db.models.functions import TruncMonth
         from django.utils import timezone
         from datetime import timedelta
+        from .models import CustomerReportFact, DailyBookingFact, DailyRevenueFact
+        from .report_facts import report_facts_as_of
+
+        # Everything below reads the daily rollups (accounts/report_facts.py),
+        # refreshed every 10 minutes, so cost doesn't grow with the bookings table
+        data_as_of = report_facts_as_of()
 
         # Date ranges
         today = timezone.now().date()
         thirty_days_ago = today - timedelta(days=30)
-        ninety_days_ago = today - timedelta(days=90)
-        start_of_year = today.replace(month=1, day=1)
 
         # === REVENUE METRICS ===
-        # Total revenue all time (only payments linked to non-deleted bookings)
-        total_revenue_cents = Payment.objects.filter(
-            status='succeeded', booking__isnull=False, booking__deleted_at__isnull=True
-        ).aggregate(
-            total=Sum('amount_cents')
-        )['total'] or 0
-
-        # Revenue last 30 days
-        revenue_30_days = Payment.objects.filter(
-            status='succeeded',
-            booking__isnull=False,
-            booking__deleted_at__isnull=True,
-            created_at__date__gte=thirty_days_ago
-        ).aggregate(total=Sum('amount_cents'))['total'] or 0
+        # (facts only hold succeeded payments linked to non-deleted bookings)
+        revenue_facts = DailyRevenueFact.objects.all()
+        total_revenue_cents = revenue_facts.aggregate(total=Sum('revenue_cents'))['total'] or 0
 
         # Revenue by day (last 30 days) for chart
-        daily_revenue = Payment.objects.filter(
-            status='succeeded',
-            booking__isnull=False,
-            booking__deleted_at__isnull=True,
-            created_at__date__gte=thirty_days_ago
-        ).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            revenue=Sum('amount_cents')
-        ).order_by('date')
+        daily_revenue = list(
+            revenue_facts.filter(date__gte=thirty_days_ago)
+            .values('date').annotate(revenue=Sum('revenue_cents')).order_by('date')
+        )
+        revenue_30_days = sum(d['revenue'] for d in daily_revenue)
 
         # Revenue by month (last 12 months) for chart
-        monthly_revenue = Payment.objects.filter(
-            status='succeeded',
-            booking__isnull=False,
-            booking__deleted_at__isnull=True,
-            created_at__date__gte=today - timedelta(days=365)
+        monthly_revenue = revenue_facts.filter(
+            date__gte=today - timedelta(days=365)
         ).annotate(
-            month=TruncMonth('created_at')
+            month=TruncMonth('date')
         ).values('month').annotate(
-            revenue=Sum('amount_cents'),
-            count=Count('id')
+            revenue=Sum('revenue_cents'),
+            count=Sum('payment_count')
         ).order_by('month')
 
         # === BOOKING METRICS ===
-        all_bookings = Booking.objects.filter(deleted_at__isnull=True)
+        # (facts only hold non-deleted bookings)
+        booking_facts = DailyBookingFact.objects.all()
 
         # Bookings by status
+        status_rows = {
+            row['status']: row
+            for row in booking_facts.values('status').annotate(
+                count=Sum('booking_count'), total=Sum('total_price_cents')
+            ).order_by()
+        }
+        status_counts = {status: row['count'] for status, row in status_rows.items()}
         bookings_by_status = {
-            'pending': all_bookings.filter(status='pending').count(),
-            'confirmed': all_bookings.filter(status='confirmed').count(),
-            'paid': all_bookings.filter(status='paid').count(),
-            'completed': all_bookings.filter(status='completed').count(),
-            'cancelled': all_bookings.filter(status='cancelled').count(),
+            status: status_counts.get(status, 0)
+            for status in ('pending', 'confirmed', 'paid', 'completed', 'cancelled')
         }
+        total_bookings = sum(status_counts.values())
 
         # Bookings by service type
-        bookings_by_service = all_bookings.values('service_type').annotate(
-            count=Count('id'),
+        bookings_by_service = booking_facts.values('service_type').annotate(
+            count=Sum('booking_count'),
             revenue=Sum('total_price_cents')
         ).order_by('-count')
 
         # Bookings last 30 days by day
-        daily_bookings = all_bookings.filter(
-            created_at__date__gte=thirty_days_ago
-        ).annotate(
-            date=TruncDate('created_at')
+        daily_bookings = booking_facts.filter(
+            date__gte=thirty_days_ago
         ).values('date').annotate(
-            count=Count('id')
+            count=Sum('booking_count')
         ).order_by('date')
 
         # Average booking value
-        avg_booking_value = all_bookings.filter(
-            status__in=['paid', 'completed']
-        ).aggregate(avg=Avg('total_price_cents'))['avg'] or 0
+        paid_rows = [status_rows[s] for s in ('paid', 'completed') if s in status_rows]
+        paid_count = sum(row['count'] for row in paid_rows)
+        avg_booking_value = (
+            sum(row['total'] for row in paid_rows) / paid_count if paid_count else 0
+        )
 
         # === CUSTOMER METRICS ===
-        total_customers = CustomerProfile.objects.count()
-        vip_customers = CustomerProfile.objects.filter(is_vip=True).count()
+        stats = get_dashboard_stats()
+        total_customers = stats.get(CUSTOMERS_KEY, 0)
+        vip_customers = stats.get(VIP_KEY, 0)
         new_customers_30_days = CustomerProfile.objects.filter(
             created_at__date__gte=thirty_days_ago
         ).count()
 
         # Top customers by booking count
-        top_customers = CustomerProfile.objects.annotate(
-            booking_count=Count('user__bookings', filter=Q(user__bookings__deleted_at__isnull=True)),
-            total_spent=Sum('user__bookings__total_price_cents', filter=Q(user__bookings__status__in=['paid', 'completed']))
-        ).filter(booking_count__gt=0).order_by('-booking_count')[:10]
+        top_customers = CustomerReportFact.objects.filter(
+            user__customer_profile__isnull=False
+        ).select_related('user__customer_profile').order_by('-booking_count', 'user_id')[:10]
 
         # === PERFORMANCE METRICS ===
         # Completion rate
-        completed = all_bookings.filter(status='completed').count()
-        total_non_cancelled = all_bookings.exclude(status='cancelled').count()
+        completed = bookings_by_status['completed']
+        total_non_cancelled = total_bookings - bookings_by_status['cancelled']
         completion_rate = (completed / total_non_cancelled * 100) if total_non_cancelled > 0 else 0
 
         # Cancellation rate
-        cancelled = all_bookings.filter(status='cancelled').count()
-        total_all = all_bookings.count()
-        cancellation_rate = (cancelled / total_all * 100) if total_all > 0 else 0
+        cancelled = bookings_by_status['cancelled']
+        cancellation_rate = (cancelled / total_bookings * 100) if total_bookings > 0 else 0
 
         return Response({
             'revenue': {
@@ -912,7 +904,7 @@ class StaffReportsView(APIView):
                 ],
             },
             'bookings': {
-                'total': all_bookings.count(),
+                'total': total_bookings,
                 'by_status': bookings_by_status,
                 'by_service': [
                     {
@@ -936,8 +928,8 @@ class StaffReportsView(APIView):
                         'name': f"{c.user.first_name} {c.user.last_name}",
                         'email': c.user.email,
                         'booking_count': c.booking_count,
-                        'total_spent': (c.total_spent or 0) / 100,
-                        'is_vip': c.is_vip
+                        'total_spent': c.total_spent_cents / 100,
+                        'is_vip': c.user.customer_profile.is_vip
                     }
                     for c in top_customers
                 ],
@@ -947,6 +939,7 @@ class StaffReportsView(APIView):
                 'cancellation_rate': round(cancellation_rate, 1),
             },
             'generated_at': timezone.now().isoformat(),
+            'data_as_of': data_as_of.isoformat(),
         })
 
 
@@ -1057,9 +1050,13 @@ class StaffResendPaymentLinkView(APIView):
             customer_email = booking.get_customer_email()
 
             # Mark any existing pending payments as failed (old checkout sessions)
-            Payment.objects.filter(
+            superseded = Payment.objects.filter(
                 booking=booking, status='pending'
             ).update(status='failed', failure_reason='Superseded by new payment link')
+            apply_deltas({
+                PAYMENT_KEY.format('pending'): -superseded,
+                PAYMENT_KEY.format('failed'): superseded,
+            })
 
             # Create new Checkout Session
             checkout_data = StripePaymentService.create_checkout_session(
@@ -0,0 +1,213 @@
+"""
+Redis checkpointer for the assistant's LangGraph agents.
+
+Conversation state lives server-side, keyed by thread, so the client only
+sends its new message each turn instead of re-uploading the transcript.
+
+Only the latest checkpoint of a thread is kept (the assistant never replays
+or forks a conversation): one hash holds it and a second hash its pending
+writes, and both expire THREAD_TTL_SECONDS after the thread was last used.
+
+Memory is best-effort, like the rest of the Redis cache (IGNORE_EXCEPTIONS):
+if Redis is unreachable the turn still runs, just without stored history.
+"""
+import logging
+import re
+from typing import Any, Iterator, Optional, Sequence
+
+from django.conf import settings
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "assistant:thread"
+THREAD_TTL_SECONDS = settings.ASSISTANT_THREAD_TTL_SECONDS
+
+
+class RedisCheckpointSaver(BaseCheckpointSaver):
+    """Latest-checkpoint-only LangGraph saver on the django-redis connection."""
+
+    def __init__(self, client=None, ttl: int = THREAD_TTL_SECONDS, serde=None):
+        super().__init__(serde=serde)
+        self._client = client
+        self.ttl = ttl
+
+    @property
+    def client(self):
+        if self._client is None:
+            from django_redis import get_redis_connection
+
+            self._client = get_redis_connection("default")
+        return self._client
+
+    @staticmethod
+    def _keys(thread_id: str, checkpoint_ns: str = ""):
+        key = f"{KEY_PREFIX}:{thread_id}:{checkpoint_ns}"
+        return key, f"{key}:writes"
+
+    def _dump(self, obj) -> bytes:
+        type_, data = self.serde.dumps_typed(obj)
+        return type_.encode() + b"\x00" + data
+
+    def _load(self, raw: bytes):
+        type_, data = raw.split(b"\x00", 1)
+        return self.serde.loads_typed((type_.decode(), data))
+
+    def has_thread(self, thread_id: str) -> bool:
+        try:
+            return bool(self.client.exists(self._keys(thread_id)[0]))
+        except RedisError as e:
+            logger.warning(f"Assistant memory unavailable: {e}")
+            return False
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        key, writes_key = self._keys(thread_id, checkpoint_ns)
+        try:
+            pipe = self.client.pipeline()
+            pipe.hgetall(key)
+            pipe.hgetall(writes_key)
+            saved, writes = pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Assistant memory unavailable: {e}")
+            return None
+        if not saved:
+            return None
+
+        checkpoint_id = saved[b"id"].decode()
+        requested = get_checkpoint_id(config)
+        if requested and requested != checkpoint_id:
+            return None  # Older checkpoints aren't kept
+
+        pending = []
+        for field, raw in writes.items():
+            write_checkpoint_id, task_id, idx = field.decode().rsplit("|", 2)
+            if write_checkpoint_id == checkpoint_id:
+                channel, value, _ = self._load(raw)
+                pending.append(((task_id, int(idx)), (task_id, channel, value)))
+        pending.sort(key=lambda item: item[0])
+
+        parent_id = saved.get(b"parent_id", b"").decode()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=self._load(saved[b"checkpoint"]),
+            metadata=self._load(saved[b"metadata"]),
+            pending_writes=[write for _, write in pending],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+        )
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        if not config or limit == 0:
+            return
+        saved = self.get_tuple(config)
+        if saved is None:
+            return
+        if before and saved.checkpoint["id"] >= get_checkpoint_id(before):
+            return
+        if filter and any(saved.metadata.get(k) != v for k, v in filter.items()):
+            return
+        yield saved
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        key, writes_key = self._keys(thread_id, checkpoint_ns)
+        try:
+            pipe = self.client.pipeline()
+            pipe.hset(key, mapping={
+                "id": checkpoint["id"],
+                "parent_id": config["configurable"].get("checkpoint_id") or "",
+                "checkpoint": self._dump(checkpoint),
+                "metadata": self._dump(get_checkpoint_metadata(config, metadata)),
+            })
+            # Writes belong to the checkpoint this one supersedes
+            pipe.delete(writes_key)
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Assistant memory unavailable, thread {thread_id} not saved: {e}")
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        _, writes_key = self._keys(thread_id, checkpoint_ns)
+        try:
+            pipe = self.client.pipeline()
+            for idx, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, idx)
+                field = f"{checkpoint_id}|{task_id}|{idx}"
+                raw = self._dump((channel, value, task_path))
+                # Regular writes are idempotent; special ones (errors,
+                # interrupts) replace what was there
+                if idx >= 0:
+                    pipe.hsetnx(writes_key, field, raw)
+                else:
+                    pipe.hset(writes_key, field, raw)
+            pipe.expire(writes_key, self.ttl)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Assistant memory unavailable, writes for {thread_id} not saved: {e}")
+
+    def delete_thread(self, thread_id: str) -> None:
+        try:
+            pattern = re.sub(r"([*?\[\]\\])", r"\\\1", thread_id)
+            keys = list(self.client.scan_iter(f"{KEY_PREFIX}:{pattern}:*"))
+            if keys:
+                self.client.delete(*keys)
+        except RedisError as e:
+            logger.warning(f"Assistant memory unavailable, thread {thread_id} not deleted: {e}")
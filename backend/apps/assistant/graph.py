@@ -1,18 +1,45 @@
 """
 LangGraph agent for ToteTaxi assistant.
 Uses a ReAct-style agent with tool calling.
+
+Agents are built once per process and reused: one compiled graph per tool
+set (public vs authenticated) sharing one ChatAnthropic client, whose
+underlying HTTP connection pool then stays warm between messages. Nothing
+per-request is baked into the graph — the caller passes the user's id and
+today's date in the RunnableConfig (see agent_config), and the nodes read
+them from there.
+
+Conversations are checkpointed in Redis per thread (checkpoint.py), so each
+turn only adds the new user message. Once a thread grows past
+THREAD_TOKEN_BUDGET the compact node folds its older turns into a running
+summary, which keeps both the stored state and the LLM input bounded.
 """
 import json
 import logging
-from typing import Annotated, Sequence, TypedDict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextvars import copy_context
+from datetime import date
+from typing import Annotated, Optional, Sequence, TypedDict
 
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import BaseMessage, SystemMessage, ToolMessage
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+    message_chunk_to_message,
+)
+from langchain_core.messages.utils import count_tokens_approximately
 from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, StateGraph
 from langgraph.graph.message import add_messages
 
-from .prompts import SYSTEM_PROMPT
+from .prompts import COMPACTION_PROMPT, SYSTEM_PROMPT
 from .tools import (
     build_booking_handoff,
     check_availability,
@@ -48,36 +75,87 @@ class AgentState(TypedDict):
     """State schema for the LangGraph agent."""
 
     messages: Annotated[Sequence[BaseMessage], add_messages]
+    # Summary of turns compacted out of `messages`
+    summary: str
 
 
-def create_agent(is_authenticated: bool = False, user_id: int = None):
-    """
-    Create a LangGraph agent with appropriate tools based on auth status.
+# Tools whose user_id argument is always taken from the request, never the LLM
+USER_BOUND_TOOLS = ("lookup_booking_status", "lookup_booking_history")
 
-    Args:
-        is_authenticated: Whether the user is logged in
-        user_id: The authenticated user's ID (for booking lookup tools)
+# A turn with several tool calls runs them side by side on this pool, so it
+# takes as long as the slowest tool rather than the sum. Each call gets
+# TOOL_TIMEOUT_SECONDS; a call that overruns is reported to the model as
+# unavailable (its thread finishes in the background).
+TOOL_WORKERS = 8
+TOOL_TIMEOUT_SECONDS = 15
 
-    Returns:
-        Compiled LangGraph graph ready for streaming
-    """
-    tools = ALL_TOOLS if is_authenticated else PUBLIC_TOOLS
-    tools_by_name = {t.name: t for t in tools}
+_tool_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="assistant-tool")
 
-    llm = ChatAnthropic(
-        model="claude-sonnet-4-20250514",
-        temperature=0.3,
-        max_tokens=1024,
-    )
-    llm_with_tools = llm.bind_tools(tools)
+# Approximate tokens of transcript a thread may hold before older turns are
+# summarized; the most recent turns (about half the budget) stay verbatim
+THREAD_TOKEN_BUDGET = 6000
+
+_llm = None
+_checkpointer = None
+_agents = {}
+_lock = threading.RLock()
+
+
+def get_llm():
+    """The process-wide ChatAnthropic client (created on first use)."""
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                _llm = ChatAnthropic(
+                    model="claude-sonnet-4-20250514",
+                    temperature=0.3,
+                    max_tokens=1024,
+                )
+    return _llm
+
+
+def get_checkpointer():
+    """The process-wide Redis checkpointer (created on first use)."""
+    global _checkpointer
+    if _checkpointer is None:
+        with _lock:
+            if _checkpointer is None:
+                from .checkpoint import RedisCheckpointSaver
+
+                _checkpointer = RedisCheckpointSaver()
+    return _checkpointer
 
-    # Build system message with auth + date context
-    from datetime import date
 
-    today = date.today()
+def thread_key(thread_id: str, user_id: Optional[int] = None) -> str:
+    """Checkpoint thread for a client thread_id, scoped to its owner so one
+    customer can't resume another's conversation by reusing its id."""
+    return f"{user_id or 'anon'}:{thread_id}"
+
+
+def agent_config(thread_id: str, user_id: Optional[int] = None, today: Optional[date] = None) -> RunnableConfig:
+    """Per-request RunnableConfig for a registry agent."""
+    return {
+        "configurable": {
+            "thread_id": thread_key(thread_id, user_id),
+            "user_id": user_id,
+            "today": (today or date.today()).isoformat(),
+        },
+        # compact + up to 4 agent/tools rounds + the final answer
+        "recursion_limit": 11,
+    }
+
+
+def system_message_for(config: RunnableConfig, summary: str = "") -> SystemMessage:
+    """System prompt with the auth + date context from the request config,
+    plus the summary of any compacted turns."""
+    configurable = (config or {}).get("configurable", {})
+    user_id = configurable.get("user_id")
+    today = date.fromisoformat(configurable.get("today") or date.today().isoformat())
+
     date_context = f"\n\nToday's date is {today.strftime('%A, %B %d, %Y')} ({today.isoformat()})."
 
-    if is_authenticated and user_id:
+    if user_id:
         auth_context = (
             f"\n\nThe user is LOGGED IN (user_id: {user_id}). "
             f"You may look up their bookings using the lookup tools. "
@@ -90,42 +168,190 @@ def create_agent(is_authenticated: bool = False, user_id: int = None):
             "contact (631) 595-5100."
         )
 
-    system_message = SystemMessage(content=SYSTEM_PROMPT + date_context + auth_context)
+    summary_context = (
+        f"\n\nSummary of the earlier conversation:\n{summary}" if summary else ""
+    )
+
+    return SystemMessage(content=SYSTEM_PROMPT + date_context + auth_context + summary_context)
+
+
+def compaction_cut(messages, budget: Optional[int] = None) -> int:
+    """
+    Index of the first message to keep verbatim, or 0 if the thread is
+    within budget. Cuts only at a user message, so an AI tool call is never
+    separated from its tool results.
+    """
+    budget = budget or THREAD_TOKEN_BUDGET
+    if count_tokens_approximately(messages) <= budget:
+        return 0
+    kept, cut = 0, 0
+    for index in range(len(messages) - 1, 0, -1):
+        kept += count_tokens_approximately([messages[index]])
+        if isinstance(messages[index], HumanMessage):
+            cut = index
+            if kept >= budget // 2:
+                break
+    return cut
+
+
+def _transcript(messages) -> str:
+    lines = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            lines.append(f"Customer: {text_of(msg.content)}")
+        elif isinstance(msg, ToolMessage):
+            lines.append(f"Tool {msg.name} returned: {text_of(msg.content)}")
+        elif text_of(msg.content):
+            lines.append(f"Assistant: {text_of(msg.content)}")
+    return "\n".join(lines)
+
+
+def text_of(content) -> str:
+    """Plain text of a message/chunk content (str or Anthropic content blocks)."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content or []
+        if not isinstance(block, dict) or block.get("type", "text") == "text"
+    )
+
+
+def _invoke_tool(tool, args) -> str:
+    """Run one tool and serialize its result for a ToolMessage."""
+    try:
+        result = tool.invoke(args)
+        return json.dumps(result) if isinstance(result, dict) else str(result)
+    except Exception as e:
+        logger.error(f"Tool {tool.name} failed: {e}")
+        return json.dumps({"error": "Tool temporarily unavailable."})
+
+
+def _invoke_tool_in_pool(tool, args) -> str:
+    """_invoke_tool on a pool thread, closing the DB connection it opened."""
+    from django.db import connections
+
+    try:
+        return _invoke_tool(tool, args)
+    finally:
+        connections.close_all()
+
+
+def run_tool_calls(calls, timeout: float = TOOL_TIMEOUT_SECONDS):
+    """
+    Execute (tool, args) pairs and return their serialized results in order.
+
+    A single call runs inline; several run concurrently on the tool pool.
+    """
+    if len(calls) == 1:
+        tool, args = calls[0]
+        return [_invoke_tool(tool, args)]
+
+    futures = [
+        # copy_context keeps tracing/callback context in the pool thread
+        _tool_pool.submit(copy_context().run, _invoke_tool_in_pool, tool, args)
+        for tool, args in calls
+    ]
+    deadline = time.monotonic() + timeout
+    results = []
+    for (tool, _), future in zip(calls, futures):
+        try:
+            results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            logger.error(f"Tool {tool.name} timed out after {timeout}s")
+            results.append(json.dumps({"error": "Tool temporarily unavailable."}))
+    return results
+
+
+def create_agent(is_authenticated: bool = False, llm=None, checkpointer=None):
+    """
+    Build and compile a LangGraph agent with the tools for this auth status.
+
+    This is the cold path — use get_agent() to reuse the compiled graph.
+
+    Args:
+        is_authenticated: Whether the graph gets the booking lookup tools
+        llm: Chat model to bind the tools to (default: the shared client)
+        checkpointer: Where threads are persisted (default: none, ephemeral)
+
+    Returns:
+        Compiled LangGraph graph ready for streaming
+    """
+    tools = ALL_TOOLS if is_authenticated else PUBLIC_TOOLS
+    tools_by_name = {t.name: t for t in tools}
+    llm = llm or get_llm()
+    llm_with_tools = llm.bind_tools(tools)
+
+    def compact_node(state: AgentState):
+        """Fold turns beyond the token budget into the running summary."""
+        messages = list(state["messages"])
+        cut = compaction_cut(messages)
+        if not cut:
+            return {}
+        earlier = state.get("summary", "")
+        transcript = _transcript(messages[:cut])
+        if earlier:
+            transcript = f"Summary so far: {earlier}\n\n{transcript}"
+        summary = llm.invoke([
+            SystemMessage(content=COMPACTION_PROMPT),
+            HumanMessage(content=transcript),
+        ])
+        logger.info(f"Compacted {cut} assistant messages into a summary")
+        return {
+            "summary": text_of(summary.content),
+            "messages": [RemoveMessage(id=msg.id) for msg in messages[:cut]],
+        }
 
     def agent_node(state: AgentState, config: RunnableConfig):
-        """The main agent node that calls the LLM."""
-        messages = [system_message] + list(state["messages"])
-        response = llm_with_tools.invoke(messages, config)
-        return {"messages": [response]}
-
-    def tool_node(state: AgentState):
-        """Execute tool calls from the last AI message."""
-        outputs = []
+        """
+        The main agent node that calls the LLM.
+
+        The LLM is streamed: each text delta goes straight out on the custom
+        stream ({"token": ...}) for the SSE view, while the chunks are summed
+        so the state only ever gets the complete message — tool calls are
+        parsed from their fully assembled args before tool_node runs.
+        """
+        messages = [system_message_for(config, state.get("summary", ""))] + list(state["messages"])
+        write = get_stream_writer()
+        response = None
+        for chunk in llm_with_tools.stream(messages, config):
+            text = text_of(chunk.content)
+            if text:
+                write({"token": text})
+            response = chunk if response is None else response + chunk
+        return {"messages": [message_chunk_to_message(response)]}
+
+    def tool_node(state: AgentState, config: RunnableConfig):
+        """Execute tool calls from the last AI message (concurrently if several)."""
+        user_id = config.get("configurable", {}).get("user_id")
         last_message = state["messages"][-1]
-        for tool_call in last_message.tool_calls:
+
+        contents = {}
+        calls, call_indexes = [], []
+        for index, tool_call in enumerate(last_message.tool_calls):
             tool_name = tool_call["name"]
-            if tool_name in tools_by_name:
-                try:
-                    args = tool_call["args"].copy()
-                    # Hard-bind user_id for booking lookup tools (C1 fix)
-                    # Prevents IDOR via LLM-controlled arguments
-                    if tool_name in ("lookup_booking_status", "lookup_booking_history"):
-                        args["user_id"] = user_id
-                    result = tools_by_name[tool_name].invoke(args)
-                    content = json.dumps(result) if isinstance(result, dict) else str(result)
-                except Exception as e:
-                    logger.error(f"Tool {tool_name} failed: {e}")
-                    content = json.dumps({"error": "Tool temporarily unavailable."})
-            else:
-                content = json.dumps({"error": f"Unknown tool: {tool_name}"})
-
-            outputs.append(
-                ToolMessage(
-                    content=content,
-                    name=tool_name,
-                    tool_call_id=tool_call["id"],
-                )
+            if tool_name not in tools_by_name:
+                contents[index] = json.dumps({"error": f"Unknown tool: {tool_name}"})
+                continue
+            args = dict(tool_call["args"])
+            # Hard-bind user_id for booking lookup tools (C1 fix)
+            # Prevents IDOR via LLM-controlled arguments
+            if tool_name in USER_BOUND_TOOLS:
+                args["user_id"] = user_id
+            calls.append((tools_by_name[tool_name], args))
+            call_indexes.append(index)
+
+        if calls:
+            contents.update(zip(call_indexes, run_tool_calls(calls)))
+
+        outputs = [
+            ToolMessage(
+                content=contents[index],
+                name=tool_call["name"],
+                tool_call_id=tool_call["id"],
             )
+            for index, tool_call in enumerate(last_message.tool_calls)
+        ]
         return {"messages": outputs}
 
     def should_continue(state: AgentState):
@@ -137,13 +363,42 @@ def create_agent(is_authenticated: bool = False, user_id: int = None):
 
     # Build the graph
     graph = StateGraph(AgentState)
+    graph.add_node("compact", compact_node)
     graph.add_node("agent", agent_node)
     graph.add_node("tools", tool_node)
 
-    graph.set_entry_point("agent")
+    graph.set_entry_point("compact")
+    graph.add_edge("compact", "agent")
     graph.add_conditional_edges("agent", should_continue, {"tools": "tools", END: END})
     graph.add_edge("tools", "agent")
 
-    # V1: ephemeral conversations — no checkpointer needed.
-    # Redis persistence can be enabled later if multi-turn memory is desired.
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+
+def get_agent(is_authenticated: bool = False):
+    """The compiled agent for this auth status, built once per process."""
+    key = bool(is_authenticated)
+    agent = _agents.get(key)
+    if agent is None:
+        with _lock:
+            agent = _agents.get(key)
+            if agent is None:
+                agent = _agents[key] = create_agent(
+                    is_authenticated=key, checkpointer=get_checkpointer(),
+                )
+    return agent
+
+
+def warm_agents():
+    """Build both agents up front (worker boot) so no message pays for it."""
+    for is_authenticated in (False, True):
+        get_agent(is_authenticated)
+
+
+def reset_agents():
+    """Drop the cached agents, LLM client and checkpointer (tests, key rotation)."""
+    global _llm, _checkpointer
+    with _lock:
+        _agents.clear()
+        _llm = None
+        _checkpointer = None
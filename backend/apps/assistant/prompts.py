@@ -122,3 +122,7 @@ You will be told whether the user is authenticated. If not authenticated:
 - You do not know real-time driver locations
 - For anything outside your capabilities, direct to: phone (631) 595-5100 or email info@totetaxi.com
 """
+
+COMPACTION_PROMPT = """Summarize the earlier part of a conversation between a Tote Taxi customer and the assistant, so the assistant can continue it without the full transcript.
+
+Keep every concrete fact the customer gave or was given: ZIP codes, dates, services and tiers discussed, quoted prices, availability results, booking numbers and statuses, and anything the customer said they want or decided. Drop greetings and small talk. Write plain sentences, at most 150 words."""
@@ -0,0 +1,32 @@
+"""Test doubles shared by the assistant tests."""
+import json
+
+from langchain_core.messages import AIMessageChunk
+
+
+class ScriptedLLM:
+    """Stands in for ChatAnthropic: returns canned AIMessages in order and
+    records the messages it was sent."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def bind_tools(self, tools):
+        return self
+
+    def invoke(self, messages, config=None):
+        self.calls.append(messages)
+        return self.responses.pop(0)
+
+    def stream(self, messages, config=None):
+        """Yield the next response as chunks: word by word, then tool calls."""
+        self.calls.append(messages)
+        response = self.responses.pop(0)
+        for word in response.content.split(" "):
+            yield AIMessageChunk(content=word + " ")
+        if response.tool_calls:
+            yield AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(response.tool_calls)
+            ])
@@ -0,0 +1,126 @@
+"""
+Tests for server-side conversation memory — the Redis checkpointer (on the
+test Redis) and compaction of long threads.
+"""
+import json
+import uuid
+
+import pytest
+from django.contrib.auth import get_user_model
+from langchain_core.messages import AIMessage, HumanMessage
+from rest_framework.test import APIClient
+
+from apps.assistant import graph
+from apps.assistant.checkpoint import RedisCheckpointSaver
+
+from .fakes import ScriptedLLM
+
+User = get_user_model()
+
+
+@pytest.fixture
+def saver():
+    saver = RedisCheckpointSaver(ttl=600)
+    threads = []
+    yield saver, threads
+    for thread in threads:
+        saver.delete_thread(thread)
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    graph.reset_agents()
+    yield
+    graph.reset_agents()
+
+
+def _new_thread(threads, user_id=None):
+    thread_id = str(uuid.uuid4())
+    threads.append(graph.thread_key(thread_id, user_id))
+    return thread_id
+
+
+def test_second_turn_sends_only_new_message(saver):
+    saver, threads = saver
+    llm = ScriptedLLM([AIMessage(content="Hi, how can I help?"), AIMessage(content="Yes, we do.")])
+    agent = graph.create_agent(llm=llm, checkpointer=saver)
+    thread_id = _new_thread(threads)
+
+    agent.invoke({"messages": [("user", "hello")]}, config=graph.agent_config(thread_id))
+    agent.invoke({"messages": [("user", "do you serve 10001?")]}, config=graph.agent_config(thread_id))
+
+    sent = [m.content.strip() for m in llm.calls[1][1:]]
+    assert sent == ["hello", "Hi, how can I help?", "do you serve 10001?"]
+    key = f"assistant:thread:{graph.thread_key(thread_id)}:"
+    assert 0 < saver.client.ttl(key) <= 600
+
+
+def test_threads_are_scoped_to_their_owner(saver):
+    saver, threads = saver
+    thread_id = _new_thread(threads, user_id=1)
+    agent = graph.create_agent(llm=ScriptedLLM([AIMessage(content="Hi!")]), checkpointer=saver)
+
+    agent.invoke({"messages": [("user", "hello")]}, config=graph.agent_config(thread_id, user_id=1))
+
+    assert saver.has_thread(graph.thread_key(thread_id, user_id=1))
+    assert not saver.has_thread(graph.thread_key(thread_id, user_id=2))
+    assert not saver.has_thread(graph.thread_key(thread_id))
+
+
+def test_long_thread_is_compacted_into_summary(saver, monkeypatch):
+    saver, threads = saver
+    monkeypatch.setattr(graph, "THREAD_TOKEN_BUDGET", 200)
+    long_reply = "word " * 150
+    llm = ScriptedLLM([
+        AIMessage(content=long_reply),
+        AIMessage(content="Customer said first."),  # turn 2 summary
+        AIMessage(content=long_reply),
+        AIMessage(content="Customer said first, then second."),  # turn 3 summary
+        AIMessage(content="Sure."),
+    ])
+    agent = graph.create_agent(llm=llm, checkpointer=saver)
+    config = graph.agent_config(_new_thread(threads))
+
+    agent.invoke({"messages": [("user", "first")]}, config=config)
+    agent.invoke({"messages": [("user", "second")]}, config=config)
+    state = agent.invoke({"messages": [("user", "third")]}, config=config)
+
+    assert state["summary"] == "Customer said first, then second."
+    assert [m.content for m in state["messages"] if isinstance(m, HumanMessage)] == ["third"]
+    # The running summary is carried into the next compaction and the prompt
+    assert "Summary so far: Customer said first." in llm.calls[3][1].content
+    assert "Customer said first, then second." in llm.calls[-1][0].content
+
+
+def test_compaction_cut_keeps_tool_results_with_their_call():
+    messages = [
+        HumanMessage(content="a " * 400),
+        AIMessage(content="", tool_calls=[{"name": "x", "args": {}, "id": "c1"}]),
+        HumanMessage(content="b"),
+    ]
+
+    assert graph.compaction_cut(messages, budget=50) == 2
+    assert graph.compaction_cut(messages, budget=100000) == 0
+
+
+@pytest.mark.django_db
+def test_chat_view_resumes_thread_server_side(saver, monkeypatch):
+    _, threads = saver
+    llm = ScriptedLLM([AIMessage(content="Hello!"), AIMessage(content="Still here.")])
+    monkeypatch.setattr(graph, "_llm", llm)
+    client = APIClient()
+    thread_id = _new_thread(threads)
+
+    for message in ("hi", "are you there?"):
+        response = client.post(
+            "/api/assistant/chat/",
+            # Client history seeds a new thread and is ignored after that
+            {"message": message, "thread_id": thread_id, "history": [{"role": "user", "content": "earlier"}]},
+            format="json",
+        )
+        body = b"".join(response.streaming_content).decode()
+        assert "event: done" in body
+
+    sent = [m.content.strip() for m in llm.calls[1][1:]]
+    assert sent == ["earlier", "hi", "Hello!", "are you there?"]
+    assert json.loads(body.split("event: done\ndata: ")[1])["thread_id"] == thread_id
@@ -0,0 +1,167 @@
+"""
+Tests for the process-level agent registry and the concurrent tool node — a
+scripted fake LLM stands in for ChatAnthropic so the real graph runs end to end.
+"""
+import json
+import time
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from apps.assistant import graph
+
+from .fakes import ScriptedLLM
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    graph.reset_agents()
+    yield
+    graph.reset_agents()
+
+
+def test_get_agent_reuses_compiled_graph_and_llm():
+    cold = graph.get_agent(is_authenticated=True)
+    warm = graph.get_agent(is_authenticated=True)
+
+    assert warm is cold
+    assert graph.get_agent(is_authenticated=False) is not cold
+    assert graph.get_llm() is graph.get_llm()
+
+
+def test_system_prompt_comes_from_request_config():
+    llm = ScriptedLLM([AIMessage(content="Hi!")])
+    agent = graph.create_agent(is_authenticated=True, llm=llm)
+
+    agent.invoke(
+        {"messages": [("user", "hello")]},
+        config=graph.agent_config("t1", user_id=42, today=date(2026, 3, 2)),
+    )
+
+    system = llm.calls[0][0].content
+    assert "user_id: 42" in system
+    assert "Monday, March 02, 2026" in system
+
+
+@pytest.mark.django_db
+def test_tool_node_binds_user_id_from_config():
+    from apps.bookings.models import Address, Booking
+
+    owner = User.objects.create_user(username="graphowner", email="go@test.com", password="x")
+    address = Address.objects.create(address_line_1="1 Test St", city="New York", state="NY", zip_code="10001")
+    booking = Booking.objects.create(
+        customer=owner, service_type="mini_move", pickup_address=address,
+        delivery_address=address, pickup_date=date.today() + timedelta(days=3),
+    )
+    tool_call = {"name": "lookup_booking_status", "args": {"user_id": 999999}, "id": "call_1"}
+    llm = ScriptedLLM([
+        AIMessage(content="", tool_calls=[tool_call]),
+        AIMessage(content="Done."),
+    ])
+    agent = graph.create_agent(is_authenticated=True, llm=llm)
+
+    result = agent.invoke(
+        {"messages": [("user", "my bookings?")]},
+        config=graph.agent_config("t2", user_id=owner.id),
+    )
+
+    tool_messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+    bookings = json.loads(tool_messages[0].content)["bookings"]
+    assert [b["booking_number"] for b in bookings] == [booking.booking_number]
+    # The same graph serves another user without rebuilding
+    assert "user_id: " not in graph.system_message_for(graph.agent_config("t3")).content
+
+
+@tool
+def slow_zip(zip_code: str) -> dict:
+    """Sleep briefly, then echo the ZIP."""
+    time.sleep(0.2)
+    return {"zip": zip_code}
+
+
+@tool
+def very_slow_tool(x: int) -> dict:
+    """Sleep past the timeout."""
+    time.sleep(1)
+    return {"x": x}
+
+
+@tool(name_or_callable="lookup_booking_status")
+def fake_lookup_booking_status(user_id: int) -> dict:
+    """Echo the user_id the tool was called with."""
+    return {"user_id": user_id}
+
+
+def test_run_tool_calls_runs_concurrently_in_order():
+    calls = [(slow_zip, {"zip_code": z}) for z in ("10001", "11201", "07030")]
+
+    started = time.perf_counter()
+    results = graph.run_tool_calls(calls)
+    elapsed = time.perf_counter() - started
+
+    assert [json.loads(r)["zip"] for r in results] == ["10001", "11201", "07030"]
+    assert elapsed < 0.45  # ~slowest tool, not the 0.6s sum
+
+
+def test_run_tool_calls_times_out_slow_tool():
+    results = graph.run_tool_calls(
+        [(very_slow_tool, {"x": 1}), (slow_zip, {"zip_code": "10001"})], timeout=0.5,
+    )
+
+    assert json.loads(results[0]) == {"error": "Tool temporarily unavailable."}
+    assert json.loads(results[1]) == {"zip": "10001"}
+
+
+def test_parallel_tool_node_keeps_order_and_user_binding(monkeypatch):
+    monkeypatch.setattr(graph, "ALL_TOOLS", [slow_zip, fake_lookup_booking_status])
+    tool_calls = [
+        {"name": "slow_zip", "args": {"zip_code": "10001"}, "id": "call_1"},
+        {"name": "lookup_booking_status", "args": {"user_id": 999999}, "id": "call_2"},
+        {"name": "no_such_tool", "args": {}, "id": "call_3"},
+        {"name": "slow_zip", "args": {"zip_code": "11201"}, "id": "call_4"},
+    ]
+    llm = ScriptedLLM([AIMessage(content="", tool_calls=tool_calls), AIMessage(content="Done.")])
+    agent = graph.create_agent(is_authenticated=True, llm=llm)
+
+    result = agent.invoke(
+        {"messages": [("user", "quote + status")]},
+        config=graph.agent_config("t4", user_id=7),
+    )
+
+    tool_messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+    assert [m.tool_call_id for m in tool_messages] == ["call_1", "call_2", "call_3", "call_4"]
+    assert json.loads(tool_messages[1].content) == {"user_id": 7}
+    assert "Unknown tool" in tool_messages[2].content
+    assert json.loads(tool_messages[3].content) == {"zip": "11201"}
+
+
+def test_agent_streams_text_deltas_and_assembles_tool_calls(monkeypatch):
+    monkeypatch.setattr(graph, "PUBLIC_TOOLS", [slow_zip])
+    tool_call = {"name": "slow_zip", "args": {"zip_code": "10001"}, "id": "call_1"}
+    llm = ScriptedLLM([
+        AIMessage(content="Checking", tool_calls=[tool_call]),
+        AIMessage(content="You are covered."),
+    ])
+    agent = graph.create_agent(is_authenticated=False, llm=llm)
+    tokens, updates = [], []
+
+    for mode, event in agent.stream(
+        {"messages": [("user", "10001?")]},
+        config=graph.agent_config("t5"),
+        stream_mode=["custom", "updates"],
+    ):
+        if mode == "custom":
+            tokens.append(event["token"])
+        elif "compact" not in event:
+            updates.append(event)
+
+    assert "".join(tokens) == "Checking You are covered. "
+    first_ai = updates[0]["agent"]["messages"][0]
+    assert type(first_ai) is AIMessage
+    assert first_ai.tool_calls[0]["args"] == {"zip_code": "10001"}
+    assert json.loads(updates[1]["tools"]["messages"][0].content) == {"zip": "10001"}
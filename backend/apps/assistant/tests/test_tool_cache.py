@@ -0,0 +1,83 @@
+"""
+Tests for the assistant tool result cache — hits skip the ORM, and catalog or
+booking changes make cached results unreachable.
+"""
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.assistant.tool_cache import reset_tool_cache_stats, tool_cache_stats
+from apps.assistant.tools import check_availability, check_zip_coverage, get_pricing_estimate
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    reset_tool_cache_stats()
+    yield
+    reset_tool_cache_stats()
+
+
+@pytest.fixture
+def delivery_config(db):
+    from apps.services.models import StandardDeliveryConfig
+
+    return StandardDeliveryConfig.objects.create(price_per_item_cents=9500, is_active=True)
+
+
+def _quote():
+    return get_pricing_estimate.invoke({"service_type": "standard_delivery", "item_count": 3})
+
+
+@pytest.mark.django_db
+def test_repeat_call_is_a_hit_without_queries(delivery_config):
+    first = _quote()
+
+    with CaptureQueriesContext(connection) as queries:
+        second = _quote()
+
+    assert second == first
+    assert len(queries.captured_queries) == 0
+    assert tool_cache_stats()["get_pricing_estimate"] == {"hit": 1, "miss": 1}
+
+
+@pytest.mark.django_db
+def test_arguments_are_normalized():
+    check_zip_coverage.invoke({"zip_code": "10001"})
+    check_zip_coverage.invoke({"zip_code": " 10001 "})
+
+    assert tool_cache_stats()["check_zip_coverage"] == {"hit": 1, "miss": 1}
+
+
+@pytest.mark.django_db
+def test_catalog_change_invalidates(delivery_config):
+    before = _quote()
+
+    delivery_config.price_per_item_cents = 12000
+    delivery_config.save()
+    after = _quote()
+
+    assert after["estimated_total"] > before["estimated_total"]
+    assert tool_cache_stats()["get_pricing_estimate"] == {"hit": 0, "miss": 2}
+
+
+@pytest.mark.django_db
+def test_new_booking_invalidates_availability():
+    from django.contrib.auth.models import User
+
+    from apps.bookings.models import Address, Booking
+
+    start = date.today() + timedelta(days=10)
+    args = {"start_date": start.isoformat(), "num_days": 3}
+    check_availability.invoke(args)
+    check_availability.invoke(args)
+
+    address = Address.objects.create(address_line_1="1 Test St", city="New York", state="NY", zip_code="10001")
+    Booking.objects.create(
+        customer=User.objects.create_user(username="cachecust", password="x"),
+        service_type="mini_move", pickup_address=address, delivery_address=address, pickup_date=start,
+    )
+    check_availability.invoke(args)
+
+    assert tool_cache_stats()["check_availability"] == {"hit": 1, "miss": 2}
@@ -147,25 +147,37 @@ class TestGetPricingEstimate(TestCase):
     def test_geographic_surcharge_both_addresses(self):
         result = get_pricing_estimate.invoke(
             {
-                "service_type": "blade_transfer",
-                "bag_count": 2,
+                "service_type": "standard_delivery",
+                "item_count": 3,
                 "pickup_zip": "07101",  # NJ surcharge
                 "delivery_zip": "07101",  # NJ surcharge
             }
         )
-        # 150 (bags) + 350 (2 * 175 geo surcharge)
-        assert result["estimated_total"] == 500.00
+        # 285 (minimum) + 350 (2 * 175 geo surcharge)
+        assert result["estimated_total"] == 635.00
 
     def test_geographic_surcharge_one_address(self):
         result = get_pricing_estimate.invoke(
             {
-                "service_type": "blade_transfer",
-                "bag_count": 2,
+                "service_type": "standard_delivery",
+                "item_count": 3,
                 "pickup_zip": "10001",  # core, no surcharge
                 "delivery_zip": "07101",  # NJ surcharge
             }
         )
-        assert result["estimated_total"] == 325.00  # 150 + 175
+        assert result["estimated_total"] == 460.00  # 285 + 175
+
+    def test_blade_transfer_has_no_geographic_surcharge(self):
+        # Checkout never charges the geo surcharge on BLADE; the estimate must match
+        result = get_pricing_estimate.invoke(
+            {
+                "service_type": "blade_transfer",
+                "bag_count": 2,
+                "pickup_zip": "07101",
+                "delivery_zip": "07101",
+            }
+        )
+        assert result["estimated_total"] == 150.00
 
     def test_unknown_service_type(self):
         result = get_pricing_estimate.invoke({"service_type": "helicopter"})
@@ -194,6 +206,13 @@ class TestCheckAvailability(TestCase):
         # Should cap at 30
         assert len(result["dates"]) == 31  # inclusive
 
+    def test_negative_days_clamped(self):
+        # First of a future month, so a negative range would cross back a month
+        start = (date.today().replace(day=1) + timedelta(days=62)).replace(day=1).isoformat()
+        result = check_availability.invoke({"start_date": start, "num_days": -5})
+        assert len(result["dates"]) == 2
+        assert result["dates"][0]["date"] == start
+
 
 @pytest.mark.django_db
 class TestLookupBookingStatus(TestCase):
@@ -11,18 +11,22 @@ from rest_framework.test import APIClient
 
 User = get_user_model()
 
-# Patch target: create_agent is lazily imported inside the view method,
+# Patch target: get_agent is lazily imported inside the view method,
 # so we patch it at the source module (apps.assistant.graph).
-PATCH_CREATE_AGENT = "apps.assistant.graph.create_agent"
+PATCH_GET_AGENT = "apps.assistant.graph.get_agent"
 
 
 def _make_updates_stream(events):
-    """Build a mock stream in stream_mode='updates' format.
+    """Build a mock stream in stream_mode=["custom", "updates"] format.
 
     Each event is a dict like {"agent": {"messages": [msg]}} or
-    {"tools": {"messages": [msg]}}.
+    {"tools": {"messages": [msg]}} (an "updates" event), or a string, which
+    becomes a streamed ("custom") text token.
     """
-    return iter(events)
+    return iter(
+        ("custom", {"token": event}) if isinstance(event, str) else ("updates", event)
+        for event in events
+    )
 
 
 @pytest.mark.django_db
@@ -74,8 +78,8 @@ class TestChatView(TestCase):
         assert response.status_code == 400
         assert "500" in response.data["error"]
 
-    @patch(PATCH_CREATE_AGENT)
-    def test_returns_sse_content_type(self, mock_create_agent):
+    @patch(PATCH_GET_AGENT)
+    def test_returns_sse_content_type(self, mock_get_agent):
         mock_msg = MagicMock()
         mock_msg.content = "Hello!"
         mock_msg.tool_calls = []
@@ -84,7 +88,7 @@ class TestChatView(TestCase):
         mock_agent.stream.return_value = _make_updates_stream([
             {"agent": {"messages": [mock_msg]}},
         ])
-        mock_create_agent.return_value = mock_agent
+        mock_get_agent.return_value = mock_agent
 
         response = self.client.post(
             "/api/assistant/chat/",
@@ -96,8 +100,8 @@ class TestChatView(TestCase):
         assert response["Content-Type"] == "text/event-stream"
         assert response["Cache-Control"] == "no-cache"
 
-    @patch(PATCH_CREATE_AGENT)
-    def test_streams_token_events(self, mock_create_agent):
+    @patch(PATCH_GET_AGENT)
+    def test_streams_token_events(self, mock_get_agent):
         mock_msg = MagicMock()
         mock_msg.content = "Hello!"
         mock_msg.tool_calls = []
@@ -106,7 +110,7 @@ class TestChatView(TestCase):
         mock_agent.stream.return_value = _make_updates_stream([
             {"agent": {"messages": [mock_msg]}},
         ])
-        mock_create_agent.return_value = mock_agent
+        mock_get_agent.return_value = mock_agent
 
         response = self.client.post(
             "/api/assistant/chat/",
@@ -119,8 +123,8 @@ class TestChatView(TestCase):
         assert "Hello!" in content
         assert "event: done" in content
 
-    @patch(PATCH_CREATE_AGENT)
-    def test_streams_tool_events(self, mock_create_agent):
+    @patch(PATCH_GET_AGENT)
+    def test_streams_tool_events(self, mock_get_agent):
         # AI message with tool calls
         ai_msg = MagicMock()
         ai_msg.content = ""
@@ -142,7 +146,7 @@ class TestChatView(TestCase):
             {"tools": {"messages": [tool_msg]}},
             {"agent": {"messages": [final_msg]}},
         ])
-        mock_create_agent.return_value = mock_agent
+        mock_get_agent.return_value = mock_agent
 
         response = self.client.post(
             "/api/assistant/chat/",
@@ -155,8 +159,8 @@ class TestChatView(TestCase):
         assert "event: tool_result" in content
         assert "event: token" in content
 
-    @patch(PATCH_CREATE_AGENT)
-    def test_anonymous_user_detected(self, mock_create_agent):
+    @patch(PATCH_GET_AGENT)
+    def test_anonymous_user_detected(self, mock_get_agent):
         mock_msg = MagicMock()
         mock_msg.content = "Hi!"
         mock_msg.tool_calls = []
@@ -165,21 +169,21 @@ class TestChatView(TestCase):
         mock_agent.stream.return_value = _make_updates_stream([
             {"agent": {"messages": [mock_msg]}},
         ])
-        mock_create_agent.return_value = mock_agent
+        mock_get_agent.return_value = mock_agent
 
-        self.client.post(
+        response = self.client.post(
             "/api/assistant/chat/",
             {"message": "Hello", "thread_id": "test"},
             format="json",
         )
+        b"".join(response.streaming_content)
 
-        mock_create_agent.assert_called_once_with(
-            is_authenticated=False,
-            user_id=None,
-        )
+        mock_get_agent.assert_called_once_with(is_authenticated=False)
+        config = mock_agent.stream.call_args.kwargs["config"]
+        assert config["configurable"]["user_id"] is None
 
-    @patch(PATCH_CREATE_AGENT)
-    def test_authenticated_customer_detected(self, mock_create_agent):
+    @patch(PATCH_GET_AGENT)
+    def test_authenticated_customer_detected(self, mock_get_agent):
         from apps.customers.models import CustomerProfile
 
         user = User.objects.create_user(
@@ -195,25 +199,25 @@ class TestChatView(TestCase):
         mock_agent.stream.return_value = _make_updates_stream([
             {"agent": {"messages": [mock_msg]}},
         ])
-        mock_create_agent.return_value = mock_agent
+        mock_get_agent.return_value = mock_agent
 
         self.client.force_authenticate(user=user)
-        self.client.post(
+        response = self.client.post(
             "/api/assistant/chat/",
             {"message": "What are my bookings?", "thread_id": "test"},
             format="json",
         )
+        b"".join(response.streaming_content)
 
-        mock_create_agent.assert_called_once_with(
-            is_authenticated=True,
-            user_id=user.id,
-        )
+        mock_get_agent.assert_called_once_with(is_authenticated=True)
+        config = mock_agent.stream.call_args.kwargs["config"]
+        assert config["configurable"]["user_id"] == user.id
 
-    @patch(PATCH_CREATE_AGENT)
-    def test_agent_error_returns_sse_error_event(self, mock_create_agent):
+    @patch(PATCH_GET_AGENT)
+    def test_agent_error_returns_sse_error_event(self, mock_get_agent):
         mock_agent = MagicMock()
         mock_agent.stream.side_effect = Exception("LLM timeout")
-        mock_create_agent.return_value = mock_agent
+        mock_get_agent.return_value = mock_agent
 
         response = self.client.post(
             "/api/assistant/chat/",
@@ -225,9 +229,9 @@ class TestChatView(TestCase):
         assert "event: error" in content
         assert "(631) 595-5100" in content
 
-    @patch(PATCH_CREATE_AGENT)
-    def test_agent_creation_failure_returns_503(self, mock_create_agent):
-        mock_create_agent.side_effect = Exception("Redis down")
+    @patch(PATCH_GET_AGENT)
+    def test_agent_creation_failure_returns_503(self, mock_get_agent):
+        mock_get_agent.side_effect = Exception("Redis down")
 
         response = self.client.post(
             "/api/assistant/chat/",
@@ -238,7 +242,7 @@ class TestChatView(TestCase):
         assert response.status_code == 503
 
     def test_thread_id_auto_generated(self):
-        with patch(PATCH_CREATE_AGENT) as mock_create_agent:
+        with patch(PATCH_GET_AGENT) as mock_get_agent:
             mock_msg = MagicMock()
             mock_msg.content = "Hi!"
             mock_msg.tool_calls = []
@@ -247,7 +251,7 @@ class TestChatView(TestCase):
             mock_agent.stream.return_value = _make_updates_stream([
                 {"agent": {"messages": [mock_msg]}},
             ])
-            mock_create_agent.return_value = mock_agent
+            mock_get_agent.return_value = mock_agent
 
             response = self.client.post(
                 "/api/assistant/chat/",
@@ -259,3 +263,33 @@ class TestChatView(TestCase):
             assert "event: done" in content
             # Thread ID should be in the done event
             assert "thread_id" in content
+
+    @patch(PATCH_GET_AGENT)
+    def test_streams_tokens_incrementally_and_reports_ttft(self, mock_get_agent):
+        final_msg = MagicMock()
+        final_msg.content = "Hello there!"
+        final_msg.tool_calls = []
+
+        mock_agent = MagicMock()
+        mock_agent.stream.return_value = _make_updates_stream([
+            "Hello",
+            " there!",
+            {"agent": {"messages": [final_msg]}},
+        ])
+        mock_get_agent.return_value = mock_agent
+
+        response = self.client.post(
+            "/api/assistant/chat/",
+            {"message": "Hi", "thread_id": "test"},
+            format="json",
+        )
+
+        events = [
+            (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+            for block in b"".join(response.streaming_content).decode().strip().split("\n\n")
+        ]
+        # The finished message is not repeated after its streamed tokens
+        assert [data["content"] for name, data in events if name == "token"] == ["Hello", " there!"]
+        done = events[-1]
+        assert done[0] == "done"
+        assert isinstance(done[1]["ttft_ms"], int)
@@ -0,0 +1,125 @@
+"""
+Result cache for the assistant's deterministic tools.
+
+check_zip_coverage, get_pricing_estimate and check_availability depend only
+on their arguments plus the pricing catalog (and, for availability, the
+bookings already on the calendar), yet the model calls them again and again
+within one conversation. Results are kept in the shared cache under
+
+    assistant:tool:<tool>:<catalog version>[:<stamp>]:<hash of normalized args>
+
+The catalog version is the stamp services/signals.py bumps whenever a
+package, service, delivery config or surcharge rule changes, so an admin
+edit makes every cached quote unreachable at once. Availability also counts
+bookings, so its key adds the public calendar's version stamp for the range
+(bumped by booking signals, bookings/availability.py) and the local date/6 PM
+cutoff, and it gets a short TTL as a backstop.
+
+Hit/miss counts are kept per process and logged every LOG_EVERY lookups.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "assistant:tool"
+CATALOG_TTL_SECONDS = 60 * 60
+AVAILABILITY_TTL_SECONDS = 60
+LOG_EVERY = 100
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def cache_key(name, version, stamp, bound_arguments):
+    args = json.dumps(
+        {k: _normalize(v) for k, v in bound_arguments.items()},
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha1(args.encode()).hexdigest()
+    parts = [KEY_PREFIX, name, version] + ([stamp] if stamp else []) + [digest]
+    return ":".join(parts)
+
+
+def _record(name, outcome):
+    with _stats_lock:
+        _stats[(name, outcome)] += 1
+        lookups = sum(_stats.values())
+        snapshot = dict(_stats) if lookups % LOG_EVERY == 0 else None
+    logger.debug(f"Assistant tool cache {outcome}: {name}")
+    if snapshot:
+        names = sorted({n for n, _ in snapshot})
+        summary = ", ".join(
+            f"{n} {snapshot.get((n, 'hit'), 0)} hit/{snapshot.get((n, 'miss'), 0)} miss"
+            for n in names
+        )
+        logger.info(f"Assistant tool cache after {lookups} lookups: {summary}")
+
+
+def tool_cache_stats():
+    """{tool name: {"hit": n, "miss": n}} for this process."""
+    with _stats_lock:
+        stats = {}
+        for (name, outcome), count in _stats.items():
+            stats.setdefault(name, {"hit": 0, "miss": 0})[outcome] = count
+        return stats
+
+
+def reset_tool_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def catalog_version():
+    from apps.services.pricing import get_catalog_snapshot
+
+    return get_catalog_snapshot().version
+
+
+def cached_tool(ttl=CATALOG_TTL_SECONDS, stamp=None):
+    """
+    Memoize a tool function in the shared cache.
+
+    Apply beneath @tool so the tool keeps the function's signature and
+    docstring. `stamp` is an optional callable taking the bound arguments
+    and returning an extra key part for inputs that aren't arguments (e.g.
+    today's date).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = cache_key(
+                func.__name__, catalog_version(), stamp(bound.arguments) if stamp else "", bound.arguments,
+            )
+
+            result = cache.get(key)
+            if result is not None:
+                _record(func.__name__, "hit")
+                return result
+
+            _record(func.__name__, "miss")
+            result = func(*args, **kwargs)
+            cache.set(key, result, ttl)
+            return result
+
+        return wrapper
+
+    return decorator
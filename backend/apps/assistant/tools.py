@@ -3,16 +3,22 @@ LangGraph tools for the ToteTaxi assistant.
 Each tool wraps existing business logic — no DB writes.
 """
 import logging
-from collections import Counter
 from datetime import date, timedelta
 from typing import Optional
 
+from django.utils import timezone
 from langchain_core.tools import tool
 
+from .tool_cache import AVAILABILITY_TTL_SECONDS, cached_tool
+
 logger = logging.getLogger(__name__)
 
+# Bookings per lookup_booking_history page (keeps tool output small for the model)
+HISTORY_PAGE_SIZE = 10
+
 
 @tool
+@cached_tool()
 def check_zip_coverage(zip_code: str) -> dict:
     """Check if a ZIP code is within Tote Taxi's service area.
     Returns whether the area is serviceable and if a geographic surcharge applies.
@@ -50,6 +56,7 @@ def check_zip_coverage(zip_code: str) -> dict:
 
 
 @tool
+@cached_tool()
 def get_pricing_estimate(
     service_type: str,
     pickup_zip: Optional[str] = None,
@@ -76,135 +83,112 @@ def get_pricing_estimate(
         coi_required: Whether a Certificate of Insurance is needed
         is_same_day: Whether same-day delivery is requested
     """
-    from apps.bookings.zip_codes import validate_service_area
-    from apps.services.models import (
-        MiniMovePackage,
-        OrganizingService,
-        StandardDeliveryConfig,
+    from apps.services.pricing import (
+        PricingError,
+        QuoteRequest,
+        get_catalog_snapshot,
+        price_quote,
     )
 
     estimate = {"service_type": service_type, "line_items": []}
-    total_cents = 0
-
-    # Geographic surcharge calculation
-    geo_surcharge_cents = 0
-    if pickup_zip:
-        _, pickup_surcharge, _, _ = validate_service_area(pickup_zip)
-        if pickup_surcharge:
-            geo_surcharge_cents += 17500
-    if delivery_zip:
-        _, delivery_surcharge, _, _ = validate_service_area(delivery_zip)
-        if delivery_surcharge:
-            geo_surcharge_cents += 17500
+    snapshot = get_catalog_snapshot()
 
     if service_type == "mini_move":
         if not mini_move_tier:
             return {"error": "Please specify a mini move tier: petite, standard, or full."}
-        try:
-            package = MiniMovePackage.objects.get(
-                package_type=mini_move_tier, is_active=True
-            )
-        except MiniMovePackage.DoesNotExist:
+        if not snapshot.package_for_tier(mini_move_tier):
             return {"error": f'Mini move tier "{mini_move_tier}" not found.'}
 
-        estimate["line_items"].append(
-            {"label": f"{package.name}", "amount": package.base_price_cents / 100}
-        )
-        total_cents += package.base_price_cents
-
-        organizing_cents = 0
-        if include_packing:
-            svc = OrganizingService.objects.filter(
-                mini_move_tier=mini_move_tier, is_packing_service=True, is_active=True
-            ).first()
-            if svc:
-                estimate["line_items"].append(
-                    {"label": "Professional Packing", "amount": svc.price_cents / 100}
-                )
-                organizing_cents += svc.price_cents
-        if include_unpacking:
-            svc = OrganizingService.objects.filter(
-                mini_move_tier=mini_move_tier, is_packing_service=False, is_active=True
-            ).first()
-            if svc:
-                estimate["line_items"].append(
-                    {"label": "Professional Unpacking", "amount": svc.price_cents / 100}
-                )
-                organizing_cents += svc.price_cents
-
-        total_cents += organizing_cents
-        if organizing_cents > 0:
-            tax = int(organizing_cents * 0.0825)
-            estimate["line_items"].append(
-                {"label": "Organizing Tax (8.25%)", "amount": tax / 100}
-            )
-            total_cents += tax
-
-        if coi_required and not package.coi_included:
-            coi_fee = package.coi_fee_cents
-            estimate["line_items"].append({"label": "COI Fee", "amount": coi_fee / 100})
-            total_cents += coi_fee
-
     elif service_type == "standard_delivery":
         if not item_count or item_count < 1:
             return {
                 "error": "Please specify the number of items for standard delivery."
             }
-        config = StandardDeliveryConfig.objects.filter(is_active=True).first()
-        if not config:
+        if not snapshot.delivery_config:
             return {"error": "Standard delivery configuration not available."}
 
-        item_total = config.price_per_item_cents * item_count
-        base = max(item_total, config.minimum_charge_cents)
-        estimate["line_items"].append(
+    elif service_type == "blade_transfer":
+        if not bag_count or bag_count < 2:
+            return {"error": "Airport Transfer requires a minimum of 2 bags."}
+
+    elif service_type == "specialty_item":
+        estimate["note"] = (
+            "Specialty item pricing depends on the specific items. "
+            "Please use the booking wizard for an exact quote, or call (631) 595-5100."
+        )
+        return estimate
+
+    else:
+        return {"error": f"Unknown service type: {service_type}"}
+
+    try:
+        quote = price_quote(
+            QuoteRequest(
+                service_type=service_type,
+                mini_move_tier=mini_move_tier,
+                include_packing=include_packing,
+                include_unpacking=include_unpacking,
+                standard_delivery_item_count=item_count or 0,
+                is_same_day_delivery=is_same_day,
+                coi_required=coi_required,
+                pickup_zip_code=pickup_zip,
+                delivery_zip_code=delivery_zip,
+                blade_bag_count=bag_count,
+            ),
+            snapshot=snapshot,
+        )
+    except PricingError:
+        return {"error": f'Mini move tier "{mini_move_tier}" not found.'}
+
+    line_items = estimate["line_items"]
+    if service_type == "mini_move":
+        line_items.append(
+            {"label": f"{quote.package.name}", "amount": quote.base_price_cents / 100}
+        )
+        for svc in quote.organizing_services:
+            label = "Professional Packing" if svc.is_packing_service else "Professional Unpacking"
+            line_items.append({"label": label, "amount": svc.price_cents / 100})
+        if quote.organizing_tax_cents > 0:
+            line_items.append(
+                {"label": "Organizing Tax (8.25%)", "amount": quote.organizing_tax_cents / 100}
+            )
+    elif service_type == "standard_delivery":
+        config = quote.delivery_config
+        line_items.append(
             {
                 "label": f"{item_count} item{'s' if item_count != 1 else ''} @ ${config.price_per_item_cents / 100:.0f}/item",
-                "amount": base / 100,
+                "amount": quote.base_price_cents / 100,
             }
         )
-        total_cents += base
-
-        if is_same_day:
-            estimate["line_items"].append(
+        if quote.same_day_surcharge_cents:
+            line_items.append(
                 {
                     "label": "Same-Day Surcharge",
-                    "amount": config.same_day_flat_rate_cents / 100,
+                    "amount": quote.same_day_surcharge_cents / 100,
                 }
             )
-            total_cents += config.same_day_flat_rate_cents
-
-        if coi_required:
-            estimate["line_items"].append({"label": "COI Fee", "amount": 50.00})
-            total_cents += 5000
-
     elif service_type == "blade_transfer":
-        if not bag_count or bag_count < 2:
-            return {"error": "Airport Transfer requires a minimum of 2 bags."}
-        base = max(bag_count * 7500, 15000)
-        estimate["line_items"].append(
+        line_items.append(
             {
                 "label": f"{bag_count} bags @ $75/bag",
-                "amount": base / 100,
+                "amount": quote.base_price_cents / 100,
             }
         )
-        total_cents += base
 
-    elif service_type == "specialty_item":
-        estimate["note"] = (
-            "Specialty item pricing depends on the specific items. "
-            "Please use the booking wizard for an exact quote, or call (631) 595-5100."
-        )
-        return estimate
+    if quote.coi_fee_cents:
+        line_items.append({"label": "COI Fee", "amount": quote.coi_fee_cents / 100})
 
-    else:
-        return {"error": f"Unknown service type: {service_type}"}
+    if quote.time_window_surcharge_cents:
+        line_items.append(
+            {"label": "1-Hour Window", "amount": quote.time_window_surcharge_cents / 100}
+        )
 
-    if geo_surcharge_cents > 0:
-        estimate["line_items"].append(
-            {"label": "Geographic Surcharge", "amount": geo_surcharge_cents / 100}
+    if quote.geographic_surcharge_cents > 0:
+        line_items.append(
+            {"label": "Geographic Surcharge", "amount": quote.geographic_surcharge_cents / 100}
         )
-        total_cents += geo_surcharge_cents
 
+    total_cents = quote.total_cents
     estimate["estimated_total"] = total_cents / 100
     estimate["disclaimer"] = (
         "Final pricing is confirmed at checkout. "
@@ -214,7 +198,33 @@ def get_pricing_estimate(
     return estimate
 
 
+def _availability_range(start_date: str, num_days: int):
+    """(start, end) dates for check_availability, or None if start_date is bad.
+    num_days is clamped to 1..30 so end is never before start."""
+    try:
+        start = date.fromisoformat(start_date)
+    except (TypeError, ValueError):
+        return None
+    return start, start + timedelta(days=max(1, min(num_days, 30)))
+
+
+def _availability_stamp(arguments):
+    """What check_availability reads besides its arguments: the local date and
+    6 PM next-day cutoff (check_same_day_restriction) and the public calendar
+    versions for the range (bumped when bookings change)."""
+    now = timezone.localtime()
+    stamp = f"{now.date().isoformat()}-{'late' if now.hour >= 18 else 'early'}"
+    dates = _availability_range(arguments["start_date"], arguments["num_days"])
+    if dates and dates[0] >= now.date():
+        from apps.bookings.availability import get_public_availability
+
+        _, etag, _ = get_public_availability(*dates)
+        stamp += "-" + etag.strip('"')
+    return stamp
+
+
 @tool
+@cached_tool(ttl=AVAILABILITY_TTL_SECONDS, stamp=_availability_stamp)
 def check_availability(start_date: str, num_days: int = 14) -> dict:
     """Check booking availability for a date range.
 
@@ -222,50 +232,38 @@ def check_availability(start_date: str, num_days: int = 14) -> dict:
         start_date: Start date in YYYY-MM-DD format
         num_days: Number of days to check (max 30, default 14)
     """
-    from apps.bookings.models import Booking, check_same_day_restriction
-    from apps.services.models import SurchargeRule
+    from apps.bookings.availability import get_public_availability
+    from apps.bookings.models import check_same_day_restriction
 
-    try:
-        start = date.fromisoformat(start_date)
-    except ValueError:
+    dates = _availability_range(start_date, num_days)
+    if dates is None:
         return {"error": "Invalid date format. Use YYYY-MM-DD."}
+    start, end = dates
 
     if start < date.today():
         return {"error": "Cannot check availability for past dates."}
 
-    num_days = min(num_days, 30)
-    end = start + timedelta(days=num_days)
+    # Booking counts and surcharges come from the cached public calendar
+    build, _, _ = get_public_availability(start, end)
 
-    bookings = Booking.objects.filter(
-        pickup_date__gte=start,
-        pickup_date__lte=end,
-        deleted_at__isnull=True,
-    ).values_list("pickup_date", flat=True)
-
-    counts = Counter(bookings)
-    surcharge_rules = list(SurchargeRule.objects.filter(is_active=True))
-
-    dates = []
-    current = start
-    while current <= end:
+    result = []
+    for day in build():
+        current = date.fromisoformat(day["date"])
         day_blocked, day_msg = check_same_day_restriction(current)
-        surcharges = [r.name for r in surcharge_rules if r.applies_to_date(current)]
-
-        booking_count = counts.get(current, 0)
-        dates.append(
+        surcharges = [s["name"] for s in day["surcharges"]]
+        result.append(
             {
-                "date": current.isoformat(),
-                "availability": "busy" if booking_count >= 8 else "available",
-                "is_weekend": current.weekday() >= 5,
+                "date": day["date"],
+                "availability": "busy" if day["booking_count"] >= 8 else "available",
+                "is_weekend": day["is_weekend"],
                 "surcharges": surcharges if surcharges else None,
                 "blocked": day_blocked,
                 "blocked_reason": day_msg,
             }
         )
-        current += timedelta(days=1)
 
     return {
-        "dates": dates,
+        "dates": result,
         "summary": (
             f"Showing availability from {start.isoformat()} to {end.isoformat()}."
         ),
@@ -287,6 +285,7 @@ def lookup_booking_status(user_id: int) -> dict:
             customer_id=user_id,
             deleted_at__isnull=True,
         )
+        .for_list()
         .order_by("-created_at")[:5]
     )
 
@@ -308,40 +307,57 @@ def lookup_booking_status(user_id: int) -> dict:
 
 
 @tool
-def lookup_booking_history(user_id: int) -> dict:
-    """Look up the full booking history and stats for the currently logged-in customer.
-    Only call this for authenticated users.
+def lookup_booking_history(user_id: int, cursor: Optional[str] = None) -> dict:
+    """Look up the booking history and stats for the currently logged-in customer.
+    Only call this for authenticated users. Returns one page of bookings, newest
+    first; pass the returned next_cursor to see older bookings.
 
     Args:
         user_id: The authenticated user's ID (provided by the system)
+        cursor: next_cursor from a previous call, to fetch the next (older) page
     """
-    from django.db.models import Sum
+    from django.db.models import Count, Q, Sum
 
     from apps.bookings.models import Booking
+    from apps.bookings.pagination import InvalidCursor, paginate_newest_first
 
     all_bookings = Booking.objects.filter(
         customer_id=user_id,
         deleted_at__isnull=True,
     )
 
-    total_count = all_bookings.count()
-    completed = all_bookings.filter(status="completed").count()
-    upcoming = all_bookings.filter(
-        status="paid",
-        pickup_date__gte=date.today(),
-    ).count()
-    total_spent = (
-        all_bookings.filter(
-            status__in=["paid", "completed"],
-        ).aggregate(total=Sum("total_price_cents"))["total"]
-        or 0
+    stats = all_bookings.aggregate(
+        total_count=Count("id"),
+        completed=Count("id", filter=Q(status="completed")),
+        upcoming=Count("id", filter=Q(status="paid", pickup_date__gte=date.today())),
+        total_spent=Sum("total_price_cents", filter=Q(status__in=["paid", "completed"])),
     )
+    total_spent = stats["total_spent"] or 0
+
+    try:
+        page = paginate_newest_first(
+            all_bookings.for_list(), cursor=cursor, limit=HISTORY_PAGE_SIZE
+        )
+    except InvalidCursor:
+        # A garbled cursor from the model: start again from the newest page
+        page = paginate_newest_first(all_bookings.for_list(), limit=HISTORY_PAGE_SIZE)
 
     return {
-        "total_bookings": total_count,
-        "completed": completed,
-        "upcoming": upcoming,
+        "total_bookings": stats["total_count"],
+        "completed": stats["completed"],
+        "upcoming": stats["upcoming"],
         "total_spent": f"${total_spent / 100:,.2f}",
+        "bookings": [
+            {
+                "booking_number": b.booking_number,
+                "service": b.get_service_type_display(),
+                "status": b.get_status_display(),
+                "pickup_date": b.pickup_date.isoformat() if b.pickup_date else None,
+                "total": f"${b.total_price_dollars:.2f}",
+            }
+            for b in page.items
+        ],
+        "next_cursor": page.next_cursor,
     }
 
 
@@ -3,6 +3,7 @@ SSE streaming views for the ToteTaxi assistant.
 """
 import json
 import logging
+import time
 import uuid
 
 from django.http import StreamingHttpResponse
@@ -29,7 +30,12 @@ class ChatView(APIView):
 
     POST /api/assistant/chat/
     Body: { "message": "...", "thread_id": "..." }
+    (An optional "history" list is only read when the server has no state
+    for thread_id; the conversation is otherwise kept server-side.)
     Response: SSE stream with event types: token, tool_call, tool_result, done, error
+
+    Text arrives as token events while the model writes it; the done event
+    reports ttft_ms, the time from receiving the request to the first token.
     """
 
     permission_classes = [permissions.AllowAny]
@@ -38,6 +44,7 @@ class ChatView(APIView):
 
     @method_decorator(ratelimit(key="ip", rate="20/h", method="POST", block=True))
     def post(self, request):
+        started_at = time.monotonic()
         message = (request.data.get("message") or "").strip()
         thread_id = request.data.get("thread_id") or str(uuid.uuid4())
         history = request.data.get("history") or []
@@ -63,14 +70,12 @@ class ChatView(APIView):
         )
         user_id = request.user.id if is_authenticated else None
 
-        # Create the agent (lazy import to avoid loading langchain during migrations)
-        from .graph import create_agent
+        # Reuse the process-wide agent (lazy import to avoid loading
+        # langchain during migrations); only the first message builds it
+        from .graph import agent_config, get_agent, get_checkpointer, text_of
 
         try:
-            agent = create_agent(
-                is_authenticated=is_authenticated,
-                user_id=user_id,
-            )
+            agent = get_agent(is_authenticated=is_authenticated)
         except Exception as e:
             logger.error(f"Failed to create agent: {e}")
             return Response(
@@ -81,18 +86,18 @@ class ChatView(APIView):
         def event_stream():
             """Generator that yields SSE events."""
             try:
-                config = {
-                    "configurable": {"thread_id": thread_id},
-                    "recursion_limit": 10,
-                }
+                config = agent_config(thread_id, user_id=user_id)
 
-                # Rebuild conversation from history + new message
+                # The thread's earlier turns are in the checkpointer, so only
+                # the new message goes in. Client-sent history is used just to
+                # seed a thread the server doesn't have (new, or expired).
                 messages_list = []
-                for msg in history[-self.MAX_HISTORY_MESSAGES:]:
-                    role = msg.get("role", "")
-                    content = msg.get("content", "")
-                    if role in ("user", "assistant") and content:
-                        messages_list.append((role, content[:MAX_HISTORY_MSG_LENGTH]))
+                if not get_checkpointer().has_thread(config["configurable"]["thread_id"]):
+                    for msg in history[-self.MAX_HISTORY_MESSAGES:]:
+                        role = msg.get("role", "")
+                        content = msg.get("content", "")
+                        if role in ("user", "assistant") and content:
+                            messages_list.append((role, content[:MAX_HISTORY_MSG_LENGTH]))
                 messages_list.append(("user", message))
 
                 input_messages = {
@@ -100,36 +105,41 @@ class ChatView(APIView):
                 }
 
                 full_response = ""
-
-                # Use stream_mode="updates" instead of "messages".
-                # "messages" intercepts the LLM invoke() and converts it to
-                # streaming, which causes tool_call args to be empty ({})
-                # in the state when tool_node runs. "updates" does not
-                # intercept — the LLM runs normally and tool_node gets
-                # complete args. Trade-off: AI text arrives all at once
-                # instead of token-by-token, but tool results are correct.
-                for event in agent.stream(
-                    input_messages, config=config, stream_mode="updates"
+                first_token_at = None
+                streamed_this_step = False
+
+                # "custom" carries the text deltas agent_node writes while the
+                # LLM streams; "updates" carries each node's finished output,
+                # so tool calls are only reported (and run) once their args
+                # are fully assembled.
+                for mode, event in agent.stream(
+                    input_messages, config=config, stream_mode=["custom", "updates"]
                 ):
+                    if mode == "custom":
+                        token = event.get("token") if isinstance(event, dict) else None
+                        if token:
+                            if first_token_at is None:
+                                first_token_at = time.monotonic()
+                            streamed_this_step = True
+                            full_response += token
+                            yield sse_event("token", {"content": token})
+                        continue
+
                     for node_name, node_output in event.items():
-                        messages = node_output.get("messages", [])
+                        messages = (node_output or {}).get("messages", [])
 
                         if node_name == "agent":
                             for msg in messages:
                                 tool_calls = getattr(msg, "tool_calls", None)
 
-                                # Emit text content
-                                content = getattr(msg, "content", "")
-                                if content and not tool_calls:
-                                    if isinstance(content, list):
-                                        text_parts = [
-                                            block.get("text", "") if isinstance(block, dict) else str(block)
-                                            for block in content
-                                        ]
-                                        content = "".join(text_parts)
-                                    if content:
-                                        full_response += content
-                                        yield sse_event("token", {"content": content})
+                                # Text not already streamed token by token
+                                # (e.g. a model that doesn't stream)
+                                content = text_of(getattr(msg, "content", ""))
+                                if content and not tool_calls and not streamed_this_step:
+                                    if first_token_at is None:
+                                        first_token_at = time.monotonic()
+                                    full_response += content
+                                    yield sse_event("token", {"content": content})
 
                                 # Emit tool call notifications
                                 if tool_calls:
@@ -140,6 +150,7 @@ class ChatView(APIView):
                                                 "tool_call",
                                                 {"tool": tool_name},
                                             )
+                            streamed_this_step = False
 
                         elif node_name == "tools":
                             for msg in messages:
@@ -160,10 +171,17 @@ class ChatView(APIView):
                                     },
                                 )
 
+                ttft_ms = (
+                    round((first_token_at - started_at) * 1000)
+                    if first_token_at is not None
+                    else None
+                )
+                logger.info(f"Assistant reply: ttft_ms={ttft_ms} chars={len(full_response)}")
                 yield sse_event(
                     "done",
                     {
                         "thread_id": thread_id,
+                        "ttft_ms": ttft_ms,
                     },
                 )
 
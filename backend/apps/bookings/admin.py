@@ -3,6 +3,14 @@ from django.utils.html import format_html
 from .models import Booking, Address, GuestCheckout, BookingSpecialtyItem, DiscountCode, DiscountCodeUsage
 from django.utils import timezone
 from django.contrib import messages
+from django.db import transaction
+
+
+def _recount_dashboard_stats_after_commit():
+    # Queryset.update() skips the signals that keep the dashboard counters
+    # current, so rebuild them once the bulk change is committed.
+    from apps.accounts.tasks import recount_dashboard_stats
+    transaction.on_commit(recount_dashboard_stats.delay)
 
 
 class BookingSpecialtyItemInline(admin.TabularInline):
@@ -163,12 +171,16 @@ class BookingAdmin(admin.ModelAdmin):
     visibility_status.short_description = 'Dashboard Status'
     
     def soft_delete_selected(self, request, queryset):
-        count = queryset.filter(deleted_at__isnull=True).update(deleted_at=timezone.now())
+        # updated_at too: the report rollups find changed days by it
+        now = timezone.now()
+        count = queryset.filter(deleted_at__isnull=True).update(deleted_at=now, updated_at=now)
+        _recount_dashboard_stats_after_commit()
         self.message_user(request, f'Hidden {count} bookings from staff dashboard')
     soft_delete_selected.short_description = "Hide selected bookings from dashboard"
     
     def restore_selected(self, request, queryset):
-        count = queryset.filter(deleted_at__isnull=False).update(deleted_at=None)
+        count = queryset.filter(deleted_at__isnull=False).update(deleted_at=None, updated_at=timezone.now())
+        _recount_dashboard_stats_after_commit()
         self.message_user(request, f'Restored {count} bookings to dashboard')
     restore_selected.short_description = "Restore hidden bookings"
 
@@ -0,0 +1,171 @@
+# backend/apps/bookings/availability.py
+"""Cached public calendar availability.
+
+The public availability endpoint is AllowAny and hit on every booking-wizard
+step. It used to load full Booking rows for up to 60 days (with no cap on
+end_date) just to count them, then rebuild the surcharge list for every day.
+
+Public data is now built per calendar month — {date: booking_count, surcharges,
+is_weekend} from a single values('pickup_date').annotate(Count) query — and
+cached. Each month's cache key carries:
+- a per-month version, bumped when a booking's pickup_date or deleted_at
+  changes (bookings/signals.py);
+- a global version, bumped when a SurchargeRule is saved or deleted;
+- the pricing catalog version the surcharges were read from.
+
+The view answers conditional GETs (If-None-Match / If-Modified-Since) with a 304
+from the same versions, so the frontend calendar can revalidate without the
+body being rebuilt or resent.
+"""
+import hashlib
+import logging
+import time
+import uuid
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_GLOBAL_VERSION_KEY = 'calendar_availability_version'
+AVAILABILITY_MONTH_VERSION_KEY = 'calendar_availability_month_{month}'
+AVAILABILITY_MONTH_CACHE_KEY = 'calendar_availability_{month}_{versions}'
+# Backstop for changes that bypass signals (queryset.update())
+AVAILABILITY_MONTH_CACHE_TTL = 600
+# Longest range a single request may ask for; larger end_dates are clamped.
+AVAILABILITY_MAX_RANGE_DAYS = 92
+
+
+def _month_key(day):
+    return f'{day.year}-{day.month:02d}'
+
+
+def _month_bounds(month):
+    year, month_num = (int(part) for part in month.split('-'))
+    first = date(year, month_num, 1)
+    if month_num == 12:
+        last = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        last = date(year, month_num + 1, 1) - timedelta(days=1)
+    return first, last
+
+
+def _get_version(key):
+    """Read a version stamp, seeding it on first use. Versions are
+    'timestamp-uuid' so they double as a Last-Modified source."""
+    version = cache.get(key)
+    if version is None:
+        version = f'{time.time():.0f}-{uuid.uuid4().hex[:8]}'
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key) or version
+    return version
+
+
+def _bump_version(key):
+    cache.set(key, f'{time.time():.0f}-{uuid.uuid4().hex[:8]}', timeout=None)
+
+
+def invalidate_availability_for_dates(*dates):
+    """Drop cached availability for the months containing these dates."""
+    for month in {_month_key(d) for d in dates if d}:
+        _bump_version(AVAILABILITY_MONTH_VERSION_KEY.format(month=month))
+
+
+def invalidate_all_availability():
+    _bump_version(AVAILABILITY_GLOBAL_VERSION_KEY)
+
+
+def _build_month(month, catalog):
+    from .models import Booking
+
+    first, last = _month_bounds(month)
+    counts = dict(
+        Booking.objects.filter(
+            pickup_date__gte=first,
+            pickup_date__lte=last,
+            deleted_at__isnull=True,
+        )
+        .values('pickup_date')
+        .annotate(count=Count('id'))
+        .values_list('pickup_date', 'count')
+    )
+
+    days = {}
+    current = first
+    while current <= last:
+        days[current.isoformat()] = {
+            'booking_count': counts.get(current, 0),
+            'is_weekend': current.weekday() >= 5,
+            'surcharges': [
+                {
+                    'name': rule.name,
+                    'type': rule.surcharge_type,
+                    'description': rule.description,
+                }
+                for rule in catalog.surcharge_rules_for_date(current)
+            ],
+        }
+        current += timedelta(days=1)
+    return days
+
+
+def get_public_availability(start_date, end_date):
+    """Return (build, etag, last_modified timestamp) for the range.
+
+    build() returns the availability list; it is deferred so a 304 costs only
+    the version lookups.
+    """
+    from apps.services.pricing import get_catalog_snapshot
+
+    catalog = get_catalog_snapshot()
+    global_version = _get_version(AVAILABILITY_GLOBAL_VERSION_KEY)
+
+    months = []
+    current = date(start_date.year, start_date.month, 1)
+    while current <= end_date:
+        months.append(_month_key(current))
+        current = _month_bounds(months[-1])[1] + timedelta(days=1)
+
+    versions = {}
+    for month in months:
+        month_version = _get_version(AVAILABILITY_MONTH_VERSION_KEY.format(month=month))
+        versions[month] = (global_version, month_version, catalog.version)
+
+    etag = '"{}"'.format(hashlib.md5(
+        f'{start_date}:{end_date}:{sorted(versions.items())}'.encode()
+    ).hexdigest())
+    last_modified = max(
+        int(v.split('-')[0])
+        for month_versions in versions.values()
+        for v in month_versions[:2]
+    )
+
+    def availability():
+        days = {}
+        for month, month_versions in versions.items():
+            key = AVAILABILITY_MONTH_CACHE_KEY.format(
+                month=month,
+                versions=hashlib.md5(':'.join(month_versions).encode()).hexdigest(),
+            )
+            month_days = cache.get(key)
+            if month_days is None:
+                month_days = _build_month(month, catalog)
+                cache.set(key, month_days, AVAILABILITY_MONTH_CACHE_TTL)
+            days.update(month_days)
+
+        result = []
+        current = start_date
+        while current <= end_date:
+            day = days[current.isoformat()]
+            result.append({
+                'date': current.isoformat(),
+                'available': True,
+                'is_weekend': day['is_weekend'],
+                'surcharges': day['surcharges'],
+                'booking_count': day['booking_count'],
+            })
+            current += timedelta(days=1)
+        return result
+
+    return availability, etag, last_modified
@@ -0,0 +1,600 @@
+# apps/bookings/loadtest/runner.py
+"""
+Checkout load test: drive the real checkout endpoints over HTTP at a fixed
+concurrency, then check the invariants the checkout locking exists for.
+
+One order is one customer checkout:
+
+    guest          POST /api/public/create-payment-intent/
+                   card confirmed on the Stripe stand-in
+                   POST /api/public/guest-booking/
+    authenticated  POST /api/customer/bookings/create-payment-intent/
+                   card confirmed on the Stripe stand-in
+                   POST /api/customer/bookings/create/
+
+A share of orders (`duplicate_rate`) is duplicated the way customers
+duplicate checkouts:
+
+    resubmit  the booking POST is sent twice at once for one PaymentIntent
+              (double click, client retry)
+    sibling   two PaymentIntents for one cart (two tabs), both charged, both
+              booking POSTs at once (INC-004)
+
+Each order has its own pickup address, so the address identifies the order
+in the database. The run tag in emails, cart keys and addresses scopes
+verification and cleanup to this run. Duplicates and pickup dates are drawn
+from the scenario seed, so two runs of one scenario send the same workload
+and their reports can be compared across commits.
+
+Scenarios are JSON files in scenarios/ (fields: Scenario below). The
+loadtest_checkout management command runs them; local_stack() serves the app
+in-process against the fake Stripe and Onfleet servers.
+"""
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from datetime import timedelta
+from pathlib import Path
+from queue import Queue
+
+import django
+import requests
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SCENARIO_DIR = Path(__file__).resolve().parent / 'scenarios'
+
+FLOWS = ('guest', 'authenticated')
+DUPLICATE_MODES = ('resubmit', 'sibling')
+SERVICE_TYPES = ('mini_move', 'standard_delivery')
+
+ENDPOINTS = {
+    'guest': ('/api/public/create-payment-intent/', '/api/public/guest-booking/'),
+    'authenticated': ('/api/customer/bookings/create-payment-intent/', '/api/customer/bookings/create/'),
+}
+LOGIN_PATH = '/api/customer/auth/login/'
+
+# Report order; 'checkout' is the whole order, first request to booking created
+STEPS = ('login', 'create_payment_intent', 'confirm_payment', 'create_booking', 'duplicate_booking', 'checkout')
+# Done once per client before the timed window, so no rate and no comparison
+SETUP_STEPS = ('login',)
+
+EMAIL_DOMAIN = 'loadtest.example.com'
+PASSWORD = 'Loadtest-Checkout-1'
+REQUEST_TIMEOUT_SECONDS = 30
+PICKUP_LEAD_DAYS = 7
+PICKUP_SPREAD_DAYS = 21
+CLEANUP_CHUNK = 500
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str = ''
+    flow: str = 'guest'
+    service_type: str = 'mini_move'
+    package_type: str = 'petite'
+    concurrency: int = 4
+    checkouts: int = 100
+    warmup: int = 5
+    duplicate_rate: float = 0.0
+    duplicate_mode: str = 'resubmit'
+    seed: int = 1
+
+    def __post_init__(self):
+        if self.flow not in FLOWS:
+            raise ValueError(f'flow must be one of {FLOWS}, got {self.flow!r}')
+        if self.service_type not in SERVICE_TYPES:
+            raise ValueError(f'service_type must be one of {SERVICE_TYPES}, got {self.service_type!r}')
+        if self.duplicate_mode not in DUPLICATE_MODES:
+            raise ValueError(f'duplicate_mode must be one of {DUPLICATE_MODES}, got {self.duplicate_mode!r}')
+        if self.concurrency < 1 or self.checkouts < 1 or self.warmup < 0:
+            raise ValueError('concurrency and checkouts must be >= 1, warmup >= 0')
+        if not 0 <= self.duplicate_rate <= 1:
+            raise ValueError('duplicate_rate must be between 0 and 1')
+
+
+def available_scenarios():
+    return sorted(path.stem for path in SCENARIO_DIR.glob('*.json'))
+
+
+def load_scenario(name_or_path, **overrides):
+    """A bundled scenario by name, or a JSON file by path; `overrides` replace
+    fields (None values are ignored)."""
+    path = Path(name_or_path)
+    if path.suffix != '.json':
+        path = SCENARIO_DIR / f'{name_or_path}.json'
+    if not path.exists():
+        raise ValueError(f'Unknown scenario {name_or_path!r} (bundled: {", ".join(available_scenarios())})')
+    data = {'name': path.stem, **json.loads(path.read_text())}
+    data.update({key: value for key, value in overrides.items() if value is not None})
+    unknown = set(data) - {f.name for f in fields(Scenario)}
+    if unknown:
+        raise ValueError(f'Unknown scenario fields: {", ".join(sorted(unknown))}')
+    return Scenario(**data)
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class Recorder:
+    """Per-step latency samples and error counts, shared by all client threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    def record(self, step, elapsed_ms, error=None):
+        with self.lock:
+            self.samples.setdefault(step, []).append(elapsed_ms)
+            if error is not None:
+                step_errors = self.errors.setdefault(step, {})
+                step_errors[str(error)] = step_errors.get(str(error), 0) + 1
+
+    def reset(self, keep=()):
+        with self.lock:
+            self.samples = {step: v for step, v in self.samples.items() if step in keep}
+            self.errors = {step: v for step, v in self.errors.items() if step in keep}
+
+    def summary(self, seconds):
+        """{step: {count, errors, per_sec, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}"""
+        with self.lock:
+            samples = {step: sorted(values) for step, values in self.samples.items()}
+            errors = {step: dict(values) for step, values in self.errors.items()}
+        summary = {}
+        for step in sorted(samples, key=lambda s: STEPS.index(s) if s in STEPS else len(STEPS)):
+            values = samples[step]
+            summary[step] = {
+                'count': len(values),
+                'errors': errors.get(step, {}),
+                'per_sec': round(len(values) / seconds, 2) if seconds and step not in SETUP_STEPS else None,
+                'mean_ms': round(sum(values) / len(values), 1),
+                'p50_ms': round(percentile(values, 50), 1),
+                'p95_ms': round(percentile(values, 95), 1),
+                'p99_ms': round(percentile(values, 99), 1),
+                'max_ms': round(values[-1], 1),
+            }
+        return summary
+
+
+class CheckoutClient:
+    """One browser: a keep-alive session to the app (logged in for the
+    authenticated flow) and one to the Stripe stand-in."""
+
+    def __init__(self, base_url, stripe_url, recorder, headers=None):
+        self.base_url = base_url.rstrip('/')
+        self.stripe_url = stripe_url.rstrip('/')
+        self.recorder = recorder
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'totetaxi-loadtest', **(headers or {})})
+        self.stripe = requests.Session()
+        self.user_email = None
+
+    def fork(self):
+        """A second connection as the same customer, for a concurrent duplicate POST."""
+        twin = CheckoutClient(self.base_url, self.stripe_url, self.recorder, headers=dict(self.session.headers))
+        twin.user_email = self.user_email
+        return twin
+
+    def post(self, step, path, payload):
+        """POST JSON to the app; (status or None, body). Non-2xx counts as a step error."""
+        started = time.perf_counter()
+        try:
+            response = self.session.post(f'{self.base_url}{path}', json=payload, timeout=REQUEST_TIMEOUT_SECONDS)
+        except requests.RequestException as e:
+            self.recorder.record(step, (time.perf_counter() - started) * 1000, type(e).__name__)
+            return None, {}
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.recorder.record(step, elapsed_ms, None if response.status_code < 400 else response.status_code)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, {}
+
+    def login(self, email):
+        status, body = self.post('login', LOGIN_PATH, {'email': email, 'password': PASSWORD})
+        if status != 200 or not body.get('session_id'):
+            raise RuntimeError(f'Load test login failed for {email}: {status} {body}')
+        # The mobile header path: no cookie jar or CSRF dance per request
+        self.session.headers['X-Session-Id'] = body['session_id']
+        self.user_email = email
+
+    def confirm_payment(self, pi_id):
+        """Charge the card, as Stripe.js confirmCardPayment would; the charged amount or None."""
+        started = time.perf_counter()
+        try:
+            response = self.stripe.post(
+                f'{self.stripe_url}/v1/payment_intents/{pi_id}/confirm',
+                auth=('sk_test_loadtest', ''), timeout=REQUEST_TIMEOUT_SECONDS,
+            )
+        except requests.RequestException as e:
+            self.recorder.record('confirm_payment', (time.perf_counter() - started) * 1000, type(e).__name__)
+            return None
+        ok = response.status_code == 200
+        self.recorder.record('confirm_payment', (time.perf_counter() - started) * 1000,
+                             None if ok else response.status_code)
+        return response.json()['amount_received'] if ok else None
+
+
+def service_fields(scenario):
+    """The service-specific request fields for the scenario's service."""
+    from apps.services.models import MiniMovePackage
+
+    if scenario.service_type == 'mini_move':
+        package = MiniMovePackage.objects.filter(package_type=scenario.package_type, is_active=True).first()
+        if package is None:
+            raise ValueError(f'No active {scenario.package_type!r} mini move package in the catalog')
+        return {'mini_move_package_id': str(package.id)}
+    return {'standard_delivery_item_count': 2, 'item_description': 'Load test boxes'}
+
+
+class CheckoutLoadTest:
+    """One run of a scenario against `base_url`, charging cards on `stripe_url`."""
+
+    def __init__(self, scenario, base_url, stripe_url):
+        self.scenario = scenario
+        self.base_url = base_url
+        self.stripe_url = stripe_url
+        self.run_tag = uuid.uuid4().hex[:8]
+        self.recorder = Recorder()
+        self.clients = Queue()
+        self.results = []
+        self.results_lock = threading.Lock()
+        self.service = service_fields(scenario)
+
+        rng = random.Random(scenario.seed)
+        self.plans = [
+            {
+                'order': n,
+                'duplicate': scenario.duplicate_mode if rng.random() < scenario.duplicate_rate else '',
+                'pickup_date': timezone.localdate() + timedelta(days=PICKUP_LEAD_DAYS + rng.randrange(PICKUP_SPREAD_DAYS)),
+            }
+            for n in range(scenario.warmup + scenario.checkouts)
+        ]
+
+    @property
+    def email_domain(self):
+        return f'{self.run_tag}.{EMAIL_DOMAIN}'
+
+    @property
+    def address_marker(self):
+        return f' Loadtest {self.run_tag} '
+
+    @property
+    def cart_prefix(self):
+        return f'lt-{self.run_tag}-'
+
+    def run(self):
+        """Warm up, run the timed orders, verify; the report dict."""
+        self._open_clients()
+        plans = self.plans
+        self._run_orders(plans[:self.scenario.warmup])
+        self.recorder.reset(keep=SETUP_STEPS)
+
+        started = time.perf_counter()
+        self._run_orders(plans[self.scenario.warmup:])
+        seconds = time.perf_counter() - started
+
+        timed = [r for r in self.results if r['order'] >= self.scenario.warmup]
+        booked = sum(1 for r in timed if 201 in r['booking_statuses'])
+        return {
+            'scenario': asdict(self.scenario),
+            'run_tag': self.run_tag,
+            'environment': environment(),
+            'seconds': round(seconds, 2),
+            'orders': len(timed),
+            'orders_booked': booked,
+            'checkouts_per_sec': round(booked / seconds, 2) if seconds else None,
+            'steps': self.recorder.summary(seconds),
+            'verification': self.verify(),
+        }
+
+    def _open_clients(self):
+        for i in range(self.scenario.concurrency):
+            client = CheckoutClient(self.base_url, self.stripe_url, self.recorder)
+            if self.scenario.flow == 'authenticated':
+                client.login(self._create_customer(i))
+            self.clients.put(client)
+
+    def _create_customer(self, i):
+        from django.contrib.auth.models import User
+        from apps.customers.models import CustomerProfile
+
+        email = f'customer{i}@{self.email_domain}'
+        user = User.objects.create_user(
+            username=email, email=email, password=PASSWORD,
+            first_name='Load', last_name=f'Customer{i}',
+        )
+        CustomerProfile.objects.create(user=user, phone='2125550100')
+        return email
+
+    def _run_orders(self, plans):
+        if not plans:
+            return
+        with ThreadPoolExecutor(max_workers=self.scenario.concurrency) as pool:
+            for result in pool.map(self._checkout, plans):
+                with self.results_lock:
+                    self.results.append(result)
+
+    def _checkout(self, plan):
+        client = self.clients.get()
+        try:
+            started = time.perf_counter()
+            result = self._order(client, plan)
+            if 201 in result['booking_statuses']:
+                self.recorder.record('checkout', (time.perf_counter() - started) * 1000)
+            return result
+        except Exception as e:
+            logger.exception(f"Load test order {plan['order']} failed")
+            self.recorder.record('checkout', 0.0, type(e).__name__)
+            return {'order': plan['order'], 'duplicate': plan['duplicate'], 'charged': {}, 'booking_statuses': []}
+        finally:
+            self.clients.put(client)
+
+    def _order(self, client, plan):
+        intent_path, booking_path = ENDPOINTS[self.scenario.flow]
+        intent_request, booking_request = self._payloads(plan, client.user_email)
+        result = {'order': plan['order'], 'duplicate': plan['duplicate'], 'charged': {}, 'booking_statuses': []}
+
+        intents = []
+        for _ in range(2 if plan['duplicate'] == 'sibling' else 1):
+            status, body = client.post('create_payment_intent', intent_path, intent_request)
+            if status != 200:
+                return result
+            intents.append(body)
+
+        for intent in intents:
+            amount = client.confirm_payment(intent['payment_intent_id'])
+            if amount is None:
+                return result
+            result['charged'][intent['payment_intent_id']] = amount
+
+        bodies = [
+            {**booking_request, 'payment_intent_id': i['payment_intent_id'], 'booking_token': i['booking_token']}
+            for i in intents
+        ]
+        if plan['duplicate'] == 'resubmit':
+            bodies *= 2
+
+        if len(bodies) == 1:
+            status, _ = client.post('create_booking', booking_path, bodies[0])
+            result['booking_statuses'] = [status]
+        else:
+            senders = [client, client.fork()]
+            with ThreadPoolExecutor(max_workers=2) as pair:
+                responses = pair.map(
+                    lambda sender, body: sender.post('duplicate_booking', booking_path, body), senders, bodies,
+                )
+                result['booking_statuses'] = [status for status, _ in responses]
+        return result
+
+    def _payloads(self, plan, user_email):
+        """(create-payment-intent body, booking body without PI fields) for an order."""
+        n = plan['order']
+        pickup_date = plan['pickup_date'].isoformat()
+        pickup = {'address_line_1': f'{n}{self.address_marker}St', 'city': 'New York', 'state': 'NY', 'zip_code': '10001'}
+        delivery = {'address_line_1': f'{n}{self.address_marker}Ave', 'city': 'New York', 'state': 'NY', 'zip_code': '10002'}
+        common = {'service_type': self.scenario.service_type, 'pickup_date': pickup_date, **self.service}
+        pricing = {**common, 'pickup_zip_code': '10001', 'delivery_zip_code': '10002'}
+
+        if self.scenario.flow == 'guest':
+            contact = {
+                'first_name': 'Load', 'last_name': f'Order{n}',
+                'email': f'order{n}@{self.email_domain}', 'phone': '2125550100',
+            }
+            booking = {**common, **contact, 'pickup_time': 'morning',
+                       'pickup_address': pickup, 'delivery_address': delivery}
+            intent = {**pricing, **contact}
+        else:
+            booking = {**common, 'pickup_time': 'morning',
+                       'new_pickup_address': pickup, 'new_delivery_address': delivery}
+            intent = {**pricing, 'customer_email': user_email}
+        return {**intent, 'booking_payload': booking, 'cart_key': f'{self.cart_prefix}{n}'}, booking
+
+    def verify(self):
+        """Check the run's rows: one booking per order, amounts that agree with
+        the charge, nothing charged and left unbooked, no double dispatch."""
+        from apps.bookings.models import Booking
+
+        bookings = list(
+            Booking.objects
+            .filter(pickup_address__address_line_1__contains=self.address_marker)
+            .select_related('pickup_address')
+            .prefetch_related('payments', 'onfleet_tasks')
+        )
+        charged = {pi_id: amount for r in self.results for pi_id, amount in r['charged'].items()}
+
+        by_order = {}
+        for booking in bookings:
+            by_order.setdefault(booking.pickup_address.address_line_1, []).append(booking.booking_number)
+        double_bookings = {order: numbers for order, numbers in by_order.items() if len(numbers) > 1}
+
+        amount_mismatches = []
+        payment_mismatches = []
+        for booking in bookings:
+            paid = [p for p in booking.payments.all() if p.status == 'succeeded']
+            if len(paid) != 1:
+                payment_mismatches.append(booking.booking_number)
+                continue
+            payment = paid[0]
+            stripe_amount = charged.get(payment.stripe_payment_intent_id)
+            if not booking.total_price_cents == payment.amount_cents == stripe_amount:
+                amount_mismatches.append({
+                    'booking': booking.booking_number,
+                    'booking_cents': booking.total_price_cents,
+                    'payment_cents': payment.amount_cents,
+                    'charged_cents': stripe_amount,
+                })
+
+        created_responses = sum(r['booking_statuses'].count(201) for r in self.results)
+        duplicates_accepted = [r['order'] for r in self.results if r['booking_statuses'].count(201) > 1]
+        charged_unbooked = [r['order'] for r in self.results if r['charged'] and 201 not in r['booking_statuses']]
+        over_dispatched = [b.booking_number for b in bookings if len(b.onfleet_tasks.all()) > 2]
+
+        violations = {
+            'double_bookings': double_bookings,
+            'duplicates_accepted': duplicates_accepted,
+            'amount_mismatches': amount_mismatches,
+            'bookings_without_one_payment': payment_mismatches,
+            'charged_without_booking': charged_unbooked,
+            'onfleet_over_dispatched': over_dispatched,
+        }
+        if created_responses != len(bookings):
+            violations['created_responses_vs_rows'] = {'responses': created_responses, 'rows': len(bookings)}
+        return {
+            'ok': not any(violations.values()),
+            'bookings': len(bookings),
+            'duplicate_orders': sum(1 for r in self.results if r['duplicate']),
+            'onfleet_tasks': sum(len(b.onfleet_tasks.all()) for b in bookings),
+            'violations': {name: value for name, value in violations.items() if value},
+        }
+
+    def cleanup(self):
+        """Delete everything the run created (orders, payments, captures, customers)."""
+        from django.contrib.auth.models import User
+        from apps.bookings.models import Address, Booking, GuestCheckout, PendingBooking
+        from apps.payments.models import Payment, PaymentAudit
+
+        pi_ids = [pi_id for r in self.results for pi_id in r['charged']]
+        with transaction.atomic():
+            booking_ids = list(
+                Booking.objects.filter(pickup_address__address_line_1__contains=self.address_marker)
+                .values_list('id', flat=True)
+            )
+            for start in range(0, max(len(pi_ids), len(booking_ids)), CLEANUP_CHUNK):
+                chunk_pis = pi_ids[start:start + CLEANUP_CHUNK]
+                chunk_bookings = booking_ids[start:start + CLEANUP_CHUNK]
+                PaymentAudit.objects.filter(payment__stripe_payment_intent_id__in=chunk_pis).delete()
+                PaymentAudit.objects.filter(payment__booking_id__in=chunk_bookings).delete()
+                Payment.objects.filter(stripe_payment_intent_id__in=chunk_pis).delete()
+                Payment.objects.filter(booking_id__in=chunk_bookings).delete()
+            PendingBooking.objects.filter(cart_key__startswith=self.cart_prefix).delete()
+            for start in range(0, len(booking_ids), CLEANUP_CHUNK):
+                Booking.objects.filter(id__in=booking_ids[start:start + CLEANUP_CHUNK]).delete()
+            GuestCheckout.objects.filter(email__endswith=f'@{self.email_domain}').delete()
+            Address.objects.filter(address_line_1__contains=self.address_marker).delete()
+            User.objects.filter(email__endswith=f'@{self.email_domain}').delete()
+
+
+def environment():
+    """What a result depends on besides the scenario, so reports compare like with like."""
+    def git(*args):
+        try:
+            return subprocess.run(
+                ['git', *args], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=10,
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ''
+
+    return {
+        'git_rev': git('rev-parse', '--short', 'HEAD'),
+        'git_dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'cpus': os.cpu_count(),
+        'recorded_at': timezone.now().isoformat(timespec='seconds'),
+    }
+
+
+def compare(report, baseline):
+    """Rows of (metric, baseline, current, change %) for two reports of the same scenario."""
+    def change(old, new):
+        if old in (None, 0) or new is None:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    rows = [('checkouts/s', baseline.get('checkouts_per_sec'), report.get('checkouts_per_sec'))]
+    for step in STEPS:
+        if step in SETUP_STEPS:
+            continue
+        old, new = baseline['steps'].get(step), report['steps'].get(step)
+        if old and new:
+            rows += [(f'{step} {metric}', old[metric], new[metric]) for metric in ('p50_ms', 'p95_ms', 'p99_ms')]
+    return [(metric, old, new, change(old, new)) for metric, old, new in rows]
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    """runserver's handler without the access log line per request."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_in_process():
+    """The Django app on a threaded WSGI server on 127.0.0.1; yields its URL."""
+    server = ThreadedWSGIServer(('127.0.0.1', 0), _QuietRequestHandler, allow_reuse_address=False)
+    server.set_app(WSGIHandler())
+    thread = threading.Thread(target=server.serve_forever, name='loadtest-app', daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def eager_tasks():
+    """Run Celery tasks inline (no broker needed), so the Onfleet dispatch and
+    confirmation email still happen, inside the request that queued them."""
+    from config.celery import app
+
+    previous = app.conf.task_always_eager
+    app.conf.task_always_eager = True
+    try:
+        yield
+    finally:
+        app.conf.task_always_eager = previous
+
+
+@contextmanager
+def local_stack(stripe_latency=0.0, onfleet_latency=0.0):
+    """App, Stripe and Onfleet all local: yields (app url, stripe server, onfleet server).
+
+    Rate limiting is off (every order comes from 127.0.0.1), mail goes to the
+    in-memory backend, and Onfleet runs for real against the fake server.
+    """
+    from apps.logistics.fake_onfleet import FakeOnfleetServer
+    from apps.payments.fake_stripe import FakeStripeServer
+    from apps.payments.stripe_client import stripe_api_base
+
+    with FakeStripeServer(latency=stripe_latency) as stripe_server, \
+            FakeOnfleetServer(latency=onfleet_latency) as onfleet_server, \
+            stripe_api_base(stripe_server.url), \
+            override_settings(
+                RATELIMIT_ENABLE=False,
+                SECURE_SSL_REDIRECT=False,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, '127.0.0.1'],
+                EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                ONFLEET_MOCK_MODE=False,
+                ONFLEET_API_KEY='loadtest',
+                ONFLEET_BASE_URL=onfleet_server.url,
+            ), \
+            eager_tasks(), \
+            serve_in_process() as base_url:
+        yield base_url, stripe_server, onfleet_server
@@ -0,0 +1,127 @@
+# backend/apps/bookings/management/commands/benchmark_booking_lists.py
+"""
+Benchmark the booking list queries before/after for_list() + cursor pages.
+
+For each list it runs the old query and the new one, and reports rows,
+bytes fetched (sum of the text size of every value the database returned)
+and median latency per page.
+
+    before  staff list: full-width rows + 6 select_related joins, first 50
+            customer list: full-width rows, entire history
+    after   BookingQuerySet.for_list() + paginate_newest_first(), per page
+
+With --seed N it first creates N bookings for a throwaway customer inside a
+transaction that is rolled back afterwards, so it is safe against a copy of
+production data and leaves nothing behind.
+
+Usage:
+    python manage.py benchmark_booking_lists --seed 5000
+    python manage.py benchmark_booking_lists --customer-id 42 --pages 5
+"""
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.bookings.models import Address, Booking
+from apps.bookings.pagination import page_queryset, paginate_newest_first
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _fetch(queryset):
+    """(rows, bytes) for the SQL `queryset` compiles to, bypassing the ORM."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    size = sum(len(str(value)) for row in rows for value in row if value is not None)
+    return len(rows), size
+
+
+def _timed(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = 'Compare bytes fetched and latency of booking list queries before/after slim projections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Create this many bookings for a throwaway customer (rolled back)')
+        parser.add_argument('--customer-id', type=int,
+                            help='Benchmark this customer\'s history (default: the seeded one)')
+        parser.add_argument('--pages', type=int, default=3)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if not options['seed'] and not options['customer_id']:
+            raise CommandError('Pass --seed N and/or --customer-id')
+        try:
+            with transaction.atomic():
+                customer_id = options['customer_id'] or self._seed(options['seed'])
+                self._run(customer_id, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count):
+        user = User.objects.create_user(username=f'bench-{timezone.now().timestamp()}', password=None)
+        pickup = Address.objects.create(address_line_1='1 Bench St', city='New York', state='NY', zip_code='10001')
+        delivery = Address.objects.create(address_line_1='2 Bench Ave', city='New York', state='NY', zip_code='10002')
+        pickup_date = timezone.now().date() + timedelta(days=7)
+        Booking.objects.bulk_create(
+            [
+                Booking(
+                    customer=user, booking_number=f'BENCH-{i:07d}', service_type='mini_move',
+                    pickup_address=pickup, delivery_address=delivery, pickup_date=pickup_date,
+                    total_price_cents=99500, status='completed',
+                )
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+        self.stdout.write(f'Seeded {count} bookings for user {user.pk} (will be rolled back)')
+        return user.pk
+
+    def _run(self, customer_id, options):
+        size, repeat = options['page_size'], options['repeat']
+        live = Booking.objects.filter(deleted_at__isnull=True)
+
+        legacy_staff = live.select_related(
+            'customer', 'customer__customer_profile', 'guest_checkout',
+            'mini_move_package', 'pickup_address', 'delivery_address',
+        ).order_by('-created_at')[:size]
+        legacy_customer = live.filter(customer_id=customer_id).order_by('-created_at')
+
+        self._report('staff list, before (page 1)', legacy_staff, repeat)
+        self._report('customer list, before (all)', legacy_customer, repeat)
+
+        for label, base in (
+            ('staff list, after', live.for_list(with_customer=True)),
+            ('customer list, after', live.filter(customer_id=customer_id).for_list()),
+        ):
+            cursor = None
+            for number in range(1, options['pages'] + 1):
+                self._report(f'{label} (page {number})', page_queryset(base, cursor, size), repeat)
+                page = paginate_newest_first(base, cursor=cursor, limit=size)
+                cursor = page.next_cursor
+                if not cursor:
+                    break
+
+    def _report(self, label, queryset, repeat):
+        (rows, size), median_ms = _timed(lambda: _fetch(queryset), repeat)
+        self.stdout.write(f'{label:<34} rows={rows:<6} bytes={size:<10} median={median_ms:.1f}ms')
@@ -0,0 +1,171 @@
+# backend/apps/bookings/management/commands/loadtest_checkout.py
+"""
+Load-test checkout: run a scenario (apps/bookings/loadtest/scenarios/*.json)
+against the real checkout endpoints and report throughput and p50/p95/p99
+latency per step, then verify no order was booked twice and every booking's
+total matches its Payment and the amount charged. Exits non-zero on a
+violation.
+
+By default everything is local and nothing needs a network: the app is
+served in-process on a threaded WSGI server, Stripe and Onfleet are the fake
+servers (apps/payments/fake_stripe.py, apps/logistics/fake_onfleet.py),
+rate limiting is off and Celery tasks run eagerly, so create_booking
+includes the Onfleet dispatch and confirmation email. Run it against
+Postgres; SQLite serializes writers and has no advisory locks.
+
+With --base-url it drives an already running stack instead (gunicorn +
+workers). The fake servers listen on --stripe-port/--onfleet-port, and the
+target must share this database and run with
+    STRIPE_API_BASE=http://127.0.0.1:<stripe-port>  ONFLEET_MOCK_MODE=False
+    ONFLEET_BASE_URL=http://127.0.0.1:<onfleet-port>  RATELIMIT_ENABLE=False
+
+Rows the run created are deleted afterwards unless --keep-data. Save a
+report with --output and pass it to a later run's --compare to see the
+change between commits (same scenario, seed and machine).
+
+Usage:
+    python manage.py loadtest_checkout --list
+    python manage.py loadtest_checkout guest_mini_move --concurrency 16 --checkouts 500
+    python manage.py loadtest_checkout guest_sibling_charges --stripe-latency-ms 150 --output before.json
+    python manage.py loadtest_checkout guest_sibling_charges --stripe-latency-ms 150 --compare before.json
+    python manage.py loadtest_checkout authenticated_mini_move --base-url http://127.0.0.1:8000
+"""
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.bookings.loadtest.runner import (
+    CheckoutLoadTest,
+    available_scenarios,
+    compare,
+    load_scenario,
+    local_stack,
+)
+from apps.payments.stripe_client import reset_stripe_call_stats, stripe_call_stats
+
+
+class Command(BaseCommand):
+    help = 'Drive the checkout endpoints at a fixed concurrency and verify no double bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', nargs='?', help='Bundled scenario name or path to a JSON file')
+        parser.add_argument('--list', action='store_true', help='List bundled scenarios')
+        parser.add_argument('--concurrency', type=int, help='Override the scenario concurrency')
+        parser.add_argument('--checkouts', type=int, help='Override the number of timed orders')
+        parser.add_argument('--warmup', type=int, help='Override the number of untimed warm-up orders')
+        parser.add_argument('--seed', type=int, help='Override the scenario seed')
+        parser.add_argument('--stripe-latency-ms', type=float, default=0,
+                            help='Fixed delay the fake Stripe adds to every request')
+        parser.add_argument('--onfleet-latency-ms', type=float, default=0,
+                            help='Fixed delay the fake Onfleet adds to every request')
+        parser.add_argument('--base-url', help='Drive a running stack instead of serving in-process')
+        parser.add_argument('--stripe-port', type=int, default=12111)
+        parser.add_argument('--onfleet-port', type=int, default=12112)
+        parser.add_argument('--output', help='Write the JSON report here')
+        parser.add_argument('--compare', help='A previous JSON report to compare against')
+        parser.add_argument('--keep-data', action='store_true', help='Leave the run\'s rows in the database')
+
+    def handle(self, *args, **options):
+        if options['list'] or not options['scenario']:
+            for name in available_scenarios():
+                self.stdout.write(f"{name:<30} {load_scenario(name).description}")
+            return
+
+        try:
+            scenario = load_scenario(
+                options['scenario'],
+                concurrency=options['concurrency'], checkouts=options['checkouts'],
+                warmup=options['warmup'], seed=options['seed'],
+            )
+        except (ValueError, TypeError) as e:
+            raise CommandError(str(e))
+        baseline = json.loads(Path(options['compare']).read_text()) if options['compare'] else None
+
+        with self._stack(options) as (base_url, stripe_server, onfleet_server):
+            try:
+                test = CheckoutLoadTest(scenario, base_url, stripe_server.url)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(
+                f'{scenario.name}: {scenario.checkouts} orders ({scenario.warmup} warm-up), '
+                f'concurrency {scenario.concurrency}, against {base_url} [run {test.run_tag}]'
+            )
+            reset_stripe_call_stats()
+            try:
+                report = test.run()
+                report['stand_ins'] = {
+                    'mode': 'external' if options['base_url'] else 'in-process',
+                    'stripe_latency_ms': options['stripe_latency_ms'],
+                    'onfleet_latency_ms': options['onfleet_latency_ms'],
+                    'stripe_requests': stripe_server.request_count,
+                    'onfleet_requests': onfleet_server.request_count,
+                }
+                if not options['base_url']:
+                    # The app's own view of its Stripe calls (in-process only)
+                    report['stand_ins']['stripe_calls'] = stripe_call_stats()
+            finally:
+                if not options['keep_data']:
+                    test.cleanup()
+
+        self._print_report(report)
+        if baseline:
+            self._print_comparison(report, baseline)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2, default=str))
+            self.stdout.write(f"Report written to {options['output']}")
+        if not report['verification']['ok']:
+            raise CommandError(f"Checkout invariants violated: {json.dumps(report['verification']['violations'])}")
+
+    @contextmanager
+    def _stack(self, options):
+        stripe_latency = options['stripe_latency_ms'] / 1000
+        onfleet_latency = options['onfleet_latency_ms'] / 1000
+        if not options['base_url']:
+            with local_stack(stripe_latency, onfleet_latency) as stack:
+                yield stack
+            return
+
+        from apps.logistics.fake_onfleet import FakeOnfleetServer
+        from apps.payments.fake_stripe import FakeStripeServer
+
+        with FakeStripeServer(port=options['stripe_port'], latency=stripe_latency) as stripe_server, \
+                FakeOnfleetServer(port=options['onfleet_port'], latency=onfleet_latency) as onfleet_server:
+            self.stdout.write(f'Fake Stripe on {stripe_server.url}, fake Onfleet on {onfleet_server.url}')
+            yield options['base_url'], stripe_server, onfleet_server
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"\n{report['orders_booked']}/{report['orders']} orders booked in {report['seconds']}s "
+            f"= {report['checkouts_per_sec']} checkouts/s  "
+            f"(git {report['environment']['git_rev'] or '?'}, {report['environment']['database']})"
+        )
+        self.stdout.write(f"{'step':<22}{'count':>7}{'errors':>8}{'/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for step, stats in report['steps'].items():
+            errors = sum(stats['errors'].values())
+            self.stdout.write(
+                f"{step:<22}{stats['count']:>7}{errors:>8}{stats['per_sec'] or '-':>9}"
+                f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+            )
+            if errors:
+                self.stdout.write(f"{'':<22}  errors by status: {stats['errors']}")
+
+        verification = report['verification']
+        if verification['ok']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Verified: {verification['bookings']} bookings, no double bookings or amount mismatches "
+                f"({verification['duplicate_orders']} duplicated orders, "
+                f"{verification['onfleet_tasks']} Onfleet tasks)"
+            ))
+        else:
+            for name, detail in verification['violations'].items():
+                self.stdout.write(self.style.ERROR(f'VIOLATION {name}: {detail}'))
+
+    def _print_comparison(self, report, baseline):
+        if baseline.get('scenario') != report['scenario']:
+            self.stdout.write(self.style.WARNING('Baseline ran a different scenario; numbers are not comparable'))
+        self.stdout.write(f"\nvs {baseline['environment'].get('git_rev') or 'baseline'}:")
+        for metric, old, new, change in compare(report, baseline):
+            delta = f'{change:+.1f}%' if change is not None else '-'
+            self.stdout.write(f'{metric:<36}{str(old):>10}{str(new):>10}{delta:>10}')
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:11
+
+from django.db import migrations, models
+
+
+SEQUENCE = 'bookings_booking_number_seq'
+
+
+def _max_issued(Booking):
+    for number in (
+        Booking.objects.filter(booking_number__startswith='TT-')
+        .order_by('-booking_number')
+        .values_list('booking_number', flat=True)[:1]
+    ):
+        digits = number.partition('-')[2]
+        if digits.isdigit():
+            return int(digits)
+    return 0
+
+
+def seed_allocator(apps, schema_editor):
+    """Start numbering after the highest booking number already issued."""
+    Booking = apps.get_model('bookings', 'Booking')
+    BookingNumberCounter = apps.get_model('bookings', 'BookingNumberCounter')
+    last = _max_issued(Booking)
+
+    BookingNumberCounter.objects.update_or_create(pk=1, defaults={'last_value': last})
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS {SEQUENCE} START WITH 1 MINVALUE 1')
+        # is_called=false when nothing was issued yet, so the first nextval() is 1
+        schema_editor.execute('SELECT setval(%s, %s, %s)', [SEQUENCE, max(last, 1), last > 0])
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS {SEQUENCE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0015_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingNumberCounter',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'bookings_booking_number_counter',
+            },
+        ),
+        migrations.RunPython(seed_allocator, drop_sequence),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0017_booking_bookings_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingbooking',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='pendingbooking',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,6 @@
 # backend/apps/bookings/models.py
 import uuid
-from django.db import models, transaction
+from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
@@ -262,6 +262,29 @@ class BookingSpecialtyItem(models.Model):
         return self.subtotal_cents / 100
 
 
+class BookingQuerySet(models.QuerySet):
+
+    # Columns the booking list views render. Booking rows are very wide
+    # (blade, organizing, pricing breakdown...), and lists only need these.
+    LIST_FIELDS = (
+        'id', 'booking_number', 'service_type', 'status', 'pickup_date', 'pickup_time',
+        'total_price_cents', 'coi_required', 'created_at', 'customer_id', 'guest_checkout_id',
+    )
+    CUSTOMER_LIST_FIELDS = (
+        'customer__first_name', 'customer__last_name', 'customer__email',
+        'guest_checkout__first_name', 'guest_checkout__last_name', 'guest_checkout__email',
+    )
+
+    def for_list(self, with_customer=False):
+        """Slim projection for list endpoints; with_customer joins just enough
+        of the customer / guest checkout for get_customer_name/email()."""
+        if not with_customer:
+            return self.only(*self.LIST_FIELDS)
+        return self.select_related('customer', 'guest_checkout').only(
+            *self.LIST_FIELDS, *self.CUSTOMER_LIST_FIELDS,
+        )
+
+
 class Booking(models.Model):
     """Core booking - works with customer OR guest checkout - WITH SERVICES INTEGRATION + BLADE"""
     
@@ -503,6 +526,8 @@ class Booking(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookingQuerySet.as_manager()
     
     class Meta:
         db_table = 'bookings_booking'
@@ -522,32 +547,24 @@ class Booking(models.Model):
             models.Index(fields=['status', 'pickup_date'], name='bookings_status_pickup_idx'),
             models.Index(fields=['created_at'], name='bookings_created_idx'),
             models.Index(fields=['service_type'], name='bookings_service_type_idx'),
+            models.Index(fields=['updated_at'], name='bookings_updated_idx'),  # Report rollup watermark
         ]
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Track original status so signals can detect real transitions (L17)
         self._original_status = self.status
+        # ...and the fields the cached public calendar depends on
+        self._original_pickup_date = self.__dict__.get('pickup_date')
+        self._original_deleted_at = self.__dict__.get('deleted_at')
 
     def save(self, *args, **kwargs):
         skip_pricing = kwargs.pop('_skip_pricing', False)
 
-        # Generate booking number if new
+        # Generate booking number if new (O(1), see bookings/numbering.py)
         if not self.booking_number:
-            with transaction.atomic():
-                last_booking = (
-                    Booking.objects
-                    .filter(booking_number__isnull=False)
-                    .select_for_update()
-                    .order_by('-booking_number')
-                    .first()
-                )
-                if last_booking and last_booking.booking_number:
-                    last_num = int(last_booking.booking_number.split('-')[1])
-                    next_num = last_num + 1
-                else:
-                    next_num = 1
-                self.booking_number = f"TT-{next_num:06d}"
+            from .numbering import next_booking_number
+            self.booking_number = next_booking_number()
 
         if not skip_pricing:
             # ========== AUTO-SET GEOGRAPHIC SURCHARGE ==========
@@ -573,6 +590,8 @@ class Booking(models.Model):
         super().save(*args, **kwargs)
         # Keep _original_status in sync so the signal detects the next transition
         self._original_status = self.status
+        self._original_pickup_date = self.pickup_date
+        self._original_deleted_at = self.deleted_at
 
     def __str__(self):
         customer_name = self.get_customer_name()
@@ -663,218 +682,63 @@ class Booking(models.Model):
     def calculate_blade_ready_time(self):
         """Calculate BLADE ready time based on flight time (to_airport only)"""
         if self.service_type == 'blade_transfer' and self.blade_flight_time:
-            if self.transfer_direction == 'from_airport':
-                self.blade_ready_time = None
-                return
-            from datetime import time
-            if self.blade_flight_time < time(13, 0):
-                self.blade_ready_time = time(5, 0)
-            else:
-                self.blade_ready_time = time(10, 0)
-    
-    def calculate_organizing_costs(self):
-        """Calculate organizing service costs based on Mini Move tier"""
-        if self.service_type != 'mini_move' or not self.mini_move_package:
-            return 0
-        
-        from apps.services.models import OrganizingService
-        
-        total_organizing_cents = 0
-        tier = self.mini_move_package.package_type
-        
-        if self.include_packing:
-            try:
-                packing_service = OrganizingService.objects.get(
-                    mini_move_tier=tier,
-                    is_packing_service=True,
-                    is_active=True
-                )
-                total_organizing_cents += packing_service.price_cents
-            except OrganizingService.DoesNotExist:
-                pass
-        
-        if self.include_unpacking:
-            try:
-                unpacking_service = OrganizingService.objects.get(
-                    mini_move_tier=tier,
-                    is_packing_service=False,
-                    is_active=True
-                )
-                total_organizing_cents += unpacking_service.price_cents
-            except OrganizingService.DoesNotExist:
-                pass
-        
-        return total_organizing_cents
-    
-    def calculate_coi_fee(self):
-        """Calculate COI fee - $50 for Standard Delivery, Specialty Items, and Petite Mini Moves"""
-        if not self.coi_required:
-            return 0
-        
-        # $50 COI fee for Standard Delivery and Specialty Items
-        if self.service_type in ['standard_delivery', 'specialty_item']:
-            return 5000
-        
-        # Mini Move COI logic
-        if self.service_type == 'mini_move' and self.mini_move_package:
-            if self.mini_move_package.package_type == 'petite':
-                return 5000
-            elif not self.mini_move_package.coi_included:
-                return self.mini_move_package.coi_fee_cents
-        
-        return 0
-    
-    def calculate_geographic_surcharge(self):
-        """
-        Calculate $175 surcharge for EACH address 30+ miles from Manhattan.
-        If both pickup AND delivery are outside core area, charges $350 total.
-        """
-        if not self.pickup_address or not self.delivery_address:
-            return 0
-
-        from .zip_codes import validate_service_area
-
-        surcharge_count = 0
-
-        # Check pickup address
-        _, pickup_surcharge, _, _ = validate_service_area(
-            self.pickup_address.zip_code
-        )
-        if pickup_surcharge:
-            surcharge_count += 1
+            from apps.services.pricing import blade_ready_time
+            self.blade_ready_time = blade_ready_time(self.blade_flight_time, self.transfer_direction)
+
+    def build_quote_request(self):
+        """Describe this booking as a QuoteRequest for the services pricing engine"""
+        from apps.services.pricing import QuoteRequest
+
+        specialty_items = ()
+        if self.service_type in ['standard_delivery', 'specialty_item'] and not self._state.adding:
+            specialty_items = tuple(
+                (str(item_id), quantity)
+                for item_id, quantity in self.bookingspecialtyitem_set.values_list('specialty_item_id', 'quantity')
+            )
 
-        # Check delivery address
-        _, delivery_surcharge, _, _ = validate_service_area(
-            self.delivery_address.zip_code
+        # Geographic surcharge only applies once both addresses are known
+        pickup_zip = delivery_zip = None
+        if self.pickup_address_id and self.delivery_address_id:
+            pickup_zip = self.pickup_address.zip_code
+            delivery_zip = self.delivery_address.zip_code
+
+        return QuoteRequest(
+            service_type=self.service_type,
+            pickup_date=self.pickup_date,
+            mini_move_package_id=str(self.mini_move_package_id) if self.mini_move_package_id else None,
+            include_packing=self.include_packing,
+            include_unpacking=self.include_unpacking,
+            standard_delivery_item_count=self.standard_delivery_item_count or 0,
+            specialty_items=specialty_items,
+            is_same_day_delivery=self.is_same_day_delivery,
+            coi_required=self.coi_required,
+            pickup_time=self.pickup_time,
+            pickup_zip_code=pickup_zip,
+            delivery_zip_code=delivery_zip,
+            blade_bag_count=self.blade_bag_count,
+            include_inactive=True,
         )
-        if delivery_surcharge:
-            surcharge_count += 1
 
-        # $175 per out-of-zone address
-        return 17500 * surcharge_count
-    
-    def calculate_time_window_surcharge(self):
-        """Calculate $175 surcharge for 1-hour window selection"""
-        if self.pickup_time == 'morning_specific':
-            if self.service_type == 'mini_move' and self.mini_move_package:
-                if self.mini_move_package.package_type == 'standard':
-                    return 17500
-                elif self.mini_move_package.package_type == 'full':
-                    return 0
-        return 0
-    
-    def calculate_organizing_tax(self):
-        """Calculate tax on organizing services - 8.25%"""
-        if self.organizing_total_cents > 0:
-            return int(self.organizing_total_cents * 0.0825)
-        return 0
-    
     def calculate_pricing(self):
         """Calculate total pricing using services pricing engine + BLADE support"""
-        from apps.services.models import StandardDeliveryConfig, calculate_surcharges_for_date
-        
-        self.base_price_cents = 0
-        self.surcharge_cents = 0
-        self.same_day_surcharge_cents = 0
-        self.coi_fee_cents = 0
-        self.organizing_total_cents = 0
-        self.geographic_surcharge_cents = 0
-        self.time_window_surcharge_cents = 0
-        self.organizing_tax_cents = 0
-        
-        # BLADE pricing
-        if self.service_type == 'blade_transfer':
-            if self.blade_bag_count:
-                per_bag_price = 7500  # $75 per bag in cents
-                self.base_price_cents = self.blade_bag_count * per_bag_price
-                self.base_price_cents = max(self.base_price_cents, 15000)
-            
-            self.calculate_blade_ready_time()
-        
-        # Mini Move pricing
-        elif self.service_type == 'mini_move' and self.mini_move_package:
-            self.base_price_cents = self.mini_move_package.base_price_cents
-            
-            self.organizing_total_cents = self.calculate_organizing_costs()
-            self.organizing_tax_cents = self.calculate_organizing_tax()
-            self.coi_fee_cents = self.calculate_coi_fee()
-            
-            if self.pickup_date:
-                self.surcharge_cents = calculate_surcharges_for_date(
-                    self.base_price_cents,
-                    self.pickup_date,
-                    self.service_type
-                )
+        from apps.services.pricing import price_quote
 
-            self.geographic_surcharge_cents = self.calculate_geographic_surcharge()
-            self.time_window_surcharge_cents = self.calculate_time_window_surcharge()
+        quote = price_quote(self.build_quote_request())
 
-        # Standard Delivery pricing
-        elif self.service_type == 'standard_delivery':
-            config = StandardDeliveryConfig.objects.filter(is_active=True).first()
-            if config:
-                if self.standard_delivery_item_count and self.standard_delivery_item_count > 0:
-                    item_total = config.price_per_item_cents * self.standard_delivery_item_count
-                    self.base_price_cents = max(item_total, config.minimum_charge_cents)
-                else:
-                    self.base_price_cents = 0
+        self.base_price_cents = quote.base_price_cents
+        self.surcharge_cents = quote.surcharge_cents
+        self.same_day_surcharge_cents = quote.same_day_surcharge_cents
+        self.coi_fee_cents = quote.coi_fee_cents
+        self.organizing_total_cents = quote.organizing_total_cents
+        self.geographic_surcharge_cents = quote.geographic_surcharge_cents
+        self.time_window_surcharge_cents = quote.time_window_surcharge_cents
+        self.organizing_tax_cents = quote.organizing_tax_cents
 
-                if self.pk and self.specialty_items.exists():
-                    specialty_total = 0
-                    for booking_item in self.bookingspecialtyitem_set.all():
-                        specialty_total += booking_item.subtotal_cents
-                    self.base_price_cents += specialty_total
-
-                # Apply same-day delivery surcharge
-                if self.is_same_day_delivery:
-                    self.same_day_surcharge_cents = config.same_day_flat_rate_cents
-            
-            # Weekend/peak date surcharges
-            if self.pickup_date:
-                self.surcharge_cents = calculate_surcharges_for_date(
-                    self.base_price_cents,
-                    self.pickup_date,
-                    self.service_type
-                )
-
-            self.geographic_surcharge_cents = self.calculate_geographic_surcharge()
-            self.coi_fee_cents = self.calculate_coi_fee()
-
-        # Specialty Item pricing
-        elif self.service_type == 'specialty_item':
-            specialty_total = 0
-            for booking_item in self.bookingspecialtyitem_set.all():
-                specialty_total += booking_item.subtotal_cents
-            self.base_price_cents = specialty_total
-            
-            # Apply same-day delivery surcharge for specialty items
-            if self.is_same_day_delivery:
-                config = StandardDeliveryConfig.objects.filter(is_active=True).first()
-                if config:
-                    self.same_day_surcharge_cents = config.same_day_flat_rate_cents
-            
-            # Apply weekend/peak date surcharges
-            if self.pickup_date:
-                self.surcharge_cents = calculate_surcharges_for_date(
-                    self.base_price_cents,
-                    self.pickup_date,
-                    self.service_type
-                )
+        if self.service_type == 'blade_transfer':
+            self.calculate_blade_ready_time()
 
-            self.geographic_surcharge_cents = self.calculate_geographic_surcharge()
-            self.coi_fee_cents = self.calculate_coi_fee()
-        
         # Calculate total
-        pre_discount = (
-            self.base_price_cents +
-            self.surcharge_cents +
-            self.same_day_surcharge_cents +
-            self.coi_fee_cents +
-            self.organizing_total_cents +
-            self.organizing_tax_cents +
-            self.geographic_surcharge_cents +
-            self.time_window_surcharge_cents
-        )
+        pre_discount = quote.total_cents
         self.pre_discount_total_cents = pre_discount
 
         if self.discount_code_id and self.discount_amount_cents > 0:
@@ -929,19 +793,16 @@ class Booking(models.Model):
         """Get detailed breakdown of organizing services"""
         if self.service_type != 'mini_move' or not self.mini_move_package:
             return {}
-        
-        from apps.services.models import OrganizingService
-        
-        services = []
+
+        from apps.services.pricing import get_catalog_snapshot
+
+        snapshot = get_catalog_snapshot()
         tier = self.mini_move_package.package_type
-        
+        services = []
+
         if self.include_packing:
-            try:
-                packing_service = OrganizingService.objects.get(
-                    mini_move_tier=tier,
-                    is_packing_service=True,
-                    is_active=True
-                )
+            packing_service = snapshot.organizing.get((tier, True))
+            if packing_service:
                 services.append({
                     'name': packing_service.name,
                     'price_dollars': packing_service.price_dollars,
@@ -949,16 +810,10 @@ class Booking(models.Model):
                     'organizer_count': packing_service.organizer_count,
                     'supplies_allowance': packing_service.supplies_allowance_dollars
                 })
-            except OrganizingService.DoesNotExist:
-                pass
-        
+
         if self.include_unpacking:
-            try:
-                unpacking_service = OrganizingService.objects.get(
-                    mini_move_tier=tier,
-                    is_packing_service=False,
-                    is_active=True
-                )
+            unpacking_service = snapshot.organizing.get((tier, False))
+            if unpacking_service:
                 services.append({
                     'name': unpacking_service.name,
                     'price_dollars': unpacking_service.price_dollars,
@@ -966,8 +821,6 @@ class Booking(models.Model):
                     'organizer_count': unpacking_service.organizer_count,
                     'supplies_allowance': 0
                 })
-            except OrganizingService.DoesNotExist:
-                pass
 
         return services
 
@@ -1032,6 +885,11 @@ class PendingBooking(models.Model):
         related_name='pending_captures',
     )
 
+    # Reconcile work claim (see recovery.claim_pending_captures): the worker
+    # holding this capture and until when. Expired leases are claimable again.
+    claimed_by = models.CharField(max_length=100, blank=True)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -1042,4 +900,79 @@ class PendingBooking(models.Model):
         ]
 
     def __str__(self):
-        return f"PendingBooking {self.stripe_payment_intent_id} ({self.status})"
\ No newline at end of file
+        return f"PendingBooking {self.stripe_payment_intent_id} ({self.status})"
+
+class BookingNumberCounter(models.Model):
+    """Single-row counter behind next_booking_number() on databases without
+    sequences (SQLite in tests/dev). PostgreSQL uses a real sequence instead."""
+
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'bookings_booking_number_counter'
+
+    def __str__(self):
+        return f"Booking number counter at {self.last_value}"
+
+
+class EmailOutbox(models.Model):
+    """Transactional booking email waiting to be sent.
+
+    Status-change emails used to be sent synchronously from a pre_save signal,
+    so every status-changing request or webhook task blocked on an SES round
+    trip (plus ICS generation for confirmations). The signal now only writes a
+    row here in the same transaction as the status change; the
+    `drain_email_outbox` task sends pending rows in batches over one mail
+    connection, retrying failures with backoff.
+
+    `dedupe_key` is unique, so a transition that is written twice (webhook and
+    view racing on the same booking) produces one email, not two. Status
+    update keys carry the transition's sequence number, so a booking that
+    later makes the same transition again is still emailed.
+    """
+
+    KIND_CHOICES = [
+        ('status_update', 'Status Update'),
+        ('confirmation', 'Booking Confirmation'),
+        ('review_request', 'Review Request'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),    # waiting to be sent (or retried)
+        ('sending', 'Sending'),    # claimed by a drain run
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),      # gave up after MAX_ATTEMPTS
+    ]
+
+    MAX_ATTEMPTS = 5
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    booking = models.ForeignKey(
+        'bookings.Booking',
+        on_delete=models.CASCADE,
+        related_name='outbox_emails',
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    dedupe_key = models.CharField(max_length=255, unique=True)
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'bookings_email_outbox'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"EmailOutbox {self.kind} for {self.booking_id} ({self.status})"
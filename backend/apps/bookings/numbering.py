@@ -0,0 +1,74 @@
+# backend/apps/bookings/numbering.py
+"""Booking number allocation (TT-000123).
+
+Booking.save() used to take the next number with
+select_for_update().order_by('-booking_number').first() over the whole bookings
+table, which serialized every concurrent booking creation (guest, customer,
+staff, orphan recovery) behind one row lock and a sort, and locked the newest
+booking against updates while doing it.
+
+next_booking_number() is O(1):
+- PostgreSQL: nextval() on `bookings_booking_number_seq` (created and seeded
+  from the existing numbers by migration 0016). Sequences never block and are
+  outside transactions, so a rolled-back booking leaves a gap in the numbering;
+  numbers stay unique and increasing.
+- Other databases (SQLite in tests/dev): an UPDATE ... +1 on the single
+  BookingNumberCounter row. SQLite serializes writers anyway; readers are never
+  blocked.
+"""
+from django.db import connection, transaction
+from django.db.models import F
+
+BOOKING_NUMBER_SEQUENCE = 'bookings_booking_number_seq'
+BOOKING_NUMBER_FORMAT = 'TT-{:06d}'
+
+
+def format_booking_number(value):
+    return BOOKING_NUMBER_FORMAT.format(value)
+
+
+def parse_booking_number(booking_number):
+    """TT-000123 -> 123; None for anything not in that format."""
+    prefix, _, digits = (booking_number or '').partition('-')
+    if prefix != 'TT' or not digits.isdigit():
+        return None
+    return int(digits)
+
+
+def current_max_booking_number():
+    """Highest number already issued, read from the bookings table."""
+    from .models import Booking
+
+    numbers = (
+        parse_booking_number(n)
+        for n in Booking.objects.filter(booking_number__startswith='TT-')
+        .order_by('-booking_number')
+        .values_list('booking_number', flat=True)[:1]
+    )
+    return next((n for n in numbers if n is not None), 0)
+
+
+def _next_from_counter():
+    from .models import BookingNumberCounter
+
+    with transaction.atomic():
+        updated = BookingNumberCounter.objects.filter(pk=1).update(last_value=F('last_value') + 1)
+        if not updated:
+            # Counter row missing (fresh DB created without migrations' data
+            # step): seed it from what is already in the table.
+            BookingNumberCounter.objects.get_or_create(
+                pk=1, defaults={'last_value': current_max_booking_number()},
+            )
+            BookingNumberCounter.objects.filter(pk=1).update(last_value=F('last_value') + 1)
+        return BookingNumberCounter.objects.values_list('last_value', flat=True).get(pk=1)
+
+
+def next_booking_number():
+    """Allocate the next booking number, e.g. 'TT-000124'."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s)', [BOOKING_NUMBER_SEQUENCE])
+            value = cursor.fetchone()[0]
+    else:
+        value = _next_from_counter()
+    return format_booking_number(value)
@@ -0,0 +1,195 @@
+# backend/apps/bookings/outbox.py
+"""Email outbox: queue transactional booking email, send it in batches.
+
+Writers (bookings/signals.py) call `queue_status_change_emails()` inside the
+status-changing transaction; it only inserts EmailOutbox rows. The
+`drain_email_outbox` task claims due rows, renders them and sends the whole
+batch over ONE mail connection (one SMTP/SES handshake instead of one per
+email). Each message is sent individually on that connection so one bad
+address fails only its own row, which is retried with backoff until
+EmailOutbox.MAX_ATTEMPTS.
+"""
+import logging
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DRAIN_BATCH_SIZE = 50
+# A drain run that dies mid-batch leaves rows in 'sending'; reclaim them after this.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 3600
+
+
+def _status_update_sequence(booking, old_status, new_status):
+    """Position of this transition among the booking's status update emails.
+
+    A new transition gets the next number, so a booking that goes A->B, B->A,
+    A->B is emailed three times. A replay of the latest transition (a second
+    writer that also saw old_status) gets the latest row's number, so its
+    dedupe_key collides and the row is dropped.
+    """
+    from .models import EmailOutbox
+
+    updates = EmailOutbox.objects.filter(booking=booking, kind='status_update')
+    count = updates.count()
+    latest = updates.order_by('-created_at').values_list('payload', flat=True).first()
+    if latest == {'old_status': old_status, 'new_status': new_status}:
+        return count - 1
+    return count
+
+
+def queue_status_change_emails(booking, old_status, new_status):
+    """Insert the outbox rows for a status transition and schedule a drain.
+
+    Status update on every change, confirmation when becoming paid/confirmed
+    (once per booking), review request on completion (once per booking).
+    """
+    from .models import EmailOutbox
+
+    sequence = _status_update_sequence(booking, old_status, new_status)
+    rows = [
+        EmailOutbox(
+            booking=booking,
+            kind='status_update',
+            dedupe_key=f'status_update:{booking.pk}:{sequence}:{old_status}:{new_status}',
+            payload={'old_status': old_status, 'new_status': new_status},
+        )
+    ]
+    if new_status in ('paid', 'confirmed'):
+        rows.append(EmailOutbox(
+            booking=booking,
+            kind='confirmation',
+            dedupe_key=f'confirmation:{booking.pk}',
+        ))
+    if new_status == 'completed':
+        rows.append(EmailOutbox(
+            booking=booking,
+            kind='review_request',
+            dedupe_key=f'review_request:{booking.pk}',
+        ))
+
+    # Savepoint: a failure here must not poison the caller's status change
+    with transaction.atomic():
+        EmailOutbox.objects.bulk_create(rows, ignore_conflicts=True)
+    transaction.on_commit(_schedule_drain)
+
+
+def _schedule_drain():
+    from .tasks import drain_email_outbox
+    try:
+        drain_email_outbox.delay()
+    except Exception as e:
+        # Broker down: the periodic drain picks the rows up.
+        logger.warning(f"Could not enqueue email outbox drain: {e}")
+
+
+def _build_message(row):
+    from apps.customers.emails import (
+        build_booking_confirmation_message,
+        build_booking_status_update_message,
+        build_review_request_message,
+    )
+
+    booking = row.booking
+    if row.kind == 'status_update':
+        return build_booking_status_update_message(
+            booking, row.payload.get('old_status'), row.payload.get('new_status')
+        )
+    if row.kind == 'confirmation':
+        return build_booking_confirmation_message(booking)
+    if row.kind == 'review_request':
+        return build_review_request_message(booking)
+    raise ValueError(f'Unknown outbox email kind: {row.kind}')
+
+
+def _claim_batch(batch_size):
+    from .models import EmailOutbox
+
+    now = timezone.now()
+    EmailOutbox.objects.filter(
+        status='sending', claimed_at__lt=now - CLAIM_TIMEOUT,
+    ).update(status='pending')
+
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=ids).update(status='sending', claimed_at=now)
+
+    return list(
+        EmailOutbox.objects
+        .filter(id__in=ids)
+        .select_related(
+            'booking',
+            'booking__customer',
+            'booking__guest_checkout',
+            'booking__pickup_address',
+            'booking__delivery_address',
+        )
+        .order_by('created_at')
+    )
+
+
+def _mark_failed(row, error):
+    row.attempts += 1
+    row.last_error = str(error)[:2000]
+    if row.attempts >= row.MAX_ATTEMPTS:
+        row.status = 'failed'
+        logger.error(f"Giving up on {row} after {row.attempts} attempts: {error}")
+    else:
+        row.status = 'pending'
+        delay = min(RETRY_BASE_SECONDS * 2 ** (row.attempts - 1), RETRY_MAX_SECONDS)
+        row.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning(f"{row} failed (attempt {row.attempts}), retrying in {delay}s: {error}")
+    row.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+def drain_outbox(batch_size=DRAIN_BATCH_SIZE):
+    """Send one batch of due outbox rows. Returns {'sent', 'failed', 'remaining'}."""
+    from .models import EmailOutbox
+
+    rows = _claim_batch(batch_size)
+    if not rows:
+        return {'sent': 0, 'failed': 0, 'remaining': False}
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Can't reach the mail server at all: the whole batch retries later.
+        for row in rows:
+            _mark_failed(row, e)
+        return {'sent': 0, 'failed': len(rows), 'remaining': False}
+
+    try:
+        for row in rows:
+            try:
+                connection.send_messages([_build_message(row)])
+            except Exception as e:
+                _mark_failed(row, e)
+                failed += 1
+                continue
+            row.status = 'sent'
+            row.attempts += 1
+            row.sent_at = timezone.now()
+            row.last_error = ''
+            row.save(update_fields=['status', 'attempts', 'sent_at', 'last_error', 'updated_at'])
+            sent += 1
+    finally:
+        connection.close()
+
+    logger.info(f"Email outbox batch: {sent} sent, {failed} failed")
+    remaining = EmailOutbox.objects.filter(
+        status='pending', next_attempt_at__lte=timezone.now(),
+    ).exists()
+    return {'sent': sent, 'failed': failed, 'remaining': remaining}
@@ -0,0 +1,89 @@
+# backend/apps/bookings/pagination.py
+"""
+Keyset (cursor) pagination for booking lists.
+
+Lists are ordered newest first on (created_at, id). A cursor is the
+(created_at, id) of the last row of the previous page, so fetching the next
+page is an index seek on bookings_customer_created_idx / bookings_created_idx
+however deep the customer scrolls, where OFFSET would re-read every earlier row.
+
+Cursors are opaque url-safe base64 JSON; clients just send back next_cursor.
+"""
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    payload = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Opaque cursor -> the dict it was made from; InvalidCursor if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, dict):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """?limit= -> a page size within 1..MAX_PAGE_SIZE (ValueError if not a number)."""
+    if value in (None, ''):
+        return default
+    return max(1, min(int(value), MAX_PAGE_SIZE))
+
+
+@dataclass
+class CursorPage:
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def page_queryset(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """The (unevaluated) query for one page: limit + 1 rows after `cursor`,
+    the extra row telling us whether there is a next page."""
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            created_at = parse_datetime(values.get('created_at') or '')
+            last_id = uuid.UUID(str(values.get('id')))
+        except ValueError:
+            raise InvalidCursor(cursor)
+        if created_at is None:
+            raise InvalidCursor(cursor)
+        # (created_at, id) < cursor, phrased so the created_at bound is a plain
+        # range the index can seek on
+        queryset = queryset.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(id__lt=last_id)
+        )
+    return queryset[:limit + 1]
+
+
+def paginate_newest_first(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """One page of `queryset` ordered by (-created_at, -id) after `cursor`."""
+    items = list(page_queryset(queryset, cursor, limit))
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor({'created_at': last.created_at.isoformat(), 'id': str(last.id)})
+    return CursorPage(items=items, next_cursor=next_cursor)
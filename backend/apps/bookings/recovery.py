@@ -527,6 +527,57 @@ def recover_orphan_for_payment_intent(payment_intent_id, *, source='recovery'):
     return materialize_pending_booking(pending.id, source=source)
 
 
+def claims_are_exclusive():
+    """True when claim_pending_captures can hand out disjoint work to
+    concurrent workers (SELECT ... FOR UPDATE SKIP LOCKED). Without it (SQLite)
+    callers must fall back to running one reconcile at a time."""
+    return connection.features.has_select_for_update_skip_locked
+
+
+def claim_pending_captures(worker_id, *, created_before, limit, lease):
+    """Claim up to `limit` reconcilable captures for `worker_id`, oldest first.
+
+    The candidate rows are locked with FOR UPDATE SKIP LOCKED, so workers
+    claiming at the same moment skip each other's rows instead of queueing on
+    them, then stamped with a lease (claimed_by / claimed_until) and the lock
+    is released at commit. Until the lease runs out no other worker claims
+    them; a worker that dies simply lets it expire.
+
+    A capture left 'pending' after processing (not paid yet, poison row) keeps
+    its lease, which doubles as the retry backoff.
+    """
+    from django.db.models import Q
+    from .models import PendingBooking
+
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = PendingBooking.objects.filter(
+            Q(claimed_until__isnull=True) | Q(claimed_until__lt=now),
+            status='pending',
+            created_at__lt=created_before,
+        ).order_by('created_at', 'id')
+        if claims_are_exclusive():
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        PendingBooking.objects.filter(id__in=ids).update(
+            claimed_by=worker_id, claimed_until=now + lease,
+        )
+    return list(
+        PendingBooking.objects.filter(id__in=ids, claimed_by=worker_id).order_by('created_at', 'id')
+    )
+
+
+def extend_claims(worker_id, pending_ids, lease):
+    """Heartbeat: push out the lease on captures `worker_id` still holds."""
+    from .models import PendingBooking
+
+    return PendingBooking.objects.filter(
+        id__in=pending_ids, claimed_by=worker_id, status='pending',
+    ).update(claimed_until=timezone.now() + lease)
+
+
 def _send_recovery_alert(info):
     """Best-effort staff alert for a duplicate/failed recovery. Runs post-commit."""
     if not info:
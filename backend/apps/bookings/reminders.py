@@ -0,0 +1,137 @@
+# backend/apps/bookings/reminders.py
+"""Batched 24-hour pickup reminders.
+
+The reminder task used to walk a plain Booking queryset and call
+send_booking_reminder_email() per booking: lazy loads of the customer, guest
+checkout, addresses and Onfleet pickup task for every row, a new mail
+connection per message and one UPDATE per booking.
+
+Due bookings are now read in id-ordered chunks with everything the email
+needs joined or prefetched. Each chunk's messages are rendered first, then
+sent over ONE mail connection (same as the email outbox, bookings/outbox.py),
+one message at a time so a bad address fails only its own booking, and the
+successfully reminded bookings are marked with one bulk UPDATE. Failed
+bookings keep reminder_sent_at empty and are retried on the next hourly run.
+
+A chunk's rows stay locked (SELECT ... FOR UPDATE SKIP LOCKED) until they are
+marked, so a slow run overlapping the next hourly one skips them instead of
+sending a second reminder. The guard is in the database rather than a cache
+lock, so reminders still go out while Redis is down.
+"""
+import logging
+import time
+
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+REMINDER_CHUNK_SIZE = 100
+
+
+def due_reminders(pickup_date):
+    """Bookings picking up on `pickup_date` that haven't been reminded yet."""
+    from apps.logistics.models import OnfleetTask
+    from .models import Booking
+
+    return (
+        Booking.objects.filter(
+            status__in=['pending', 'paid', 'confirmed'],
+            pickup_date=pickup_date,
+            reminder_sent_at__isnull=True,
+            deleted_at__isnull=True,
+        )
+        .select_related('customer', 'guest_checkout', 'pickup_address', 'delivery_address')
+        .prefetch_related(Prefetch(
+            'onfleet_tasks',
+            queryset=OnfleetTask.objects.filter(task_type='pickup'),
+            to_attr='pickup_tasks',
+        ))
+        .order_by('id')
+    )
+
+
+def _send_chunk(bookings):
+    """Render and send one chunk's reminders; returns (sent ids, failed count)."""
+    from apps.customers.emails import build_booking_reminder_message
+
+    messages = []
+    failed = 0
+    for booking in bookings:
+        try:
+            messages.append((booking, build_booking_reminder_message(booking)))
+        except Exception as e:
+            logger.error(f'Failed to render reminder for {booking.booking_number}: {e}', exc_info=True)
+            failed += 1
+
+    if not messages:
+        return [], failed
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Can't reach the mail server: the whole chunk waits for the next run
+        logger.error(f'Could not open mail connection for reminders: {e}')
+        return [], failed + len(messages)
+
+    sent_ids = []
+    try:
+        for booking, message in messages:
+            try:
+                connection.send_messages([message])
+            except Exception as e:
+                logger.error(f'Failed to send reminder for {booking.booking_number}: {e}', exc_info=True)
+                failed += 1
+                continue
+            sent_ids.append(booking.id)
+    finally:
+        connection.close()
+
+    return sent_ids, failed
+
+
+def send_due_reminders(pickup_date, chunk_size=REMINDER_CHUNK_SIZE):
+    """Send every due reminder for `pickup_date`. Returns the run report."""
+    from .models import Booking
+
+    started = time.monotonic()
+    queryset = due_reminders(pickup_date)
+    sent = failed = chunks = 0
+    last_id = None
+
+    while True:
+        # Keyset on id: reminded rows drop out of the filter, failed ones are
+        # stepped over instead of being re-read every chunk
+        chunk_qs = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        with transaction.atomic():
+            bookings = list(chunk_qs.select_for_update(skip_locked=True, of=('self',))[:chunk_size])
+            if not bookings:
+                break
+            last_id = bookings[-1].id
+            chunks += 1
+
+            sent_ids, chunk_failed = _send_chunk(bookings)
+            if sent_ids:
+                Booking.objects.filter(
+                    id__in=sent_ids, reminder_sent_at__isnull=True,
+                ).update(reminder_sent_at=timezone.now())
+        sent += len(sent_ids)
+        failed += chunk_failed
+
+    elapsed = time.monotonic() - started
+    report = {
+        'sent': sent,
+        'failed': failed,
+        'chunks': chunks,
+        'seconds': round(elapsed, 3),
+        'msgs_per_sec': round(sent / elapsed, 1) if elapsed and sent else 0.0,
+        'pickup_date': str(pickup_date),
+    }
+    logger.info(
+        f"Reminders for {pickup_date}: {sent} sent, {failed} failed in {chunks} chunk(s), "
+        f"{report['seconds']}s ({report['msgs_per_sec']} msgs/sec)"
+    )
+    return report
@@ -1,56 +1,73 @@
 import logging
-from django.db.models.signals import pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from apps.bookings.models import Booking
-from apps.customers.emails import (
-    send_booking_status_update_email,
-    send_booking_confirmation_email,
-    send_review_request_email,
+from apps.bookings.availability import (
+    invalidate_all_availability,
+    invalidate_availability_for_dates,
 )
+from apps.bookings.models import Booking
+from apps.bookings.outbox import queue_status_change_emails
+from apps.services.models import SurchargeRule
 
 logger = logging.getLogger(__name__)
 
 
-@receiver(pre_save, sender=Booking)
-def booking_status_changed(sender, instance, **kwargs):
+@receiver(post_save, sender=Booking)
+def booking_status_changed(sender, instance, created, **kwargs):
     """
-    Send emails when a booking's status changes.
-    - Always send status-update email on change.
-    - Additionally send confirmation when becoming 'paid' or 'confirmed'.
-    """
-    if not instance.pk:
-        # New booking being created; no "old" status to compare here.
-        return
+    Queue emails when a booking's status changes.
+    - Always a status-update email on change.
+    - Additionally a confirmation when becoming 'paid' or 'confirmed'.
+    - A review request on completion.
 
-    try:
-        old = Booking.objects.get(pk=instance.pk)
-    except Booking.DoesNotExist:
-        # Shouldn't happen for existing pk, but guard anyway.
+    Emails are written to the EmailOutbox in the same transaction and sent by
+    the drain_email_outbox task, so the request never waits on the mail server.
+    """
+    if created:
+        # New booking; no "old" status to compare here.
         return
 
-    old_status = old.status
+    old_status = instance._original_status
     new_status = instance.status
 
     if old_status == new_status:
         return
 
-    logger.info(f"📧 Booking {old.booking_number} status changed: {old_status} → {new_status}")
-    # Status update notification to customer
+    logger.info(f"📧 Booking {instance.booking_number} status changed: {old_status} → {new_status}")
     try:
-        send_booking_status_update_email(instance, old_status, new_status)
+        queue_status_change_emails(instance, old_status, new_status)
     except Exception as e:
-        logger.error(f"Failed to send status update email for {instance.booking_number}: {e}", exc_info=True)
-
-    # Confirmation on transition to paid/confirmed
-    if new_status in ('paid', 'confirmed'):
-        try:
-            send_booking_confirmation_email(instance)
-        except Exception as e:
-            logger.error(f"Failed to send confirmation for {instance.booking_number}: {e}", exc_info=True)
-
-    # Review request on completion
-    if new_status == 'completed':
-        try:
-            send_review_request_email(instance)
-        except Exception as e:
-            logger.error(f"Failed to send review request for {instance.booking_number}: {e}", exc_info=True)
+        logger.error(f"Failed to queue status emails for {instance.booking_number}: {e}", exc_info=True)
+
+
+def _invalidate_availability_after_commit(*dates):
+    # Now for this request, and again after commit so a concurrent reader
+    # can't re-cache the month from pre-commit data.
+    invalidate_availability_for_dates(*dates)
+    transaction.on_commit(lambda: invalidate_availability_for_dates(*dates))
+
+
+@receiver(post_save, sender=Booking)
+def booking_availability_changed(sender, instance, created, **kwargs):
+    """Drop cached public calendar months when a booking's day count changes."""
+    old_date = instance._original_pickup_date
+    if (
+        created
+        or old_date != instance.pickup_date
+        or instance._original_deleted_at != instance.deleted_at
+    ):
+        _invalidate_availability_after_commit(old_date, instance.pickup_date)
+
+
+@receiver(post_delete, sender=Booking)
+def booking_availability_deleted(sender, instance, **kwargs):
+    _invalidate_availability_after_commit(instance.pickup_date)
+
+
+@receiver(post_save, sender=SurchargeRule)
+@receiver(post_delete, sender=SurchargeRule)
+def surcharge_rule_changed(sender, instance, **kwargs):
+    """Surcharges are part of every cached calendar month."""
+    invalidate_all_availability()
+    transaction.on_commit(invalidate_all_availability)
@@ -19,8 +19,7 @@ def send_booking_reminders():
     error here would silently skip reminders.
     """
     from django.conf import settings
-    from apps.bookings.models import Booking
-    from apps.customers.emails import send_booking_reminder_email
+    from apps.bookings.reminders import send_due_reminders
 
     # Kill-switch (see BOOKING_REMINDERS_ENABLED in settings) — lets us pause
     # reminders without removing the Beat schedule or redeploying.
@@ -38,28 +37,36 @@ def send_booking_reminders():
 
     logger.info(f'Checking for bookings with pickup_date == {tomorrow} (local)')
 
-    # Find confirmed bookings whose pickup is tomorrow and haven't been reminded.
-    bookings = Booking.objects.filter(
-        status__in=['pending', 'paid', 'confirmed'],
-        pickup_date=tomorrow,
-        reminder_sent_at__isnull=True,
-        deleted_at__isnull=True
-    )
+    # Confirmed bookings whose pickup is tomorrow and haven't been reminded,
+    # sent in chunks over one mail connection each. Each chunk is row-locked
+    # until marked, so an overlapping run can't double-send (bookings/reminders.py)
+    report = send_due_reminders(tomorrow)
+
+    logger.info(f"✓ Reminder task complete: {report['sent']} sent, {report['failed']} failed")
+    return report
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def drain_email_outbox(max_batches=20):
+    """
+    Send queued transactional booking emails (EmailOutbox).
+
+    Enqueued on commit by every status change, and run every minute by Celery
+    Beat as a backstop for retries and for drains that never got enqueued.
+    Each batch shares one mail connection; see apps/bookings/outbox.py.
+    """
+    from apps.bookings.outbox import drain_outbox
 
     sent_count = 0
     failed_count = 0
 
-    for booking in bookings:
-        logger.info(f'Sending reminder for booking {booking.booking_number}')
-
-        if send_booking_reminder_email(booking):
-            sent_count += 1
-        else:
-            failed_count += 1
+    for _ in range(max_batches):
+        result = drain_outbox()
+        sent_count += result['sent']
+        failed_count += result['failed']
+        if not result['remaining']:
+            break
 
-    logger.info(f'✓ Reminder task complete: {sent_count} sent, {failed_count} failed')
-    return {
-        'sent': sent_count,
-        'failed': failed_count,
-        'pickup_date': str(tomorrow)
-    }
+    if sent_count or failed_count:
+        logger.info(f'Email outbox drained: {sent_count} sent, {failed_count} failed')
+    return {'sent': sent_count, 'failed': failed_count}
@@ -0,0 +1,123 @@
+# backend/apps/bookings/tests/test_availability_cache.py
+"""
+Public calendar availability is served from a per-month cache and must:
+- count bookings with a single aggregate query, then zero queries when cached
+- drop a month when a booking is added, moved or soft-deleted
+- answer conditional GETs with 304
+- cap the requested range
+"""
+import pytest
+from datetime import date, timedelta
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bookings.availability import AVAILABILITY_MAX_RANGE_DAYS
+from apps.bookings.models import Booking, Address, GuestCheckout
+from apps.services.models import SurchargeRule
+
+URL = '/api/public/availability/'
+
+
+@pytest.fixture
+def make_booking(db):
+    def _make(pickup_date):
+        address = Address.objects.create(
+            address_line_1='1 Main St', city='New York', state='NY', zip_code='10001',
+        )
+        guest = GuestCheckout.objects.create(
+            first_name='Test', last_name='Guest', email='guest@example.com', phone='2125550100',
+        )
+        return Booking.objects.create(
+            guest_checkout=guest,
+            service_type='blade_transfer',
+            blade_bag_count=2,
+            pickup_address=address,
+            delivery_address=address,
+            pickup_date=pickup_date,
+        )
+    return _make
+
+
+def _day(response, day):
+    return next(d for d in response.data['availability'] if d['date'] == day.isoformat())
+
+
+@pytest.mark.django_db
+class TestPublicAvailabilityCache:
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.day = date.today() + timedelta(days=20)
+        self.params = {'start_date': self.day.isoformat(), 'end_date': (self.day + timedelta(days=6)).isoformat()}
+
+    def test_counts_and_second_request_hits_cache(self, make_booking, django_assert_max_num_queries):
+        make_booking(self.day)
+        make_booking(self.day)
+
+        response = self.client.get(URL, self.params)
+        assert response.status_code == 200
+        assert _day(response, self.day)['booking_count'] == 2
+        assert 'bookings' not in _day(response, self.day)
+
+        with django_assert_max_num_queries(0):
+            response = self.client.get(URL, self.params)
+        assert _day(response, self.day)['booking_count'] == 2
+
+    def test_new_moved_and_deleted_bookings_invalidate(self, make_booking):
+        booking = make_booking(self.day)
+        assert _day(self.client.get(URL, self.params), self.day)['booking_count'] == 1
+
+        make_booking(self.day)
+        assert _day(self.client.get(URL, self.params), self.day)['booking_count'] == 2
+
+        booking.pickup_date = self.day + timedelta(days=1)
+        booking.save()
+        response = self.client.get(URL, self.params)
+        assert _day(response, self.day)['booking_count'] == 1
+        assert _day(response, self.day + timedelta(days=1))['booking_count'] == 1
+
+        booking.deleted_at = timezone.now()
+        booking.save()
+        assert _day(self.client.get(URL, self.params), self.day + timedelta(days=1))['booking_count'] == 0
+
+    def test_surcharge_rule_change_invalidates(self):
+        SurchargeRule.objects.create(
+            surcharge_type='peak_date',
+            name='Holiday',
+            calculation_type='fixed_amount',
+            fixed_amount_cents=10000,
+            specific_date=self.day,
+            is_active=True,
+        )
+        assert [s['name'] for s in _day(self.client.get(URL, self.params), self.day)['surcharges']] == ['Holiday']
+
+        SurchargeRule.objects.all().delete()
+        assert _day(self.client.get(URL, self.params), self.day)['surcharges'] == []
+
+    def test_etag_revalidation_returns_304(self, make_booking):
+        response = self.client.get(URL, self.params)
+        etag = response['ETag']
+        assert response['Last-Modified']
+
+        response = self.client.get(URL, self.params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        make_booking(self.day)
+        response = self.client.get(URL, self.params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_end_date_is_capped(self):
+        response = self.client.get(URL, {
+            'start_date': self.day.isoformat(),
+            'end_date': (self.day + timedelta(days=1000)).isoformat(),
+        })
+        assert response.status_code == 200
+        assert len(response.data['availability']) == AVAILABILITY_MAX_RANGE_DAYS + 1
+
+    def test_end_before_start_returns_400(self):
+        response = self.client.get(URL, {
+            'start_date': self.day.isoformat(),
+            'end_date': (self.day - timedelta(days=1)).isoformat(),
+        })
+        assert response.status_code == 400
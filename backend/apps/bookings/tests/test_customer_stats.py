@@ -28,7 +28,7 @@ def _next_weekday():
 
 
 @pytest.fixture
-def customer_with_booking(db):
+def customer_with_booking(db, django_capture_on_commit_callbacks):
     """Create a customer with a paid booking — ready for delivery completion."""
     user = User.objects.create_user(
         username='statscust', email='stats@example.com', password='testpass',
@@ -53,15 +53,17 @@ def customer_with_booking(db):
         address_line_1='20 Broadway', city='New York', state='NY', zip_code='10002',
     )
 
-    booking = Booking.objects.create(
-        customer=user,
-        service_type='mini_move',
-        mini_move_package=package,
-        pickup_address=pickup,
-        delivery_address=delivery,
-        pickup_date=_next_weekday(),
-        status='paid',
-    )
+    # Onfleet tasks are dispatched once the paid booking commits
+    with django_capture_on_commit_callbacks(execute=True):
+        booking = Booking.objects.create(
+            customer=user,
+            service_type='mini_move',
+            mini_move_package=package,
+            pickup_address=pickup,
+            delivery_address=delivery,
+            pickup_date=_next_weekday(),
+            status='paid',
+        )
 
     payment = Payment.objects.create(
         booking=booking,
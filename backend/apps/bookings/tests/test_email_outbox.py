@@ -0,0 +1,115 @@
+# backend/apps/bookings/tests/test_email_outbox.py
+"""
+Status-change emails go through the EmailOutbox:
+- the status change only writes outbox rows (no mail sent in the request)
+- a repeated transition is deduped
+- the drain sends a batch over one connection and retries failures
+"""
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.utils import timezone
+
+from apps.bookings.models import Address, Booking, EmailOutbox, GuestCheckout
+from apps.bookings.outbox import drain_outbox
+
+
+@pytest.fixture
+def booking(db):
+    address = Address.objects.create(
+        address_line_1='123 Test St', city='New York', state='NY', zip_code='10001',
+    )
+    guest = GuestCheckout.objects.create(
+        first_name='Guest', last_name='User', email='guest@example.com', phone='5559876543',
+    )
+    return Booking.objects.create(
+        guest_checkout=guest,
+        service_type='blade_transfer',
+        blade_bag_count=2,
+        pickup_address=address,
+        delivery_address=address,
+        pickup_date=timezone.now().date() + timedelta(days=3),
+        status='pending',
+    )
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def setup_method(self):
+        mail.outbox = []
+
+    def test_status_change_queues_rows_without_sending(self, booking, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            booking.status = 'paid'
+            booking.save()
+
+        kinds = set(EmailOutbox.objects.filter(booking=booking).values_list('kind', flat=True))
+        assert kinds == {'status_update', 'confirmation'}
+        assert mail.outbox == []
+
+    def test_repeated_transition_is_deduped(self, booking, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            booking.status = 'paid'
+            booking.save()
+            # A second writer that also saw 'pending' replays the same transition
+            stale = Booking.objects.get(pk=booking.pk)
+            stale._original_status = 'pending'
+            stale.save()
+
+        assert EmailOutbox.objects.filter(booking=booking, kind='status_update').count() == 1
+        assert EmailOutbox.objects.filter(booking=booking, kind='confirmation').count() == 1
+
+    def test_transition_made_again_is_emailed_again(self, booking, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            for status in ('confirmed', 'pending', 'confirmed'):
+                booking.status = status
+                booking.save()
+
+        payloads = list(
+            EmailOutbox.objects.filter(booking=booking, kind='status_update')
+            .order_by('created_at').values_list('payload', flat=True)
+        )
+        assert [p['new_status'] for p in payloads] == ['confirmed', 'pending', 'confirmed']
+
+    def test_drain_sends_batch_over_one_connection(self, booking, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            booking.status = 'paid'
+            booking.save()
+            booking.status = 'completed'
+            booking.save()
+
+        with patch('apps.bookings.outbox.get_connection', wraps=get_connection) as connection_factory:
+            result = drain_outbox()
+
+        assert result['sent'] == 4  # 2 status updates, confirmation, review request
+        assert connection_factory.call_count == 1
+        assert len(mail.outbox) == 4
+        assert not EmailOutbox.objects.exclude(status='sent').exists()
+
+    def test_failed_message_is_retried_later(self, booking, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False):
+            booking.status = 'paid'
+            booking.save()
+
+        with patch(
+            'apps.customers.emails.build_booking_confirmation_message',
+            side_effect=RuntimeError('SES throttled'),
+        ):
+            result = drain_outbox()
+
+        assert result == {'sent': 1, 'failed': 1, 'remaining': False}
+        row = EmailOutbox.objects.get(booking=booking, kind='confirmation')
+        assert row.status == 'pending'
+        assert row.attempts == 1
+        assert row.next_attempt_at > timezone.now()
+        assert 'SES throttled' in row.last_error
+
+        # Not due yet: nothing to send
+        assert drain_outbox()['sent'] == 0
+
+        EmailOutbox.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+        assert drain_outbox()['sent'] == 1
@@ -0,0 +1,97 @@
+# backend/apps/bookings/tests/test_loadtest_checkout.py
+"""The checkout load-test harness: scenarios, stats, and small end-to-end runs
+over HTTP against the in-process app and the fake Stripe/Onfleet servers."""
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from apps.bookings.loadtest import runner
+from apps.bookings.loadtest.runner import (
+    CheckoutLoadTest,
+    Scenario,
+    available_scenarios,
+    load_scenario,
+    local_stack,
+    percentile,
+)
+from apps.bookings.models import Booking, PendingBooking
+from apps.bookings.tests.test_orphan_recovery import package  # noqa: F401
+from apps.payments.models import Payment
+
+
+def test_percentiles_interpolate():
+    values = [10.0, 20.0, 30.0, 40.0]
+
+    assert percentile(values, 50) == 25.0
+    assert percentile(values, 99) == pytest.approx(39.7)
+    assert percentile([5.0], 95) == 5.0
+    assert percentile([], 50) is None
+
+
+def test_bundled_scenarios_load():
+    names = available_scenarios()
+
+    assert {'guest_mini_move', 'authenticated_mini_move', 'guest_sibling_charges'} <= set(names)
+    assert all(load_scenario(name).name == name for name in names)
+    assert load_scenario('guest_mini_move', concurrency=2, seed=None).concurrency == 2
+
+
+def test_invalid_scenarios_are_rejected(tmp_path):
+    path = tmp_path / 'bad.json'
+    path.write_text(json.dumps({'flow': 'guest', 'retries': 3}))
+
+    with pytest.raises(ValueError, match='retries'):
+        load_scenario(str(path))
+    with pytest.raises(ValueError, match='flow'):
+        Scenario(name='x', flow='staff')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_guest_run_verifies_and_cleans_up(package, tmp_path):
+    output = tmp_path / 'report.json'
+
+    call_command('loadtest_checkout', 'guest_mini_move', concurrency=1, checkouts=3, warmup=1,
+                 output=str(output))
+
+    report = json.loads(output.read_text())
+    assert report['orders_booked'] == 3
+    assert report['verification'] == {
+        'ok': True, 'bookings': 4, 'duplicate_orders': 0, 'onfleet_tasks': 8, 'violations': {},
+    }
+    assert report['steps']['create_booking']['count'] == 3
+    assert set(report['steps']['checkout']) >= {'p50_ms', 'p95_ms', 'p99_ms', 'per_sec'}
+    assert report['stand_ins']['onfleet_requests'] == 8
+    assert not Booking.objects.exists()
+    assert not Payment.objects.exists()
+
+
+@pytest.fixture
+def duplicate_pairs(monkeypatch):
+    """SQLite's shared in-memory test database takes one writer at a time (and
+    has no advisory locks), so duplicate POSTs go one after the other there;
+    on Postgres they race as in a real run."""
+    if connection.vendor != 'postgresql':
+        monkeypatch.setattr(runner, 'ThreadPoolExecutor', lambda max_workers: ThreadPoolExecutor(max_workers=1))
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('duplicate_pairs')
+@pytest.mark.parametrize('flow,mode', [('guest', 'resubmit'), ('guest', 'sibling'), ('authenticated', 'resubmit')])
+def test_duplicate_checkouts_book_once(package, flow, mode):
+    scenario = Scenario(name='dup', flow=flow, concurrency=1, checkouts=2, warmup=0,
+                        duplicate_rate=1.0, duplicate_mode=mode)
+
+    with local_stack() as (base_url, stripe_server, _):
+        test = CheckoutLoadTest(scenario, base_url, stripe_server.url)
+        report = test.run()
+
+    assert report['verification']['ok'], report['verification']
+    assert report['verification']['bookings'] == 2
+    assert all(sorted(r['booking_statuses']) == [201, 400] for r in test.results)
+    if mode == 'sibling':
+        assert PendingBooking.objects.filter(status='duplicate').count() == 2
+    test.cleanup()
+    assert not Booking.objects.exists()
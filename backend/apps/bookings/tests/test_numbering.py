@@ -0,0 +1,81 @@
+# backend/apps/bookings/tests/test_numbering.py
+"""
+Booking number allocator: TT-000123 format, O(1), no table-wide lock.
+"""
+import pytest
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.bookings.models import Address, Booking, BookingNumberCounter, GuestCheckout
+from apps.bookings.numbering import next_booking_number, parse_booking_number
+
+
+@pytest.fixture
+def addresses(db):
+    pickup = Address.objects.create(
+        address_line_1='123 Test St', city='New York', state='NY', zip_code='10001'
+    )
+    delivery = Address.objects.create(
+        address_line_1='456 Test Ave', city='New York', state='NY', zip_code='10002'
+    )
+    return pickup, delivery
+
+
+def _create_booking(addresses, **extra):
+    pickup, delivery = addresses
+    guest = GuestCheckout.objects.create(
+        first_name='Number', last_name='Test', email='number@example.com', phone='5551234567',
+    )
+    return Booking.objects.create(
+        guest_checkout=guest,
+        service_type='mini_move',
+        pickup_address=pickup,
+        delivery_address=delivery,
+        pickup_date=timezone.now().date() + timedelta(days=1),
+        **extra,
+    )
+
+
+@pytest.mark.django_db
+class TestNextBookingNumber:
+
+    def test_format_and_sequence(self):
+        first = next_booking_number()
+        second = next_booking_number()
+
+        assert first.startswith('TT-') and len(first) == 9
+        assert parse_booking_number(second) == parse_booking_number(first) + 1
+
+    def test_bookings_get_consecutive_numbers(self, addresses):
+        booking1 = _create_booking(addresses)
+        booking2 = _create_booking(addresses)
+
+        assert parse_booking_number(booking2.booking_number) == parse_booking_number(booking1.booking_number) + 1
+
+    def test_allocation_does_not_scan_bookings(self, addresses):
+        with CaptureQueriesContext(connection) as ctx:
+            next_booking_number()
+
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries)
+        assert 'bookings_booking"' not in sql
+        assert 'FOR UPDATE' not in sql
+
+    def test_missing_counter_row_is_seeded_from_existing_numbers(self, addresses):
+        _create_booking(addresses, booking_number='TT-000412')
+        BookingNumberCounter.objects.all().delete()
+
+        assert next_booking_number() == 'TT-000413'
+
+    def test_explicit_number_is_kept(self, addresses):
+        booking = _create_booking(addresses, booking_number='TT-009999')
+        assert booking.booking_number == 'TT-009999'
+
+
+def test_parse_booking_number():
+    assert parse_booking_number('TT-000123') == 123
+    assert parse_booking_number('XX-000123') is None
+    assert parse_booking_number('TT-abc') is None
+    assert parse_booking_number('') is None
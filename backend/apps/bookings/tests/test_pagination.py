@@ -0,0 +1,138 @@
+# backend/apps/bookings/tests/test_pagination.py
+"""
+Booking list projections (BookingQuerySet.for_list) and (created_at, id) cursor pages.
+"""
+import pytest
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import StaffProfile
+from apps.assistant.tools import lookup_booking_history
+from apps.bookings.models import Address, Booking
+from apps.bookings.pagination import (
+    InvalidCursor,
+    encode_cursor,
+    paginate_newest_first,
+)
+from apps.customers.models import CustomerProfile
+from apps.payments.models import Payment
+
+
+@pytest.fixture
+def customer(db):
+    user = User.objects.create_user(username='pager', email='pager@example.com', password='x')
+    CustomerProfile.objects.create(user=user)
+    return user
+
+
+@pytest.fixture
+def make_bookings(db):
+    def _make(user, count):
+        pickup = Address.objects.create(address_line_1='1 Test St', city='New York', state='NY', zip_code='10001')
+        delivery = Address.objects.create(address_line_1='2 Test Ave', city='New York', state='NY', zip_code='10002')
+        now = timezone.now()
+        bookings = []
+        for _ in range(count):
+            booking = Booking.objects.create(
+                customer=user, service_type='mini_move',
+                pickup_address=pickup, delivery_address=delivery,
+                pickup_date=now.date() + timedelta(days=3),
+            )
+            bookings.append(booking)
+        # Two bookings share a timestamp so the id tiebreak is exercised
+        Booking.objects.filter(pk__in=[b.pk for b in bookings[:2]]).update(created_at=now - timedelta(days=1))
+        return bookings
+    return _make
+
+
+@pytest.mark.django_db
+class TestPaginateNewestFirst:
+
+    def test_walks_every_booking_once_in_order(self, customer, make_bookings):
+        make_bookings(customer, 7)
+        expected = list(
+            Booking.objects.order_by('-created_at', '-id').values_list('pk', flat=True)
+        )
+
+        seen, cursor = [], None
+        while True:
+            page = paginate_newest_first(Booking.objects.for_list(), cursor=cursor, limit=3)
+            seen.extend(b.pk for b in page.items)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+        assert seen == expected
+
+    def test_rejects_malformed_cursors(self, db):
+        for cursor in ('garbage', encode_cursor({'created_at': 'x', 'id': 'y'}), encode_cursor([1])):
+            with pytest.raises(InvalidCursor):
+                paginate_newest_first(Booking.objects.all(), cursor=cursor)
+
+    def test_for_list_defers_wide_columns(self, customer, make_bookings):
+        make_bookings(customer, 1)
+        booking = Booking.objects.for_list().get()
+
+        deferred = booking.get_deferred_fields()
+        assert 'pricing_breakdown' in deferred or 'special_instructions' in deferred
+        assert 'booking_number' not in deferred
+
+
+@pytest.mark.django_db
+class TestListEndpoints:
+
+    def test_customer_list_is_paginated(self, customer, make_bookings):
+        make_bookings(customer, 5)
+        client = APIClient()
+        client.force_authenticate(user=customer)
+
+        first = client.get('/api/customer/bookings/', {'limit': 3}).data
+        second = client.get('/api/customer/bookings/', {'limit': 3, 'cursor': first['next_cursor']}).data
+
+        assert len(first['bookings']) == 3
+        assert len(second['bookings']) == 2
+        assert second['next_cursor'] is None
+        assert first['total_count'] == 5
+
+    def test_customer_list_rejects_bad_cursor(self, customer):
+        client = APIClient()
+        client.force_authenticate(user=customer)
+
+        assert client.get('/api/customer/bookings/', {'cursor': 'nope'}).status_code == 400
+
+    def test_staff_list_payment_status_is_one_query(self, customer, make_bookings):
+        staff = User.objects.create_user(username='pagerstaff', email='ps@example.com', password='x')
+        StaffProfile.objects.create(user=staff, role='staff', phone='5550000007')
+        client = APIClient()
+        client.force_authenticate(user=staff)
+        bookings = make_bookings(customer, 2)
+        Payment.objects.create(booking=bookings[0], amount_cents=100, status='succeeded')
+
+        with CaptureQueriesContext(connection) as small:
+            response = client.get('/api/staff/bookings/')
+        statuses = {b['id']: b['payment_status'] for b in response.data['bookings']}
+        assert statuses[str(bookings[0].pk)] == 'succeeded'
+        assert statuses[str(bookings[1].pk)] == 'not_created'
+
+        make_bookings(customer, 6)
+        with CaptureQueriesContext(connection) as large:
+            client.get('/api/staff/bookings/')
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+
+@pytest.mark.django_db
+def test_assistant_history_pages_with_cursor(customer, make_bookings):
+    make_bookings(customer, 12)
+
+    first = lookup_booking_history.invoke({'user_id': customer.id})
+    second = lookup_booking_history.invoke({'user_id': customer.id, 'cursor': first['next_cursor']})
+
+    assert first['total_bookings'] == 12
+    assert len(first['bookings']) == 10
+    assert len(second['bookings']) == 2
+    assert second['next_cursor'] is None
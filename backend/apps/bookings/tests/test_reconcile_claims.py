@@ -0,0 +1,84 @@
+# backend/apps/bookings/tests/test_reconcile_claims.py
+"""Work claiming for reconcile_pending_payments: disjoint leased chunks, and a
+run that drains the whole backlog instead of a fixed batch."""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bookings.models import PendingBooking
+from apps.bookings.recovery import claim_pending_captures, extend_claims
+from apps.bookings.tests.test_orphan_recovery import _age_pending, create_pi, package  # noqa: F401
+from apps.payments.models import Payment
+from apps.payments.tasks import reconcile_pending_payments
+
+LEASE = timedelta(minutes=2)
+
+
+@pytest.fixture
+def captures(package):
+    pi_ids = [f'pi_claim_{i}' for i in range(5)]
+    for pi_id in pi_ids:
+        create_pi(APIClient(), package, pi_id=pi_id, cart_key=f'cart-{pi_id}', email=f'{pi_id}@example.com')
+        Payment.objects.filter(stripe_payment_intent_id=pi_id).update(status='succeeded')
+        _age_pending(pi_id)
+    return pi_ids
+
+
+def _claim(worker, limit=2):
+    return claim_pending_captures(worker, created_before=timezone.now(), limit=limit, lease=LEASE)
+
+
+@pytest.mark.django_db
+class TestClaimPendingCaptures:
+
+    def test_workers_claim_disjoint_chunks_oldest_first(self, captures):
+        first = _claim('worker-a')
+        second = _claim('worker-b')
+
+        assert len(first) == len(second) == 2
+        assert not {p.id for p in first} & {p.id for p in second}
+        assert all(p.claimed_by == 'worker-a' and p.claimed_until > timezone.now() for p in first)
+        assert max(p.created_at for p in first) <= min(p.created_at for p in second)
+
+    def test_expired_lease_is_claimable_again(self, captures):
+        claimed = _claim('worker-a', limit=5)
+        assert _claim('worker-b', limit=5) == []
+
+        PendingBooking.objects.filter(id=claimed[0].id).update(
+            claimed_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        assert [p.id for p in _claim('worker-b', limit=5)] == [claimed[0].id]
+
+    def test_heartbeat_only_extends_own_claims(self, captures):
+        claimed = _claim('worker-a')
+
+        assert extend_claims('worker-b', [p.id for p in claimed], LEASE) == 0
+        assert extend_claims('worker-a', [p.id for p in claimed], LEASE) == 2
+
+
+@pytest.mark.django_db
+class TestReconcileDrain:
+
+    @patch('apps.payments.tasks.RECONCILE_CLAIM_CHUNK', 2)
+    def test_run_drains_backlog_across_chunks(self, captures):
+        result = reconcile_pending_payments()
+
+        assert result['recovered'] == 5
+        assert result['claimed'] == 5
+        assert result['drained'] is True
+        assert not PendingBooking.objects.filter(status='pending').exists()
+
+    @patch('apps.payments.tasks.RECONCILE_CLAIM_CHUNK', 2)
+    def test_unpaid_capture_is_not_retried_within_a_run(self, captures):
+        Payment.objects.filter(stripe_payment_intent_id='pi_claim_0').update(status='pending')
+        with patch('stripe.PaymentIntent.retrieve', side_effect=Exception('unreachable')) as retrieve:
+            result = reconcile_pending_payments()
+
+        assert retrieve.call_count == 1
+        assert result['recovered'] == 4
+        assert result['drained'] is True
+        assert PendingBooking.objects.get(stripe_payment_intent_id='pi_claim_0').status == 'pending'
@@ -0,0 +1,119 @@
+# backend/apps/bookings/tests/test_reminders.py
+"""
+Batched reminder dispatch: one mail connection per chunk, per-message failure
+isolation, and a query count that doesn't grow with the number of bookings.
+"""
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.bookings.models import Address, Booking, GuestCheckout
+from apps.bookings.reminders import send_due_reminders
+
+
+@pytest.fixture
+def pickup_date():
+    return timezone.localdate() + timedelta(days=1)
+
+
+@pytest.fixture
+def make_bookings(db, pickup_date):
+    pickup = Address.objects.create(address_line_1='1 Pickup St', city='New York', state='NY', zip_code='10001')
+    delivery = Address.objects.create(address_line_1='2 Delivery Ave', city='New York', state='NY', zip_code='10002')
+
+    def make(count):
+        bookings = []
+        for i in range(count):
+            guest = GuestCheckout.objects.create(
+                first_name='Guest', last_name=str(i), email=f'guest{i}@example.com', phone='5551234567',
+            )
+            bookings.append(Booking.objects.create(
+                guest_checkout=guest, service_type='mini_move', pickup_address=pickup,
+                delivery_address=delivery, pickup_date=pickup_date, total_price_cents=99500,
+                status='confirmed',
+            ))
+        return bookings
+
+    return make
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+@pytest.mark.django_db
+class TestSendDueReminders:
+
+    def setup_method(self):
+        mail.outbox = []
+        CountingBackend.opened = 0
+
+    def test_one_connection_per_chunk(self, make_bookings, pickup_date):
+        make_bookings(5)
+
+        with mock.patch('apps.bookings.reminders.get_connection', lambda **kw: CountingBackend(**kw)):
+            report = send_due_reminders(pickup_date, chunk_size=2)
+
+        assert report['sent'] == 5
+        assert report['chunks'] == 3
+        assert CountingBackend.opened == 3
+        assert len(mail.outbox) == 5
+        assert report['msgs_per_sec'] > 0
+        assert not Booking.objects.filter(reminder_sent_at__isnull=True).exists()
+
+    def test_failed_message_does_not_block_the_rest(self, make_bookings, pickup_date):
+        bookings = make_bookings(3)
+        bad_address = bookings[1].get_customer_email()
+        real_send = EmailBackend.send_messages
+
+        def send_messages(self, messages):
+            if bad_address in messages[0].to:
+                raise ConnectionResetError('smtp went away')
+            return real_send(self, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', send_messages):
+            report = send_due_reminders(pickup_date)
+
+        assert report['sent'] == 2
+        assert report['failed'] == 1
+        assert list(
+            Booking.objects.filter(reminder_sent_at__isnull=True).values_list('id', flat=True)
+        ) == [bookings[1].id]
+
+    def test_query_count_does_not_grow_with_bookings(self, make_bookings, pickup_date):
+        make_bookings(2)
+        with CaptureQueriesContext(connection) as small:
+            send_due_reminders(pickup_date)
+
+        Booking.objects.update(reminder_sent_at=None)
+        make_bookings(8)
+        with CaptureQueriesContext(connection) as large:
+            report = send_due_reminders(pickup_date)
+
+        assert report['sent'] == 10
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_nothing_due(self, db, pickup_date):
+        report = send_due_reminders(pickup_date)
+
+        assert report == {**report, 'sent': 0, 'failed': 0, 'chunks': 0}
+        assert mail.outbox == []
+
+    @mock.patch('django.core.cache.cache.add', return_value=None)
+    def test_task_sends_while_cache_is_down(self, _add, make_bookings):
+        # A Redis outage (IGNORE_EXCEPTIONS: add() -> None) must not skip the run
+        from apps.bookings.tasks import send_booking_reminders
+        make_bookings(2)
+
+        assert send_booking_reminders()['sent'] == 2
+        assert len(mail.outbox) == 2
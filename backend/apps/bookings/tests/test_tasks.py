@@ -36,7 +36,7 @@ class TestBookingReminderTask:
     def test_sends_reminders_for_tomorrow_bookings(self, test_addresses):
         """Test reminders sent for bookings tomorrow"""
         pickup, delivery = test_addresses
-        tomorrow = timezone.now().date() + timedelta(days=1)
+        tomorrow = timezone.localdate() + timedelta(days=1)
         
         guest = GuestCheckout.objects.create(
             first_name='Test',
@@ -68,7 +68,7 @@ class TestBookingReminderTask:
     def test_no_reminders_for_past_bookings(self, test_addresses):
         """Test no reminders sent for past bookings"""
         pickup, delivery = test_addresses
-        yesterday = timezone.now().date() - timedelta(days=1)
+        yesterday = timezone.localdate() - timedelta(days=1)
         
         guest = GuestCheckout.objects.create(
             first_name='Test',
@@ -96,7 +96,7 @@ class TestBookingReminderTask:
     def test_no_duplicate_reminders(self, test_addresses):
         """Test reminder not sent twice"""
         pickup, delivery = test_addresses
-        tomorrow = timezone.now().date() + timedelta(days=1)
+        tomorrow = timezone.localdate() + timedelta(days=1)
         
         guest = GuestCheckout.objects.create(
             first_name='Test',
@@ -124,7 +124,7 @@ class TestBookingReminderTask:
     def test_only_confirmed_bookings_get_reminders(self, test_addresses):
         """Test only confirmed/paid bookings get reminders"""
         pickup, delivery = test_addresses
-        tomorrow = timezone.now().date() + timedelta(days=1)
+        tomorrow = timezone.localdate() + timedelta(days=1)
         
         # Cancelled booking
         guest1 = GuestCheckout.objects.create(
@@ -173,7 +173,7 @@ class TestBookingReminderTask:
     def test_handles_multiple_bookings(self, test_addresses):
         """Test task handles multiple bookings correctly"""
         pickup, delivery = test_addresses
-        tomorrow = timezone.now().date() + timedelta(days=1)
+        tomorrow = timezone.localdate() + timedelta(days=1)
         
         for i in range(3):
             guest = GuestCheckout.objects.create(
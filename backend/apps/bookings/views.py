@@ -7,15 +7,17 @@ from django.core.cache import cache
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from collections import defaultdict
-from datetime import date, timedelta, time as dt_time
+from datetime import date, timedelta
 import logging
 import json
 import uuid as _uuid_mod
 import stripe
-from django.conf import settings
 
 from .models import Booking, Address, GuestCheckout, check_same_day_restriction
+from .availability import AVAILABILITY_MAX_RANGE_DAYS, get_public_availability
 from apps.payments.models import Payment
 from .serializers import (
     BookingSerializer,
@@ -30,7 +32,6 @@ from apps.services.models import (
     StandardDeliveryConfig, 
     SpecialtyItem, 
     OrganizingService,
-    SurchargeRule
 )
 from apps.services.serializers import (
     ServiceCatalogSerializer,
@@ -42,16 +43,18 @@ from apps.services.serializers import (
     OrganizingServicesByTierSerializer
 )
 from apps.payments.services import StripePaymentService
-from .pricing_utils import calculate_geographic_surcharge_from_zips
+from apps.services.pricing import (
+    PricingError,
+    QuoteRequest,
+    blade_ready_time,
+    get_catalog_snapshot,
+    price_quote,
+)
 from django.utils.decorators import method_decorator
 from django_ratelimit.decorators import ratelimit
 
 logger = logging.getLogger(__name__)
 
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
-
 SERVICE_CATALOG_CACHE_KEY = 'service_catalog_v1'
 SERVICE_CATALOG_CACHE_TTL = 300  # staff edits to the catalog take up to 5 min to appear
 
@@ -134,284 +137,115 @@ class PricingPreviewView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         # ========== END RESTRICTION CHECK ==========
 
-        base_price_cents = 0
-        surcharge_cents = 0
-        coi_fee_cents = 0
-        organizing_total_cents = 0
-        organizing_tax_cents = 0
-        geographic_surcharge_cents = 0
-        time_window_surcharge_cents = 0
-        same_day_fee_cents = 0
+        data = serializer.validated_data
         details = {}
-        
-        # BLADE pricing
-        if service_type == 'blade_transfer':
-            bag_count = serializer.validated_data.get('blade_bag_count', 0)
-            
-            if bag_count < 2:
+
+        if service_type in ['standard_delivery', 'specialty_item']:
+            if data.get('include_packing') or data.get('include_unpacking'):
                 return Response({
-                    'error': 'BLADE service requires minimum 2 bags'
+                    'error': 'Organizing services are only available for Mini Move bookings'
                 }, status=status.HTTP_400_BAD_REQUEST)
-            
-            per_bag_price = 7500  # $75 in cents
-            base_price_cents = bag_count * per_bag_price
-            base_price_cents = max(base_price_cents, 15000)  # $150 minimum
-            
-            # Calculate ready time (to_airport only)
-            transfer_direction = serializer.validated_data.get('transfer_direction', 'to_airport')
-            flight_time = serializer.validated_data.get('blade_flight_time')
-            if transfer_direction == 'to_airport' and flight_time:
-                if flight_time < dt_time(13, 0):
-                    ready_time = dt_time(5, 0)
-                else:
-                    ready_time = dt_time(10, 0)
+
+        if service_type == 'blade_transfer' and data.get('blade_bag_count', 0) < 2:
+            return Response({
+                'error': 'BLADE service requires minimum 2 bags'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            quote = price_quote(QuoteRequest.from_data(data))
+        except PricingError:
+            return Response({'error': 'Invalid mini move package'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # BLADE details
+        if service_type == 'blade_transfer':
+            transfer_direction = data.get('transfer_direction', 'to_airport')
+            ready_time = blade_ready_time(data.get('blade_flight_time'), transfer_direction)
+            if ready_time:
                 details['ready_time'] = ready_time.isoformat()
 
             details['transfer_direction'] = transfer_direction
-            details['terminal'] = serializer.validated_data.get('blade_terminal')
-            details['airport'] = serializer.validated_data.get('blade_airport')
-            details['bag_count'] = bag_count
+            details['terminal'] = data.get('blade_terminal')
+            details['airport'] = data.get('blade_airport')
+            details['bag_count'] = data.get('blade_bag_count', 0)
             details['per_bag_price'] = 75
-            details['flight_date'] = serializer.validated_data.get('blade_flight_date').isoformat() if serializer.validated_data.get('blade_flight_date') else None
-            details['flight_time'] = serializer.validated_data.get('blade_flight_time').isoformat() if serializer.validated_data.get('blade_flight_time') else None
-        
-        # Mini Move pricing
-        elif service_type == 'mini_move':
-            package_id = serializer.validated_data.get('mini_move_package_id')
-            if package_id:
-                try:
-                    package = MiniMovePackage.objects.get(id=package_id, is_active=True)
-                    base_price_cents = package.base_price_cents
-                    details['package_name'] = package.name
-                    details['package_tier'] = package.package_type
-                    
-                    coi_required = serializer.validated_data.get('coi_required', False)
-                    if coi_required and not package.coi_included:
-                        coi_fee_cents = package.coi_fee_cents
-                        details['coi_required'] = True
-                    
-                    include_packing = serializer.validated_data.get('include_packing', False)
-                    include_unpacking = serializer.validated_data.get('include_unpacking', False)
-                    
-                    organizing_services_breakdown = []
-                    
-                    if include_packing:
-                        packing_service = OrganizingService.objects.filter(
-                            mini_move_tier=package.package_type,
-                            is_packing_service=True,
-                            is_active=True
-                        ).first()
-                        
-                        if packing_service:
-                            organizing_total_cents += packing_service.price_cents
-                            organizing_services_breakdown.append({
-                                'service': 'packing',
-                                'name': packing_service.name,
-                                'price_dollars': packing_service.price_dollars,
-                                'duration_hours': packing_service.duration_hours,
-                                'organizer_count': packing_service.organizer_count,
-                                'supplies_allowance_dollars': packing_service.supplies_allowance_dollars
-                            })
-                        else:
-                            logger.warning(f"Packing service not found for tier {package.package_type}")
-                            return Response({
-                                'error': f'Packing service not available for {package.package_type} tier'
-                            }, status=status.HTTP_400_BAD_REQUEST)
-                    
-                    if include_unpacking:
-                        unpacking_service = OrganizingService.objects.filter(
-                            mini_move_tier=package.package_type,
-                            is_packing_service=False,
-                            is_active=True
-                        ).first()
-                        
-                        if unpacking_service:
-                            organizing_total_cents += unpacking_service.price_cents
-                            organizing_services_breakdown.append({
-                                'service': 'unpacking',
-                                'name': unpacking_service.name,
-                                'price_dollars': unpacking_service.price_dollars,
-                                'duration_hours': unpacking_service.duration_hours,
-                                'organizer_count': unpacking_service.organizer_count,
-                                'supplies_allowance_dollars': 0
-                            })
-                        else:
-                            logger.warning(f"Unpacking service not found for tier {package.package_type}")
-                            return Response({
-                                'error': f'Unpacking service not available for {package.package_type} tier'
-                            }, status=status.HTTP_400_BAD_REQUEST)
-                    
-                    if organizing_total_cents > 0:
-                        organizing_tax_cents = int(organizing_total_cents * 0.0825)
-                    
-                    pickup_time = serializer.validated_data.get('pickup_time', 'morning')
-                    if pickup_time == 'morning_specific' and package.package_type == 'standard':
-                        time_window_surcharge_cents = 17500
-                    
-                    # Calculate geographic surcharge ($175 per out-of-zone address)
-                    geographic_surcharge_cents = calculate_geographic_surcharge_from_zips(
-                        serializer.validated_data.get('pickup_zip_code'),
-                        serializer.validated_data.get('delivery_zip_code'),
-                        fallback_is_outside=serializer.validated_data.get('is_outside_core_area', False)
-                    )
-                    
-                    if organizing_services_breakdown:
-                        details['organizing_services'] = organizing_services_breakdown
-                    
-                except MiniMovePackage.DoesNotExist:
-                    return Response({'error': 'Invalid mini move package'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Standard Delivery pricing
-        elif service_type == 'standard_delivery':
-            if serializer.validated_data.get('include_packing') or serializer.validated_data.get('include_unpacking'):
-                return Response({
-                    'error': 'Organizing services are only available for Mini Move bookings'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            item_count = serializer.validated_data.get('standard_delivery_item_count', 0)
-            specialty_items_data = serializer.validated_data.get('specialty_items', [])
-            is_same_day = serializer.validated_data.get('is_same_day_delivery', False)
-            
-            config = StandardDeliveryConfig.objects.filter(is_active=True).first()
-            if config:
-                if item_count > 0:
-                    item_total = config.price_per_item_cents * item_count
-                    base_price_cents = max(item_total, config.minimum_charge_cents)
-
-                    details['item_count'] = item_count
-                    details['per_item_rate'] = config.price_per_item_cents / 100
-                    details['minimum_charge'] = config.minimum_charge_cents / 100
-                else:
-                    base_price_cents = 0
-
-                # Calculate specialty items with quantities
-                if specialty_items_data:
-                    specialty_items_list = []
-                    specialty_total_cents = 0
-
-                    for item_data in specialty_items_data:
-                        item_id = item_data.get('item_id')
-                        quantity = item_data.get('quantity', 1)
-
-                        try:
-                            specialty_item = SpecialtyItem.objects.get(id=item_id, is_active=True)
-                            item_total = specialty_item.price_cents * quantity
-                            specialty_total_cents += item_total
-
-                            specialty_items_list.append({
-                                'name': specialty_item.name,
-                                'price_dollars': specialty_item.price_dollars,
-                                'quantity': quantity,
-                                'subtotal_dollars': item_total / 100
-                            })
-                        except SpecialtyItem.DoesNotExist:
-                            logger.warning(f"Specialty item {item_id} not found")
-                            continue
-
-                    base_price_cents += specialty_total_cents
-                    details['specialty_items'] = specialty_items_list
-
-                if is_same_day:
-                    same_day_fee_cents = config.same_day_flat_rate_cents
-                    details['is_same_day'] = True
-                    details['same_day_rate'] = config.same_day_flat_rate_cents / 100
-            
-            # Apply geographic surcharge for Standard Delivery ($175 per out-of-zone address)
-            geographic_surcharge_cents = calculate_geographic_surcharge_from_zips(
-                serializer.validated_data.get('pickup_zip_code'),
-                serializer.validated_data.get('delivery_zip_code'),
-                fallback_is_outside=serializer.validated_data.get('is_outside_core_area', False)
-            )
-            
-            # Apply COI fee for Standard Delivery
-            coi_required = serializer.validated_data.get('coi_required', False)
-            if coi_required:
-                coi_fee_cents = 5000
-        
-        # Specialty Item pricing with quantities
-        elif service_type == 'specialty_item':
-            if serializer.validated_data.get('include_packing') or serializer.validated_data.get('include_unpacking'):
+            details['flight_date'] = data.get('blade_flight_date').isoformat() if data.get('blade_flight_date') else None
+            details['flight_time'] = data.get('blade_flight_time').isoformat() if data.get('blade_flight_time') else None
+
+        # Mini Move details
+        elif service_type == 'mini_move' and quote.package:
+            package = quote.package
+            if quote.unavailable_organizing:
+                service_label = quote.unavailable_organizing[0]
+                logger.warning(f"{service_label.capitalize()} service not found for tier {package.package_type}")
                 return Response({
-                    'error': 'Organizing services are only available for Mini Move bookings'
+                    'error': f'{service_label.capitalize()} service not available for {package.package_type} tier'
                 }, status=status.HTTP_400_BAD_REQUEST)
-            
-            specialty_items_data = serializer.validated_data.get('specialty_items', [])
-            
-            if specialty_items_data:
-                specialty_items_list = []
-                specialty_total_cents = 0
-                
-                for item_data in specialty_items_data:
-                    item_id = item_data.get('item_id')
-                    quantity = item_data.get('quantity', 1)
-                    
-                    try:
-                        specialty_item = SpecialtyItem.objects.get(id=item_id, is_active=True)
-                        item_total = specialty_item.price_cents * quantity
-                        specialty_total_cents += item_total
-                        
-                        specialty_items_list.append({
-                            'name': specialty_item.name,
-                            'price_dollars': specialty_item.price_dollars,
-                            'quantity': quantity,
-                            'subtotal_dollars': item_total / 100
-                        })
-                    except SpecialtyItem.DoesNotExist:
-                        logger.warning(f"Specialty item {item_id} not found")
-                        continue
-                
-                base_price_cents = specialty_total_cents
-                details['specialty_items'] = specialty_items_list
-            
-            # Apply same-day delivery for specialty items
-            is_same_day = serializer.validated_data.get('is_same_day_delivery', False)
-            if is_same_day:
-                config = StandardDeliveryConfig.objects.filter(is_active=True).first()
-                if config:
-                    same_day_fee_cents = config.same_day_flat_rate_cents
-                    details['is_same_day'] = True
-                    details['same_day_rate'] = config.same_day_flat_rate_cents / 100
-            
-            # Apply geographic surcharge for Specialty Items ($175 per out-of-zone address)
-            geographic_surcharge_cents = calculate_geographic_surcharge_from_zips(
-                serializer.validated_data.get('pickup_zip_code'),
-                serializer.validated_data.get('delivery_zip_code'),
-                fallback_is_outside=serializer.validated_data.get('is_outside_core_area', False)
-            )
-            
-            # Apply COI fee for Specialty Items
-            coi_required = serializer.validated_data.get('coi_required', False)
-            if coi_required:
-                coi_fee_cents = 5000
-        
-        # Apply surcharges (NOT for BLADE)
-        if service_type != 'blade_transfer' and pickup_date and base_price_cents > 0:
-            active_surcharges = SurchargeRule.objects.filter(is_active=True)
-            surcharge_details = []
-            
-            for surcharge in active_surcharges:
-                surcharge_amount = surcharge.calculate_surcharge(base_price_cents, pickup_date, service_type)
-                if surcharge_amount > 0:
-                    surcharge_cents += surcharge_amount
-                    surcharge_details.append({
-                        'name': surcharge.name,
-                        'amount_dollars': surcharge_amount / 100,
-                        'reason': surcharge.description
-                    })
-            
-            if surcharge_details:
-                details['surcharges'] = surcharge_details
-        
-        total_price_cents = (
-            base_price_cents +
-            same_day_fee_cents +
-            surcharge_cents +
-            coi_fee_cents +
-            organizing_total_cents +
-            organizing_tax_cents +
-            geographic_surcharge_cents +
-            time_window_surcharge_cents
-        )
+
+            details['package_name'] = package.name
+            details['package_tier'] = package.package_type
+            if quote.coi_fee_cents:
+                details['coi_required'] = True
+
+            if quote.organizing_services:
+                details['organizing_services'] = [
+                    {
+                        'service': 'packing' if service.is_packing_service else 'unpacking',
+                        'name': service.name,
+                        'price_dollars': service.price_dollars,
+                        'duration_hours': service.duration_hours,
+                        'organizer_count': service.organizer_count,
+                        'supplies_allowance_dollars': (
+                            service.supplies_allowance_dollars if service.is_packing_service else 0
+                        ),
+                    }
+                    for service in quote.organizing_services
+                ]
+
+        # Standard Delivery / Specialty Item details
+        elif service_type in ['standard_delivery', 'specialty_item']:
+            config = quote.delivery_config
+            item_count = data.get('standard_delivery_item_count', 0)
+            if service_type == 'standard_delivery' and config and item_count > 0:
+                details['item_count'] = item_count
+                details['per_item_rate'] = config.price_per_item_cents / 100
+                details['minimum_charge'] = config.minimum_charge_cents / 100
+
+            for item_id in quote.unknown_specialty_item_ids:
+                logger.warning(f"Specialty item {item_id} not found")
+            if data.get('specialty_items') and (config or service_type == 'specialty_item'):
+                details['specialty_items'] = [
+                    {
+                        'name': item.name,
+                        'price_dollars': item.price_dollars,
+                        'quantity': quantity,
+                        'subtotal_dollars': subtotal_cents / 100
+                    }
+                    for item, quantity, subtotal_cents in quote.specialty_lines
+                ]
+
+            if quote.same_day_surcharge_cents:
+                details['is_same_day'] = True
+                details['same_day_rate'] = quote.same_day_surcharge_cents / 100
+
+        if quote.surcharges:
+            details['surcharges'] = [
+                {
+                    'name': rule.name,
+                    'amount_dollars': amount / 100,
+                    'reason': rule.description
+                }
+                for rule, amount in quote.surcharges
+            ]
+
+        base_price_cents = quote.base_price_cents
+        same_day_fee_cents = quote.same_day_surcharge_cents
+        surcharge_cents = quote.surcharge_cents
+        coi_fee_cents = quote.coi_fee_cents
+        organizing_total_cents = quote.organizing_total_cents
+        organizing_tax_cents = quote.organizing_tax_cents
+        geographic_surcharge_cents = quote.geographic_surcharge_cents
+        time_window_surcharge_cents = quote.time_window_surcharge_cents
+        total_price_cents = quote.total_cents
 
         # Apply discount code if provided
         discount_amount_cents = 0
@@ -491,29 +325,37 @@ class CalendarAvailabilityView(APIView):
         else:
             end_date = start_date + timedelta(days=60)
 
+        if end_date < start_date:
+            return Response(
+                {'error': 'end_date must be on or after start_date.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        end_date = min(end_date, start_date + timedelta(days=AVAILABILITY_MAX_RANGE_DAYS))
+
         is_staff = (
             request.user.is_authenticated
             and hasattr(request.user, 'staff_profile')
         )
 
+        if not is_staff:
+            return self._public_availability(request, start_date, end_date)
+
         # Bulk-fetch all bookings in date range (single query instead of N)
         bookings_qs = Booking.objects.filter(
             pickup_date__gte=start_date,
             pickup_date__lte=end_date,
             deleted_at__isnull=True,
+        ).select_related(
+            'customer', 'guest_checkout', 'mini_move_package',
         )
-        if is_staff:
-            bookings_qs = bookings_qs.select_related(
-                'customer', 'guest_checkout', 'mini_move_package',
-            )
 
         # Group bookings by date in Python
         bookings_by_date = defaultdict(list)
         for b in bookings_qs:
             bookings_by_date[b.pickup_date].append(b)
 
-        # Fetch surcharge rules once (instead of per-day)
-        surcharge_rules = list(SurchargeRule.objects.filter(is_active=True))
+        # Per-day surcharge rules come from the precomputed surcharge calendar
+        catalog = get_catalog_snapshot()
 
         availability = []
         current_date = start_date
@@ -525,8 +367,7 @@ class CalendarAvailabilityView(APIView):
                     'type': rule.surcharge_type,
                     'description': rule.description,
                 }
-                for rule in surcharge_rules
-                if rule.applies_to_date(current_date)
+                for rule in catalog.surcharge_rules_for_date(current_date)
             ]
 
             day_data = {
@@ -534,12 +375,7 @@ class CalendarAvailabilityView(APIView):
                 'available': True,
                 'is_weekend': current_date.weekday() >= 5,
                 'surcharges': surcharges,
-            }
-
-            day_bookings = bookings_by_date.get(current_date, [])
-
-            if is_staff:
-                day_data['bookings'] = [
+                'bookings': [
                     {
                         'id': str(b.id),
                         'booking_number': b.booking_number,
@@ -550,10 +386,9 @@ class CalendarAvailabilityView(APIView):
                         'total_price_dollars': b.total_price_dollars,
                         'coi_required': b.coi_required,
                     }
-                    for b in day_bookings
-                ]
-            else:
-                day_data['booking_count'] = len(day_bookings)
+                    for b in bookings_by_date.get(current_date, [])
+                ],
+            }
 
             availability.append(day_data)
             current_date += timedelta(days=1)
@@ -564,6 +399,26 @@ class CalendarAvailabilityView(APIView):
             'end_date': end_date.isoformat(),
         })
 
+    def _public_availability(self, request, start_date, end_date):
+        """Counts + surcharges only, served from the per-month cache with
+        ETag / Last-Modified revalidation."""
+        build, etag, last_modified = get_public_availability(start_date, end_date)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        response = Response({
+            'availability': build(),
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+        })
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
 
 @method_decorator(ratelimit(key='ip', rate='10/h', method='POST', block=True), name='post')
 class CreateGuestPaymentIntentView(APIView):
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class CustomersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.customers'  # Change this from 'customers' to 'apps.customers'
\ No newline at end of file
+    name = 'apps.customers'  # Change this from 'customers' to 'apps.customers'
+
+    def ready(self):
+        # Auth user cache invalidation
+        import apps.customers.signals  # noqa: F401
@@ -0,0 +1,91 @@
+# apps/customers/auth_cache.py
+"""
+Cached user + profile lookup for request authentication.
+
+Every authenticated API call used to read the session row, let
+AuthenticationMiddleware load the User, and then have HybridAuthentication
+load the same User again with select_related('staff_profile',
+'customer_profile'). Sessions now live in the cache (cached_db, written
+through to the DB), and the user is resolved once from the session through
+get_auth_user(): a single select_related query on a miss, a cache hit
+otherwise.
+
+The cached User carries both profile caches (including "no such profile"),
+so hasattr(user, 'customer_profile') costs nothing. It is dropped whenever
+the User or either profile is saved or deleted (customers/signals.py), and
+by CustomerProfile.add_booking_stats(), whose update() sends no signal; the
+TTL is only a backstop for other queryset.update()s. Views that write the
+profile load it from the DB rather than saving the cached instance.
+
+user_from_session() mirrors django.contrib.auth.get_user: the backend must
+still be configured, the user active, and the session's auth hash must match
+(so a password change still logs other sessions out).
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+AUTH_USER_CACHE_KEY = 'auth_user_{user_id}'
+AUTH_USER_CACHE_TTL = 60 * 10
+PROFILE_FIELDS = ('staff_profile', 'customer_profile')
+
+
+def get_auth_user(user_id):
+    """User `user_id` with both profiles loaded, from the cache when possible."""
+    key = AUTH_USER_CACHE_KEY.format(user_id=user_id)
+    user = cache.get(key)
+    if user is not None:
+        return user
+
+    user = User.objects.select_related(*PROFILE_FIELDS).filter(pk=user_id).first()
+    if user is None:
+        return None
+    cache.set(key, user, AUTH_USER_CACHE_TTL)
+    return user
+
+
+def invalidate_auth_user(user_id):
+    cache.delete(AUTH_USER_CACHE_KEY.format(user_id=user_id))
+
+
+def _session_hash_verified(session, user):
+    session_hash = session.get(HASH_SESSION_KEY)
+    if not session_hash:
+        return False
+    session_auth_hash = user.get_session_auth_hash()
+    if constant_time_compare(session_hash, session_auth_hash):
+        return True
+    # Signed with a SECRET_KEY_FALLBACKS key: accept and re-sign, as Django does
+    if any(
+        constant_time_compare(session_hash, fallback_hash)
+        for fallback_hash in user.get_session_auth_fallback_hash()
+    ):
+        session.cycle_key()
+        session[HASH_SESSION_KEY] = session_auth_hash
+        return True
+    return False
+
+
+def user_from_session(session):
+    """The active, verified user logged in to `session`, or None."""
+    try:
+        user_id = User._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+    except (KeyError, ValueError):
+        return None
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return None
+
+    user = get_auth_user(user_id)
+    if user is None or not user.is_active:
+        return None
+    if not _session_hash_verified(session, user):
+        session.flush()
+        return None
+    return user
@@ -5,13 +5,13 @@ from django.utils import timezone
 from datetime import timedelta, time as dt_time
 from apps.bookings.models import Booking, Address, BookingSpecialtyItem
 from apps.bookings.serializers import validate_blade_terminal
-from apps.bookings.pricing_utils import calculate_geographic_surcharge_from_zips
 from apps.payments.models import Payment
 from apps.payments.services import StripePaymentService
 from .models import CustomerProfile, SavedAddress, CustomerPaymentMethod
 import logging
 from .serializers import SavedAddressSerializer
-from apps.services.models import MiniMovePackage, SpecialtyItem, StandardDeliveryConfig, calculate_surcharges_for_date
+from apps.services.models import MiniMovePackage, SpecialtyItem
+from apps.services.pricing import PricingError, QuoteRequest, price_quote
 
 logger = logging.getLogger(__name__)
 
@@ -142,141 +142,11 @@ class PaymentIntentCreateSerializer(serializers.Serializer):
         return attrs
     
     def _calculate_total_price(self, data):
-        """Calculate total price in cents WITH QUANTITIES"""
-        service_type = data['service_type']
-        total_cents = 0
-        
-        # BLADE pricing
-        if service_type == 'blade_transfer':
-            bag_count = data.get('blade_bag_count', 0)
-            per_bag_price = 7500  # $75
-            total_cents = max(bag_count * per_bag_price, 15000)  # $150 min
-
-        # Mini Move pricing
-        elif service_type == 'mini_move':
-            try:
-                package = MiniMovePackage.objects.get(id=data['mini_move_package_id'])
-                total_cents = package.base_price_cents
-                
-                if data.get('coi_required') and not package.coi_included:
-                    total_cents += package.coi_fee_cents
-                
-                # Organizing services
-                if data.get('include_packing') or data.get('include_unpacking'):
-                    from apps.services.models import OrganizingService
-                    organizing_total = 0
-                    
-                    if data.get('include_packing'):
-                        packing = OrganizingService.objects.filter(
-                            mini_move_tier=package.package_type,
-                            is_packing_service=True,
-                            is_active=True
-                        ).first()
-                        if packing:
-                            organizing_total += packing.price_cents
-                    
-                    if data.get('include_unpacking'):
-                        unpacking = OrganizingService.objects.filter(
-                            mini_move_tier=package.package_type,
-                            is_packing_service=False,
-                            is_active=True
-                        ).first()
-                        if unpacking:
-                            organizing_total += unpacking.price_cents
-                    
-                    if organizing_total > 0:
-                        total_cents += organizing_total + int(organizing_total * 0.0825)
-
-                # Geographic surcharge: $175 per out-of-zone address (max $350)
-                geographic_surcharge = calculate_geographic_surcharge_from_zips(
-                    data.get('pickup_zip_code'),
-                    data.get('delivery_zip_code'),
-                    fallback_is_outside=data.get('is_outside_core_area', False)
-                )
-                total_cents += geographic_surcharge
-
-                if data.get('pickup_time') == 'morning_specific' and package.package_type == 'standard':
-                    total_cents += 17500
-                
-            except MiniMovePackage.DoesNotExist:
-                raise serializers.ValidationError("Invalid package")
-        
-        # Standard Delivery pricing - ✅ WITH QUANTITIES
-        elif service_type == 'standard_delivery':
-            try:
-                config = StandardDeliveryConfig.objects.filter(is_active=True).first()
-                if config:
-                    item_count = data.get('standard_delivery_item_count', 0)
-                    if item_count > 0:
-                        item_total = config.price_per_item_cents * item_count
-                        total_cents = max(item_total, config.minimum_charge_cents)
-                    
-                    # ✅ Specialty items WITH QUANTITIES
-                    specialty_items_data = data.get('specialty_items', [])
-                    if specialty_items_data:
-                        for item_data in specialty_items_data:
-                            try:
-                                item = SpecialtyItem.objects.get(id=item_data['item_id'])
-                                quantity = item_data['quantity']
-                                total_cents += item.price_cents * quantity
-                            except SpecialtyItem.DoesNotExist:
-                                pass
-                    
-                    if data.get('is_same_day_delivery'):
-                        total_cents += config.same_day_flat_rate_cents
-
-                    if data.get('coi_required'):
-                        total_cents += 5000
-
-                    # Geographic surcharge: $175 per out-of-zone address (max $350)
-                    geographic_surcharge = calculate_geographic_surcharge_from_zips(
-                        data.get('pickup_zip_code'),
-                        data.get('delivery_zip_code'),
-                        fallback_is_outside=data.get('is_outside_core_area', False)
-                    )
-                    total_cents += geographic_surcharge
-
-            except StandardDeliveryConfig.DoesNotExist:
-                raise serializers.ValidationError("Standard delivery not configured")
-        
-        # Specialty Item pricing - ✅ WITH QUANTITIES
-        elif service_type == 'specialty_item':
-            specialty_items_data = data.get('specialty_items', [])
-            for item_data in specialty_items_data:
-                try:
-                    item = SpecialtyItem.objects.get(id=item_data['item_id'])
-                    quantity = item_data['quantity']
-                    total_cents += item.price_cents * quantity
-                except SpecialtyItem.DoesNotExist:
-                    pass
-            
-            if data.get('is_same_day_delivery'):
-                try:
-                    config = StandardDeliveryConfig.objects.filter(is_active=True).first()
-                    if config:
-                        total_cents += config.same_day_flat_rate_cents
-                except StandardDeliveryConfig.DoesNotExist:
-                    pass
-            
-            if data.get('coi_required'):
-                total_cents += 5000
-
-            # Geographic surcharge: $175 per out-of-zone address (max $350)
-            geographic_surcharge = calculate_geographic_surcharge_from_zips(
-                data.get('pickup_zip_code'),
-                data.get('delivery_zip_code'),
-                fallback_is_outside=data.get('is_outside_core_area', False)
-            )
-            total_cents += geographic_surcharge
-
-        # Weekend/peak date surcharges (peak dates override weekends)
-        if service_type != 'blade_transfer' and data.get('pickup_date'):
-            surcharge_amount = calculate_surcharges_for_date(
-                total_cents,
-                data['pickup_date'],
-                service_type
-            )
-            total_cents += surcharge_amount
+        """Calculate total price in cents WITH QUANTITIES (shared pricing engine)"""
+        try:
+            total_cents = price_quote(QuoteRequest.from_data(data)).total_cents
+        except PricingError:
+            raise serializers.ValidationError("Invalid package")
 
         # Apply discount code if provided
         discount_code_str = (data.get('discount_code') or '').strip()
@@ -6,7 +6,6 @@ from rest_framework.views import APIView
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.conf import settings
 import logging
 import json
 import uuid as _uuid_mod
@@ -29,10 +28,6 @@ from django_ratelimit.decorators import ratelimit
 
 logger = logging.getLogger(__name__)
 
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
-
 @method_decorator(ratelimit(key='ip', rate='10/h', method='POST', block=True), name='post')
 class CreatePaymentIntentView(APIView):
     """
@@ -143,49 +143,52 @@ def send_password_reset_email(user, reset_token, reset_url):
         return False
 
 
-def send_booking_confirmation_email(booking):
+def build_booking_confirmation_message(booking):
     """
-    Send booking confirmation email with calendar invite:
+    Build the booking confirmation email with calendar invite:
     - To: customer
     - BCC: internal list (BOOKING_EMAIL_BCC)
     - Attachment: .ics calendar invite for pickup
     """
-    try:
-        subject = f'Booking Confirmation - {booking.booking_number}'
-        context = {
-            'booking': booking,
-            'customer_name': booking.get_customer_name(),
-            'customer_email': booking.get_customer_email(),
-        }
-        message = render_to_string('emails/booking_confirmation.txt', context)
-
-        to_addr = [booking.get_customer_email()]
-        bcc_list = getattr(settings, 'BOOKING_EMAIL_BCC', [])
-
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=to_addr,
-            bcc=bcc_list,
+    subject = f'Booking Confirmation - {booking.booking_number}'
+    context = {
+        'booking': booking,
+        'customer_name': booking.get_customer_name(),
+        'customer_email': booking.get_customer_email(),
+    }
+    message = render_to_string('emails/booking_confirmation.txt', context)
+
+    email = EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[booking.get_customer_email()],
+        bcc=getattr(settings, 'BOOKING_EMAIL_BCC', []),
+    )
+    email.content_subtype = 'plain'
+
+    # Generate and attach calendar invite
+    ics_content = generate_ics_calendar_invite(booking)
+    if ics_content:
+        email.attach(
+            f'totetaxi-pickup-{booking.booking_number}.ics',
+            ics_content,
+            'text/calendar'
         )
-        email.content_subtype = 'plain'
+        logger.info(f'Calendar invite attached to confirmation for {booking.booking_number}')
 
-        # Generate and attach calendar invite
-        ics_content = generate_ics_calendar_invite(booking)
-        if ics_content:
-            email.attach(
-                f'totetaxi-pickup-{booking.booking_number}.ics',
-                ics_content,
-                'text/calendar'
-            )
-            logger.info(f'Calendar invite attached to confirmation for {booking.booking_number}')
+    return email
 
+
+def send_booking_confirmation_email(booking):
+    """Send booking confirmation email (see build_booking_confirmation_message)"""
+    try:
+        email = build_booking_confirmation_message(booking)
         email.send(fail_silently=False)
 
         logger.info(
             f'Booking confirmation sent for {booking.booking_number} '
-            f"(bcc={','.join(bcc_list) if bcc_list else 'none'})"
+            f"(bcc={','.join(email.bcc) if email.bcc else 'none'})"
         )
         return True
     except Exception as e:
@@ -196,25 +199,29 @@ def send_booking_confirmation_email(booking):
         return False
 
 
+def build_booking_status_update_message(booking, old_status, new_status):
+    """Build the email sent when booking status changes"""
+    subject = f'Booking Update - {booking.booking_number}'
+    context = {
+        'booking': booking,
+        'customer_name': booking.get_customer_name(),
+        'old_status': old_status,
+        'new_status': new_status,
+    }
+    message = render_to_string('emails/booking_status_update.txt', context)
+
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[booking.get_customer_email()],
+    )
+
+
 def send_booking_status_update_email(booking, old_status, new_status):
     """Send email when booking status changes"""
     try:
-        subject = f'Booking Update - {booking.booking_number}'
-        context = {
-            'booking': booking,
-            'customer_name': booking.get_customer_name(),
-            'old_status': old_status,
-            'new_status': new_status,
-        }
-        message = render_to_string('emails/booking_status_update.txt', context)
-
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[booking.get_customer_email()],
-            fail_silently=False,
-        )
+        build_booking_status_update_message(booking, old_status, new_status).send(fail_silently=False)
         logger.info(f'Status update email sent for {booking.booking_number}')
         return True
     except Exception as e:
@@ -246,51 +253,64 @@ def send_email_verification(user, token, verify_url):
         return False
 
 
+def _pickup_tracking_url(booking):
+    """Tracking link of the booking's Onfleet pickup task, if there is one.
+
+    Uses `booking.pickup_tasks` when the caller prefetched it (batch reminders).
+    """
+    pickup_tasks = getattr(booking, 'pickup_tasks', None)
+    if pickup_tasks is not None:
+        pickup_task = pickup_tasks[0] if pickup_tasks else None
+    elif hasattr(booking, 'onfleet_tasks'):
+        pickup_task = booking.onfleet_tasks.filter(task_type='pickup').first()
+    else:
+        pickup_task = None
+    return pickup_task.tracking_url if pickup_task and pickup_task.tracking_url else ''
+
+
+def build_booking_reminder_message(booking):
+    """Build the 24-hour pickup reminder email with calendar invite attachment"""
+    tracking_url = _pickup_tracking_url(booking)
+
+    subject = f'Reminder: Your Tote Taxi Pickup is Tomorrow! - {booking.booking_number}'
+    context = {
+        'booking': booking,
+        'customer_name': booking.get_customer_name(),
+        'has_tracking': bool(tracking_url),
+        'tracking_url': tracking_url,
+    }
+    message = render_to_string('emails/booking_reminder.txt', context)
+
+    # Create email with potential attachment
+    email = EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[booking.get_customer_email()],
+    )
+
+    # Generate and attach calendar invite
+    ics_content = generate_ics_calendar_invite(booking)
+    if ics_content:
+        email.attach(
+            f'totetaxi-pickup-{booking.booking_number}.ics',
+            ics_content,
+            'text/calendar'
+        )
+        logger.info(f'Calendar invite attached for {booking.booking_number}')
+
+    return email
+
+
 def send_booking_reminder_email(booking):
-    """Send 24-hour reminder email before pickup with calendar invite attachment"""
+    """Send 24-hour reminder email before pickup (see build_booking_reminder_message)"""
     try:
         # Already sent?
         if booking.reminder_sent_at:
             logger.info(f'Reminder already sent for {booking.booking_number} at {booking.reminder_sent_at}')
             return False
 
-        # Tracking if available
-        has_tracking = False
-        tracking_url = ''
-        if hasattr(booking, 'onfleet_tasks'):
-            pickup_task = booking.onfleet_tasks.filter(task_type='pickup').first()
-            if pickup_task and pickup_task.tracking_url:
-                has_tracking = True
-                tracking_url = pickup_task.tracking_url
-
-        subject = f'Reminder: Your Tote Taxi Pickup is Tomorrow! - {booking.booking_number}'
-        context = {
-            'booking': booking,
-            'customer_name': booking.get_customer_name(),
-            'has_tracking': has_tracking,
-            'tracking_url': tracking_url,
-        }
-        message = render_to_string('emails/booking_reminder.txt', context)
-
-        # Create email with potential attachment
-        email = EmailMessage(
-            subject=subject,
-            body=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[booking.get_customer_email()],
-        )
-
-        # Generate and attach calendar invite
-        ics_content = generate_ics_calendar_invite(booking)
-        if ics_content:
-            email.attach(
-                f'totetaxi-pickup-{booking.booking_number}.ics',
-                ics_content,
-                'text/calendar'
-            )
-            logger.info(f'Calendar invite attached for {booking.booking_number}')
-
-        email.send(fail_silently=False)
+        build_booking_reminder_message(booking).send(fail_silently=False)
 
         booking.reminder_sent_at = timezone.now()
         booking.save(update_fields=['reminder_sent_at'])
@@ -345,6 +365,24 @@ def send_payment_link_email(booking, checkout_url, is_resend=False):
         return False
 
 
+def build_review_request_message(booking):
+    """Build the post-delivery email requesting a Google review"""
+    subject = f'How was your Tote Taxi experience? - {booking.booking_number}'
+    context = {
+        'booking': booking,
+        'customer_name': booking.get_customer_name(),
+        'review_url': GOOGLE_REVIEW_URL,
+    }
+    message = render_to_string('emails/review_request.txt', context)
+
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[booking.get_customer_email()],
+    )
+
+
 def send_review_request_email(booking):
     """Send post-delivery email requesting Google review"""
     try:
@@ -353,21 +391,7 @@ def send_review_request_email(booking):
             logger.info(f'Review request already sent for {booking.booking_number}')
             return False
 
-        subject = f'How was your Tote Taxi experience? - {booking.booking_number}'
-        context = {
-            'booking': booking,
-            'customer_name': booking.get_customer_name(),
-            'review_url': GOOGLE_REVIEW_URL,
-        }
-        message = render_to_string('emails/review_request.txt', context)
-
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[booking.get_customer_email()],
-            fail_silently=False,
-        )
+        build_review_request_message(booking).send(fail_silently=False)
 
         # Mark as sent if field exists
         if hasattr(booking, 'review_request_sent_at'):
@@ -1,12 +1,14 @@
 import uuid
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
 from django.db.models import F
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 import secrets
 from datetime import timedelta
+from .auth_cache import invalidate_auth_user
+
 
 class EmailVerificationToken(models.Model):
     """Email verification tokens for new registrations"""
@@ -129,9 +131,15 @@ class CustomerProfile(models.Model):
                 "Users cannot have both staff and customer profiles."
             )
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Tracked for the staff dashboard VIP counter
+        self._original_is_vip = self.__dict__.get('is_vip')
+
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
+        self._original_is_vip = self.is_vip
     
     def __str__(self):
         return f"Profile: {self.user.get_full_name()}"
@@ -151,6 +159,11 @@ class CustomerProfile(models.Model):
             last_booking_at=timezone.now(),
         )
         self.refresh_from_db()
+        # update() sends no post_save, so drop the cached auth user here (now
+        # and after commit, as customers/signals.py does)
+        user_id = self.user_id
+        invalidate_auth_user(user_id)
+        transaction.on_commit(lambda: invalidate_auth_user(user_id))
 
     @classmethod
     def ensure_single_profile_type(cls, user):
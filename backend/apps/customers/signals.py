@@ -0,0 +1,27 @@
+# apps/customers/signals.py
+import logging
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from apps.accounts.models import StaffProfile
+from apps.customers.auth_cache import invalidate_auth_user
+from apps.customers.models import CustomerProfile
+
+logger = logging.getLogger(__name__)
+
+
+def auth_user_changed(sender, instance, **kwargs):
+    """
+    Drop the cached auth user when the user or one of their profiles changes.
+
+    Now, so this request sees the change, and again after commit, so no
+    concurrent request can re-cache the pre-commit rows.
+    """
+    user_id = instance.pk if sender is User else instance.user_id
+    invalidate_auth_user(user_id)
+    transaction.on_commit(lambda: invalidate_auth_user(user_id))
+
+
+for model in (User, StaffProfile, CustomerProfile):
+    post_save.connect(auth_user_changed, sender=model, dispatch_uid=f'auth_cache_save_{model.__name__}')
+    post_delete.connect(auth_user_changed, sender=model, dispatch_uid=f'auth_cache_delete_{model.__name__}')
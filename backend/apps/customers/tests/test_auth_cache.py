@@ -0,0 +1,103 @@
+# apps/customers/tests/test_auth_cache.py
+"""
+Authenticated requests resolve the session and user (+ profiles) from the
+cache; profile and password changes still take effect immediately.
+"""
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.customers.models import CustomerProfile
+
+CURRENT_USER_URL = '/api/customer/auth/user/'
+PROFILE_URL = '/api/customer/profile/'
+DASHBOARD_URL = '/api/customer/dashboard/'
+
+
+@pytest.fixture
+def customer(db):
+    user = User.objects.create_user(
+        username='cachedauth@example.com', email='cachedauth@example.com', password='pw-12345678',
+    )
+    CustomerProfile.objects.create(user=user, phone='5550001111')
+    return user
+
+
+@pytest.fixture
+def client(customer):
+    client = APIClient()
+    assert client.login(username='cachedauth@example.com', password='pw-12345678')
+    return client
+
+
+def _auth_selects(queries):
+    return [
+        q['sql'] for q in queries.captured_queries
+        if q['sql'].startswith('SELECT') and (
+            'FROM "auth_user"' in q['sql'] or 'FROM "django_session"' in q['sql']
+        )
+    ]
+
+
+@pytest.mark.django_db
+class TestCachedAuthentication:
+
+    def test_warm_request_reads_no_session_or_user_rows(self, client):
+        assert client.get(CURRENT_USER_URL).status_code == 200
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(CURRENT_USER_URL)
+
+        assert response.status_code == 200
+        assert response.data['customer_profile']['phone'] == '5550001111'
+        assert _auth_selects(queries) == []
+
+    def test_profile_change_is_seen_on_next_request(self, client, customer):
+        client.get(CURRENT_USER_URL)
+
+        profile = CustomerProfile.objects.get(user=customer)
+        profile.phone = '5559998888'
+        profile.save()
+
+        assert client.get(CURRENT_USER_URL).data['customer_profile']['phone'] == '5559998888'
+
+    def test_password_change_logs_session_out(self, client, customer):
+        client.get(CURRENT_USER_URL)
+
+        customer.set_password('another-pw-123')
+        customer.save()
+
+        assert client.get(CURRENT_USER_URL).status_code in (401, 403)
+
+    def test_mobile_session_header(self, client):
+        session_key = client.cookies['totetaxi_sessionid'].value
+        mobile = APIClient()
+
+        response = mobile.get(CURRENT_USER_URL, HTTP_X_SESSION_ID=session_key)
+
+        assert response.status_code == 200
+        assert mobile.get(CURRENT_USER_URL, HTTP_X_SESSION_ID='not-a-session').status_code in (401, 403)
+
+    def test_booking_stats_survive_a_profile_patch(self, client, customer, django_capture_on_commit_callbacks):
+        client.get(CURRENT_USER_URL)
+
+        # What payments/services.py does when a payment succeeds
+        with django_capture_on_commit_callbacks(execute=True):
+            CustomerProfile.objects.get(user=customer).add_booking_stats(25000)
+
+        stats = client.get(DASHBOARD_URL).data['customer_profile']
+        assert (stats['total_bookings'], stats['total_spent_dollars']) == (1, 250.0)
+
+        assert client.patch(PROFILE_URL, {'phone': '5552223333'}, format='json').status_code == 200
+        profile = CustomerProfile.objects.get(user=customer)
+        assert (profile.phone, profile.total_bookings, profile.total_spent_cents) == ('5552223333', 1, 25000)
+
+    def test_profile_patch_does_not_save_the_cached_instance(self, client, customer):
+        client.get(CURRENT_USER_URL)
+        # A counter update that bypasses signals and the cache invalidation
+        CustomerProfile.objects.filter(user=customer).update(total_bookings=7)
+
+        assert client.patch(PROFILE_URL, {'phone': '5552223333'}, format='json').status_code == 200
+        assert CustomerProfile.objects.get(user=customer).total_bookings == 7
@@ -19,6 +19,7 @@ from .emails import send_welcome_email, send_password_reset_email, send_email_ve
 from .models import CustomerProfile, SavedAddress, PasswordResetToken, EmailVerificationToken
 from apps.accounts.permissions import IsStaffMember
 from apps.accounts.models import StaffAction
+from apps.bookings.pagination import InvalidCursor, page_size, paginate_newest_first
 from .serializers import (
     CustomerRegistrationSerializer, 
     CustomerLoginSerializer,
@@ -319,7 +320,12 @@ class CustomerProfileView(generics.RetrieveUpdateAPIView):
             from rest_framework.exceptions import NotFound
             raise NotFound(str(e))
 
-        return self.request.user.customer_profile
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user.customer_profile
+        # request.user may come from the auth cache (customers/auth_cache.py);
+        # saving its profile would write stale counters back over
+        # add_booking_stats' update()
+        return CustomerProfile.objects.get(user=self.request.user)
 
 
 @method_decorator(ratelimit(key='user', rate='20/m', method=['GET', 'POST'], block=True), name='dispatch')
@@ -353,13 +359,20 @@ class CustomerBookingListView(generics.ListAPIView):
     def get_queryset(self):
         return self.request.user.bookings.filter(
             deleted_at__isnull=True
-        ).order_by('-created_at')
+        ).for_list()
     
     def get(self, request, *args, **kwargs):
-        bookings = self.get_queryset()
+        # Cursor pages on (created_at, id) instead of the whole history
+        try:
+            limit = page_size(request.query_params.get('limit'))
+            page = paginate_newest_first(
+                self.get_queryset(), cursor=request.query_params.get('cursor'), limit=limit,
+            )
+        except (InvalidCursor, ValueError):
+            return Response({'error': 'Invalid cursor or limit'}, status=status.HTTP_400_BAD_REQUEST)
+
         booking_data = []
-        
-        for booking in bookings:
+        for booking in page.items:
             booking_data.append({
                 'id': str(booking.id),
                 'booking_number': booking.booking_number,
@@ -372,7 +385,8 @@ class CustomerBookingListView(generics.ListAPIView):
         
         return Response({
             'bookings': booking_data,
-            'total_count': len(booking_data)
+            'total_count': self.get_queryset().count(),
+            'next_cursor': page.next_cursor,
         })
 
 
@@ -0,0 +1,126 @@
+# apps/logistics/fake_onfleet.py
+"""
+A local HTTP stand-in for the Onfleet endpoints OnfleetService calls.
+
+ONFLEET_MOCK_MODE short-circuits inside OnfleetService, so it never touches
+the pooled session, timeouts or retry handling. This server is for runs that
+should exercise the real HTTP path offline — mainly the checkout load test
+(ONFLEET_MOCK_MODE=False, ONFLEET_BASE_URL=<server url>). Tasks live in
+memory; `latency` adds a fixed delay to every request.
+"""
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+WORKERS = [
+    {'id': 'fake_worker_1', 'name': 'Load Test Driver 1', 'onDuty': True},
+    {'id': 'fake_worker_2', 'name': 'Load Test Driver 2', 'onDuty': False},
+]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        path = urlsplit(self.path).path.rstrip('/')
+        with server.lock:
+            server.request_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        if method == 'POST' and path.endswith('/tasks'):
+            return self._respond(200, server.create_task(body))
+        if method == 'GET' and path.endswith('/tasks/all'):
+            with server.lock:
+                tasks = list(server.tasks.values())
+            return self._respond(200, {'tasks': tasks})
+        if method == 'GET' and path.endswith('/organization'):
+            return self._respond(200, {'id': 'fake_org', 'name': 'ToteTaxi (fake Onfleet)', 'workers': WORKERS})
+        if method == 'GET' and path.endswith('/workers'):
+            return self._respond(200, WORKERS)
+        match = re.search(r'/workers/([^/]+)$', path)
+        if method == 'GET' and match:
+            return self._respond(200, {'id': match.group(1), 'name': 'Load Test Driver', 'onDuty': True})
+        return self._respond(404, {'code': 'InvalidArgument', 'message': f'Unknown endpoint {method} {path}'})
+
+    def _respond(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-RateLimit-Remaining', '1000')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f'fake onfleet: {format % args}')
+
+
+class FakeOnfleetServer(ThreadingHTTPServer):
+    """Threaded fake Onfleet on 127.0.0.1; use as a context manager or start()/stop()."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency = latency
+        self.tasks = {}
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def create_task(self, data):
+        task_id = uuid.uuid4().hex[:24]
+        task = {
+            'id': task_id,
+            'shortId': task_id[:8],
+            'trackingURL': f'https://onf.lt/fake{task_id[:10]}',
+            'state': 0,
+            'worker': None,
+            'completionDetails': {},
+            'pickupTask': data.get('pickupTask', False),
+            'dependencies': data.get('dependencies', []),
+            'metadata': data.get('metadata', []),
+            'timeCreated': int(time.time() * 1000),
+        }
+        with self.lock:
+            self.tasks[task_id] = task
+        return task
+
+    def handle_error(self, request, client_address):
+        logger.debug('fake onfleet: client went away', exc_info=True)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='fake-onfleet', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:04
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistics', '0002_alter_onfleettask_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('event_id', models.CharField(max_length=128, unique=True)),
+                ('trigger_id', models.IntegerField(blank=True, null=True)),
+                ('onfleet_task_id', models.CharField(blank=True, max_length=100)),
+                ('payload', models.JSONField(default=dict)),
+                ('event_time', models.DateTimeField(default=django.utils.timezone.now)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'logistics_webhook_event',
+                'ordering': ['event_time', 'received_at'],
+                'indexes': [models.Index(fields=['onfleet_task_id', 'status', 'event_time'], name='webhook_task_status_idx'), models.Index(fields=['status', 'next_attempt_at'], name='webhook_status_next_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,6 @@
 # apps/logistics/models.py
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 import logging
 
@@ -167,6 +167,57 @@ class OnfleetTask(models.Model):
             logger.error(f"Error updating booking completion: {e}")
 
 
+class WebhookEvent(models.Model):
+    """Raw Onfleet webhook delivery, waiting to be applied.
+
+    The webhook view used to apply events inline and, when the OnfleetTask row
+    was not committed yet, sleep up to ~4s in the request. The view now only
+    verifies the signature and stores the event here; the
+    `process_onfleet_webhook_events` task applies events per Onfleet task in
+    event-time order, retrying later when the task row does not exist yet.
+
+    `event_id` is unique (Onfleet's id, or a hash of the body for payloads
+    without one), so redelivered webhooks are stored once.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),    # waiting to be applied (or retried)
+        ('done', 'Done'),
+        ('ignored', 'Ignored'),    # no task id, or task never appeared locally
+        ('failed', 'Failed'),      # handler raised
+    ]
+
+    # ~15 minutes of retries for a task row that has not been committed yet;
+    # after that the event is for a task created outside ToteTaxi.
+    MAX_ATTEMPTS = 6
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    event_id = models.CharField(max_length=128, unique=True)
+    trigger_id = models.IntegerField(null=True, blank=True)
+    onfleet_task_id = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField(default=dict)
+    event_time = models.DateTimeField(default=timezone.now)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'logistics_webhook_event'
+        ordering = ['event_time', 'received_at']
+        indexes = [
+            models.Index(fields=['onfleet_task_id', 'status', 'event_time'], name='webhook_task_status_idx'),
+            models.Index(fields=['status', 'next_attempt_at'], name='webhook_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"WebhookEvent {self.trigger_id} for {self.onfleet_task_id or '?'} ({self.status})"
+
+
 # UPDATED Signal - now creates 2 tasks instead of 1
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -174,8 +225,10 @@ from django.dispatch import receiver
 @receiver(post_save, sender='bookings.Booking')
 def create_onfleet_tasks_on_payment(sender, instance, created, **kwargs):
     """
-    Auto-create Onfleet tasks when booking status transitions to paid/confirmed.
-    Only fires on actual status changes, not every save. Creates 2 tasks: pickup + dropoff.
+    Queue Onfleet task creation when booking status transitions to paid/confirmed.
+    Only fires on actual status changes, not every save. The dispatch task
+    (logistics/tasks.py) creates 2 tasks: pickup + dropoff, after the
+    transaction that marked the booking paid has committed.
     """
     if instance.status not in ['paid', 'confirmed']:
         return
@@ -190,15 +243,13 @@ def create_onfleet_tasks_on_payment(sender, instance, created, **kwargs):
         logger.debug(f"Tasks already exist for booking {instance.booking_number}")
         return
 
-    try:
-        from .services import ToteTaxiOnfleetIntegration
-        integration = ToteTaxiOnfleetIntegration()
-        pickup, dropoff = integration.create_tasks_for_booking(instance)
+    booking_id = str(instance.pk)
 
-        if pickup and dropoff:
-            logger.info(f"✓ Created 2 Onfleet tasks for booking {instance.booking_number}")
-        else:
-            logger.error(f"✗ Failed to create tasks for booking {instance.booking_number}")
+    def _enqueue():
+        from .tasks import dispatch_onfleet_tasks
+        try:
+            dispatch_onfleet_tasks.delay(booking_id)
+        except Exception as e:
+            logger.error(f"Could not enqueue Onfleet dispatch for booking {booking_id}: {e}", exc_info=True)
 
-    except Exception as e:
-        logger.error(f"Error in Onfleet signal: {e}", exc_info=True)
\ No newline at end of file
+    transaction.on_commit(_enqueue)
@@ -1,10 +1,13 @@
 import logging
 import re
+import threading
 import time
-from datetime import datetime, timedelta, time as dt_time
+from datetime import datetime, timedelta, time as dt_time, timezone as dt_timezone
 from typing import Dict, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
 from django.utils import timezone
 
@@ -26,51 +29,139 @@ def parse_street_address(address_line_1: str) -> Tuple[str, str]:
         return "", address_line_1
 
 
+# One pooled session per process: every Onfleet call used to open a fresh TLS
+# connection via bare requests.get/post, with no timeout at all.
+_session = None
+_session_lock = threading.Lock()
+
+# Onfleet allows ~20 requests/sec per key and reports the remaining budget in
+# X-RateLimit-Remaining. Below this many we pause briefly instead of running
+# straight into a 429.
+RATE_LIMIT_LOW_WATERMARK = 2
+RATE_LIMIT_PAUSE_SECONDS = 1.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# POST /tasks is not idempotent: a 5xx or read timeout may still have created
+# the task, so only retry a POST when Onfleet tells us it was rejected (429).
+IDEMPOTENT_METHODS = frozenset({'GET', 'PUT', 'DELETE'})
+
+
+def get_onfleet_session() -> requests.Session:
+    """Process-wide keep-alive session for the Onfleet API."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Connection errors happen before the request is sent, so they
+                # are safe to retry for any method; status retries are handled
+                # in OnfleetService._make_request where the method is known.
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=getattr(settings, 'ONFLEET_POOL_MAXSIZE', 10),
+                    max_retries=Retry(total=None, connect=2, read=0, status=0, other=0,
+                                      backoff_factor=0.5),
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'Content-Type': 'application/json'})
+                _session = session
+    return _session
+
+
 class OnfleetService:
     """Low-level Onfleet API wrapper"""
 
     def __init__(self):
         self.api_key = getattr(settings, 'ONFLEET_API_KEY', '')
-        self.base_url = 'https://onfleet.com/api/v2'
+        self.base_url = getattr(settings, 'ONFLEET_BASE_URL', 'https://onfleet.com/api/v2')
         self.mock_mode = getattr(settings, 'ONFLEET_MOCK_MODE', True)
         self.environment = getattr(settings, 'ONFLEET_ENVIRONMENT', 'sandbox')
-
-    def _make_request(self, method: str, endpoint: str, data: dict = None) -> dict:
-        """Make authenticated request to Onfleet API"""
+        self.timeout = (
+            getattr(settings, 'ONFLEET_CONNECT_TIMEOUT', 5),
+            getattr(settings, 'ONFLEET_READ_TIMEOUT', 30),
+        )
+        self.max_retries = getattr(settings, 'ONFLEET_MAX_RETRIES', 3)
+
+    def _retry_delay(self, response, attempt: int) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), 30.0)
+            except ValueError:
+                pass
+        return min(0.5 * 2 ** attempt, 8.0)
+
+    def _respect_rate_limit(self, response):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        try:
+            if remaining is not None and int(remaining) <= RATE_LIMIT_LOW_WATERMARK:
+                logger.info(f"Onfleet rate limit nearly exhausted ({remaining} left), pausing")
+                time.sleep(RATE_LIMIT_PAUSE_SECONDS)
+        except ValueError:
+            pass
+
+    def _make_request(self, method: str, endpoint: str, data: dict = None, params: dict = None) -> dict:
+        """Make authenticated request to Onfleet API.
+
+        Retries 429s (any method, honouring Retry-After) and 5xx/read timeouts
+        (idempotent methods only) with exponential backoff.
+        """
         if self.mock_mode:
-            return self._mock_response(method, endpoint, data)
+            return self._mock_response(method, endpoint, data, params)
 
         url = f"{self.base_url}/{endpoint}"
-        auth = (self.api_key, '')
-        headers = {'Content-Type': 'application/json'}
-
-        try:
-            if method == 'GET':
-                response = requests.get(url, auth=auth, headers=headers)
-            elif method == 'POST':
-                response = requests.post(url, auth=auth, headers=headers, json=data)
-            elif method == 'PUT':
-                response = requests.put(url, auth=auth, headers=headers, json=data)
-            elif method == 'DELETE':
-                response = requests.delete(url, auth=auth, headers=headers)
-
-            response.raise_for_status()
-            return response.json()
-
-        except requests.RequestException as e:
-            error_detail = ''
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_detail = e.response.json()
-                except Exception:
-                    error_detail = e.response.text
-
-            logger.error(f"Onfleet API error ({method} {endpoint}): {e}")
-            logger.error(f"Error details: {error_detail}")
-            logger.error(f"Request data: {data}")
-            raise
-
-    def _mock_response(self, method: str, endpoint: str, data: dict = None) -> dict:
+        session = get_onfleet_session()
+        attempt = 0
+
+        while True:
+            response = None
+            try:
+                response = session.request(
+                    method, url,
+                    auth=(self.api_key, ''),
+                    params=params,
+                    json=data if method in ('POST', 'PUT') else None,
+                    timeout=self.timeout,
+                )
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    if response.status_code == 429 or method in IDEMPOTENT_METHODS:
+                        delay = self._retry_delay(response, attempt)
+                        logger.warning(
+                            f"Onfleet {method} {endpoint} returned {response.status_code}, "
+                            f"retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})"
+                        )
+                        attempt += 1
+                        time.sleep(delay)
+                        continue
+
+                response.raise_for_status()
+                self._respect_rate_limit(response)
+                return response.json()
+
+            except requests.Timeout as e:
+                if method in IDEMPOTENT_METHODS and attempt < self.max_retries:
+                    delay = self._retry_delay(None, attempt)
+                    logger.warning(f"Onfleet {method} {endpoint} timed out, retrying in {delay:.1f}s: {e}")
+                    attempt += 1
+                    time.sleep(delay)
+                    continue
+                logger.error(f"Onfleet API timeout ({method} {endpoint}): {e}")
+                raise
+
+            except requests.RequestException as e:
+                error_detail = ''
+                if hasattr(e, 'response') and e.response is not None:
+                    try:
+                        error_detail = e.response.json()
+                    except Exception:
+                        error_detail = e.response.text
+
+                logger.error(f"Onfleet API error ({method} {endpoint}): {e}")
+                logger.error(f"Error details: {error_detail}")
+                logger.error(f"Request data: {data}")
+                raise
+
+    def _mock_response(self, method: str, endpoint: str, data: dict = None, params: dict = None) -> dict:
         """Mock responses for development"""
         if endpoint == 'tasks' and method == 'POST':
             task_metadata = data.get('metadata', [])
@@ -109,8 +200,49 @@ class OnfleetService:
                 'onDuty': True
             }
 
+        elif endpoint == 'workers':
+            return [
+                {'id': 'mock_worker_1', 'name': 'Test Driver 1', 'onDuty': True},
+                {'id': 'mock_worker_2', 'name': 'Test Driver 2', 'onDuty': False}
+            ]
+
+        elif endpoint == 'tasks/all':
+            return self._mock_task_list(params or {})
+
         return {'success': True, 'mock': True}
 
+    def _mock_task_list(self, params: dict) -> dict:
+        """The mock backend "knows" the mock tasks we created, in their current
+        local state, so the bulk sync runs end to end without changing anything."""
+        from .models import OnfleetTask
+
+        state_for_status = {'created': 0, 'assigned': 1, 'active': 2, 'completed': 3, 'failed': 3}
+        since = datetime.fromtimestamp(int(params.get('from', 0)) / 1000, tz=dt_timezone.utc)
+        tasks = OnfleetTask.objects.filter(
+            onfleet_task_id__startswith='mock_',
+            created_at__gte=since,
+        ).exclude(status='deleted')
+        return {
+            'tasks': [
+                {
+                    'id': task.onfleet_task_id,
+                    'state': state_for_status[task.status],
+                    'worker': task.worker_id or None,
+                    'estimatedCompletionTime': (
+                        int(task.estimated_arrival.timestamp() * 1000) if task.estimated_arrival else None
+                    ),
+                    'completionDetails': {
+                        'success': task.status != 'failed',
+                        'time': int(task.completed_at.timestamp() * 1000) if task.completed_at else None,
+                        'failureReason': task.failure_reason,
+                        'failureNotes': task.failure_notes,
+                        'notes': task.delivery_notes,
+                    },
+                }
+                for task in tasks
+            ],
+        }
+
     def create_task(self, task_data: dict) -> dict:
         return self._make_request('POST', 'tasks', task_data)
 
@@ -120,6 +252,19 @@ class OnfleetService:
     def get_worker(self, worker_id: str) -> dict:
         return self._make_request('GET', f'workers/{worker_id}')
 
+    def list_workers(self) -> list:
+        return self._make_request('GET', 'workers')
+
+    def list_tasks(self, from_ms: int, to_ms: int = None, last_id: str = None) -> dict:
+        """One page (up to 64 tasks) of GET /tasks/all for a creation-time window.
+        Returns {'tasks': [...], 'lastId': <cursor for the next page, if any>}."""
+        params = {'from': from_ms}
+        if to_ms:
+            params['to'] = to_ms
+        if last_id:
+            params['lastId'] = last_id
+        return self._make_request('GET', 'tasks/all', params=params)
+
 
 class ToteTaxiOnfleetIntegration:
     """High-level integration manager for ToteTaxi + Onfleet"""
@@ -477,41 +622,35 @@ class ToteTaxiOnfleetIntegration:
             return f"Airport Transfer - {blade_name}"
         return booking.get_customer_name()
 
+    @staticmethod
+    def webhook_task_id(webhook_data: dict) -> str:
+        return webhook_data.get('taskId') or webhook_data.get('data', {}).get('task', {}).get('id') or ''
+
     def handle_webhook(self, webhook_data: dict) -> bool:
+        """Apply a webhook to its OnfleetTask. Returns False if the task is unknown.
+
+        Does not wait for a task row that is not committed yet — webhook
+        deliveries go through the WebhookEvent inbox (logistics/webhooks.py),
+        which retries those later.
+        """
         from .models import OnfleetTask
 
-        try:
-            task_id = webhook_data.get('taskId') or webhook_data.get('data', {}).get('task', {}).get('id')
-            if not task_id:
-                logger.warning("Webhook received without task ID")
-                logger.debug(f"Webhook payload: {webhook_data}")
-                return False
-
-            # Retry logic to handle race condition where webhook arrives
-            # before DB transaction commits the OnfleetTask record
-            onfleet_task = None
-            max_retries = 5
-            retry_delays = [0.1, 0.3, 0.5, 1.0, 2.0]  # exponential backoff
-
-            for attempt in range(max_retries):
-                try:
-                    onfleet_task = OnfleetTask.objects.get(onfleet_task_id=task_id)
-                    break  # Found it, exit retry loop
-                except OnfleetTask.DoesNotExist:
-                    if attempt < max_retries - 1:
-                        delay = retry_delays[attempt]
-                        logger.debug(
-                            f"Task {task_id} not found in database, "
-                            f"retry {attempt + 1}/{max_retries} in {delay}s"
-                        )
-                        time.sleep(delay)
-                    else:
-                        logger.debug(f"Task not found in database after {max_retries} retries: {task_id} (likely created outside ToteTaxi)")
-                        return False
+        task_id = self.webhook_task_id(webhook_data)
+        if not task_id:
+            logger.warning("Webhook received without task ID")
+            logger.debug(f"Webhook payload: {webhook_data}")
+            return False
+
+        onfleet_task = OnfleetTask.objects.select_related('booking').filter(onfleet_task_id=task_id).first()
+        if onfleet_task is None:
+            logger.debug(f"Task not found in database: {task_id} (likely created outside ToteTaxi)")
+            return False
 
-            if not onfleet_task:
-                return False
+        return self.apply_webhook(onfleet_task, webhook_data)
 
+    def apply_webhook(self, onfleet_task, webhook_data: dict) -> bool:
+        task_id = onfleet_task.onfleet_task_id
+        try:
             trigger_id = webhook_data.get('triggerId')
             task_obj = webhook_data.get('data', {}).get('task', {})
 
@@ -0,0 +1,167 @@
+# apps/logistics/sync.py
+"""Bulk Onfleet → OnfleetTask status sync.
+
+Webhooks keep tasks current most of the time; this is the safety net for the
+ones we miss (endpoint down, signature rotation, Onfleet delivery gaps). It
+used to be a stub that re-saved every open row one at a time.
+
+Instead of one GET per task, we page through GET /tasks/all for the creation
+window covering our open tasks (64 tasks per page, so a few hundred open tasks
+are a handful of requests), diff each remote task against its local row and
+write only the rows — and only the fields — that changed, via bulk_update.
+Every row we saw remotely gets last_synced bumped in a single UPDATE.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ('created', 'assigned', 'active')
+SYNC_LOOKBACK_DAYS = 7
+# Safety valve so a bad cursor can never loop forever (64 tasks per page).
+MAX_PAGES = 200
+
+
+def _from_ms(value):
+    if not value:
+        return None
+    return datetime.fromtimestamp(value / 1000, tz=timezone.get_current_timezone())
+
+
+def _same(local_value, remote_value):
+    # Onfleet timestamps are milliseconds; ignore sub-millisecond noise.
+    if isinstance(local_value, datetime) and isinstance(remote_value, datetime):
+        return abs((local_value - remote_value).total_seconds()) < 0.001
+    return local_value == remote_value
+
+
+def _remote_values(remote):
+    """Map an Onfleet task payload onto OnfleetTask field values."""
+    completion = remote.get('completionDetails') or {}
+    state = remote.get('state')
+    worker = remote.get('worker')
+    if isinstance(worker, dict):
+        worker = worker.get('id')
+
+    if state == 3:
+        status = 'completed' if completion.get('success', True) else 'failed'
+    else:
+        status = {0: 'created', 1: 'assigned', 2: 'active'}.get(state, 'created')
+
+    values = {
+        'status': status,
+        'worker_id': worker or '',
+        'estimated_arrival': _from_ms(remote.get('estimatedCompletionTime')),
+    }
+    if state == 3:
+        values['completed_at'] = _from_ms(completion.get('time'))
+        values['delivery_notes'] = completion.get('notes') or ''
+        if status == 'failed':
+            values['failure_reason'] = completion.get('failureReason') or ''
+            values['failure_notes'] = completion.get('failureNotes') or ''
+    return values
+
+
+def sync_open_tasks(lookback_days=SYNC_LOOKBACK_DAYS, onfleet=None):
+    """Reconcile open OnfleetTask rows with Onfleet.
+
+    Returns counts: checked (open rows seen remotely), updated, completed,
+    failed, missing (open rows Onfleet did not return) and pages fetched.
+    """
+    from .models import OnfleetTask
+    from .services import OnfleetService
+
+    onfleet = onfleet or OnfleetService()
+    now = timezone.now()
+
+    local = {
+        task.onfleet_task_id: task
+        for task in OnfleetTask.objects.filter(
+            status__in=OPEN_STATUSES,
+            created_at__gte=now - timedelta(days=lookback_days),
+        ).select_related('booking')
+    }
+    counts = {'checked': 0, 'updated': 0, 'completed': 0, 'failed': 0, 'missing': 0, 'pages': 0}
+    if not local:
+        return counts
+
+    # Onfleet windows /tasks/all by creation time; ours are created a few
+    # seconds after the row, so start the window a little before the oldest.
+    oldest = min(task.created_at for task in local.values())
+    from_ms = int((oldest - timedelta(minutes=5)).timestamp() * 1000)
+    to_ms = int(now.timestamp() * 1000)
+
+    remote_by_id = {}
+    last_id = None
+    while counts['pages'] < MAX_PAGES:
+        page = onfleet.list_tasks(from_ms, to_ms, last_id=last_id)
+        counts['pages'] += 1
+        for remote in page.get('tasks') or []:
+            if remote.get('id') in local:
+                remote_by_id[remote['id']] = remote
+        last_id = page.get('lastId')
+        if not last_id or len(remote_by_id) == len(local):
+            break
+
+    worker_names = None
+    changed_by_fields = defaultdict(list)
+    newly_completed_dropoffs = []
+
+    for onfleet_id, task in local.items():
+        remote = remote_by_id.get(onfleet_id)
+        if remote is None:
+            counts['missing'] += 1
+            continue
+        counts['checked'] += 1
+
+        values = _remote_values(remote)
+        if values['worker_id'] != task.worker_id:
+            if values['worker_id']:
+                if worker_names is None:
+                    worker_names = _load_worker_names(onfleet)
+                values['worker_name'] = worker_names.get(values['worker_id'], '')
+            else:
+                values['worker_name'] = ''
+
+        changed = [field for field, value in values.items() if not _same(getattr(task, field), value)]
+        if not changed:
+            continue
+
+        for field in changed:
+            setattr(task, field, values[field])
+        task.updated_at = now
+        changed_by_fields[tuple(sorted(changed))].append(task)
+        counts['updated'] += 1
+        if 'status' in changed:
+            if task.status == 'completed':
+                counts['completed'] += 1
+                if task.is_dropoff():
+                    newly_completed_dropoffs.append(task)
+            elif task.status == 'failed':
+                counts['failed'] += 1
+
+    for fields, tasks in changed_by_fields.items():
+        OnfleetTask.objects.bulk_update(tasks, list(fields) + ['updated_at'])
+    if remote_by_id:
+        OnfleetTask.objects.filter(onfleet_task_id__in=remote_by_id).update(last_synced=now)
+
+    # Booking transitions go through Booking.save() so status signals fire.
+    for task in newly_completed_dropoffs:
+        task._mark_booking_completed()
+
+    logger.info(
+        f"Onfleet sync: {counts['checked']} checked, {counts['updated']} updated, "
+        f"{counts['missing']} missing, {counts['pages']} page(s)"
+    )
+    return counts
+
+
+def _load_worker_names(onfleet):
+    try:
+        return {w.get('id'): w.get('name', '') for w in onfleet.list_workers() or []}
+    except Exception as e:
+        logger.warning(f"Could not load Onfleet workers for sync: {e}")
+        return {}
@@ -0,0 +1,163 @@
+# apps/logistics/tasks.py
+from celery import shared_task
+from django.db import OperationalError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Held while one worker talks to Onfleet for a booking, so a duplicate
+# delivery of the task (acks_late redelivery, double on_commit) cannot create
+# a second pair of Onfleet tasks. Longer than two Onfleet calls with retries.
+DISPATCH_LOCK_KEY = 'onfleet_dispatch_lock_{booking_id}'
+DISPATCH_LOCK_TIMEOUT = 300
+SYNC_LOCK_TIMEOUT = 540
+
+# Paid bookings this old with no OnfleetTask are re-dispatched by the backstop;
+# younger ones may still have their first dispatch in flight.
+REDISPATCH_GRACE_MINUTES = 10
+
+
+@shared_task(bind=True, autoretry_for=(OperationalError,), retry_backoff=True,
+             retry_backoff_max=60, max_retries=5)
+def dispatch_onfleet_tasks(self, booking_id):
+    """Create the Onfleet pickup + dropoff tasks for a paid/confirmed booking.
+
+    Queued by the Booking post_save signal after the payment transaction
+    commits, so the Stripe webhook / confirm request no longer waits on two
+    Onfleet round-trips. Idempotent: bookings that already have tasks, or that
+    another worker is dispatching right now, are skipped. When the cache cannot
+    grant the lock at all (Redis down) the dispatch goes ahead unlocked rather
+    than being dropped; redispatch_missing_onfleet_tasks catches anything lost.
+    """
+    from django.core.cache import cache
+    from apps.bookings.models import Booking
+    from .models import OnfleetTask
+    from .services import ToteTaxiOnfleetIntegration
+
+    try:
+        booking = Booking.objects.select_related(
+            'customer', 'guest_checkout', 'pickup_address', 'delivery_address',
+        ).get(pk=booking_id)
+    except Booking.DoesNotExist:
+        logger.warning(f"dispatch_onfleet_tasks: booking {booking_id} no longer exists")
+        return {'created': False, 'reason': 'missing'}
+
+    if booking.status not in ('paid', 'confirmed'):
+        return {'created': False, 'reason': f'status {booking.status}'}
+
+    if OnfleetTask.objects.filter(booking=booking).exists():
+        return {'created': False, 'reason': 'exists'}
+
+    lock_id = DISPATCH_LOCK_KEY.format(booking_id=booking_id)
+    # add() is False when another worker holds the key, None when the cache
+    # swallowed an error (IGNORE_EXCEPTIONS)
+    acquired = cache.add(lock_id, '1', timeout=DISPATCH_LOCK_TIMEOUT)
+    if acquired is False:
+        logger.info(f"dispatch_onfleet_tasks: {booking.booking_number} already being dispatched")
+        return {'created': False, 'reason': 'locked'}
+    if not acquired:
+        logger.warning(f"dispatch_onfleet_tasks: cache unavailable, dispatching {booking.booking_number} unlocked")
+
+    try:
+        pickup, dropoff = ToteTaxiOnfleetIntegration().create_tasks_for_booking(booking)
+    finally:
+        if acquired:
+            cache.delete(lock_id)
+
+    if pickup and dropoff:
+        logger.info(f"✓ Created 2 Onfleet tasks for booking {booking.booking_number}")
+        return {'created': True}
+
+    logger.error(
+        f"✗ Failed to create tasks for booking {booking.booking_number} — "
+        f"retry {self.request.retries}/{self.max_retries}"
+    )
+    raise self.retry(countdown=min(30 * 2 ** self.request.retries, 900))
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def redispatch_missing_onfleet_tasks(limit=100):
+    """Re-enqueue dispatch for paid/confirmed bookings that have no OnfleetTask.
+
+    Runs every 10 minutes via Celery Beat as the backstop for dispatches that
+    were never enqueued (broker blip in on_commit), were dropped, or ran out of
+    retries. Only bookings with an upcoming pickup are considered.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from apps.bookings.models import Booking
+
+    booking_ids = list(
+        Booking.objects.filter(
+            status__in=('paid', 'confirmed'),
+            deleted_at__isnull=True,
+            onfleet_tasks__isnull=True,
+            pickup_date__gte=timezone.localdate(),
+            updated_at__lte=timezone.now() - timedelta(minutes=REDISPATCH_GRACE_MINUTES),
+        )
+        .order_by('pickup_date')
+        .values_list('id', flat=True)[:limit]
+    )
+    for booking_id in booking_ids:
+        logger.warning(f"redispatch_missing_onfleet_tasks: booking {booking_id} has no Onfleet tasks, re-dispatching")
+        dispatch_onfleet_tasks.delay(str(booking_id))
+    return {'enqueued': len(booking_ids)}
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def sync_onfleet_tasks():
+    """Reconcile open Onfleet tasks with the Onfleet task list.
+
+    Runs every 10 minutes via Celery Beat as the backstop for missed webhooks.
+    Onfleet API errors propagate so Sentry sees them; the next run retries.
+    """
+    from django.core.cache import cache
+    from .sync import sync_open_tasks
+
+    lock_id = 'sync_onfleet_tasks_lock'
+    if not cache.add(lock_id, '1', timeout=SYNC_LOCK_TIMEOUT):
+        logger.info("sync_onfleet_tasks: another run holds the lock, skipping")
+        return {'skipped': 'locked'}
+
+    try:
+        return sync_open_tasks()
+    finally:
+        cache.delete(lock_id)
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def process_onfleet_webhook_events(onfleet_task_id):
+    """Apply stored Onfleet webhook events for one task, in order.
+
+    Queued by OnfleetWebhookView for every new event; reschedules itself when
+    the OnfleetTask row has not been committed yet.
+    """
+    from .webhooks import enqueue_processing, process_events_for_task
+
+    result = process_events_for_task(onfleet_task_id)
+    if result.get('retry_in'):
+        enqueue_processing(onfleet_task_id, countdown=result['retry_in'])
+    return result
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def sweep_onfleet_webhook_events(limit=200):
+    """Pick up due webhook events whose processing task was lost.
+
+    Runs every minute via Celery Beat (broker blip at enqueue time, worker
+    killed mid-run, retry countdown dropped).
+    """
+    from django.utils import timezone
+    from .models import WebhookEvent
+    from .webhooks import process_events_for_task
+
+    task_ids = list(
+        WebhookEvent.objects.filter(status='pending', next_attempt_at__lte=timezone.now())
+        .order_by('onfleet_task_id')
+        .values_list('onfleet_task_id', flat=True)
+        .distinct()[:limit]
+    )
+    processed = 0
+    for task_id in task_ids:
+        processed += process_events_for_task(task_id)['processed']
+    return {'tasks': len(task_ids), 'processed': processed}
@@ -0,0 +1,180 @@
+# backend/apps/logistics/tests/test_dispatch.py
+"""
+Onfleet dispatch: async task creation after commit + the pooled API client.
+"""
+import pytest
+from datetime import timedelta
+from unittest.mock import patch, MagicMock
+
+import requests
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.bookings.models import Booking, Address, GuestCheckout
+from apps.logistics.models import OnfleetTask
+from apps.logistics.services import OnfleetService, get_onfleet_session
+from apps.logistics.tasks import dispatch_onfleet_tasks, redispatch_missing_onfleet_tasks, DISPATCH_LOCK_KEY
+from apps.services.models import MiniMovePackage
+
+
+@pytest.fixture
+def pending_booking(db):
+    package = MiniMovePackage.objects.create(
+        package_type='petite', name='Petite Move',
+        base_price_cents=15000, max_items=10, is_active=True,
+    )
+    guest = GuestCheckout.objects.create(
+        first_name='Dispatch', last_name='Test',
+        email='dispatch@example.com', phone='5551234567',
+    )
+    return Booking.objects.create(
+        service_type='mini_move',
+        mini_move_package=package,
+        guest_checkout=guest,
+        pickup_address=Address.objects.create(
+            address_line_1='123 Main St', city='New York', state='NY', zip_code='10001'),
+        delivery_address=Address.objects.create(
+            address_line_1='456 Park Ave', city='New York', state='NY', zip_code='10002'),
+        pickup_date=timezone.now().date() + timedelta(days=2),
+        pickup_time='morning',
+        total_price_cents=15000,
+        status='pending',
+    )
+
+
+def _response(status, body=None, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.json.return_value = body or {}
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f'{status}', response=response)
+    else:
+        response.raise_for_status.return_value = None
+    return response
+
+
+@pytest.mark.django_db
+class TestDispatchTask:
+
+    def test_dispatch_waits_for_commit(self, pending_booking, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            pending_booking.status = 'paid'
+            pending_booking.save()
+
+        assert not OnfleetTask.objects.filter(booking=pending_booking).exists()
+        assert len(callbacks) >= 1
+
+        for callback in callbacks:
+            callback()
+        assert OnfleetTask.objects.filter(booking=pending_booking).count() == 2
+
+    def test_dispatch_is_idempotent(self, pending_booking):
+        Booking.objects.filter(pk=pending_booking.pk).update(status='paid')
+
+        first = dispatch_onfleet_tasks(str(pending_booking.pk))
+        second = dispatch_onfleet_tasks(str(pending_booking.pk))
+
+        assert first == {'created': True}
+        assert second == {'created': False, 'reason': 'exists'}
+        assert OnfleetTask.objects.filter(booking=pending_booking).count() == 2
+
+    def test_dispatch_skips_while_locked(self, pending_booking):
+        Booking.objects.filter(pk=pending_booking.pk).update(status='paid')
+        cache.add(DISPATCH_LOCK_KEY.format(booking_id=pending_booking.pk), '1', 60)
+        try:
+            result = dispatch_onfleet_tasks(str(pending_booking.pk))
+        finally:
+            cache.delete(DISPATCH_LOCK_KEY.format(booking_id=pending_booking.pk))
+
+        assert result == {'created': False, 'reason': 'locked'}
+        assert not OnfleetTask.objects.filter(booking=pending_booking).exists()
+
+    def test_dispatch_proceeds_while_cache_is_down(self, pending_booking):
+        Booking.objects.filter(pk=pending_booking.pk).update(status='paid')
+        with patch('django.core.cache.cache.add', return_value=None):
+            result = dispatch_onfleet_tasks(str(pending_booking.pk))
+
+        assert result == {'created': True}
+        assert OnfleetTask.objects.filter(booking=pending_booking).count() == 2
+
+    def test_backstop_redispatches_paid_bookings_without_tasks(self, pending_booking):
+        stale = timezone.now() - timedelta(hours=1)
+        Booking.objects.filter(pk=pending_booking.pk).update(status='paid', updated_at=stale)
+
+        result = redispatch_missing_onfleet_tasks()
+
+        assert result == {'enqueued': 1}
+        assert OnfleetTask.objects.filter(booking=pending_booking).count() == 2
+        assert redispatch_missing_onfleet_tasks() == {'enqueued': 0}
+
+    def test_backstop_leaves_recent_and_unpaid_bookings(self, pending_booking):
+        assert redispatch_missing_onfleet_tasks() == {'enqueued': 0}
+
+        Booking.objects.filter(pk=pending_booking.pk).update(status='paid', updated_at=timezone.now())
+        assert redispatch_missing_onfleet_tasks() == {'enqueued': 0}
+
+    def test_dispatch_skips_unpaid_booking(self, pending_booking):
+        result = dispatch_onfleet_tasks(str(pending_booking.pk))
+        assert result['created'] is False
+        assert not OnfleetTask.objects.filter(booking=pending_booking).exists()
+
+
+class TestOnfleetClient:
+
+    def _live_service(self):
+        service = OnfleetService()
+        service.mock_mode = False
+        service.api_key = 'test_key'
+        return service
+
+    def test_session_is_shared_across_instances(self):
+        assert get_onfleet_session() is get_onfleet_session()
+
+    @patch('apps.logistics.services.time.sleep')
+    def test_requests_use_timeouts(self, mock_sleep):
+        service = self._live_service()
+        with patch.object(get_onfleet_session(), 'request', return_value=_response(200, {'id': 'org'})) as req:
+            assert service.get_organization_info() == {'id': 'org'}
+
+        assert req.call_args.kwargs['timeout'] == service.timeout
+
+    @patch('apps.logistics.services.time.sleep')
+    def test_429_is_retried_with_retry_after(self, mock_sleep):
+        service = self._live_service()
+        responses = [
+            _response(429, headers={'Retry-After': '2'}),
+            _response(200, {'id': 'task_1'}),
+        ]
+        with patch.object(get_onfleet_session(), 'request', side_effect=responses) as req:
+            assert service.create_task({'metadata': []}) == {'id': 'task_1'}
+
+        assert req.call_count == 2
+        mock_sleep.assert_any_call(2.0)
+
+    @patch('apps.logistics.services.time.sleep')
+    def test_post_is_not_retried_on_server_error(self, mock_sleep):
+        service = self._live_service()
+        with patch.object(get_onfleet_session(), 'request', return_value=_response(502)) as req:
+            with pytest.raises(requests.HTTPError):
+                service.create_task({'metadata': []})
+
+        assert req.call_count == 1
+
+    @patch('apps.logistics.services.time.sleep')
+    def test_get_is_retried_on_server_error(self, mock_sleep):
+        service = self._live_service()
+        responses = [_response(503), _response(200, {'id': 'w1'})]
+        with patch.object(get_onfleet_session(), 'request', side_effect=responses) as req:
+            assert service.get_worker('w1') == {'id': 'w1'}
+
+        assert req.call_count == 2
+
+    @patch('apps.logistics.services.time.sleep')
+    def test_low_rate_limit_budget_pauses(self, mock_sleep):
+        service = self._live_service()
+        response = _response(200, {'id': 'org'}, headers={'X-RateLimit-Remaining': '1'})
+        with patch.object(get_onfleet_session(), 'request', return_value=response):
+            service.get_organization_info()
+
+        mock_sleep.assert_called_once()
@@ -0,0 +1,168 @@
+# backend/apps/logistics/tests/test_sync.py
+"""
+Bulk Onfleet status sync: paged task list, diff, bulk_update.
+"""
+import pytest
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.bookings.models import Booking, Address, GuestCheckout
+from apps.logistics.models import OnfleetTask
+from apps.logistics.services import ToteTaxiOnfleetIntegration
+from apps.logistics.sync import sync_open_tasks
+from apps.logistics.tasks import sync_onfleet_tasks
+from apps.services.models import MiniMovePackage
+
+
+class FakeOnfleet:
+    """Stands in for OnfleetService: serves /tasks/all in fixed-size pages."""
+
+    def __init__(self, tasks, page_size=2, workers=None):
+        self.tasks = tasks
+        self.page_size = page_size
+        self.workers = workers or []
+        self.list_calls = 0
+        self.worker_calls = 0
+
+    def list_tasks(self, from_ms, to_ms=None, last_id=None):
+        self.list_calls += 1
+        start = 0
+        if last_id:
+            start = next(i for i, t in enumerate(self.tasks) if t['id'] == last_id) + 1
+        page = self.tasks[start:start + self.page_size]
+        more = start + self.page_size < len(self.tasks)
+        return {'tasks': page, 'lastId': page[-1]['id'] if more else None}
+
+    def list_workers(self):
+        self.worker_calls += 1
+        return self.workers
+
+
+def _make_booking(n):
+    package, _ = MiniMovePackage.objects.get_or_create(
+        package_type='petite',
+        defaults={'name': 'Petite', 'base_price_cents': 15000, 'max_items': 10, 'is_active': True},
+    )
+    guest = GuestCheckout.objects.create(
+        first_name='Sync', last_name=f'Test{n}', email=f'sync{n}@example.com', phone='5551234567',
+    )
+    return Booking.objects.create(
+        service_type='mini_move',
+        mini_move_package=package,
+        guest_checkout=guest,
+        pickup_address=Address.objects.create(
+            address_line_1=f'{n} Main St', city='New York', state='NY', zip_code='10001'),
+        delivery_address=Address.objects.create(
+            address_line_1=f'{n} Park Ave', city='New York', state='NY', zip_code='10002'),
+        pickup_date=timezone.now().date() + timedelta(days=2),
+        pickup_time='morning',
+        total_price_cents=15000,
+        status='pending',
+    )
+
+
+@pytest.fixture
+def open_tasks(db):
+    """Three bookings' worth of open pickup/dropoff tasks."""
+    integration = ToteTaxiOnfleetIntegration()
+    tasks = []
+    for n in range(3):
+        pickup, dropoff = integration.create_tasks_for_booking(_make_booking(n))
+        Booking.objects.filter(pk=pickup.booking_id).update(status='paid')
+        tasks.extend([pickup, dropoff])
+    return tasks
+
+
+def _remote(task, state=0, **extra):
+    return {'id': task.onfleet_task_id, 'state': state, 'worker': None, **extra}
+
+
+@pytest.mark.django_db
+class TestBulkSync:
+
+    def test_unchanged_tasks_only_bump_last_synced(self, open_tasks):
+        fake = FakeOnfleet([_remote(t) for t in open_tasks], page_size=64)
+
+        counts = sync_open_tasks(onfleet=fake)
+
+        assert counts['checked'] == 6
+        assert counts['updated'] == 0
+        assert counts['pages'] == 1
+        assert all(t.last_synced for t in OnfleetTask.objects.all())
+
+    def test_pages_through_task_list(self, open_tasks):
+        fake = FakeOnfleet([_remote(t) for t in open_tasks], page_size=2)
+
+        counts = sync_open_tasks(onfleet=fake)
+
+        assert counts['pages'] == 3
+        assert counts['checked'] == 6
+
+    def test_changed_rows_are_bulk_updated(self, open_tasks):
+        pickup = open_tasks[0]
+        remote = [_remote(t) for t in open_tasks]
+        remote[0] = _remote(pickup, state=1, worker='w_1')
+        fake = FakeOnfleet(remote, page_size=64, workers=[{'id': 'w_1', 'name': 'Dana Driver'}])
+
+        with CaptureQueriesContext(connection) as ctx:
+            counts = sync_open_tasks(onfleet=fake)
+
+        assert counts['updated'] == 1
+        assert fake.worker_calls == 1
+        pickup.refresh_from_db()
+        assert pickup.status == 'assigned'
+        assert pickup.worker_id == 'w_1'
+        assert pickup.worker_name == 'Dana Driver'
+        # select open rows, one bulk UPDATE, one last_synced UPDATE (+ savepoint noise)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        assert len(updates) == 2
+
+    def test_completed_dropoff_completes_booking(self, open_tasks):
+        dropoff = open_tasks[1]
+        done_ms = int(timezone.now().timestamp() * 1000)
+        remote = [_remote(t) for t in open_tasks]
+        remote[1] = _remote(dropoff, state=3, completionDetails={
+            'success': True, 'time': done_ms, 'notes': 'Left with doorman',
+        })
+        fake = FakeOnfleet(remote, page_size=64)
+
+        counts = sync_open_tasks(onfleet=fake)
+
+        assert counts['completed'] == 1
+        dropoff.refresh_from_db()
+        assert dropoff.status == 'completed'
+        assert dropoff.delivery_notes == 'Left with doorman'
+        assert dropoff.completed_at is not None
+        assert Booking.objects.get(pk=dropoff.booking_id).status == 'completed'
+
+    def test_unsuccessful_completion_is_failed(self, open_tasks):
+        pickup = open_tasks[2]
+        remote = [_remote(t) for t in open_tasks]
+        remote[2] = _remote(pickup, state=3, completionDetails={
+            'success': False, 'failureReason': 'NOBODY_HOME', 'failureNotes': 'No answer',
+        })
+
+        counts = sync_open_tasks(onfleet=FakeOnfleet(remote, page_size=64))
+
+        assert counts['failed'] == 1
+        pickup.refresh_from_db()
+        assert pickup.status == 'failed'
+        assert pickup.failure_reason == 'NOBODY_HOME'
+
+    def test_tasks_missing_remotely_are_counted_not_touched(self, open_tasks):
+        fake = FakeOnfleet([_remote(t) for t in open_tasks[:4]], page_size=64)
+
+        counts = sync_open_tasks(onfleet=fake)
+
+        assert counts['missing'] == 2
+        assert OnfleetTask.objects.filter(last_synced__isnull=True).count() == 2
+
+    def test_periodic_task_runs_against_mock_backend(self, open_tasks):
+        result = sync_onfleet_tasks()
+
+        assert result['checked'] == 6
+        assert result['updated'] == 0
+        assert result['missing'] == 0
@@ -202,7 +202,7 @@ class TestOnfleetTaskCreation:
 class TestTaskCreationSignal:
     """Test automatic task creation via Django signal"""
     
-    def test_signal_creates_tasks_on_paid_status(self, test_booking):
+    def test_signal_creates_tasks_on_paid_status(self, test_booking, django_capture_on_commit_callbacks):
         """Test signal auto-creates tasks when booking is marked paid"""
         # Booking fixture already has status='paid', but tasks created before signal
         # Create a new booking with pending status
@@ -212,9 +212,10 @@ class TestTaskCreationSignal:
         # Delete any existing tasks
         OnfleetTask.objects.filter(booking=test_booking).delete()
         
-        # Change status to paid (should trigger signal)
-        test_booking.status = 'paid'
-        test_booking.save()
+        # Change status to paid (should trigger signal; tasks dispatch on commit)
+        with django_capture_on_commit_callbacks(execute=True):
+            test_booking.status = 'paid'
+            test_booking.save()
         
         # Check tasks were created
         tasks = OnfleetTask.objects.filter(booking=test_booking)
@@ -222,15 +223,16 @@ class TestTaskCreationSignal:
         assert tasks.filter(task_type='pickup').exists()
         assert tasks.filter(task_type='dropoff').exists()
     
-    def test_signal_creates_tasks_on_confirmed_status(self, test_booking):
+    def test_signal_creates_tasks_on_confirmed_status(self, test_booking, django_capture_on_commit_callbacks):
         """Test signal works with 'confirmed' status too"""
         test_booking.status = 'pending_payment'
         test_booking.save()
         
         OnfleetTask.objects.filter(booking=test_booking).delete()
         
-        test_booking.status = 'confirmed'
-        test_booking.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            test_booking.status = 'confirmed'
+            test_booking.save()
         
         tasks = OnfleetTask.objects.filter(booking=test_booking)
         assert tasks.count() == 2
@@ -0,0 +1,164 @@
+# backend/apps/logistics/tests/test_webhook_inbox.py
+"""
+Onfleet webhook inbox: store-and-ack in the view, ordered deferred processing.
+"""
+import hashlib
+import hmac
+import json
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking, Address, GuestCheckout
+from apps.logistics.models import WebhookEvent
+from apps.logistics.services import ToteTaxiOnfleetIntegration
+from apps.logistics.tasks import process_onfleet_webhook_events, sweep_onfleet_webhook_events
+from apps.logistics.webhooks import process_events_for_task, record_webhook_event
+from apps.services.models import MiniMovePackage
+
+
+WEBHOOK_URL = '/api/staff/logistics/webhook/'
+WEBHOOK_SECRET = 'aabbccdd11223344aabbccdd11223344aabbccdd11223344aabbccdd11223344'
+
+
+@pytest.fixture(autouse=True)
+def set_webhook_secret(settings):
+    settings.ONFLEET_WEBHOOK_SECRET = WEBHOOK_SECRET
+
+
+@pytest.fixture
+def tasks(db):
+    package = MiniMovePackage.objects.create(
+        package_type='petite', name='Petite Move',
+        base_price_cents=15000, max_items=10, is_active=True,
+    )
+    guest = GuestCheckout.objects.create(
+        first_name='Inbox', last_name='Test', email='inbox@example.com', phone='5551234567',
+    )
+    booking = Booking.objects.create(
+        service_type='mini_move',
+        mini_move_package=package,
+        guest_checkout=guest,
+        pickup_address=Address.objects.create(
+            address_line_1='123 Main St', city='New York', state='NY', zip_code='10001'),
+        delivery_address=Address.objects.create(
+            address_line_1='456 Park Ave', city='New York', state='NY', zip_code='10002'),
+        pickup_date=timezone.now().date() + timedelta(days=2),
+        pickup_time='morning',
+        total_price_cents=15000,
+        status='pending',
+    )
+    return ToteTaxiOnfleetIntegration().create_tasks_for_booking(booking)
+
+
+def _post(payload):
+    body = json.dumps(payload).encode('utf-8')
+    sig = hmac.new(bytes.fromhex(WEBHOOK_SECRET), body, hashlib.sha512).hexdigest()
+    return APIClient().post(
+        WEBHOOK_URL, data=body, content_type='application/json', HTTP_X_ONFLEET_SIGNATURE=sig,
+    )
+
+
+def _event(task_id, trigger_id, ms, **task):
+    return {'triggerId': trigger_id, 'taskId': task_id, 'time': ms, 'data': {'task': {'id': task_id, **task}}}
+
+
+@pytest.mark.django_db
+class TestWebhookView:
+
+    def test_view_stores_event_without_processing_inline(self, tasks):
+        pickup, _ = tasks
+        with patch('apps.logistics.views.enqueue_processing') as enqueue:
+            response = _post(_event(pickup.onfleet_task_id, 0, 1_700_000_000_000))
+
+        assert response.status_code == 200
+        assert response.data['success'] is True
+        enqueue.assert_called_once_with(pickup.onfleet_task_id)
+        event = WebhookEvent.objects.get()
+        assert event.status == 'pending'
+        assert event.trigger_id == 0
+        pickup.refresh_from_db()
+        assert pickup.status == 'created'
+
+    def test_redelivery_is_deduplicated(self, tasks):
+        pickup, _ = tasks
+        payload = _event(pickup.onfleet_task_id, 0, 1_700_000_000_000)
+
+        first = _post(payload)
+        second = _post(payload)
+
+        assert first.data['duplicate'] is False
+        assert second.data['duplicate'] is True
+        assert WebhookEvent.objects.count() == 1
+
+    def test_unknown_task_does_not_sleep_in_request(self, tasks):
+        with patch('apps.logistics.services.time.sleep') as sleep, \
+                patch('apps.logistics.views.enqueue_processing'):
+            response = _post(_event('not_ours', 3, 1_700_000_000_000))
+
+        assert response.status_code == 200
+        sleep.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestInboxProcessing:
+
+    def test_events_apply_in_event_time_order(self, tasks):
+        pickup, _ = tasks
+        task_id = pickup.onfleet_task_id
+        # Delivered out of order: completion arrives before start
+        record_webhook_event(b'', _event(task_id, 3, 1_700_000_060_000))
+        record_webhook_event(b'', _event(task_id, 0, 1_700_000_000_000, worker={'id': 'w1', 'name': 'Dana'}))
+
+        result = process_events_for_task(task_id)
+
+        assert result['processed'] == 2
+        pickup.refresh_from_db()
+        assert pickup.status == 'completed'
+        assert pickup.worker_name == 'Dana'
+        assert set(WebhookEvent.objects.values_list('status', flat=True)) == {'done'}
+
+    def test_missing_task_is_retried_later(self, db):
+        record_webhook_event(b'', _event('late_task', 0, 1_700_000_000_000))
+
+        result = process_onfleet_webhook_events('late_task')
+
+        assert result['retry_in'] > 0
+        event = WebhookEvent.objects.get()
+        assert event.status == 'pending'
+        assert event.attempts == 1
+        assert event.next_attempt_at > timezone.now()
+
+    def test_sweep_applies_once_task_row_exists(self, tasks):
+        pickup, _ = tasks
+        task_id = pickup.onfleet_task_id
+        record_webhook_event(b'', _event(task_id, 0, 1_700_000_000_000))
+        # Simulate a first attempt that ran before the row was committed
+        WebhookEvent.objects.update(attempts=1, next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+        result = sweep_onfleet_webhook_events()
+
+        assert result == {'tasks': 1, 'processed': 1}
+        pickup.refresh_from_db()
+        assert pickup.status == 'active'
+
+    def test_task_that_never_appears_is_ignored(self, db):
+        record_webhook_event(b'', _event('foreign_task', 0, 1_700_000_000_000))
+        WebhookEvent.objects.update(attempts=WebhookEvent.MAX_ATTEMPTS - 1)
+
+        process_events_for_task('foreign_task')
+
+        assert WebhookEvent.objects.get().status == 'ignored'
+
+    @patch('django.core.cache.cache.add', return_value=None)
+    def test_events_apply_while_cache_is_down(self, _add, tasks):
+        # IGNORE_EXCEPTIONS turns a Redis outage into add() -> None; the inbox
+        # must keep draining without it
+        pickup, _ = tasks
+        record_webhook_event(b'', _event(pickup.onfleet_task_id, 0, 1_700_000_000_000))
+
+        assert sweep_onfleet_webhook_events() == {'tasks': 1, 'processed': 1}
+        assert WebhookEvent.objects.get().status == 'done'
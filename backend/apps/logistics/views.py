@@ -14,6 +14,7 @@ from django.conf import settings as django_settings
 
 from .services import ToteTaxiOnfleetIntegration
 from .models import OnfleetTask
+from .webhooks import enqueue_processing, record_webhook_event
 from apps.accounts.permissions import IsStaffMember
 
 logger = logging.getLogger(__name__)
@@ -46,27 +47,22 @@ class LogisticsSummaryView(APIView):
 def sync_onfleet_status(request):
     """Manual sync button for staff dashboard.
 
-    TODO: Fetch real-time status from Onfleet API for each task.
-    Currently a stub — updates last_synced timestamp only.
+    Runs the same bulk sync as the periodic sync_onfleet_tasks job
+    (logistics/sync.py): paged task list from Onfleet, diffed locally.
     """
-    from datetime import timedelta as _td
+    from .sync import sync_open_tasks
 
     try:
-        recent_tasks = OnfleetTask.objects.filter(
-            status__in=['created', 'assigned', 'active'],
-            created_at__gte=timezone.now() - _td(days=7),
-        )
-
-        synced_count = 0
-        for task in recent_tasks:
-            task.last_synced = timezone.now()
-            task.save()
-            synced_count += 1
+        counts = sync_open_tasks()
 
         return Response({
             'success': True,
-            'message': f'Synced {synced_count} tasks (timestamps only — real sync not yet implemented)',
-            'synced_count': synced_count,
+            'message': (
+                f"Synced {counts['checked']} tasks: {counts['updated']} updated, "
+                f"{counts['missing']} not found in Onfleet"
+            ),
+            'synced_count': counts['checked'],
+            'counts': counts,
             'timestamp': timezone.now(),
         })
 
@@ -174,10 +170,10 @@ class OnfleetWebhookView(APIView):
 
     def post(self, request):
         """
-        Handle actual webhook events from Onfleet
+        Accept webhook events from Onfleet into the WebhookEvent inbox
 
-        ✅ CRITICAL: Always return 200 OK for webhook processing
-        Even if processing fails, return 200 to prevent Onfleet retries
+        ✅ CRITICAL: Always return 200 OK once the event is stored
+        Processing happens in Celery, so it can never hold the request
         """
         # ========== C3: Verify webhook signature ==========
         if not self._verify_signature(request):
@@ -189,34 +185,29 @@ class OnfleetWebhookView(APIView):
         try:
             webhook_data = request.data
             trigger_id = webhook_data.get('triggerId')
-            task_id = webhook_data.get('taskId')
-            
+            task_id = ToteTaxiOnfleetIntegration.webhook_task_id(webhook_data)
+
             logger.info(f"📨 Onfleet webhook received - Trigger: {trigger_id}, Task: {task_id}")
-            
-            # Process the webhook
-            integration = ToteTaxiOnfleetIntegration()
-            success = integration.handle_webhook(webhook_data)
-            
-            # ✅ FIX: Always return 200 OK, regardless of processing result
-            # This prevents Onfleet from retrying failed webhooks
-            response_data = {
-                'success': success,
+
+            # Persist and acknowledge; process_onfleet_webhook_events applies it
+            event, created = record_webhook_event(request.body, webhook_data)
+            if created and event.status == 'pending':
+                enqueue_processing(event.onfleet_task_id)
+
+            # ✅ Always return 200 OK so Onfleet doesn't retry an accepted event
+            return Response({
+                'success': True,
                 'trigger_id': trigger_id,
                 'task_id': task_id,
+                'event_id': event.event_id,
+                'duplicate': not created,
                 'timestamp': timezone.now(),
-                'message': 'Webhook processed successfully' if success else 'Webhook processing failed but acknowledged'
-            }
-            
-            if success:
-                logger.info(f"✅ Webhook processed successfully - Trigger: {trigger_id}")
-            else:
-                logger.debug(f"Webhook for non-ToteTaxi task acknowledged - Trigger: {trigger_id}")
-            
-            return Response(response_data, status=200)  # ✅ Always 200
-                
+                'message': 'Webhook accepted',
+            }, status=200)
+
         except Exception as e:
             logger.error(f"❌ Webhook error: {e}", exc_info=True)
-            
+
             # ✅ Even on exception, return 200 to prevent retries
             return Response({
                 'success': False,
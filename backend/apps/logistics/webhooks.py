@@ -0,0 +1,147 @@
+# apps/logistics/webhooks.py
+"""Onfleet webhook inbox.
+
+OnfleetWebhookView calls `record_webhook_event()` after verifying the
+signature and returns 200 straight away. `process_events_for_task()` (run by
+the `process_onfleet_webhook_events` task) applies a task's pending events
+oldest-first, so a "completed" that overtakes "started" on the wire is still
+applied last. When the OnfleetTask row does not exist yet (Onfleet can call
+back before our create transaction commits) the event waits with backoff
+instead of the old in-request time.sleep loop; later events for the same task
+wait behind it to keep the order.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 300
+
+
+def _event_id(raw_body, webhook_data):
+    explicit = webhook_data.get('id') if isinstance(webhook_data, dict) else None
+    if explicit:
+        return str(explicit)[:128]
+    # Onfleet redelivers the identical body, so its hash is a stable id.
+    if not raw_body:
+        raw_body = json.dumps(webhook_data, sort_keys=True).encode()
+    return hashlib.sha256(raw_body).hexdigest()
+
+
+def _event_time(webhook_data):
+    ts = webhook_data.get('time')
+    if isinstance(ts, (int, float)) and ts > 0:
+        return datetime.fromtimestamp(ts / 1000, tz=timezone.get_current_timezone())
+    return timezone.now()
+
+
+def record_webhook_event(raw_body, webhook_data):
+    """Store a verified webhook delivery. Returns (event, created)."""
+    from .models import WebhookEvent
+    from .services import ToteTaxiOnfleetIntegration
+
+    event_id = _event_id(raw_body, webhook_data)
+    task_id = ToteTaxiOnfleetIntegration.webhook_task_id(webhook_data)
+    trigger_id = webhook_data.get('triggerId')
+
+    try:
+        with transaction.atomic():
+            event = WebhookEvent.objects.create(
+                event_id=event_id,
+                trigger_id=trigger_id if isinstance(trigger_id, int) else None,
+                onfleet_task_id=task_id[:100],
+                payload=webhook_data,
+                event_time=_event_time(webhook_data),
+                status='pending' if task_id else 'ignored',
+            )
+    except IntegrityError:
+        logger.info(f"Duplicate Onfleet webhook {event_id} ignored")
+        return WebhookEvent.objects.get(event_id=event_id), False
+
+    return event, True
+
+
+def enqueue_processing(task_id, countdown=None):
+    from .tasks import process_onfleet_webhook_events
+    try:
+        if countdown:
+            process_onfleet_webhook_events.apply_async((task_id,), countdown=countdown)
+        else:
+            process_onfleet_webhook_events.delay(task_id)
+    except Exception as e:
+        # Broker down: the periodic sweep picks the events up.
+        logger.warning(f"Could not enqueue Onfleet webhook processing for {task_id}: {e}")
+
+
+def _retry_delay(attempts):
+    return min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+
+
+def process_events_for_task(task_id):
+    """Apply due pending events for one Onfleet task, oldest first.
+
+    Each event is applied in its own transaction holding row locks on the
+    task's pending events (SKIP LOCKED), so a second consumer of the same task
+    finds the head claimed and backs off instead of applying a later event out
+    of order. The claim lives in the database, not the cache, so the inbox
+    keeps draining while Redis is down.
+
+    Returns {'processed', 'retry_in'}; `retry_in` is set (seconds) only when
+    this run deferred an event because the task row is not there yet, so the
+    caller schedules exactly one follow-up.
+    """
+    from .models import OnfleetTask, WebhookEvent
+    from .services import ToteTaxiOnfleetIntegration
+
+    integration = ToteTaxiOnfleetIntegration()
+    processed = 0
+    while True:
+        with transaction.atomic():
+            pending = WebhookEvent.objects.filter(onfleet_task_id=task_id, status='pending')
+            claimed = list(
+                pending.select_for_update(skip_locked=True).order_by('event_time', 'received_at')
+            )
+            if not claimed:
+                return {'processed': processed, 'retry_in': None}
+            event = claimed[0]
+            head_id = pending.order_by('event_time', 'received_at').values_list('id', flat=True).first()
+            if head_id != event.id:
+                # Another consumer holds the older events; it applies them in order
+                return {'processed': processed, 'retry_in': None, 'skipped': 'locked'}
+
+            now = timezone.now()
+            if event.next_attempt_at > now:
+                # Head of the queue is backing off (its follow-up is already
+                # scheduled); everything behind it waits too.
+                return {'processed': processed, 'retry_in': None}
+
+            onfleet_task = OnfleetTask.objects.select_related('booking').filter(onfleet_task_id=task_id).first()
+            event.attempts += 1
+
+            if onfleet_task is None:
+                if event.attempts >= WebhookEvent.MAX_ATTEMPTS:
+                    # Never showed up: a task created outside ToteTaxi.
+                    pending.update(status='ignored', processed_at=now, last_error='task not found')
+                    logger.debug(f"Onfleet task {task_id} never appeared locally; events ignored")
+                    return {'processed': processed, 'retry_in': None}
+
+                delay = _retry_delay(event.attempts)
+                event.next_attempt_at = now + timedelta(seconds=delay)
+                event.save(update_fields=['attempts', 'next_attempt_at'])
+                logger.info(f"Onfleet task {task_id} not found yet, retrying webhook in {delay}s")
+                return {'processed': processed, 'retry_in': delay}
+
+            if integration.apply_webhook(onfleet_task, event.payload):
+                event.status = 'done'
+            else:
+                event.status = 'failed'
+                event.last_error = 'handler failed; see logs'
+            event.processed_at = timezone.now()
+            event.save(update_fields=['attempts', 'status', 'last_error', 'processed_at'])
+            processed += 1
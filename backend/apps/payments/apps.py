@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.payments'
+
+    def ready(self):
+        # Key, API base, timeouts, retries and the shared HTTP client for the
+        # stripe SDK, in one place (stripe_client.py)
+        from .stripe_client import configure_stripe
+        configure_stripe()
@@ -0,0 +1,291 @@
+# apps/payments/fake_stripe.py
+"""
+A local stand-in for the slice of the Stripe REST API we call.
+
+It speaks real HTTP, so it exercises the whole SDK path — form encoding,
+the shared session in stripe_client, timeouts, retries, error mapping —
+which patching stripe.PaymentIntent.* can't. Used by the `fake_stripe`
+pytest fixture (conftest.py), by `manage.py fake_stripe_server` for pointing
+a dev server at it (STRIPE_API_BASE=http://127.0.0.1:12111), and by the
+checkout load test, so checkout throughput can be measured offline.
+
+Covers payment intents (create, retrieve, update, confirm, cancel, list by
+created window), refunds and checkout sessions. State is in memory, per
+server. `latency` adds a fixed delay to every request, and fail_next()
+makes the next N requests answer with an error status (to exercise retries).
+"""
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+_KEY_PART = re.compile(r'\[([^\]]*)\]')
+
+
+def _new_id(prefix):
+    return f'{prefix}_Fake{uuid.uuid4().hex[:20]}'
+
+
+def parse_form(body):
+    """Decode Stripe's form encoding (metadata[k]=v, expand[0]=x) into dicts/lists."""
+    data = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        head = key.split('[', 1)[0]
+        parts = [head] + _KEY_PART.findall(key)
+        target = data
+        for part, following in zip(parts, parts[1:]):
+            default = [] if following.isdigit() else {}
+            if isinstance(target, list):
+                index = int(part)
+                while len(target) <= index:
+                    target.append(default)
+                target = target[index]
+            else:
+                target = target.setdefault(part, default)
+        last = parts[-1]
+        if isinstance(target, list):
+            target.append(value)
+        else:
+            target[last] = value
+    return data
+
+
+class StripeError(Exception):
+    def __init__(self, status, message, error_type='invalid_request_error', code=None):
+        super().__init__(message)
+        self.status = status
+        self.body = {'error': {'type': error_type, 'message': message, 'code': code}}
+
+
+class FakeStripe:
+    """The in-memory API: one method per endpoint, returning JSON-able dicts."""
+
+    def __init__(self):
+        self.payment_intents = {}
+        self.lock = threading.Lock()
+
+    def _intent(self, pi_id):
+        try:
+            return self.payment_intents[pi_id]
+        except KeyError:
+            raise StripeError(404, f"No such payment_intent: '{pi_id}'", code='resource_missing')
+
+    def create_payment_intent(self, params):
+        try:
+            amount = int(params['amount'])
+        except (KeyError, ValueError):
+            raise StripeError(400, 'Missing required param: amount.', code='parameter_missing')
+        pi_id = _new_id('pi')
+        intent = {
+            'id': pi_id,
+            'object': 'payment_intent',
+            'amount': amount,
+            'amount_received': 0,
+            'currency': params.get('currency', 'usd'),
+            'status': 'requires_payment_method',
+            'client_secret': f'{pi_id}_secret_{uuid.uuid4().hex[:12]}',
+            'created': int(time.time()),
+            'latest_charge': None,
+            'metadata': params.get('metadata', {}),
+            'receipt_email': params.get('receipt_email'),
+            'livemode': False,
+        }
+        with self.lock:
+            self.payment_intents[pi_id] = intent
+        return intent
+
+    def retrieve_payment_intent(self, pi_id, params):
+        return self._intent(pi_id)
+
+    def update_payment_intent(self, pi_id, params):
+        with self.lock:
+            intent = self._intent(pi_id)
+            if 'metadata' in params:
+                intent['metadata'] = {**intent['metadata'], **params['metadata']}
+            if 'amount' in params:
+                intent['amount'] = int(params['amount'])
+        return intent
+
+    def confirm_payment_intent(self, pi_id, params=None):
+        """The card is charged: what Stripe.js confirmCardPayment does for us."""
+        with self.lock:
+            intent = self._intent(pi_id)
+            if intent['status'] == 'canceled':
+                raise StripeError(400, 'This PaymentIntent has been canceled.', code='payment_intent_unexpected_state')
+            intent['status'] = 'succeeded'
+            intent['amount_received'] = intent['amount']
+            intent['latest_charge'] = intent['latest_charge'] or _new_id('ch')
+        return intent
+
+    def cancel_payment_intent(self, pi_id, params):
+        with self.lock:
+            intent = self._intent(pi_id)
+            if intent['status'] in ('succeeded', 'canceled'):
+                raise StripeError(
+                    400, f"You cannot cancel this PaymentIntent because it has a status of {intent['status']}.",
+                    code='payment_intent_unexpected_state',
+                )
+            intent['status'] = 'canceled'
+        return intent
+
+    def list_payment_intents(self, params):
+        created = params.get('created', {})
+        limit = int(params.get('limit', 10))
+        with self.lock:
+            intents = sorted(self.payment_intents.values(), key=lambda pi: (pi['created'], pi['id']), reverse=True)
+        if isinstance(created, dict):
+            if 'gte' in created:
+                intents = [pi for pi in intents if pi['created'] >= int(created['gte'])]
+            if 'lte' in created:
+                intents = [pi for pi in intents if pi['created'] <= int(created['lte'])]
+        if params.get('starting_after'):
+            ids = [pi['id'] for pi in intents]
+            if params['starting_after'] in ids:
+                intents = intents[ids.index(params['starting_after']) + 1:]
+        return {
+            'object': 'list',
+            'url': '/v1/payment_intents',
+            'data': intents[:limit],
+            'has_more': len(intents) > limit,
+        }
+
+    def create_refund(self, params):
+        intent = self._intent(params.get('payment_intent', ''))
+        amount = int(params.get('amount', intent['amount']))
+        return {
+            'id': _new_id('re'),
+            'object': 'refund',
+            'amount': amount,
+            'payment_intent': intent['id'],
+            'charge': intent['latest_charge'],
+            'status': 'succeeded',
+            'metadata': params.get('metadata', {}),
+        }
+
+    def create_checkout_session(self, params):
+        session_id = _new_id('cs')
+        return {
+            'id': session_id,
+            'object': 'checkout.session',
+            'url': f'https://checkout.stripe.test/c/pay/{session_id}',
+            'payment_intent': None,
+            'status': 'open',
+            'metadata': params.get('metadata', {}),
+        }
+
+
+ROUTES = [
+    ('POST', re.compile(r'^/v1/payment_intents$'), 'create_payment_intent'),
+    ('GET', re.compile(r'^/v1/payment_intents$'), 'list_payment_intents'),
+    ('GET', re.compile(r'^/v1/payment_intents/([^/]+)$'), 'retrieve_payment_intent'),
+    ('POST', re.compile(r'^/v1/payment_intents/([^/]+)$'), 'update_payment_intent'),
+    ('POST', re.compile(r'^/v1/payment_intents/([^/]+)/confirm$'), 'confirm_payment_intent'),
+    ('POST', re.compile(r'^/v1/payment_intents/([^/]+)/cancel$'), 'cancel_payment_intent'),
+    ('POST', re.compile(r'^/v1/refunds$'), 'create_refund'),
+    ('POST', re.compile(r'^/v1/checkout/sessions$'), 'create_checkout_session'),
+]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like api.stripe.com
+    # Headers and body go out as separate writes; with Nagle on, keep-alive
+    # requests would stall ~40ms on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode() if length else ''
+        url = urlsplit(self.path)
+        params = parse_form(url.query if method == 'GET' else body)
+
+        with server.counter_lock:
+            server.request_count += 1
+            failure = server.failures.pop(0) if server.failures else None
+        if server.latency:
+            time.sleep(server.latency)
+
+        if failure is not None:
+            return self._respond(failure, {'error': {'type': 'api_error', 'message': 'Injected failure'}})
+
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.match(url.path)
+            if route_method == method and match:
+                try:
+                    return self._respond(200, getattr(server.api, handler)(*match.groups(), params))
+                except StripeError as e:
+                    return self._respond(e.status, e.body)
+        return self._respond(404, {'error': {
+            'type': 'invalid_request_error', 'message': f'Unrecognized request URL ({method}: {url.path}).',
+        }})
+
+    def _respond(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Request-Id', f'req_{uuid.uuid4().hex[:14]}')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f'fake stripe: {format % args}')
+
+
+class FakeStripeServer(ThreadingHTTPServer):
+    """Threaded fake Stripe on 127.0.0.1; use as a context manager or start()/stop()."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.api = FakeStripe()
+        self.latency = latency
+        self.failures = []
+        self.request_count = 0
+        self.counter_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def fail_next(self, count=1, status=500):
+        with self.counter_lock:
+            self.failures.extend([status] * count)
+
+    def succeed(self, pi_id):
+        """Mark a PaymentIntent paid, as a customer completing checkout would."""
+        return self.api.confirm_payment_intent(pi_id)
+
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up mid-response; that's expected here
+        logger.debug('fake stripe: client went away', exc_info=True)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-stripe', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
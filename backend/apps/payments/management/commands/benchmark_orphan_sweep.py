@@ -0,0 +1,160 @@
+# backend/apps/payments/management/commands/benchmark_orphan_sweep.py
+"""
+Benchmark cleanup_orphaned_payments against a local Stripe stand-in.
+
+Seeds N orphaned pending Payments (older than 24h, no booking) inside a
+transaction that is rolled back afterwards, replaces PaymentIntent.retrieve /
+.list / .cancel with an in-process stand-in that sleeps --latency-ms per API
+call, and runs the sweep once per mode:
+
+    serial       one Stripe call at a time (the pre-stripe_batch behaviour)
+    concurrent   retrieves/cancels on the bounded pool, no list-by-window
+    batched      list-by-window first, pool for the rest (what production runs)
+
+Every mode starts from the same seeded rows. No request leaves the process.
+
+Usage:
+    python manage.py benchmark_orphan_sweep --orphans 1000
+    python manage.py benchmark_orphan_sweep --orphans 1000 --latency-ms 150 --modes concurrent batched
+"""
+import threading
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+from unittest import mock
+
+import stripe
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.payments import stripe_batch
+from apps.payments.models import Payment
+from apps.payments.tasks import cleanup_orphaned_payments
+
+MODES = ('serial', 'concurrent', 'batched')
+
+
+class _Rollback(Exception):
+    pass
+
+
+class StripeStandIn:
+    """Just enough of the PaymentIntent API for the sweeps, with fixed latency."""
+
+    def __init__(self, intents, latency):
+        self.intents = {pi['id']: pi for pi in intents}
+        self.latency = latency
+        self.calls = {'retrieve': 0, 'list': 0, 'cancel': 0}
+        self._lock = threading.Lock()
+
+    def _call(self, name):
+        with self._lock:
+            self.calls[name] += 1
+        time.sleep(self.latency)
+
+    def _intent(self, pi_id):
+        if pi_id not in self.intents:
+            raise stripe.error.InvalidRequestError(f'No such payment_intent: {pi_id}', 'id')
+        return stripe.PaymentIntent.construct_from(self.intents[pi_id], 'sk_bench')
+
+    def retrieve(self, pi_id, **params):
+        self._call('retrieve')
+        return self._intent(pi_id)
+
+    def cancel(self, pi_id, **params):
+        self._call('cancel')
+        intent = self.intents[pi_id]
+        if intent['status'] in ('succeeded', 'canceled'):
+            raise stripe.error.InvalidRequestError(f'PaymentIntent is {intent["status"]}', 'status')
+        intent['status'] = 'canceled'
+        return self._intent(pi_id)
+
+    def list(self, created, limit=10, starting_after=None, **params):
+        """Newest first, like Stripe."""
+        self._call('list')
+        matching = sorted(
+            (pi for pi in self.intents.values() if created['gte'] <= pi['created'] <= created['lte']),
+            key=lambda pi: (pi['created'], pi['id']),
+            reverse=True,
+        )
+        if starting_after:
+            ids = [pi['id'] for pi in matching]
+            matching = matching[ids.index(starting_after) + 1:]
+        return stripe.ListObject.construct_from(
+            {
+                'object': 'list',
+                'data': [self._intent(pi['id']) for pi in matching[:limit]],
+                'has_more': len(matching) > limit,
+            },
+            'sk_bench',
+        )
+
+
+class Command(BaseCommand):
+    help = 'Time cleanup_orphaned_payments for N orphans against a local Stripe stand-in'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orphans', type=int, default=1000)
+        parser.add_argument('--latency-ms', type=float, default=50,
+                            help='Simulated latency of every Stripe API call')
+        parser.add_argument('--succeeded-every', type=int, default=50,
+                            help='Every Nth orphan is succeeded in Stripe (0: none)')
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+
+    def handle(self, *args, **options):
+        for mode in options['modes']:
+            try:
+                with transaction.atomic():
+                    intents = self._seed(options['orphans'], options['succeeded_every'])
+                    self._run(mode, StripeStandIn(intents, options['latency_ms'] / 1000), len(intents))
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _seed(self, count, succeeded_every):
+        start = timezone.now() - timedelta(hours=30)
+        payments = Payment.objects.bulk_create(
+            [
+                Payment(amount_cents=99500, status='pending', stripe_payment_intent_id=f'pi_bench_{i:06d}')
+                for i in range(count)
+            ],
+            batch_size=1000,
+        )
+        intents = []
+        for i, payment in enumerate(payments):
+            # Orphans a few seconds apart, as abandoned checkouts would be
+            created_at = start + timedelta(seconds=5 * i)
+            Payment.objects.filter(pk=payment.pk).update(created_at=created_at)
+            succeeded = succeeded_every and i % succeeded_every == 0
+            intents.append({
+                'id': payment.stripe_payment_intent_id,
+                'object': 'payment_intent',
+                'status': 'succeeded' if succeeded else 'requires_payment_method',
+                'latest_charge': f'ch_bench_{i:06d}' if succeeded else None,
+                'created': int(created_at.timestamp()),
+                'metadata': {},
+            })
+        return intents
+
+    def _run(self, mode, stand_in, count):
+        settings = {
+            'serial': {'STRIPE_WORKERS': 1, 'LIST_MIN_IDS': float('inf')},
+            'concurrent': {'LIST_MIN_IDS': float('inf')},
+            'batched': {},
+        }[mode]
+
+        with ExitStack() as stack:
+            for name, value in settings.items():
+                stack.enter_context(mock.patch.object(stripe_batch, name, value))
+            for name in ('retrieve', 'cancel', 'list'):
+                stack.enter_context(mock.patch.object(stripe.PaymentIntent, name, getattr(stand_in, name)))
+            started = time.perf_counter()
+            result = cleanup_orphaned_payments()
+            elapsed = time.perf_counter() - started
+
+        calls = ', '.join(f'{name}={n}' for name, n in stand_in.calls.items())
+        self.stdout.write(
+            f'{mode:<11} {count} orphans: {elapsed:7.2f}s  '
+            f'expired={result["expired"]} failed={result["failed"]}  stripe calls: {calls}'
+        )
@@ -0,0 +1,33 @@
+# backend/apps/payments/management/commands/fake_stripe_server.py
+"""
+Run the local fake Stripe API (apps/payments/fake_stripe.py) in the foreground.
+
+Point a dev server or the checkout load test at it with
+STRIPE_API_BASE=http://127.0.0.1:<port> (any non-empty STRIPE_SECRET_KEY).
+
+Usage:
+    python manage.py fake_stripe_server --port 12111 --latency-ms 120
+"""
+from django.core.management.base import BaseCommand
+
+from apps.payments.fake_stripe import FakeStripeServer
+
+
+class Command(BaseCommand):
+    help = 'Serve a local in-memory stand-in for the Stripe API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=12111)
+        parser.add_argument('--latency-ms', type=float, default=0,
+                            help='Fixed delay added to every request')
+
+    def handle(self, *args, **options):
+        server = FakeStripeServer(port=options['port'], latency=options['latency_ms'] / 1000)
+        self.stdout.write(f'Fake Stripe listening on {server.url} (Ctrl-C to stop)')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f'Served {server.request_count} request(s)')
@@ -0,0 +1,95 @@
+# backend/apps/payments/management/commands/replay_stripe_events.py
+"""
+Replay stored Stripe webhook events (incident recovery).
+
+Every delivery is kept in the StripeEvent table, so events whose processing
+failed — or that need re-running after a fix — can be replayed without asking
+Stripe to resend them. Handlers are idempotent (a succeeded Payment is not
+re-applied), so replaying a 'done' event is safe.
+
+Usage:
+    python manage.py replay_stripe_events --status failed
+    python manage.py replay_stripe_events --event-id evt_123 --event-id evt_456
+    python manage.py replay_stripe_events --type payment_intent.succeeded --since 2026-10-01 --include-done
+    python manage.py replay_stripe_events --status failed --sync   # run inline, not via Celery
+    python manage.py replay_stripe_events --status failed --dry-run
+"""
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.payments.models import StripeEvent
+from apps.payments.tasks import process_stripe_event
+
+
+class Command(BaseCommand):
+    help = 'Replay stored Stripe webhook events through process_stripe_event'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event-id', action='append', default=[],
+                            help='Stripe event id (evt_...); repeatable')
+        parser.add_argument('--status', choices=['received', 'processing', 'failed', 'done'],
+                            help='Only events in this status')
+        parser.add_argument('--type', dest='event_type', help='Only events of this Stripe type')
+        parser.add_argument('--since', help='Only events received on/after this date (YYYY-MM-DD)')
+        parser.add_argument('--include-done', action='store_true',
+                            help="Allow replaying events that already finished ('done')")
+        parser.add_argument('--limit', type=int, default=500)
+        parser.add_argument('--sync', action='store_true',
+                            help='Process inline instead of enqueueing to Celery')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List matching events without replaying them')
+
+    def handle(self, *args, **options):
+        events = StripeEvent.objects.all()
+        if options['event_id']:
+            events = events.filter(stripe_event_id__in=options['event_id'])
+        if options['status']:
+            events = events.filter(status=options['status'])
+        if options['event_type']:
+            events = events.filter(event_type=options['event_type'])
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--since must be YYYY-MM-DD')
+            events = events.filter(
+                received_at__gte=timezone.make_aware(datetime.combine(since, time.min))
+            )
+        if not options['include_done']:
+            events = events.exclude(status='done')
+        if not (options['event_id'] or options['status'] or options['event_type'] or options['since']):
+            raise CommandError('Refusing to replay everything: pass --event-id, --status, --type or --since')
+
+        events = list(events.order_by('received_at')[:options['limit']])
+        if not events:
+            self.stdout.write('No matching Stripe events.')
+            return
+
+        for event in events:
+            self.stdout.write(f'{event.stripe_event_id}  {event.event_type}  {event.status}  attempts={event.attempts}')
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run: {len(events)} event(s) would be replayed'))
+            return
+
+        StripeEvent.objects.filter(pk__in=[e.pk for e in events]).update(
+            status='received', last_error='', updated_at=timezone.now(),
+        )
+
+        failed = 0
+        for event in events:
+            if options['sync']:
+                try:
+                    result = process_stripe_event.apply(args=(str(event.pk),), throw=True).result
+                    self.stdout.write(f'  {event.stripe_event_id}: {result}')
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'  {event.stripe_event_id}: {e}'))
+            else:
+                process_stripe_event.delay(str(event.pk))
+
+        verb = 'Processed' if options['sync'] else 'Enqueued'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(events) - failed} event(s)'))
+        if failed:
+            self.stdout.write(self.style.ERROR(f'{failed} event(s) failed again'))
@@ -62,8 +62,23 @@ class Payment(models.Model):
             models.Index(fields=['customer', 'created_at'], name='payments_customer_created_idx'),  # Customer dashboard
             models.Index(fields=['status'], name='payments_status_idx'),  # Admin filtering
             models.Index(fields=['created_at'], name='payments_created_idx'),  # Ordering
+            models.Index(fields=['updated_at'], name='payments_updated_idx'),  # Report rollup watermark
         ]
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Track the fields the staff dashboard counters depend on, so the
+        # post_save signal can apply a delta instead of recounting
+        self._original_status = self.__dict__.get('status')
+        self._original_booking_id = self.__dict__.get('booking_id')
+        self._original_amount_cents = self.__dict__.get('amount_cents')
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._original_status = self.status
+        self._original_booking_id = self.booking_id
+        self._original_amount_cents = self.amount_cents
+
     def __str__(self):
         booking_num = self.booking.booking_number if self.booking else 'UNLINKED'
         return f"{booking_num} - ${self.amount_dollars} ({self.status})"
@@ -202,4 +217,46 @@ class PaymentAudit(models.Model):
             payment=payment,
             refund=refund,
             user=user
-        )
\ No newline at end of file
+        )
+
+class StripeEvent(models.Model):
+    """Durable inbox for Stripe webhook deliveries.
+
+    Idempotency used to live only in Redis (`stripe_event_{id}` with a 3-day
+    TTL), so a Redis flush or eviction let redeliveries be processed twice,
+    and the whole event JSON was shipped through the broker. The webhook view
+    now inserts one row per Stripe event id (insert-or-ignore) and enqueues
+    `process_stripe_event` with just the row's pk.
+    """
+
+    STATUS_CHOICES = [
+        ('received', 'Received'),      # stored, waiting for (or between) processing attempts
+        ('processing', 'Processing'),  # claimed by a worker
+        ('done', 'Done'),
+        ('failed', 'Failed'),          # handler raised; replay with `replay_stripe_events`
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    stripe_event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'payments_stripe_event'
+        ordering = ['-received_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='stripe_event_status_idx'),
+            models.Index(fields=['event_type', 'received_at'], name='stripe_event_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.stripe_event_id} ({self.status})"
@@ -11,8 +11,6 @@ from apps.bookings.models import Booking
 
 logger = logging.getLogger(__name__)
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
 
 class StripePaymentService:
     """Service layer for Stripe payment processing"""
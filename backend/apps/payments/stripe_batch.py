@@ -0,0 +1,106 @@
+# apps/payments/stripe_batch.py
+"""
+Bulk PaymentIntent reads/cancels for the orphan sweeps.
+
+cleanup_orphaned_payments, alert_succeeded_orphans and
+reconcile_pending_payments used to call stripe.PaymentIntent.retrieve (and
+.cancel) serially, one orphan at a time, so a slow Stripe API multiplied
+straight into the task's time limit. The Stripe calls now run up front for a
+chunk of rows, and the DB updates are then applied sequentially in the
+caller, as before:
+
+  - when a chunk is big enough, its PIs are first listed by creation window
+    (PaymentIntent.list(created=...), 100 per page) so a dense window costs a
+    handful of paged calls instead of one retrieve per PI;
+  - whatever the listing didn't cover is retrieved on a bounded thread pool.
+
+Results map each PI id to the PaymentIntent, or to the exception the call
+raised, so callers keep their per-row error handling. The workers only talk
+to Stripe; they never touch the database.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import stripe
+
+logger = logging.getLogger(__name__)
+
+STRIPE_WORKERS = 8
+# Below this many PIs a few concurrent retrieves beat paging a window
+LIST_MIN_IDS = 25
+LIST_PAGE_SIZE = 100
+LIST_MAX_PAGES = 10
+# Our rows are written just after Stripe creates the PI; pad the window
+CREATED_SLACK = timedelta(minutes=5)
+
+
+def _call_each(fn, keys):
+    """{key: fn(key) or the exception it raised}; one call runs inline."""
+    keys = list(dict.fromkeys(keys))
+
+    def guarded(key):
+        try:
+            return fn(key)
+        except Exception as e:
+            return e
+
+    if len(keys) <= 1:
+        return {key: guarded(key) for key in keys}
+    with ThreadPoolExecutor(
+        max_workers=min(STRIPE_WORKERS, len(keys)), thread_name_prefix='stripe-batch',
+    ) as pool:
+        return dict(zip(keys, pool.map(guarded, keys)))
+
+
+def _list_window(wanted, created_between, expand):
+    """PIs in `wanted` found by paging PaymentIntent.list over the creation window."""
+    earliest, latest = created_between
+    params = {
+        'created': {
+            'gte': int((earliest - CREATED_SLACK).timestamp()),
+            'lte': int((latest + CREATED_SLACK).timestamp()),
+        },
+        'limit': LIST_PAGE_SIZE,
+    }
+    if expand:
+        params['expand'] = [f'data.{field}' for field in expand]
+
+    found = {}
+    try:
+        for _ in range(LIST_MAX_PAGES):
+            page = stripe.PaymentIntent.list(**params)
+            for pi in page.data:
+                if pi.id in wanted:
+                    found[pi.id] = pi
+            if len(found) == len(wanted) or not page.has_more or not page.data:
+                break
+            params['starting_after'] = page.data[-1].id
+    except stripe.error.StripeError as e:
+        # Retrieves below cover whatever is missing
+        logger.warning(f'PaymentIntent.list over {earliest}..{latest} failed: {e}')
+    return found
+
+
+def fetch_payment_intents(pi_ids, created_between=None, expand=None):
+    """{pi_id: PaymentIntent | Exception} for every id in `pi_ids`.
+
+    `created_between` is the (earliest, latest) creation time of the local rows
+    behind `pi_ids`; with enough ids it enables the list-by-window path.
+    """
+    wanted = {pi_id for pi_id in pi_ids if pi_id}
+    found = {}
+    if created_between and len(wanted) >= LIST_MIN_IDS:
+        found = _list_window(wanted, created_between, expand)
+
+    missing = [pi_id for pi_id in pi_ids if pi_id in wanted and pi_id not in found]
+    kwargs = {'expand': list(expand)} if expand else {}
+    found.update(_call_each(lambda pi_id: stripe.PaymentIntent.retrieve(pi_id, **kwargs), missing))
+
+    logger.debug(f'Fetched {len(wanted)} PaymentIntents ({len(missing)} retrieved individually)')
+    return found
+
+
+def cancel_payment_intents(pi_ids):
+    """{pi_id: PaymentIntent | Exception} for cancelling each PI, concurrently."""
+    return _call_each(stripe.PaymentIntent.cancel, [pi_id for pi_id in pi_ids if pi_id])
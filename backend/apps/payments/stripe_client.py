@@ -0,0 +1,137 @@
+# apps/payments/stripe_client.py
+"""
+One configured HTTP client for every Stripe call.
+
+Views, StripePaymentService and the payments tasks all call Stripe through
+the module-level SDK (stripe.PaymentIntent.create(...) etc.). Left alone, the
+SDK opens a requests.Session per thread with an 80s timeout and no retries,
+and each module set stripe.api_key on import. configure_stripe() runs once at
+app start-up (PaymentsConfig.ready) and installs:
+
+  - a single keep-alive requests.Session with a bounded connection pool,
+    shared by all threads (web workers, the stripe_batch pool);
+  - explicit (connect, read) timeouts;
+  - the SDK's own bounded network retries — connection errors, 409/429/5xx,
+    with backoff and an automatic idempotency key on POSTs;
+  - per-call latency metrics by endpoint (stripe_call_stats), with a warning
+    for slow calls.
+
+Call sites keep using the module API, so existing stripe.* patches in tests
+still apply. STRIPE_API_BASE (or stripe_api_base() in tests) points the SDK
+at the local fake server in apps/payments/fake_stripe.py.
+"""
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+import stripe
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+SLOW_CALL_MS = 2000
+DEFAULT_API_BASE = stripe.api_base
+
+_client = None
+_client_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+# Path segments that are object ids (pi_3Nx..., ch_..., cs_test_...)
+_ID_SEGMENT = re.compile(r'^[a-z]+_(?=[A-Za-z0-9_]*[A-Z0-9])[A-Za-z0-9_]+$')
+
+
+def endpoint_of(method, url):
+    """'GET /v1/payment_intents/{id}' for a request, so stats group by endpoint."""
+    path = urlsplit(url).path
+    segments = ['{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/')]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+def _record(endpoint, elapsed_ms, ok):
+    with _stats_lock:
+        entry = _stats.setdefault(endpoint, {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        entry['calls'] += 1
+        entry['errors'] += 0 if ok else 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+    if elapsed_ms >= SLOW_CALL_MS:
+        logger.warning(f'Slow Stripe call: {endpoint} took {elapsed_ms:.0f}ms')
+
+
+def stripe_call_stats():
+    """{endpoint: {calls, errors, total_ms, max_ms, avg_ms}} since start-up (or the last reset)."""
+    with _stats_lock:
+        return {
+            endpoint: {**entry, 'avg_ms': round(entry['total_ms'] / entry['calls'], 1)}
+            for endpoint, entry in _stats.items()
+        }
+
+
+def reset_stripe_call_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class InstrumentedRequestsClient(stripe.RequestsClient):
+    """RequestsClient that times every HTTP attempt (retries count separately)."""
+
+    def _request_internal(self, method, url, headers, post_data, is_streaming):
+        started = time.perf_counter()
+        ok = False
+        try:
+            content, status, response_headers = super()._request_internal(
+                method, url, headers, post_data, is_streaming,
+            )
+            ok = status < 500
+            return content, status, response_headers
+        finally:
+            _record(endpoint_of(method, url), (time.perf_counter() - started) * 1000, ok)
+
+
+def _build_client():
+    pool_size = settings.STRIPE_HTTP_POOL_SIZE
+    session = requests.Session()
+    # Retries are the SDK's job (max_network_retries); the adapter must not add its own
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return InstrumentedRequestsClient(
+        timeout=(settings.STRIPE_CONNECT_TIMEOUT_SECONDS, settings.STRIPE_READ_TIMEOUT_SECONDS),
+        session=session,
+    )
+
+
+def http_client():
+    """The process-wide Stripe HTTP client (built on first use)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def configure_stripe():
+    """Point the module-level SDK at our key, API base and shared client."""
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.api_base = settings.STRIPE_API_BASE or DEFAULT_API_BASE
+    stripe.max_network_retries = settings.STRIPE_MAX_NETWORK_RETRIES
+    stripe.default_http_client = http_client()
+
+
+@contextmanager
+def stripe_api_base(api_base, api_key='sk_test_fake'):
+    """Temporarily send SDK calls to `api_base` (the fake server in tests/benchmarks)."""
+    previous = stripe.api_base, stripe.api_key
+    stripe.api_base = api_base
+    stripe.api_key = stripe.api_key or api_key
+    try:
+        yield
+    finally:
+        stripe.api_base, stripe.api_key = previous
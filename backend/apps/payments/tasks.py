@@ -9,16 +9,13 @@ from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
+def _payment_succeeded(task, event_data):
+    """Apply a payment_intent.succeeded event.
 
-@shared_task(bind=True, max_retries=10, default_retry_delay=1)
-def process_payment_succeeded(self, event_data):
-    """Process payment_intent.succeeded webhook event asynchronously.
-
-    Replaces the synchronous time.sleep() retry loop that blocked gunicorn workers.
-    Uses Celery's built-in retry with exponential backoff (up to 60s per retry).
-    Total retry window ~5 minutes to allow frontend booking creation to complete.
+    `task` is the running bound task: when the Payment row does not exist yet it
+    uses Celery's retry with exponential backoff (up to 60s per retry), a total
+    window of ~5 minutes to let frontend booking creation complete.
     """
     from apps.payments.models import Payment, PaymentAudit
     from apps.accounts.models import StaffProfile, StaffAction
@@ -69,12 +66,12 @@ def process_payment_succeeded(self, event_data):
             )
             return {'status': 'ignored_non_app', 'payment_intent_id': payment_intent_id}
 
-        if self.request.retries >= self.max_retries:
+        if task.request.retries >= task.max_retries:
             amount_dollars = payment_intent.get('amount', 0) / 100
             logger.critical(
                 f"ORPHANED PAYMENT: Stripe PI {payment_intent_id} succeeded "
                 f"(${amount_dollars:.2f}) but no Payment record found after "
-                f"{self.max_retries} retries. "
+                f"{task.max_retries} retries. "
                 f"Customer: {metadata.get('customer_email', 'unknown')}. "
                 f"Service: {metadata.get('service_type', 'unknown')}. "
                 f"Event: {event_id}. "
@@ -89,9 +86,9 @@ def process_payment_succeeded(self, event_data):
 
         logger.info(
             f"Webhook task: Payment not found for {payment_intent_id}, "
-            f"retry {self.request.retries}/{self.max_retries}"
+            f"retry {task.request.retries}/{task.max_retries}"
         )
-        raise self.retry(countdown=min(2 ** self.request.retries, 60))
+        raise task.retry(countdown=min(2 ** task.request.retries, 60))
 
     # Skip if already processed
     if payment.status == 'succeeded':
@@ -172,9 +169,8 @@ def process_payment_succeeded(self, event_data):
     return {'status': 'success', 'booking_number': booking.booking_number}
 
 
-@shared_task(bind=True, max_retries=10, default_retry_delay=1)
-def process_payment_failed(self, event_data):
-    """Process payment_intent.payment_failed webhook event asynchronously."""
+def _payment_failed(task, event_data):
+    """Apply a payment_intent.payment_failed event (same retry contract)."""
     from apps.payments.models import Payment, PaymentAudit
 
     payment_intent = event_data['data']['object']
@@ -185,11 +181,11 @@ def process_payment_failed(self, event_data):
             stripe_payment_intent_id=payment_intent_id
         )
     except Payment.DoesNotExist:
-        if self.request.retries >= self.max_retries:
+        if task.request.retries >= task.max_retries:
             metadata = payment_intent.get('metadata', {})
             logger.warning(
                 f"Webhook task: Payment not found for failed PI {payment_intent_id} "
-                f"after {self.max_retries} retries. "
+                f"after {task.max_retries} retries. "
                 f"Customer: {metadata.get('customer_email', 'unknown')}. "
                 f"No action needed — payment was not captured."
             )
@@ -197,9 +193,9 @@ def process_payment_failed(self, event_data):
 
         logger.info(
             f"Webhook task: Payment not found for failed {payment_intent_id}, "
-            f"retry {self.request.retries}/{self.max_retries}"
+            f"retry {task.request.retries}/{task.max_retries}"
         )
-        raise self.retry(countdown=min(2 ** self.request.retries, 60))
+        raise task.retry(countdown=min(2 ** task.request.retries, 60))
 
     # Update payment to failed
     payment.status = 'failed'
@@ -247,6 +243,187 @@ def process_payment_failed(self, event_data):
     return {'status': 'payment_failed', 'booking_number': booking.booking_number}
 
 
+def _charge_refunded_event(task, event_data):
+    """Sync Payment.status when a charge is refunded in Stripe (incl. dashboard
+    refunds). Keeps the DB authoritative so auto-recovery never materializes a
+    booking on refunded money (INC-004 B3). Refunds are never auto-issued by us —
+    this only records a refund that already happened in Stripe.
+    """
+    from apps.payments.models import Payment, PaymentAudit
+
+    charge = event_data['data']['object']
+    payment_intent_id = charge.get('payment_intent')
+    if not payment_intent_id:
+        logger.info("charge.refunded with no payment_intent — ignoring")
+        return {'status': 'ignored'}
+
+    amount = charge.get('amount') or 0
+    amount_refunded = charge.get('amount_refunded') or 0
+    fully = bool(charge.get('refunded')) or (amount and amount_refunded >= amount)
+    new_status = 'refunded' if fully else 'partially_refunded'
+
+    updated = 0
+    for payment in Payment.objects.filter(stripe_payment_intent_id=payment_intent_id):
+        # Skip if already at the target state (avoids duplicate audits on
+        # redelivery) or already fully refunded (never downgrade refunded ->
+        # partially_refunded). A partial -> full refund still proceeds.
+        if payment.status == new_status or payment.status == 'refunded':
+            continue
+        payment.status = new_status
+        payment.save(update_fields=['status', 'updated_at'])
+        updated += 1
+        try:
+            PaymentAudit.log(
+                action='refund_completed',
+                description=(
+                    f"Stripe charge refund synced: PI {payment_intent_id} "
+                    f"${amount_refunded / 100:.2f} of ${amount / 100:.2f} → {new_status}"
+                ),
+                payment=payment,
+            )
+        except Exception:
+            logger.exception("charge.refunded: PaymentAudit.log failed for PI %s", payment_intent_id)
+
+    logger.info(
+        f"charge.refunded: PI {payment_intent_id} → {new_status} ({updated} Payment row(s) synced)"
+    )
+    return {'status': 'processed', 'updated': updated}
+
+
+def _checkout_expired_event(task, event_data):
+    """Handle expired Checkout Sessions — mark pending Payment as expired."""
+    from apps.payments.models import Payment
+
+    session = event_data['data']['object']
+    payment_intent_id = session.get('payment_intent')
+
+    if payment_intent_id:
+        try:
+            payment = Payment.objects.get(
+                stripe_payment_intent_id=payment_intent_id,
+                status='pending'
+            )
+            payment.status = 'failed'
+            payment.failure_reason = 'Checkout session expired'
+            payment.save()
+            booking_num = payment.booking.booking_number if payment.booking else 'UNLINKED'
+            logger.info(
+                f"Checkout session expired for booking {booking_num}"
+            )
+        except Payment.DoesNotExist:
+            logger.info(f"No pending payment found for expired PI {payment_intent_id}")
+
+    return {'status': 'processed'}
+
+
+STRIPE_EVENT_HANDLERS = {
+    'payment_intent.succeeded': _payment_succeeded,
+    'payment_intent.payment_failed': _payment_failed,
+    'checkout.session.expired': _checkout_expired_event,
+    'charge.refunded': _charge_refunded_event,
+}
+
+# A 'received' row untouched this long lost its queued task (broker blip,
+# retry countdown dropped); a 'processing' row this old lost its worker.
+STUCK_RECEIVED_AFTER = timedelta(minutes=5)
+STUCK_PROCESSING_AFTER = timedelta(minutes=15)
+
+# Orphan sweeps fetch Stripe state for this many rows at a time, then apply
+# them; small enough that a fetched PI is seconds old when it's acted on
+ORPHAN_SWEEP_CHUNK = 100
+
+
+@shared_task(bind=True, max_retries=10, default_retry_delay=1)
+def process_stripe_event(self, stripe_event_pk):
+    """Process one stored StripeEvent by primary key.
+
+    Claims the row (received -> processing) so a duplicate enqueue is a no-op,
+    runs the handler for its type and records done/failed. A handler Retry
+    (Payment not created yet) puts the row back to 'received' for the retry.
+    """
+    from celery.exceptions import Retry
+    from django.db.models import F
+    from apps.payments.models import StripeEvent
+
+    claimed = StripeEvent.objects.filter(pk=stripe_event_pk, status='received').update(
+        status='processing', attempts=F('attempts') + 1, updated_at=timezone.now(),
+    )
+    if not claimed:
+        logger.info(f"StripeEvent {stripe_event_pk} not claimable (already handled or in flight)")
+        return {'status': 'skipped'}
+
+    event = StripeEvent.objects.get(pk=stripe_event_pk)
+    handler = STRIPE_EVENT_HANDLERS.get(event.event_type)
+
+    try:
+        result = handler(self, event.payload) if handler else {'status': 'ignored'}
+    except Retry:
+        StripeEvent.objects.filter(pk=event.pk).update(status='received', updated_at=timezone.now())
+        raise
+    except Exception as e:
+        StripeEvent.objects.filter(pk=event.pk).update(
+            status='failed', last_error=str(e)[:2000], updated_at=timezone.now(),
+        )
+        logger.exception(f"StripeEvent {event.stripe_event_id} ({event.event_type}) failed")
+        raise
+
+    StripeEvent.objects.filter(pk=event.pk).update(
+        status='done', result=result, last_error='',
+        processed_at=timezone.now(), updated_at=timezone.now(),
+    )
+    return result
+
+
+@shared_task(bind=True, max_retries=10, default_retry_delay=1)
+def process_payment_succeeded(self, event_data):
+    """Legacy entry point taking the full event JSON.
+
+    Kept so messages queued before the StripeEvent inbox drain cleanly; new
+    deliveries go through process_stripe_event.
+    """
+    return _payment_succeeded(self, event_data)
+
+
+@shared_task(bind=True, max_retries=10, default_retry_delay=1)
+def process_payment_failed(self, event_data):
+    """Legacy entry point taking the full event JSON (see process_payment_succeeded)."""
+    return _payment_failed(self, event_data)
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
+def sweep_stripe_events():
+    """Re-enqueue StripeEvent rows stuck in received/processing.
+
+    Runs every 5 minutes via Celery Beat. Failed rows are left alone — they
+    need a human (or `manage.py replay_stripe_events`).
+    """
+    from django.db.models import Q
+    from apps.payments.models import StripeEvent
+
+    now = timezone.now()
+    stuck = list(
+        StripeEvent.objects.filter(
+            Q(status='received', updated_at__lt=now - STUCK_RECEIVED_AFTER)
+            | Q(status='processing', updated_at__lt=now - STUCK_PROCESSING_AFTER)
+        ).order_by('received_at').values_list('pk', flat=True)[:500]
+    )
+    if not stuck:
+        return {'requeued': 0}
+
+    # A worker that died mid-run left 'processing'; make it claimable again.
+    StripeEvent.objects.filter(pk__in=stuck, status='processing').update(
+        status='received', updated_at=now,
+    )
+    for pk in stuck:
+        try:
+            process_stripe_event.delay(str(pk))
+        except Exception as e:
+            logger.warning(f"sweep_stripe_events: could not enqueue {pk}: {e}")
+
+    logger.warning(f"sweep_stripe_events: re-enqueued {len(stuck)} stuck Stripe event(s)")
+    return {'requeued': len(stuck)}
+
+
 @shared_task(autoretry_for=(OperationalError,), retry_backoff=True, retry_backoff_max=60, max_retries=3)
 def cleanup_orphaned_payments():
     """Cancel Stripe PIs and expire Payment records that were never linked to a booking.
@@ -256,24 +433,43 @@ def cleanup_orphaned_payments():
     created a PaymentIntent but never completed the booking.
     """
     from apps.payments.models import Payment, PaymentAudit
+    from apps.payments.stripe_batch import cancel_payment_intents, fetch_payment_intents
 
     cutoff = timezone.now() - timedelta(hours=24)
-    orphans = Payment.objects.filter(
+    orphans = list(Payment.objects.filter(
         booking__isnull=True,
         status='pending',
         created_at__lt=cutoff,
-    )
+    ).order_by('created_at', 'id'))
 
     cancelled_count = 0
     failed_count = 0
 
-    for payment in orphans:
-        # Before expiring, verify the PI hasn't actually been captured by Stripe.
-        # If the webhook task failed to update our DB but Stripe charged the card,
-        # we must NOT mark this as failed — it needs the orphan alert path instead.
-        if payment.stripe_payment_intent_id:
-            try:
-                pi = stripe.PaymentIntent.retrieve(payment.stripe_payment_intent_id)
+    # Stripe calls for a chunk run concurrently up front (stripe_batch); the
+    # DB updates below stay sequential. Oldest first, so each chunk is a
+    # narrow creation window for the list-by-window fetch.
+    for start in range(0, len(orphans), ORPHAN_SWEEP_CHUNK):
+        chunk = orphans[start:start + ORPHAN_SWEEP_CHUNK]
+        intents = fetch_payment_intents(
+            [payment.stripe_payment_intent_id for payment in chunk],
+            created_between=(chunk[0].created_at, chunk[-1].created_at),
+        )
+
+        to_cancel = []
+        for payment in chunk:
+            # Before expiring, verify the PI hasn't actually been captured by Stripe.
+            # If the webhook task failed to update our DB but Stripe charged the card,
+            # we must NOT mark this as failed — it needs the orphan alert path instead.
+            if payment.stripe_payment_intent_id:
+                pi = intents[payment.stripe_payment_intent_id]
+                if isinstance(pi, stripe.error.StripeError):
+                    logger.warning(
+                        f"Failed to verify orphaned PI {payment.stripe_payment_intent_id}: {pi}"
+                    )
+                    failed_count += 1
+                    continue
+                if isinstance(pi, Exception):
+                    raise pi
                 if pi.status == 'succeeded':
                     # Stripe captured funds but our DB still says 'pending' —
                     # fix the DB status and let alert_succeeded_orphans handle it
@@ -288,41 +484,40 @@ def cleanup_orphaned_payments():
                     )
                     failed_count += 1
                     continue
-            except stripe.error.StripeError as e:
-                logger.warning(
-                    f"Failed to verify orphaned PI {payment.stripe_payment_intent_id}: {e}"
-                )
-                failed_count += 1
-                continue
-
-        # Try to cancel the Stripe PI so the hold is released
-        if payment.stripe_payment_intent_id:
-            try:
-                stripe.PaymentIntent.cancel(payment.stripe_payment_intent_id)
-            except stripe.error.InvalidRequestError:
-                # PI already cancelled or otherwise not cancellable
-                pass
-            except stripe.error.StripeError as e:
-                logger.warning(
-                    f"Failed to cancel orphaned PI {payment.stripe_payment_intent_id}: {e}"
-                )
-                failed_count += 1
-                continue
-
-        payment.status = 'failed'
-        payment.failure_reason = 'Expired — booking never completed'
-        payment.save(update_fields=['status', 'failure_reason', 'updated_at'])
-
-        PaymentAudit.log(
-            action='payment_failed',
-            description=(
-                f"Orphaned payment expired (PI: {payment.stripe_payment_intent_id}). "
-                f"No booking created within 24 hours."
-            ),
-            payment=payment,
-            user=None,
-        )
-        cancelled_count += 1
+            to_cancel.append(payment)
+
+        # Try to cancel the Stripe PIs so the holds are released
+        cancelled = cancel_payment_intents([payment.stripe_payment_intent_id for payment in to_cancel])
+
+        for payment in to_cancel:
+            if payment.stripe_payment_intent_id:
+                result = cancelled[payment.stripe_payment_intent_id]
+                # InvalidRequestError: PI already cancelled or otherwise not cancellable
+                if isinstance(result, stripe.error.StripeError) and not isinstance(
+                    result, stripe.error.InvalidRequestError
+                ):
+                    logger.warning(
+                        f"Failed to cancel orphaned PI {payment.stripe_payment_intent_id}: {result}"
+                    )
+                    failed_count += 1
+                    continue
+                if isinstance(result, Exception) and not isinstance(result, stripe.error.StripeError):
+                    raise result
+
+            payment.status = 'failed'
+            payment.failure_reason = 'Expired — booking never completed'
+            payment.save(update_fields=['status', 'failure_reason', 'updated_at'])
+
+            PaymentAudit.log(
+                action='payment_failed',
+                description=(
+                    f"Orphaned payment expired (PI: {payment.stripe_payment_intent_id}). "
+                    f"No booking created within 24 hours."
+                ),
+                payment=payment,
+                user=None,
+            )
+            cancelled_count += 1
 
     if cancelled_count or failed_count:
         logger.info(
@@ -408,19 +603,30 @@ def alert_succeeded_orphans():
         "",
     ]
 
-    # Collect per-payment details for the email body
+    # Collect per-payment details for the email body. Metadata for every
+    # orphan is fetched up front, concurrently (stripe_batch).
+    from apps.payments.stripe_batch import fetch_payment_intents
+    intents = fetch_payment_intents(
+        [payment.stripe_payment_intent_id for payment in orphans_to_alert],
+        created_between=(
+            min(payment.created_at for payment in orphans_to_alert),
+            max(payment.created_at for payment in orphans_to_alert),
+        ),
+    )
+
     payment_details = []
     for payment in orphans_to_alert:
         # Fetch customer email from Stripe PI metadata
         customer_email = "unknown"
         service_type = "unknown"
-        try:
-            pi = stripe.PaymentIntent.retrieve(payment.stripe_payment_intent_id)
-            metadata = pi.get('metadata', {}) if hasattr(pi, 'get') else getattr(pi, 'metadata', {})
-            customer_email = metadata.get('customer_email', 'unknown')
-            service_type = metadata.get('service_type', 'unknown')
-        except Exception:
-            pass
+        pi = intents.get(payment.stripe_payment_intent_id)
+        if pi is not None and not isinstance(pi, Exception):
+            try:
+                metadata = pi.get('metadata', {}) if hasattr(pi, 'get') else getattr(pi, 'metadata', {})
+                customer_email = metadata.get('customer_email', 'unknown')
+                service_type = metadata.get('service_type', 'unknown')
+            except Exception:
+                pass
 
         lines.extend([
             f"Payment ID: {payment.id}",
@@ -475,6 +681,14 @@ def alert_succeeded_orphans():
     return {'alerted': len(orphans_to_alert), 'email_sent': True}
 
 
+# Captures claimed per round trip, and how long a claim is held without a
+# heartbeat (also the retry backoff for captures that stay 'pending').
+RECONCILE_CLAIM_CHUNK = 25
+RECONCILE_LEASE = timedelta(minutes=2)
+# Stop claiming new chunks after this long — headroom under the 540s soft limit
+RECONCILE_TIME_BUDGET_SECONDS = 420
+
+
 @shared_task(
     autoretry_for=(OperationalError,),
     retry_backoff=True,
@@ -483,7 +697,7 @@ def alert_succeeded_orphans():
     time_limit=600,
     soft_time_limit=540,
 )
-def reconcile_pending_payments():
+def reconcile_pending_payments(fan_out=True):
     """Auto-recover orphaned payments from captured PendingBooking rows (INC-004).
 
     Runs every ~5 minutes. For each PendingBooking still awaiting materialization
@@ -497,10 +711,26 @@ def reconcile_pending_payments():
     Leaves genuinely-unpaid captures alone (cleanup_orphaned_payments cancels those
     PIs); marks captures whose payment failed/refunded as abandoned so they stop
     being re-scanned.
+
+    Work is claimed in chunks with SELECT ... FOR UPDATE SKIP LOCKED plus a
+    per-row lease (recovery.claim_pending_captures), so any number of runs can
+    drain a backlog side by side without touching the same capture. A run keeps
+    claiming until nothing is left or its time budget is spent; when it finds a
+    backlog it enqueues up to ORPHAN_RECOVERY_WORKERS - 1 helper runs
+    (fan_out=False). Databases without SKIP LOCKED (SQLite) fall back to the
+    old singleton lock.
     """
+    import os
+    import socket
+    import time
+    import uuid
+
     from apps.bookings.models import PendingBooking
     from apps.bookings.recovery import (
         autorecovery_enabled,
+        claim_pending_captures,
+        claims_are_exclusive,
+        extend_claims,
         materialize_pending_booking,
     )
     from apps.payments.models import Payment
@@ -509,65 +739,84 @@ def reconcile_pending_payments():
     if not autorecovery_enabled():
         return {'recovered': 0, 'skipped': 'disabled'}
 
-    # Singleton guard: the per-run time budget (soft 540s) can exceed the 5-min
-    # beat interval, so two runs could otherwise overlap and double-process
-    # tie-ordered siblings. Only one reconcile runs at a time.
-    lock_id = 'reconcile_pending_payments_lock'
-    # TTL must exceed the hard time_limit (600s) so the guard cannot expire while a
-    # slow run is still alive (which would let a second run start concurrently).
-    if not cache.add(lock_id, '1', timeout=660):
-        logger.info("reconcile_pending_payments: another run holds the lock, skipping")
-        return {'recovered': 0, 'skipped': 'locked'}
+    # Singleton guard when claims can't be made disjoint: the per-run time budget
+    # (soft 540s) can exceed the 5-min beat interval, so two runs could otherwise
+    # overlap and double-process tie-ordered siblings.
+    lock_id = None
+    if not claims_are_exclusive():
+        lock_id = 'reconcile_pending_payments_lock'
+        # TTL must exceed the hard time_limit (600s) so the guard cannot expire while a
+        # slow run is still alive (which would let a second run start concurrently).
+        if not cache.add(lock_id, '1', timeout=660):
+            logger.info("reconcile_pending_payments: another run holds the lock, skipping")
+            return {'recovered': 0, 'skipped': 'locked'}
 
     try:
         grace_minutes = getattr(settings, 'ORPHAN_RECOVERY_GRACE_MINUTES', 3)
         cutoff = timezone.now() - timedelta(minutes=grace_minutes)
-
-        BATCH = 200
-        pendings = list(PendingBooking.objects.filter(
-            status='pending',
-            created_at__lt=cutoff,
-        ).order_by('created_at', 'id')[:BATCH])  # deterministic order → concurrent
-        #                                          passes serialize on the same row
-
-        if len(pendings) >= BATCH:
-            logger.critical(
-                "reconcile_pending_payments: batch saturated at %d pending captures — "
-                "newer orphans may be delayed; investigate backlog.", BATCH
-            )
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        deadline = time.monotonic() + RECONCILE_TIME_BUDGET_SECONDS
+        heartbeat_every = RECONCILE_LEASE.total_seconds() / 3
 
         recovered = 0
         duplicates = 0
         failed = 0
         not_yet_paid = 0
-
-        for pending in pendings:
-            try:
-                outcome = _reconcile_one(pending, Payment, materialize_pending_booking)
-            except Exception:
-                # Per-row isolation: one poison capture must not abort the whole
-                # batch (which, with oldest-first ordering, would starve every newer
-                # orphan permanently). Log and move on.
-                logger.exception(
-                    "reconcile_pending_payments: unexpected error processing "
-                    "PendingBooking %s (PI %s)", pending.id, pending.stripe_payment_intent_id
-                )
-                failed += 1
-                continue
-            if outcome == 'recovered':
-                recovered += 1
-            elif outcome == 'duplicate':
-                duplicates += 1
-            elif outcome == 'failed':
-                failed += 1
-            elif outcome == 'not_yet_paid':
-                not_yet_paid += 1
-            # 'retired' (abandoned capture) counts toward none
+        claimed = 0
+        drained = False
+
+        while time.monotonic() < deadline:
+            # Deterministic oldest-first order → concurrent passes serialize on
+            # the same rows instead of deadlocking
+            pendings = claim_pending_captures(
+                worker_id, created_before=cutoff, limit=RECONCILE_CLAIM_CHUNK, lease=RECONCILE_LEASE,
+            )
+            if not pendings:
+                drained = True
+                break
+            if fan_out and lock_id is None and not claimed:
+                _fan_out_reconcile(PendingBooking, cutoff)
+            claimed += len(pendings)
+
+            last_heartbeat = time.monotonic()
+            for index, (pending, intent) in enumerate(_with_prefetched_intents(pendings, Payment)):
+                if time.monotonic() - last_heartbeat > heartbeat_every:
+                    extend_claims(worker_id, [p.id for p in pendings[index:]], RECONCILE_LEASE)
+                    last_heartbeat = time.monotonic()
+                try:
+                    outcome = _reconcile_one(pending, Payment, materialize_pending_booking, intent=intent)
+                except Exception:
+                    # Per-row isolation: one poison capture must not abort the whole
+                    # batch (which, with oldest-first ordering, would starve every newer
+                    # orphan permanently). Log and move on; its lease expiring is
+                    # the retry backoff.
+                    logger.exception(
+                        "reconcile_pending_payments: unexpected error processing "
+                        "PendingBooking %s (PI %s)", pending.id, pending.stripe_payment_intent_id
+                    )
+                    failed += 1
+                    continue
+                if outcome == 'recovered':
+                    recovered += 1
+                elif outcome == 'duplicate':
+                    duplicates += 1
+                elif outcome == 'failed':
+                    failed += 1
+                elif outcome == 'not_yet_paid':
+                    not_yet_paid += 1
+                # 'retired' (abandoned capture) counts toward none
+
+        if not drained:
+            logger.critical(
+                "reconcile_pending_payments: time budget spent after %d capture(s) with "
+                "more still claimable — backlog is not draining; investigate.", claimed
+            )
 
         if recovered or duplicates or failed:
             logger.info(
                 f"reconcile_pending_payments: recovered={recovered} "
-                f"duplicates={duplicates} failed={failed} not_yet_paid={not_yet_paid}"
+                f"duplicates={duplicates} failed={failed} not_yet_paid={not_yet_paid} "
+                f"claimed={claimed} worker={worker_id}"
             )
 
         return {
@@ -575,9 +824,37 @@ def reconcile_pending_payments():
             'duplicates': duplicates,
             'failed': failed,
             'not_yet_paid': not_yet_paid,
+            'claimed': claimed,
+            'drained': drained,
         }
     finally:
-        cache.delete(lock_id)
+        if lock_id:
+            cache.delete(lock_id)
+
+
+def _fan_out_reconcile(PendingBooking, cutoff):
+    """Enqueue helper reconcile runs for a backlog bigger than one claim chunk."""
+    from django.db.models import Q
+
+    backlog = PendingBooking.objects.filter(
+        Q(claimed_until__isnull=True) | Q(claimed_until__lt=timezone.now()),
+        status='pending',
+        created_at__lt=cutoff,
+    ).count()
+    helpers = min(
+        getattr(settings, 'ORPHAN_RECOVERY_WORKERS', 4) - 1,
+        backlog // RECONCILE_CLAIM_CHUNK,
+    )
+    for _ in range(max(helpers, 0)):
+        try:
+            reconcile_pending_payments.delay(fan_out=False)
+        except Exception as e:
+            logger.warning(f"reconcile_pending_payments: could not enqueue helper run: {e}")
+            break
+    if helpers > 0:
+        logger.warning(
+            f"reconcile_pending_payments: backlog of {backlog} capture(s), enqueued {helpers} helper run(s)"
+        )
 
 
 def _charge_id(charge):
@@ -603,9 +880,48 @@ def _charge_refunded(charge):
         return False
 
 
-def _reconcile_one(pending, Payment, materialize_pending_booking):
+# Reconcile materializes bookings between fetches, which is slower than the
+# other sweeps; keep its chunks smaller so prefetched PI state stays fresh
+RECONCILE_FETCH_CHUNK = 25
+
+
+def _with_prefetched_intents(pendings, Payment):
+    """Yield (pending, PaymentIntent | exception | None) in order.
+
+    Captures whose Payment is already succeeded (or refunded) don't need
+    Stripe and get None. The rest have their PIs fetched concurrently, one
+    chunk at a time (stripe_batch), right before that chunk is processed.
+    """
+    from apps.payments.stripe_batch import fetch_payment_intents
+
+    # Status of the oldest Payment per PI, as _reconcile_one picks it
+    first_status = {}
+    for pi_id, status in Payment.objects.filter(
+        stripe_payment_intent_id__in=[p.stripe_payment_intent_id for p in pendings],
+    ).order_by('created_at').values_list('stripe_payment_intent_id', 'status'):
+        first_status.setdefault(pi_id, status)
+
+    for start in range(0, len(pendings), RECONCILE_FETCH_CHUNK):
+        chunk = pendings[start:start + RECONCILE_FETCH_CHUNK]
+        need_stripe = [
+            p.stripe_payment_intent_id for p in chunk
+            if first_status.get(p.stripe_payment_intent_id) not in ('succeeded', 'refunded', 'partially_refunded')
+        ]
+        intents = fetch_payment_intents(
+            need_stripe,
+            created_between=(chunk[0].created_at, chunk[-1].created_at),
+            expand=['latest_charge'],
+        ) if need_stripe else {}
+        for pending in chunk:
+            yield pending, intents.get(pending.stripe_payment_intent_id)
+
+
+def _reconcile_one(pending, Payment, materialize_pending_booking, intent=None):
     """Process a single PendingBooking. Returns an outcome category:
-    'retired' | 'not_yet_paid' | 'recovered' | 'duplicate' | 'failed'."""
+    'retired' | 'not_yet_paid' | 'recovered' | 'duplicate' | 'failed'.
+
+    `intent` is the PI already fetched for this capture (or the error fetching
+    it raised); without one it is retrieved here."""
     pi_id = pending.stripe_payment_intent_id
     payment = (
         Payment.objects.filter(stripe_payment_intent_id=pi_id)
@@ -634,7 +950,12 @@ def _reconcile_one(pending, Payment, materialize_pending_booking):
     charged = bool(payment and payment.status == 'succeeded')
     if not charged:
         try:
-            pi = stripe.PaymentIntent.retrieve(pi_id, expand=['latest_charge'])
+            if intent is None:
+                pi = stripe.PaymentIntent.retrieve(pi_id, expand=['latest_charge'])
+            elif isinstance(intent, Exception):
+                raise intent
+            else:
+                pi = intent
         except stripe.error.StripeError as e:
             logger.warning(f"reconcile: could not retrieve PI {pi_id}: {e}")
             return 'not_yet_paid'
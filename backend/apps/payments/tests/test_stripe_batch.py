@@ -0,0 +1,117 @@
+# apps/payments/tests/test_stripe_batch.py
+"""
+Orphan sweeps fetch PaymentIntents concurrently / by creation window, then
+apply the results sequentially with the same per-row outcomes as before.
+"""
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+import stripe
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.payments.management.commands.benchmark_orphan_sweep import StripeStandIn
+from apps.payments.models import Payment
+from apps.payments.stripe_batch import LIST_MIN_IDS, fetch_payment_intents
+from apps.payments.tasks import cleanup_orphaned_payments
+
+NOW = timezone.now()
+
+
+def _intents(count, created=NOW):
+    return [
+        {
+            'id': f'pi_batch_{i}', 'object': 'payment_intent', 'status': 'requires_payment_method',
+            'created': int((created - timedelta(seconds=i)).timestamp()), 'metadata': {},
+        }
+        for i in range(count)
+    ]
+
+
+def _patched(stand_in):
+    return (
+        patch.object(stripe.PaymentIntent, 'retrieve', stand_in.retrieve),
+        patch.object(stripe.PaymentIntent, 'list', stand_in.list),
+        patch.object(stripe.PaymentIntent, 'cancel', stand_in.cancel),
+    )
+
+
+class TestFetchPaymentIntents:
+
+    def test_small_batches_are_retrieved_concurrently(self):
+        stand_in = StripeStandIn(_intents(16), latency=0.05)
+        ids = list(stand_in.intents)
+
+        retrieve, list_, _ = _patched(stand_in)
+        with retrieve, list_:
+            started = time.perf_counter()
+            intents = fetch_payment_intents(ids, created_between=(NOW - timedelta(minutes=1), NOW))
+            elapsed = time.perf_counter() - started
+
+        assert [intents[pi_id].id for pi_id in ids] == ids
+        assert stand_in.calls == {'retrieve': 16, 'list': 0, 'cancel': 0}
+        assert elapsed < 16 * 0.05 / 2
+
+    def test_dense_window_is_listed(self):
+        count = LIST_MIN_IDS + 10
+        stand_in = StripeStandIn(_intents(count), latency=0)
+
+        retrieve, list_, _ = _patched(stand_in)
+        with retrieve, list_:
+            intents = fetch_payment_intents(
+                list(stand_in.intents), created_between=(NOW - timedelta(minutes=1), NOW),
+            )
+
+        assert len(intents) == count
+        assert stand_in.calls['list'] == 1
+        assert stand_in.calls['retrieve'] == 0
+
+    def test_errors_are_returned_per_intent(self):
+        stand_in = StripeStandIn(_intents(2), latency=0)
+
+        retrieve, list_, _ = _patched(stand_in)
+        with retrieve, list_:
+            intents = fetch_payment_intents(['pi_batch_0', 'pi_missing', 'pi_batch_1'])
+
+        assert intents['pi_batch_0'].status == 'requires_payment_method'
+        assert isinstance(intents['pi_missing'], stripe.error.InvalidRequestError)
+        assert intents['pi_batch_1'].id == 'pi_batch_1'
+
+
+@pytest.mark.django_db
+class TestCleanupOrphanedPayments:
+
+    def test_sweep_outcomes_match_stripe_state(self):
+        created = NOW - timedelta(hours=25)
+        intents = _intents(LIST_MIN_IDS + 5, created=created)
+        intents[0]['status'] = 'succeeded'
+        intents[1]['status'] = 'canceled'
+        for intent in intents:
+            payment = Payment.objects.create(
+                amount_cents=5000, status='pending', stripe_payment_intent_id=intent['id'],
+            )
+            Payment.objects.filter(pk=payment.pk).update(created_at=created)
+        stand_in = StripeStandIn(intents, latency=0)
+
+        retrieve, list_, cancel = _patched(stand_in)
+        with retrieve, list_, cancel:
+            result = cleanup_orphaned_payments()
+
+        # succeeded → promoted for the alert path; already-canceled still expires
+        assert result == {'expired': len(intents) - 1, 'failed': 1}
+        assert Payment.objects.get(stripe_payment_intent_id='pi_batch_0').status == 'succeeded'
+        assert Payment.objects.filter(status='failed').count() == len(intents) - 1
+        assert stand_in.calls['retrieve'] == 0
+        assert stand_in.calls['cancel'] == len(intents) - 1
+
+    def test_benchmark_command_runs(self):
+        out = StringIO()
+        call_command('benchmark_orphan_sweep', orphans=30, latency_ms=0, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert [line.split()[0] for line in lines] == ['serial', 'concurrent', 'batched']
+        assert all('expired=29 failed=1' in line for line in lines)
+        assert not Payment.objects.exists()
@@ -0,0 +1,93 @@
+# apps/payments/tests/test_stripe_client.py
+"""
+The shared Stripe HTTP client (timeouts, retries, latency stats) and the local
+fake Stripe server, exercised through the real SDK over HTTP.
+"""
+import pytest
+import stripe
+from django.conf import settings
+from rest_framework.test import APIClient
+
+from apps.bookings.tests.test_orphan_recovery import guest_booking_payload, package  # noqa: F401
+from apps.payments.models import Payment
+from apps.payments.stripe_client import (
+    InstrumentedRequestsClient,
+    endpoint_of,
+    http_client,
+    reset_stripe_call_stats,
+    stripe_call_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    reset_stripe_call_stats()
+    yield
+    reset_stripe_call_stats()
+
+
+def test_sdk_uses_the_shared_client():
+    client = http_client()
+
+    assert stripe.default_http_client is client
+    assert client._timeout == (settings.STRIPE_CONNECT_TIMEOUT_SECONDS, settings.STRIPE_READ_TIMEOUT_SECONDS)
+    assert stripe.max_network_retries == settings.STRIPE_MAX_NETWORK_RETRIES
+    assert client._session.get_adapter('https://api.stripe.com')._pool_maxsize == settings.STRIPE_HTTP_POOL_SIZE
+
+
+def test_endpoints_group_object_ids():
+    assert endpoint_of('get', 'https://api.stripe.com/v1/payment_intents/pi_3NxAbc123') == \
+        'GET /v1/payment_intents/{id}'
+    assert endpoint_of('post', 'http://127.0.0.1:1/v1/payment_intents/pi_FakeAbc1/cancel') == \
+        'POST /v1/payment_intents/{id}/cancel'
+    assert endpoint_of('post', 'https://api.stripe.com/v1/checkout/sessions') == 'POST /v1/checkout/sessions'
+
+
+def test_calls_are_timed_per_endpoint(fake_stripe):
+    intent = stripe.PaymentIntent.create(amount=1500, currency='usd', metadata={'booking_id': 'b1'})
+    stripe.PaymentIntent.retrieve(intent.id)
+    stripe.PaymentIntent.retrieve(intent.id)
+
+    stats = stripe_call_stats()
+    assert stats['POST /v1/payment_intents']['calls'] == 1
+    assert stats['GET /v1/payment_intents/{id}']['calls'] == 2
+    assert stats['GET /v1/payment_intents/{id}']['errors'] == 0
+    assert fake_stripe.api.payment_intents[intent.id]['metadata'] == {'booking_id': 'b1'}
+
+
+def test_server_errors_are_retried(fake_stripe):
+    intent = stripe.PaymentIntent.create(amount=1500, currency='usd')
+    fake_stripe.fail_next(1, status=503)
+
+    assert stripe.PaymentIntent.retrieve(intent.id).id == intent.id
+    retrieves = stripe_call_stats()['GET /v1/payment_intents/{id}']
+    assert (retrieves['calls'], retrieves['errors']) == (2, 1)
+
+
+def test_read_timeout_is_enforced(fake_stripe, monkeypatch):
+    monkeypatch.setattr(stripe, 'default_http_client', InstrumentedRequestsClient(timeout=(1, 0.1)))
+    monkeypatch.setattr(stripe, 'max_network_retries', 0)
+    fake_stripe.latency = 0.5
+
+    with pytest.raises(stripe.error.APIConnectionError):
+        stripe.PaymentIntent.create(amount=1500, currency='usd')
+    assert stripe_call_stats()['POST /v1/payment_intents']['errors'] == 1
+
+
+@pytest.mark.django_db
+def test_checkout_payment_intent_against_fake_stripe(fake_stripe, package):
+    payload = guest_booking_payload(package, email='fake-stripe@example.com')
+    response = APIClient().post('/api/public/create-payment-intent/', {
+        'service_type': 'mini_move',
+        'mini_move_package_id': str(package.id),
+        'pickup_date': payload['pickup_date'],
+        'first_name': 'Lauren', 'last_name': 'Sachs',
+        'email': 'fake-stripe@example.com', 'phone': '2019194770',
+        'pickup_zip_code': '10001', 'delivery_zip_code': '10002',
+        'booking_payload': payload,
+    }, format='json')
+
+    assert response.status_code == 200, response.data
+    pi_id = Payment.objects.get().stripe_payment_intent_id
+    assert pi_id in fake_stripe.api.payment_intents
+    assert response.data['client_secret'] == fake_stripe.api.payment_intents[pi_id]['client_secret']
@@ -0,0 +1,168 @@
+# backend/apps/payments/tests/test_stripe_events.py
+"""
+StripeEvent inbox: insert-or-ignore on receipt, pk-only task, sweeper, replay.
+"""
+import pytest
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.bookings.models import Booking, Address, GuestCheckout
+from apps.payments.models import Payment, StripeEvent
+from apps.payments.tasks import process_stripe_event, sweep_stripe_events
+from apps.services.models import MiniMovePackage
+
+
+@pytest.fixture
+def pending_payment(db):
+    package, _ = MiniMovePackage.objects.get_or_create(
+        package_type='petite',
+        defaults={'name': 'Petite', 'base_price_cents': 99500, 'max_items': 15, 'is_active': True},
+    )
+    guest = GuestCheckout.objects.create(
+        first_name='Event', last_name='Test', email='event@example.com', phone='5551234567',
+    )
+    booking = Booking.objects.create(
+        guest_checkout=guest,
+        service_type='mini_move',
+        mini_move_package=package,
+        pickup_address=Address.objects.create(
+            address_line_1='1 Test St', city='New York', state='NY', zip_code='10001'),
+        delivery_address=Address.objects.create(
+            address_line_1='2 Test Ave', city='New York', state='NY', zip_code='10002'),
+        pickup_date=timezone.now().date() + timedelta(days=2),
+        status='pending',
+    )
+    return Payment.objects.create(
+        booking=booking,
+        stripe_payment_intent_id='pi_inbox_test',
+        amount_cents=99500,
+        status='pending',
+    )
+
+
+def _succeeded_event(event_id='evt_inbox_1', pi='pi_inbox_test'):
+    return {
+        'id': event_id,
+        'type': 'payment_intent.succeeded',
+        'data': {'object': {'id': pi, 'latest_charge': 'ch_inbox', 'amount': 99500}},
+    }
+
+
+def _deliver(event):
+    with patch('stripe.Webhook.construct_event', return_value=event):
+        return APIClient().post(
+            '/api/payments/webhook/',
+            data={},
+            content_type='application/json',
+            HTTP_STRIPE_SIGNATURE='test_signature',
+        )
+
+
+@pytest.mark.django_db
+class TestStripeEventInbox:
+
+    @patch('apps.logistics.models.create_onfleet_tasks_on_payment')
+    def test_webhook_stores_event_and_task_marks_done(self, mock_signal, pending_payment):
+        response = _deliver(_succeeded_event())
+
+        assert response.status_code == 200
+        event = StripeEvent.objects.get(stripe_event_id='evt_inbox_1')
+        assert event.status == 'done'
+        assert event.attempts == 1
+        assert event.result['status'] == 'success'
+        pending_payment.refresh_from_db()
+        assert pending_payment.status == 'succeeded'
+
+    def test_task_is_enqueued_with_pk_only(self, pending_payment):
+        with patch('apps.payments.views.process_stripe_event.delay') as delay:
+            _deliver(_succeeded_event())
+
+        event = StripeEvent.objects.get()
+        delay.assert_called_once_with(str(event.pk))
+        assert event.status == 'received'
+
+    def test_duplicate_delivery_is_ignored(self, pending_payment):
+        with patch('apps.payments.views.process_stripe_event.delay') as delay:
+            _deliver(_succeeded_event())
+            second = _deliver(_succeeded_event())
+
+        assert second.data['status'] == 'already_received'
+        assert StripeEvent.objects.count() == 1
+        assert delay.call_count == 1
+
+    def test_unhandled_type_is_recorded_done(self, db):
+        response = _deliver({'id': 'evt_other', 'type': 'customer.created', 'data': {'object': {}}})
+
+        assert response.data['status'] == 'ignored'
+        assert StripeEvent.objects.get().status == 'done'
+
+    def test_claimed_event_is_not_processed_twice(self, pending_payment):
+        with patch('apps.payments.views.process_stripe_event.delay'):
+            _deliver(_succeeded_event())
+        event = StripeEvent.objects.get()
+        StripeEvent.objects.filter(pk=event.pk).update(status='processing')
+
+        assert process_stripe_event(str(event.pk)) == {'status': 'skipped'}
+
+    def test_handler_error_marks_failed(self, pending_payment):
+        with patch('apps.payments.views.process_stripe_event.delay'):
+            _deliver(_succeeded_event())
+        event = StripeEvent.objects.get()
+
+        with patch.dict('apps.payments.tasks.STRIPE_EVENT_HANDLERS',
+                        {'payment_intent.succeeded': lambda task, data: 1 / 0}):
+            with pytest.raises(ZeroDivisionError):
+                process_stripe_event(str(event.pk))
+
+        event.refresh_from_db()
+        assert event.status == 'failed'
+        assert 'division' in event.last_error
+
+
+@pytest.mark.django_db
+class TestSweepAndReplay:
+
+    @patch('apps.logistics.models.create_onfleet_tasks_on_payment')
+    def test_sweeper_requeues_stuck_rows(self, mock_signal, pending_payment):
+        with patch('apps.payments.views.process_stripe_event.delay'):
+            _deliver(_succeeded_event())
+        StripeEvent.objects.update(updated_at=timezone.now() - timedelta(minutes=10))
+
+        assert sweep_stripe_events() == {'requeued': 1}
+        assert StripeEvent.objects.get().status == 'done'
+
+    def test_sweeper_leaves_fresh_and_failed_rows(self, pending_payment):
+        with patch('apps.payments.views.process_stripe_event.delay'):
+            _deliver(_succeeded_event('evt_fresh'))
+            _deliver(_succeeded_event('evt_failed'))
+        StripeEvent.objects.filter(stripe_event_id='evt_failed').update(
+            status='failed', updated_at=timezone.now() - timedelta(hours=1),
+        )
+
+        assert sweep_stripe_events() == {'requeued': 0}
+
+    @patch('apps.logistics.models.create_onfleet_tasks_on_payment')
+    def test_replay_command_reprocesses_failed_events(self, mock_signal, pending_payment):
+        with patch('apps.payments.views.process_stripe_event.delay'):
+            _deliver(_succeeded_event())
+        StripeEvent.objects.update(status='failed', last_error='boom')
+
+        out = StringIO()
+        call_command('replay_stripe_events', '--status', 'failed', '--sync', stdout=out)
+
+        event = StripeEvent.objects.get()
+        assert event.status == 'done'
+        assert event.last_error == ''
+        assert 'Processed 1 event(s)' in out.getvalue()
+        pending_payment.refresh_from_db()
+        assert pending_payment.status == 'succeeded'
+
+    def test_replay_requires_a_filter(self, db):
+        from django.core.management.base import CommandError
+        with pytest.raises(CommandError):
+            call_command('replay_stripe_events', stdout=StringIO())
@@ -1,4 +1,5 @@
 # backend/apps/payments/views.py
+import json
 import stripe
 import logging
 from rest_framework import generics, status, permissions
@@ -8,15 +9,17 @@ from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.utils import timezone
 from django.http import HttpResponse
 from django.conf import settings
-from django.core.cache import cache
-from django.db import transaction, models
+from django.db import IntegrityError, transaction, models
 from django.contrib.auth import get_user_model
 
+from celery.exceptions import OperationalError as CeleryOperationalError
 from django_ratelimit.decorators import ratelimit
 
-from .models import Payment, Refund, PaymentAudit
+from .models import Payment, Refund, PaymentAudit, StripeEvent
+from .tasks import STRIPE_EVENT_HANDLERS, process_stripe_event
 from .serializers import (
     PaymentIntentCreateSerializer,
     PaymentSerializer,
@@ -140,8 +143,8 @@ class StripeWebhookView(APIView):
     """
     Production webhook handler for Stripe events
     - Verifies webhook signatures
-    - Handles payment_intent.succeeded and payment_intent.payment_failed
-    - Idempotent (won't process same event twice)
+    - Stores each event once in the StripeEvent inbox (idempotent)
+    - Processing runs in process_stripe_event (payments/tasks.py)
     - Comprehensive logging and audit trail
     """
     permission_classes = [permissions.AllowAny]
@@ -173,143 +176,45 @@ class StripeWebhookView(APIView):
         # Extract event data
         event_id = event['id']
         event_type = event['type']
-        
-        # Idempotency check - prevent processing same event twice
-        cache_key = f'stripe_event_{event_id}'
-        if cache.get(cache_key):
-            logger.info(f"Webhook: Event {event_id} already processed, skipping")
-            return Response({'status': 'already_processed'}, status=status.HTTP_200_OK)
-
-        logger.info(f"Webhook: Processing event {event_id} of type {event_type}")
-
-        # NOTE: the idempotency flag is set by each handler only AFTER the task
-        # is successfully dispatched/handled. If dispatch fails we return non-2xx
-        # so Stripe retries the delivery instead of the event being marked
-        # "processed" and silently lost (INC-003).
-        if event_type == 'payment_intent.succeeded':
-            return self._handle_payment_succeeded(event, cache_key)
-        elif event_type == 'payment_intent.payment_failed':
-            return self._handle_payment_failed(event, cache_key)
-        elif event_type == 'checkout.session.expired':
-            return self._handle_checkout_expired(event, cache_key)
-        elif event_type == 'charge.refunded':
-            return self._handle_charge_refunded(event, cache_key)
-        else:
-            logger.info(f"Webhook: Unhandled event type {event_type}")
-            cache.set(cache_key, True, timeout=259200)
-            return Response({'status': 'ignored'}, status=status.HTTP_200_OK)
-    
-    def _handle_payment_succeeded(self, event, cache_key):
-        """Dispatch payment succeeded processing to Celery task.
-
-        The task handles retry logic via Celery's built-in retry mechanism
-        instead of blocking the gunicorn worker with time.sleep().
-        """
-        from apps.payments.tasks import process_payment_succeeded
-        from celery.exceptions import OperationalError
-        try:
-            process_payment_succeeded.delay(dict(event))
-        except OperationalError:
-            # Broker unreachable — the task was never enqueued. Return non-2xx so
-            # Stripe retries delivery instead of the event being marked processed
-            # and silently lost (INC-003).
-            logger.exception("Broker unavailable; could not enqueue payment succeeded task")
-            return Response(
-                {'error': 'dispatch failed'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-        except Exception:
-            # Eager/test mode runs the task inline; task-level errors (e.g. Retry)
-            # are not dispatch failures and must not block the webhook ack.
-            logger.exception("Payment succeeded task raised during eager execution")
-        cache.set(cache_key, True, timeout=259200)
-        return Response({'status': 'processing'}, status=status.HTTP_200_OK)
 
-    def _handle_payment_failed(self, event, cache_key):
-        """Dispatch payment failed processing to Celery task."""
-        from apps.payments.tasks import process_payment_failed
-        from celery.exceptions import OperationalError
+        # Idempotency: one StripeEvent row per Stripe event id. The unique
+        # constraint makes this insert-or-ignore, and unlike the old Redis
+        # flag it survives a cache flush.
         try:
-            process_payment_failed.delay(dict(event))
-        except OperationalError:
-            logger.exception("Broker unavailable; could not enqueue payment failed task")
+            with transaction.atomic():
+                stripe_event = StripeEvent.objects.create(
+                    stripe_event_id=event_id,
+                    event_type=event_type,
+                    payload=json.loads(json.dumps(event)),
+                )
+        except IntegrityError:
+            existing = StripeEvent.objects.only('status').get(stripe_event_id=event_id)
+            logger.info(f"Webhook: Event {event_id} already received ({existing.status}), skipping")
             return Response(
-                {'error': 'dispatch failed'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                {'status': 'already_processed' if existing.status == 'done' else 'already_received'},
+                status=status.HTTP_200_OK,
             )
-        except Exception:
-            logger.exception("Payment failed task raised during eager execution")
-        cache.set(cache_key, True, timeout=259200)
-        return Response({'status': 'processing'}, status=status.HTTP_200_OK)
 
-    def _handle_charge_refunded(self, event, cache_key):
-        """Sync Payment.status when a charge is refunded in Stripe (incl. dashboard
-        refunds). Keeps the DB authoritative so auto-recovery never materializes a
-        booking on refunded money (INC-004 B3). Refunds are never auto-issued by us —
-        this only records a refund that already happened in Stripe.
-        """
-        cache.set(cache_key, True, timeout=259200)
-        charge = event['data']['object']
-        payment_intent_id = charge.get('payment_intent')
-        if not payment_intent_id:
-            logger.info("charge.refunded with no payment_intent — ignoring")
+        if event_type not in STRIPE_EVENT_HANDLERS:
+            logger.info(f"Webhook: Unhandled event type {event_type}")
+            StripeEvent.objects.filter(pk=stripe_event.pk).update(
+                status='done', result={'status': 'ignored'}, processed_at=timezone.now(),
+            )
             return Response({'status': 'ignored'}, status=status.HTTP_200_OK)
 
-        amount = charge.get('amount') or 0
-        amount_refunded = charge.get('amount_refunded') or 0
-        fully = bool(charge.get('refunded')) or (amount and amount_refunded >= amount)
-        new_status = 'refunded' if fully else 'partially_refunded'
-
-        updated = 0
-        for payment in Payment.objects.filter(stripe_payment_intent_id=payment_intent_id):
-            # Skip if already at the target state (avoids duplicate audits on
-            # redelivery) or already fully refunded (never downgrade refunded ->
-            # partially_refunded). A partial -> full refund still proceeds.
-            if payment.status == new_status or payment.status == 'refunded':
-                continue
-            payment.status = new_status
-            payment.save(update_fields=['status', 'updated_at'])
-            updated += 1
-            try:
-                PaymentAudit.log(
-                    action='refund_completed',
-                    description=(
-                        f"Stripe charge refund synced: PI {payment_intent_id} "
-                        f"${amount_refunded / 100:.2f} of ${amount / 100:.2f} → {new_status}"
-                    ),
-                    payment=payment,
-                )
-            except Exception:
-                logger.exception("charge.refunded: PaymentAudit.log failed for PI %s", payment_intent_id)
-
-        logger.info(
-            f"charge.refunded: PI {payment_intent_id} → {new_status} ({updated} Payment row(s) synced)"
-        )
-        return Response({'status': 'processed'}, status=status.HTTP_200_OK)
-
-    def _handle_checkout_expired(self, event, cache_key):
-        """Handle expired Checkout Sessions — mark pending Payment as expired."""
-        cache.set(cache_key, True, timeout=259200)
-        session = event['data']['object']
-        payment_intent_id = session.get('payment_intent')
-
-        if payment_intent_id:
-            try:
-                payment = Payment.objects.get(
-                    stripe_payment_intent_id=payment_intent_id,
-                    status='pending'
-                )
-                payment.status = 'failed'
-                payment.failure_reason = 'Checkout session expired'
-                payment.save()
-                booking_num = payment.booking.booking_number if payment.booking else 'UNLINKED'
-                logger.info(
-                    f"Checkout session expired for booking {booking_num}"
-                )
-            except Payment.DoesNotExist:
-                logger.info(f"No pending payment found for expired PI {payment_intent_id}")
+        logger.info(f"Webhook: Queued event {event_id} of type {event_type}")
 
-        return Response({'status': 'processed'}, status=status.HTTP_200_OK)
+        # The row is committed, so a broker outage no longer loses the event
+        # (INC-003): sweep_stripe_events re-enqueues rows left in 'received'.
+        try:
+            process_stripe_event.delay(str(stripe_event.pk))
+        except CeleryOperationalError:
+            logger.exception(f"Broker unavailable; StripeEvent {event_id} left for the sweeper")
+        except Exception:
+            # Eager/test mode runs the task inline; task-level errors (e.g. Retry)
+            # are not dispatch failures and must not block the webhook ack.
+            logger.exception("Stripe event task raised during eager execution")
+        return Response({'status': 'processing'}, status=status.HTTP_200_OK)
 
 
 class MockPaymentConfirmView(APIView):
@@ -370,40 +370,16 @@ def calculate_surcharges_for_date(base_amount_cents, booking_date, service_type)
     Peak date surcharges OVERRIDE weekend surcharges (don't stack).
     If a date has a peak date surcharge, weekend surcharge is skipped.
 
+    Reads the rules from the cached pricing snapshot (see services/pricing.py),
+    so this no longer queries SurchargeRule on every call.
+
     Returns:
         int: Total surcharge in cents
     """
-    active_surcharges = SurchargeRule.objects.filter(is_active=True)
-
-    # Separate peak date rules from weekend rules
-    peak_date_rules = []
-    weekend_rules = []
-
-    for rule in active_surcharges:
-        if rule.is_peak_date_rule():
-            peak_date_rules.append(rule)
-        elif rule.is_weekend_rule():
-            weekend_rules.append(rule)
-
-    # Check if any peak date rule applies to this date and service type
-    peak_surcharge = 0
-    peak_date_applies = False
+    from .pricing import get_catalog_snapshot
 
-    for rule in peak_date_rules:
-        if rule.applies_to_date(booking_date):
-            amount = rule.calculate_surcharge(base_amount_cents, booking_date, service_type)
-            if amount > 0:
-                peak_surcharge += amount
-                peak_date_applies = True
-
-    # If peak date applies, return only peak surcharge (skip weekend)
-    if peak_date_applies:
-        return peak_surcharge
-
-    # Otherwise, calculate weekend surcharge
-    weekend_surcharge = 0
-    for rule in weekend_rules:
-        weekend_surcharge += rule.calculate_surcharge(base_amount_cents, booking_date, service_type)
-
-    return weekend_surcharge
+    total, _ = get_catalog_snapshot().surcharges_for_date(
+        base_amount_cents, booking_date, service_type
+    )
+    return total
     
\ No newline at end of file
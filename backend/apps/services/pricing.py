@@ -0,0 +1,589 @@
+# backend/apps/services/pricing.py
+"""Single pricing engine shared by every quote and booking path.
+
+Pricing used to be re-implemented in five places (Booking.calculate_pricing, the
+pricing preview, both PaymentIntent serializers and the assistant's estimate
+tool), each running its own MiniMovePackage / OrganizingService /
+StandardDeliveryConfig / SurchargeRule queries — and each with small drift (the
+PI serializers took percentage surcharges on the running total, the preview
+stacked weekend + peak rules), which is exactly how a PI amount ends up not
+matching the saved booking total.
+
+Now every path builds a plain-data `QuoteRequest` and calls `price_quote()`.
+The catalog + surcharge rules are loaded once into an immutable, versioned
+`CatalogSnapshot` that is reused across requests in the process, so a quote runs
+zero DB queries. The version stamp lives in the shared cache and is bumped by
+the catalog model signals (services/signals.py), so a staff edit in the admin is
+picked up by every web and worker process on its next quote. While the cache is
+unreachable the version is derived from the catalog tables instead (row counts
+and latest updated_at), re-read at most every few seconds.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import time as dt_time
+from types import MappingProxyType
+from typing import Optional
+
+from django.core.cache import cache
+
+from apps.bookings.pricing_utils import calculate_geographic_surcharge_from_zips
+from .models import SurchargeRule
+from .surcharge_calendar import load_surcharge_calendar
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_CACHE_KEY = 'pricing_catalog_version'
+
+# Backstop for a missed invalidation (e.g. a queryset.update() that bypasses
+# signals): no process prices from a snapshot older than this.
+SNAPSHOT_MAX_AGE_SECONDS = 300
+# An id missing from the snapshot forces one rebuild, at most this often, so a
+# row created moments ago is found without letting junk ids hammer the DB.
+SNAPSHOT_MIN_REFRESH_SECONDS = 5
+# How long a table-derived version is trusted while the cache is down.
+DB_VERSION_MAX_AGE_SECONDS = 5
+
+# Rates that live in code rather than in the catalog tables.
+BLADE_PER_BAG_CENTS = 7500  # $75 per bag
+BLADE_MINIMUM_CENTS = 15000  # $150 minimum
+FLAT_COI_FEE_CENTS = 5000  # $50 — standard delivery, specialty items, Petite
+TIME_WINDOW_SURCHARGE_CENTS = 17500  # $175 — 1-hour window on a Standard Mini Move
+ORGANIZING_TAX_RATE = 0.0825
+
+
+class PricingError(Exception):
+    """The quote request references something that can't be priced (e.g. an
+    unknown or inactive Mini Move package)."""
+
+
+@dataclass(frozen=True)
+class PackageEntry:
+    id: str
+    package_type: str
+    name: str
+    base_price_cents: int
+    coi_included: bool
+    coi_fee_cents: int
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class OrganizingEntry:
+    id: str
+    service_type: str
+    mini_move_tier: str
+    name: str
+    price_cents: int
+    duration_hours: int
+    organizer_count: int
+    supplies_allowance_cents: int
+    is_packing_service: bool
+
+    @property
+    def price_dollars(self):
+        return self.price_cents / 100
+
+    @property
+    def supplies_allowance_dollars(self):
+        return self.supplies_allowance_cents / 100
+
+
+@dataclass(frozen=True)
+class SpecialtyItemEntry:
+    id: str
+    item_type: str
+    name: str
+    price_cents: int
+    is_active: bool
+
+    @property
+    def price_dollars(self):
+        return self.price_cents / 100
+
+
+@dataclass(frozen=True)
+class DeliveryConfigEntry:
+    price_per_item_cents: int
+    minimum_charge_cents: int
+    same_day_flat_rate_cents: int
+
+
+@dataclass(frozen=True)
+class SurchargeRuleEntry:
+    id: str
+    name: str
+    description: str
+    surcharge_type: str
+    applies_to_service_type: str
+    calculation_type: str
+    percentage: object
+    fixed_amount_cents: Optional[int]
+    specific_date: object
+    start_date: object
+    end_date: object
+    applies_saturday: bool
+    applies_sunday: bool
+    is_active: bool = True
+
+    # Same attribute names as the model, so borrow its rule logic verbatim
+    # instead of keeping a second copy that could drift.
+    applies_to_date = SurchargeRule.applies_to_date
+    calculate_surcharge = SurchargeRule.calculate_surcharge
+    is_peak_date_rule = SurchargeRule.is_peak_date_rule
+    is_weekend_rule = SurchargeRule.is_weekend_rule
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable copy of the whole priceable catalog at one version."""
+    version: str
+    built_at: float
+    packages: MappingProxyType  # id -> PackageEntry (active and inactive)
+    organizing: MappingProxyType  # (tier, is_packing) -> OrganizingEntry (active only)
+    specialty_items: MappingProxyType  # id -> SpecialtyItemEntry (active and inactive)
+    delivery_config: Optional[DeliveryConfigEntry]
+    peak_rules: tuple
+    weekend_rules: tuple
+    surcharge_calendar: object  # SurchargeCalendar over peak_rules / weekend_rules
+
+    @property
+    def age(self):
+        return time.monotonic() - self.built_at
+
+    def package_for_tier(self, tier):
+        for package in self.packages.values():
+            if package.package_type == tier and package.is_active:
+                return package
+        return None
+
+    def surcharge_rules_for_date(self, booking_date):
+        """Every active rule that falls on booking_date (peak first), for display."""
+        peak, weekend = self.surcharge_calendar.rules_for_date(booking_date)
+        return peak + weekend
+
+    def surcharges_for_date(self, base_amount_cents, booking_date, service_type):
+        """Peak date surcharges OVERRIDE weekend surcharges (they don't stack).
+
+        Returns (total_cents, ((rule, amount_cents), ...)).
+        """
+        peak, weekend = self.surcharge_calendar.rules_for_date(booking_date)
+        applied = ()
+        for rules in (peak, weekend):
+            applied = tuple(
+                (rule, amount) for rule, amount in (
+                    (rule, rule.calculate_surcharge(base_amount_cents, booking_date, service_type))
+                    for rule in rules
+                ) if amount > 0
+            )
+            if applied:
+                break
+        return sum(amount for _, amount in applied), applied
+
+
+@dataclass(frozen=True)
+class QuoteRequest:
+    """Everything that affects a price, as plain data (no model instances)."""
+    service_type: str
+    pickup_date: object = None
+    mini_move_package_id: Optional[str] = None
+    mini_move_tier: Optional[str] = None
+    include_packing: bool = False
+    include_unpacking: bool = False
+    standard_delivery_item_count: int = 0
+    specialty_items: tuple = ()  # ((item_id, quantity), ...)
+    is_same_day_delivery: bool = False
+    coi_required: bool = False
+    pickup_time: str = 'morning'
+    pickup_zip_code: Optional[str] = None
+    delivery_zip_code: Optional[str] = None
+    is_outside_core_area: bool = False
+    blade_bag_count: Optional[int] = None
+    # Re-pricing an existing booking must keep working after staff deactivate
+    # its package or items; customer-facing quotes only see active catalog rows.
+    include_inactive: bool = False
+
+    @classmethod
+    def from_data(cls, data, **overrides):
+        """Build from booking-wizard fields (a serializer's validated_data)."""
+        package_id = data.get('mini_move_package_id')
+        values = {
+            'service_type': data['service_type'],
+            'pickup_date': data.get('pickup_date'),
+            'mini_move_package_id': str(package_id) if package_id else None,
+            'include_packing': bool(data.get('include_packing')),
+            'include_unpacking': bool(data.get('include_unpacking')),
+            'standard_delivery_item_count': data.get('standard_delivery_item_count') or 0,
+            'specialty_items': tuple(
+                (str(item.get('item_id')), item.get('quantity', 1))
+                for item in (data.get('specialty_items') or [])
+            ),
+            'is_same_day_delivery': bool(data.get('is_same_day_delivery')),
+            'coi_required': bool(data.get('coi_required')),
+            'pickup_time': data.get('pickup_time') or 'morning',
+            'pickup_zip_code': data.get('pickup_zip_code'),
+            'delivery_zip_code': data.get('delivery_zip_code'),
+            'is_outside_core_area': bool(data.get('is_outside_core_area')),
+            'blade_bag_count': data.get('blade_bag_count'),
+        }
+        values.update(overrides)
+        return cls(**values)
+
+
+@dataclass(frozen=True)
+class Quote:
+    service_type: str
+    catalog_version: str
+    base_price_cents: int = 0
+    surcharge_cents: int = 0
+    same_day_surcharge_cents: int = 0
+    coi_fee_cents: int = 0
+    organizing_total_cents: int = 0
+    organizing_tax_cents: int = 0
+    geographic_surcharge_cents: int = 0
+    time_window_surcharge_cents: int = 0
+    package: Optional[PackageEntry] = None
+    delivery_config: Optional[DeliveryConfigEntry] = None
+    organizing_services: tuple = ()  # OrganizingEntry, packing first
+    unavailable_organizing: tuple = ()  # 'packing' / 'unpacking' asked for but not offered
+    specialty_lines: tuple = ()  # ((SpecialtyItemEntry, quantity, subtotal_cents), ...)
+    unknown_specialty_item_ids: tuple = ()
+    surcharges: tuple = ()  # ((SurchargeRuleEntry, amount_cents), ...)
+
+    @property
+    def total_cents(self):
+        """Pre-discount total."""
+        return (
+            self.base_price_cents +
+            self.surcharge_cents +
+            self.same_day_surcharge_cents +
+            self.coi_fee_cents +
+            self.organizing_total_cents +
+            self.organizing_tax_cents +
+            self.geographic_surcharge_cents +
+            self.time_window_surcharge_cents
+        )
+
+
+# ---------------------------------------------------------------------------
+# Snapshot lifecycle
+# ---------------------------------------------------------------------------
+
+_snapshot = None
+_build_lock = threading.Lock()
+# (version, monotonic time read) of the last table-derived version
+_db_version = None
+
+
+def _current_version():
+    version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if version is None:
+        # First process after a cache flush claims the version. add() returns
+        # None rather than False when the cache is down (IGNORE_EXCEPTIONS).
+        version = uuid.uuid4().hex
+        claimed = cache.add(CATALOG_VERSION_CACHE_KEY, version, timeout=None)
+        if claimed is None:
+            return _catalog_db_version()
+        if not claimed:
+            version = cache.get(CATALOG_VERSION_CACHE_KEY) or version
+    return version
+
+
+def _catalog_db_version():
+    """Version stamp read from the catalog tables, for when the shared cache is
+    unavailable. Row counts catch deletes, max(updated_at) catches edits."""
+    global _db_version
+    cached = _db_version
+    if cached and time.monotonic() - cached[1] < DB_VERSION_MAX_AGE_SECONDS:
+        return cached[0]
+
+    from django.db.models import Count, Max
+    from .models import (
+        MiniMovePackage,
+        OrganizingService,
+        SpecialtyItem,
+        StandardDeliveryConfig,
+    )
+
+    parts = []
+    for model in (MiniMovePackage, OrganizingService, SpecialtyItem, StandardDeliveryConfig, SurchargeRule):
+        stats = model.objects.aggregate(rows=Count('pk'), latest=Max('updated_at'))
+        parts.append(f"{stats['rows']}:{stats['latest'].isoformat() if stats['latest'] else ''}")
+    version = 'db-' + hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+    _db_version = (version, time.monotonic())
+    return version
+
+
+def _build_snapshot(version):
+    from .models import (
+        MiniMovePackage,
+        OrganizingService,
+        SpecialtyItem,
+        StandardDeliveryConfig,
+    )
+
+    packages = {
+        str(p.id): PackageEntry(
+            id=str(p.id),
+            package_type=p.package_type,
+            name=p.name,
+            base_price_cents=p.base_price_cents,
+            coi_included=p.coi_included,
+            coi_fee_cents=p.coi_fee_cents,
+            is_active=p.is_active,
+        )
+        for p in MiniMovePackage.objects.all()
+    }
+
+    # Model ordering is (tier, is_packing, price): the first row per key matches
+    # what the old `.filter(...).first()` lookups picked.
+    organizing = {}
+    for s in OrganizingService.objects.filter(is_active=True):
+        organizing.setdefault((s.mini_move_tier, s.is_packing_service), OrganizingEntry(
+            id=str(s.id),
+            service_type=s.service_type,
+            mini_move_tier=s.mini_move_tier,
+            name=s.name,
+            price_cents=s.price_cents,
+            duration_hours=s.duration_hours,
+            organizer_count=s.organizer_count,
+            supplies_allowance_cents=s.supplies_allowance_cents,
+            is_packing_service=s.is_packing_service,
+        ))
+
+    specialty_items = {
+        str(i.id): SpecialtyItemEntry(
+            id=str(i.id),
+            item_type=i.item_type,
+            name=i.name,
+            price_cents=i.price_cents,
+            is_active=i.is_active,
+        )
+        for i in SpecialtyItem.objects.all()
+    }
+
+    config = StandardDeliveryConfig.objects.filter(is_active=True).first()
+    delivery_config = DeliveryConfigEntry(
+        price_per_item_cents=config.price_per_item_cents,
+        minimum_charge_cents=config.minimum_charge_cents,
+        same_day_flat_rate_cents=config.same_day_flat_rate_cents,
+    ) if config else None
+
+    peak_rules, weekend_rules = [], []
+    for r in SurchargeRule.objects.filter(is_active=True):
+        entry = SurchargeRuleEntry(
+            id=str(r.id),
+            name=r.name,
+            description=r.description,
+            surcharge_type=r.surcharge_type,
+            applies_to_service_type=r.applies_to_service_type,
+            calculation_type=r.calculation_type,
+            percentage=r.percentage,
+            fixed_amount_cents=r.fixed_amount_cents,
+            specific_date=r.specific_date,
+            start_date=r.start_date,
+            end_date=r.end_date,
+            applies_saturday=r.applies_saturday,
+            applies_sunday=r.applies_sunday,
+        )
+        if entry.is_peak_date_rule():
+            peak_rules.append(entry)
+        elif entry.is_weekend_rule():
+            weekend_rules.append(entry)
+
+    return CatalogSnapshot(
+        version=version,
+        built_at=time.monotonic(),
+        packages=MappingProxyType(packages),
+        organizing=MappingProxyType(organizing),
+        specialty_items=MappingProxyType(specialty_items),
+        delivery_config=delivery_config,
+        peak_rules=tuple(peak_rules),
+        weekend_rules=tuple(weekend_rules),
+        surcharge_calendar=load_surcharge_calendar(version, tuple(peak_rules), tuple(weekend_rules)),
+    )
+
+
+def get_catalog_snapshot(refresh=False):
+    """Return the process-wide snapshot, rebuilding it if the shared version moved
+    on, it aged out, or `refresh` is set."""
+    global _snapshot
+    version = _current_version()
+
+    def usable(snap):
+        if snap is None or snap.version != version:
+            return False
+        if refresh:
+            return snap.age < SNAPSHOT_MIN_REFRESH_SECONDS
+        return snap.age < SNAPSHOT_MAX_AGE_SECONDS
+
+    snap = _snapshot
+    if usable(snap):
+        return snap
+    with _build_lock:
+        snap = _snapshot
+        if usable(snap):  # another thread rebuilt it while we waited
+            return snap
+        snap = _build_snapshot(version)
+        _snapshot = snap
+        return snap
+
+
+def invalidate_catalog_snapshot():
+    """Bump the shared version so every process rebuilds on its next quote."""
+    global _snapshot, _db_version
+    _snapshot = None
+    _db_version = None
+    cache.set(CATALOG_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=None)
+
+
+# ---------------------------------------------------------------------------
+# Pricing
+# ---------------------------------------------------------------------------
+
+def blade_ready_time(flight_time, transfer_direction='to_airport'):
+    """When bags must be ready for a to-airport transfer: 5 AM for flights before
+    1 PM, 10 AM otherwise. None for from-airport transfers."""
+    if transfer_direction == 'from_airport' or not flight_time:
+        return None
+    return dt_time(5, 0) if flight_time < dt_time(13, 0) else dt_time(10, 0)
+
+
+def _references_missing(request, snapshot):
+    if request.mini_move_package_id and request.mini_move_package_id not in snapshot.packages:
+        return True
+    return any(item_id not in snapshot.specialty_items for item_id, _ in request.specialty_items)
+
+
+def price_quote(request, snapshot=None):
+    """Price a QuoteRequest against the catalog snapshot. Runs no queries unless
+    the snapshot has to be (re)built."""
+    if snapshot is None:
+        snapshot = get_catalog_snapshot()
+        if _references_missing(request, snapshot):
+            snapshot = get_catalog_snapshot(refresh=True)
+    return _price(request, snapshot)
+
+
+def _specialty_lines(request, snapshot):
+    lines, unknown = [], []
+    for item_id, quantity in request.specialty_items:
+        item = snapshot.specialty_items.get(item_id)
+        if item is None or not (item.is_active or request.include_inactive):
+            unknown.append(item_id)
+            continue
+        lines.append((item, quantity, item.price_cents * quantity))
+    return tuple(lines), tuple(unknown)
+
+
+def _price(request, snapshot):
+    service_type = request.service_type
+    fields = {}
+
+    def geographic():
+        return calculate_geographic_surcharge_from_zips(
+            request.pickup_zip_code,
+            request.delivery_zip_code,
+            fallback_is_outside=request.is_outside_core_area,
+        )
+
+    def date_surcharges(base_cents):
+        if not request.pickup_date:
+            return
+        total, applied = snapshot.surcharges_for_date(
+            base_cents, request.pickup_date, service_type
+        )
+        fields['surcharge_cents'] = total
+        fields['surcharges'] = applied
+
+    if service_type == 'blade_transfer':
+        if request.blade_bag_count:
+            fields['base_price_cents'] = max(
+                request.blade_bag_count * BLADE_PER_BAG_CENTS, BLADE_MINIMUM_CENTS
+            )
+
+    elif service_type == 'mini_move':
+        package = None
+        if request.mini_move_package_id:
+            package = snapshot.packages.get(request.mini_move_package_id)
+        elif request.mini_move_tier:
+            package = snapshot.package_for_tier(request.mini_move_tier)
+
+        if (request.mini_move_package_id or request.mini_move_tier) and (
+            package is None or not (package.is_active or request.include_inactive)
+        ):
+            raise PricingError('Invalid mini move package')
+
+        if package is not None:
+            fields['package'] = package
+            fields['base_price_cents'] = package.base_price_cents
+
+            organizing, unavailable = [], []
+            for wanted, is_packing, label in (
+                (request.include_packing, True, 'packing'),
+                (request.include_unpacking, False, 'unpacking'),
+            ):
+                if not wanted:
+                    continue
+                service = snapshot.organizing.get((package.package_type, is_packing))
+                if service:
+                    organizing.append(service)
+                else:
+                    unavailable.append(label)
+            organizing_total = sum(s.price_cents for s in organizing)
+            fields['organizing_services'] = tuple(organizing)
+            fields['unavailable_organizing'] = tuple(unavailable)
+            fields['organizing_total_cents'] = organizing_total
+            fields['organizing_tax_cents'] = int(organizing_total * ORGANIZING_TAX_RATE)
+
+            if request.coi_required:
+                if package.package_type == 'petite':
+                    fields['coi_fee_cents'] = FLAT_COI_FEE_CENTS
+                elif not package.coi_included:
+                    fields['coi_fee_cents'] = package.coi_fee_cents
+
+            date_surcharges(package.base_price_cents)
+            fields['geographic_surcharge_cents'] = geographic()
+
+            if request.pickup_time == 'morning_specific' and package.package_type == 'standard':
+                fields['time_window_surcharge_cents'] = TIME_WINDOW_SURCHARGE_CENTS
+
+    elif service_type in ('standard_delivery', 'specialty_item'):
+        config = snapshot.delivery_config
+        fields['delivery_config'] = config
+        lines, unknown = _specialty_lines(request, snapshot)
+        specialty_total = sum(subtotal for _, _, subtotal in lines)
+        base = 0
+
+        if service_type == 'standard_delivery':
+            # Without an active config nothing about the delivery itself is
+            # priceable (specialty add-ons included) — same as before the engine.
+            if config:
+                item_count = request.standard_delivery_item_count or 0
+                if item_count > 0:
+                    base = max(config.price_per_item_cents * item_count, config.minimum_charge_cents)
+                base += specialty_total
+                fields['specialty_lines'] = lines
+            else:
+                lines = ()
+        else:
+            base = specialty_total
+            fields['specialty_lines'] = lines
+
+        fields['unknown_specialty_item_ids'] = unknown
+        fields['base_price_cents'] = base
+        if request.is_same_day_delivery and config:
+            fields['same_day_surcharge_cents'] = config.same_day_flat_rate_cents
+
+        date_surcharges(base)
+        fields['geographic_surcharge_cents'] = geographic()
+        if request.coi_required:
+            fields['coi_fee_cents'] = FLAT_COI_FEE_CENTS
+
+    else:
+        raise PricingError(f'Unknown service type: {service_type}')
+
+    return Quote(service_type=service_type, catalog_version=snapshot.version, **fields)
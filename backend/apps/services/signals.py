@@ -0,0 +1,40 @@
+import logging
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.services.models import (
+    MiniMovePackage,
+    OrganizingService,
+    SpecialtyItem,
+    StandardDeliveryConfig,
+    SurchargeRule,
+)
+from apps.services.pricing import invalidate_catalog_snapshot
+
+logger = logging.getLogger(__name__)
+
+CATALOG_MODELS = (
+    MiniMovePackage,
+    OrganizingService,
+    SpecialtyItem,
+    StandardDeliveryConfig,
+    SurchargeRule,
+)
+
+
+def catalog_changed(sender, instance, **kwargs):
+    """
+    Bump the pricing snapshot version when staff edit the catalog.
+
+    Invalidate now (so this process stops using the old snapshot) and again
+    after commit (so no other process can rebuild from pre-commit data and
+    keep it for the rest of the snapshot's lifetime).
+    """
+    logger.info(f"Pricing catalog changed ({sender.__name__} {instance.pk}); invalidating snapshot")
+    invalidate_catalog_snapshot()
+    transaction.on_commit(invalidate_catalog_snapshot)
+
+
+for model in CATALOG_MODELS:
+    receiver(post_save, sender=model, dispatch_uid=f'pricing_catalog_save_{model.__name__}')(catalog_changed)
+    receiver(post_delete, sender=model, dispatch_uid=f'pricing_catalog_delete_{model.__name__}')(catalog_changed)
@@ -0,0 +1,99 @@
+# backend/apps/services/surcharge_calendar.py
+"""Precomputed date -> surcharge-rule index.
+
+The booking wizard prices every date the customer hovers over, and the public
+calendar / assistant availability tool list the surcharges for every day in a
+30-60 day window. Walking every active rule's applies_to_date() for each of
+those dates adds up, so the catalog snapshot carries a SurchargeCalendar: for
+each date in a rolling horizon, the peak and weekend rules that apply to it.
+
+The index is built once per catalog version and stored in the shared cache, so
+other processes that see the same version load it instead of rebuilding. A
+SurchargeRule save/delete bumps the catalog version (services/signals.py),
+which orphans the old index. Dates outside the horizon fall back to scanning
+the rules directly.
+"""
+import logging
+from datetime import date, timedelta
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SURCHARGE_CALENDAR_CACHE_KEY = 'surcharge_calendar_{version}'
+SURCHARGE_CALENDAR_TTL = 60 * 60 * 24
+SURCHARGE_CALENDAR_HORIZON_DAYS = 548  # ~18 months
+
+
+class SurchargeCalendar:
+    """Immutable date -> (peak rules, weekend rules) lookup."""
+
+    def __init__(self, start, horizon_days, days, peak_rules, weekend_rules):
+        self.start = start
+        self.end = start + timedelta(days=horizon_days - 1)
+        self._days = days  # date ordinal -> (peak rule ids, weekend rule ids)
+        self._peak_rules = peak_rules
+        self._weekend_rules = weekend_rules
+        self._peak_by_id = {rule.id: rule for rule in peak_rules}
+        self._weekend_by_id = {rule.id: rule for rule in weekend_rules}
+
+    def rules_for_date(self, booking_date):
+        """Return (peak_rules, weekend_rules) that apply to booking_date.
+
+        Rules are returned regardless of the service type they are limited to;
+        calculate_surcharge() applies that filter.
+        """
+        if self.start <= booking_date <= self.end:
+            peak_ids, weekend_ids = self._days.get(booking_date.toordinal(), ((), ()))
+            return (
+                tuple(self._peak_by_id[i] for i in peak_ids),
+                tuple(self._weekend_by_id[i] for i in weekend_ids),
+            )
+        return (
+            tuple(r for r in self._peak_rules if r.applies_to_date(booking_date)),
+            tuple(r for r in self._weekend_rules if r.applies_to_date(booking_date)),
+        )
+
+
+def build_surcharge_days(peak_rules, weekend_rules, start, horizon_days):
+    """Sparse {date ordinal: (peak ids, weekend ids)} for dates with any rule."""
+    days = {}
+    for offset in range(horizon_days):
+        day = start + timedelta(days=offset)
+        peak_ids = tuple(r.id for r in peak_rules if r.applies_to_date(day))
+        weekend_ids = tuple(r.id for r in weekend_rules if r.applies_to_date(day))
+        if peak_ids or weekend_ids:
+            days[day.toordinal()] = (peak_ids, weekend_ids)
+    return days
+
+
+def load_surcharge_calendar(version, peak_rules, weekend_rules, horizon_days=SURCHARGE_CALENDAR_HORIZON_DAYS):
+    """Load the index for this catalog version from the cache, building it on a miss."""
+    today = date.today()
+    key = SURCHARGE_CALENDAR_CACHE_KEY.format(version=version)
+    rule_ids = (
+        tuple(sorted(r.id for r in peak_rules)),
+        tuple(sorted(r.id for r in weekend_rules)),
+    )
+
+    cached = cache.get(key)
+    # Reuse only if it was built today from the same rule set (another process
+    # may have built it with a snapshot taken just before a rule change).
+    if (
+        cached
+        and cached.get('start') == today.toordinal()
+        and cached.get('horizon_days') == horizon_days
+        and cached.get('rule_ids') == rule_ids
+    ):
+        days = cached['days']
+    else:
+        days = build_surcharge_days(peak_rules, weekend_rules, today, horizon_days)
+        cache.set(key, {
+            'start': today.toordinal(),
+            'horizon_days': horizon_days,
+            'rule_ids': rule_ids,
+            'days': days,
+        }, SURCHARGE_CALENDAR_TTL)
+        logger.debug(f"Built surcharge calendar {key}: {len(days)} surcharge days")
+
+    return SurchargeCalendar(today, horizon_days, days, peak_rules, weekend_rules)
@@ -0,0 +1,260 @@
+# apps/services/tests/test_pricing.py
+"""
+Tests for the shared pricing engine (apps.services.pricing).
+Every quote path must agree with Booking.calculate_pricing() - a mismatch
+means the PaymentIntent amount and the booking total disagree.
+"""
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase
+
+from apps.bookings.serializers import GuestPaymentIntentSerializer
+from apps.services.models import (
+    MiniMovePackage,
+    OrganizingService,
+    SpecialtyItem,
+    StandardDeliveryConfig,
+    SurchargeRule,
+)
+from apps.services.pricing import (
+    PricingError,
+    QuoteRequest,
+    get_catalog_snapshot,
+    price_quote,
+)
+
+
+def next_weekday(weekday):
+    """Next date (at least a week out) falling on the given weekday (0=Mon)."""
+    d = date.today() + timedelta(days=7)
+    return d + timedelta(days=(weekday - d.weekday()) % 7)
+
+
+@pytest.mark.django_db
+class TestPricingEngine(TestCase):
+
+    def setUp(self):
+        self.standard = MiniMovePackage.objects.create(
+            package_type='standard',
+            name='Standard Move',
+            description='Standard',
+            base_price_cents=172500,
+            max_items=30,
+            coi_included=False,
+            coi_fee_cents=5000,
+            is_active=True,
+        )
+        # Organizing services are seeded by a data migration
+        self.packing, _ = OrganizingService.objects.update_or_create(
+            service_type='standard_packing',
+            defaults={
+                'mini_move_tier': 'standard',
+                'name': 'Standard Packing',
+                'price_cents': 200000,
+                'supplies_allowance_cents': 25000,
+                'is_packing_service': True,
+                'is_active': True,
+            },
+        )
+        for unpacking in OrganizingService.objects.filter(mini_move_tier='standard', is_packing_service=False):
+            unpacking.is_active = False
+            unpacking.save()
+        self.config = StandardDeliveryConfig.objects.create(
+            price_per_item_cents=9500,
+            minimum_items=3,
+            minimum_charge_cents=28500,
+            same_day_flat_rate_cents=36000,
+            is_active=True,
+        )
+        self.peloton = SpecialtyItem.objects.create(
+            item_type='peloton',
+            name='Peloton',
+            description='Bike',
+            price_cents=50000,
+            is_active=True,
+        )
+        self.weekend = SurchargeRule.objects.create(
+            surcharge_type='weekend',
+            name='Weekend Surcharge',
+            description='Weekend',
+            applies_to_service_type='all',
+            calculation_type='percentage',
+            percentage=Decimal('10.00'),
+            applies_saturday=True,
+            applies_sunday=True,
+            is_active=True,
+        )
+        self.saturday = next_weekday(5)
+
+    def test_quote_runs_no_queries_once_snapshot_is_warm(self):
+        get_catalog_snapshot()
+        request = QuoteRequest(
+            service_type='standard_delivery',
+            pickup_date=self.saturday,
+            standard_delivery_item_count=5,
+            specialty_items=((str(self.peloton.id), 2),),
+            pickup_zip_code='10001',
+            delivery_zip_code='07101',
+        )
+        with self.assertNumQueries(0):
+            quote = price_quote(request)
+        # 475 items + 1000 specialty, 10% weekend on base, one NJ address
+        self.assertEqual(quote.base_price_cents, 147500)
+        self.assertEqual(quote.surcharge_cents, 14750)
+        self.assertEqual(quote.geographic_surcharge_cents, 17500)
+
+    def test_mini_move_components(self):
+        quote = price_quote(QuoteRequest(
+            service_type='mini_move',
+            mini_move_package_id=str(self.standard.id),
+            include_packing=True,
+            include_unpacking=True,  # not offered for this tier
+            coi_required=True,
+            pickup_time='morning_specific',
+            pickup_date=self.saturday,
+        ))
+        self.assertEqual(quote.base_price_cents, 172500)
+        self.assertEqual(quote.organizing_total_cents, 200000)
+        self.assertEqual(quote.organizing_tax_cents, 16500)
+        self.assertEqual(quote.coi_fee_cents, 5000)
+        self.assertEqual(quote.time_window_surcharge_cents, 17500)
+        self.assertEqual(quote.surcharge_cents, 17250)  # 10% of base only
+        self.assertEqual(quote.unavailable_organizing, ('unpacking',))
+
+    def test_peak_date_overrides_weekend(self):
+        SurchargeRule.objects.create(
+            surcharge_type='peak_date',
+            name='Holiday',
+            description='Holiday',
+            applies_to_service_type='all',
+            calculation_type='fixed_amount',
+            fixed_amount_cents=15000,
+            specific_date=self.saturday,
+            is_active=True,
+        )
+        quote = price_quote(QuoteRequest(
+            service_type='standard_delivery',
+            pickup_date=self.saturday,
+            standard_delivery_item_count=3,
+        ))
+        self.assertEqual(quote.surcharge_cents, 15000)
+        self.assertEqual([rule.name for rule, _ in quote.surcharges], ['Holiday'])
+
+    def test_catalog_edit_invalidates_snapshot(self):
+        before = get_catalog_snapshot()
+        self.config.price_per_item_cents = 10000
+        self.config.save()
+
+        quote = price_quote(QuoteRequest(service_type='standard_delivery', standard_delivery_item_count=5))
+        self.assertNotEqual(quote.catalog_version, before.version)
+        self.assertEqual(quote.base_price_cents, 50000)
+
+    def test_snapshot_is_reused_while_cache_is_down(self):
+        with patch('apps.services.pricing.cache') as down:
+            down.get.return_value = None
+            down.add.return_value = None
+            first = get_catalog_snapshot()
+            with self.assertNumQueries(0):
+                self.assertIs(get_catalog_snapshot(), first)
+
+            self.config.price_per_item_cents = 10000
+            self.config.save()
+            quote = price_quote(QuoteRequest(service_type='standard_delivery', standard_delivery_item_count=5))
+
+        self.assertNotEqual(quote.catalog_version, first.version)
+        self.assertEqual(quote.base_price_cents, 50000)
+
+    def test_inactive_package_only_priced_for_existing_bookings(self):
+        self.standard.is_active = False
+        self.standard.save()
+        request = QuoteRequest(service_type='mini_move', mini_move_package_id=str(self.standard.id))
+
+        with self.assertRaises(PricingError):
+            price_quote(request)
+        quote = price_quote(QuoteRequest(
+            service_type='mini_move',
+            mini_move_package_id=str(self.standard.id),
+            include_inactive=True,
+        ))
+        self.assertEqual(quote.base_price_cents, 172500)
+
+    def test_payment_intent_amount_matches_engine(self):
+        serializer = GuestPaymentIntentSerializer(data={
+            'service_type': 'mini_move',
+            'mini_move_package_id': str(self.standard.id),
+            'include_packing': True,
+            'pickup_date': self.saturday.isoformat(),
+            'pickup_time': 'morning',
+            'first_name': 'Test',
+            'last_name': 'Customer',
+            'email': 'test@example.com',
+            'phone': '2125550100',
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        expected = price_quote(QuoteRequest(
+            service_type='mini_move',
+            mini_move_package_id=str(self.standard.id),
+            include_packing=True,
+            pickup_date=self.saturday,
+        )).total_cents
+        # Percentage surcharge is taken on the package base, not the running total
+        self.assertEqual(serializer.validated_data['calculated_total_cents'], expected)
+        self.assertEqual(expected, 172500 + 200000 + 16500 + 17250)
+
+
+@pytest.mark.django_db
+class TestSurchargeCalendar(TestCase):
+
+    def setUp(self):
+        self.weekend = SurchargeRule.objects.create(
+            surcharge_type='weekend',
+            name='Weekend Surcharge',
+            description='Weekend',
+            applies_to_service_type='all',
+            calculation_type='fixed_amount',
+            fixed_amount_cents=5000,
+            applies_saturday=True,
+            applies_sunday=True,
+            is_active=True,
+        )
+        self.holiday_start = date.today() + timedelta(days=30)
+        self.holiday = SurchargeRule.objects.create(
+            surcharge_type='peak_date',
+            name='Holiday Week',
+            description='Holiday',
+            applies_to_service_type='mini_move',
+            calculation_type='fixed_amount',
+            fixed_amount_cents=17500,
+            start_date=self.holiday_start,
+            end_date=self.holiday_start + timedelta(days=6),
+            is_active=True,
+        )
+
+    def test_index_matches_rule_scan(self):
+        calendar = get_catalog_snapshot().surcharge_calendar
+        for offset in range(0, 120):
+            day = date.today() + timedelta(days=offset)
+            peak, weekend = calendar.rules_for_date(day)
+            self.assertEqual([r.name for r in peak], ['Holiday Week'] if self.holiday.applies_to_date(day) else [])
+            self.assertEqual([r.name for r in weekend], ['Weekend Surcharge'] if day.weekday() >= 5 else [])
+
+    def test_lookup_runs_no_queries(self):
+        snapshot = get_catalog_snapshot()
+        with self.assertNumQueries(0):
+            for offset in range(60):
+                snapshot.surcharges_for_date(10000, date.today() + timedelta(days=offset), 'mini_move')
+
+    def test_dates_beyond_horizon_fall_back_to_rules(self):
+        calendar = get_catalog_snapshot().surcharge_calendar
+        saturday = calendar.end + timedelta(days=(5 - calendar.end.weekday()) % 7 or 7)
+        _, weekend = calendar.rules_for_date(saturday)
+        self.assertEqual([r.name for r in weekend], ['Weekend Surcharge'])
+
+    def test_rule_change_rebuilds_index(self):
+        saturday = next_weekday(5)
+        self.assertEqual(get_catalog_snapshot().surcharges_for_date(0, saturday, 'standard_delivery')[0], 5000)
+
+        self.weekend.delete()
+        self.assertEqual(get_catalog_snapshot().surcharges_for_date(0, saturday, 'standard_delivery')[0], 0)
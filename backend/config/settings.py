@@ -177,7 +177,8 @@ CACHES = {
 }
 
 RATELIMIT_USE_CACHE = 'default'
-RATELIMIT_ENABLE = True
+# Off only for load tests against a local stack (loadtest_checkout)
+RATELIMIT_ENABLE = env.bool('RATELIMIT_ENABLE', default=True)
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -248,7 +249,8 @@ SESSION_COOKIE_AGE = 60 * 60 * 24 * 30
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 SESSION_SAVE_EVERY_REQUEST = True
 SESSION_COOKIE_NAME = 'totetaxi_sessionid'
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Sessions are read from Redis and written through to the DB (survive a flush)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 
 # EMAIL — use OS env first (Fly secrets), then .env
 EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND') or env('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
@@ -316,6 +318,8 @@ LOGGING = {
 ANTHROPIC_API_KEY = env('ANTHROPIC_API_KEY', default='')
 if ANTHROPIC_API_KEY:
     os.environ.setdefault('ANTHROPIC_API_KEY', ANTHROPIC_API_KEY)
+# Idle time after which a chat thread's server-side memory is dropped
+ASSISTANT_THREAD_TTL_SECONDS = env.int('ASSISTANT_THREAD_TTL_SECONDS', default=60 * 60 * 24)
 
 # LangSmith Observability (only when configured and not testing)
 LANGSMITH_API_KEY = env('LANGSMITH_API_KEY', default='')
@@ -332,12 +336,27 @@ if os.environ.get('FLY_APP_NAME'):
     STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET')  # Required in production
 else:
     STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET', default='')
+# Shared HTTP client for every Stripe call (apps/payments/stripe_client.py).
+# STRIPE_API_BASE points the SDK somewhere else, e.g. the local fake server
+# (`manage.py fake_stripe_server`) for offline load tests; empty = api.stripe.com.
+STRIPE_API_BASE = env('STRIPE_API_BASE', default='')
+STRIPE_CONNECT_TIMEOUT_SECONDS = env.float('STRIPE_CONNECT_TIMEOUT_SECONDS', default=5)
+STRIPE_READ_TIMEOUT_SECONDS = env.float('STRIPE_READ_TIMEOUT_SECONDS', default=20)
+STRIPE_MAX_NETWORK_RETRIES = env.int('STRIPE_MAX_NETWORK_RETRIES', default=2)
+STRIPE_HTTP_POOL_SIZE = env.int('STRIPE_HTTP_POOL_SIZE', default=16)
 
 # Onfleet
 ONFLEET_API_KEY = env('ONFLEET_API_KEY', default='')
 ONFLEET_MOCK_MODE = env.bool('ONFLEET_MOCK_MODE', default=True)
 ONFLEET_ENVIRONMENT = env('ONFLEET_ENVIRONMENT', default='sandbox')
 ONFLEET_WEBHOOK_SECRET = env('ONFLEET_WEBHOOK_SECRET', default='')
+# Point at the local fake (apps/logistics/fake_onfleet.py) for offline load tests
+ONFLEET_BASE_URL = env('ONFLEET_BASE_URL', default='https://onfleet.com/api/v2')
+# Outbound API client (apps/logistics/services.py): pooled keep-alive session
+ONFLEET_CONNECT_TIMEOUT = env.float('ONFLEET_CONNECT_TIMEOUT', default=5.0)
+ONFLEET_READ_TIMEOUT = env.float('ONFLEET_READ_TIMEOUT', default=30.0)
+ONFLEET_MAX_RETRIES = env.int('ONFLEET_MAX_RETRIES', default=3)
+ONFLEET_POOL_MAXSIZE = env.int('ONFLEET_POOL_MAXSIZE', default=10)
 
 BLADE_PHONE_NUMBER = env('BLADE_PHONE_NUMBER', default='+1234567890')
 
@@ -353,6 +372,9 @@ BOOKING_REMINDERS_ENABLED = env.bool('BOOKING_REMINDERS_ENABLED', default=True)
 # it, giving the normal frontend booking-create flow time to win first.
 ORPHAN_AUTORECOVERY_ENABLED = env.bool('ORPHAN_AUTORECOVERY_ENABLED', default=True)
 ORPHAN_RECOVERY_GRACE_MINUTES = env.int('ORPHAN_RECOVERY_GRACE_MINUTES', default=3)
+# Reconcile runs claim disjoint captures (SKIP LOCKED), so a backlog is drained
+# by up to this many concurrent runs: the beat-triggered one fans out the rest.
+ORPHAN_RECOVERY_WORKERS = env.int('ORPHAN_RECOVERY_WORKERS', default=4)
 
 CELERY_BEAT_SCHEDULE = {
     'send-booking-reminders-hourly': {
@@ -375,6 +397,47 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(minute='*/5'),
         'options': {'expires': 300}
     },
+    'sweep-stripe-events': {
+        'task': 'apps.payments.tasks.sweep_stripe_events',
+        'schedule': crontab(minute='*/5'),
+        'options': {'expires': 300}
+    },
+    'drain-email-outbox': {
+        'task': 'apps.bookings.tasks.drain_email_outbox',
+        'schedule': crontab(minute='*'),
+        'options': {'expires': 60}
+    },
+    'sweep-onfleet-webhook-events': {
+        'task': 'apps.logistics.tasks.sweep_onfleet_webhook_events',
+        'schedule': crontab(minute='*'),
+        'options': {'expires': 60}
+    },
+    'redispatch-missing-onfleet-tasks': {
+        'task': 'apps.logistics.tasks.redispatch_missing_onfleet_tasks',
+        'schedule': crontab(minute='*/10'),
+        'options': {'expires': 600}
+    },
+    'sync-onfleet-tasks': {
+        'task': 'apps.logistics.tasks.sync_onfleet_tasks',
+        'schedule': crontab(minute='*/10'),
+        'options': {'expires': 600}
+    },
+    'recount-dashboard-stats': {
+        'task': 'apps.accounts.tasks.recount_dashboard_stats',
+        'schedule': crontab(minute='*/30'),
+        'options': {'expires': 1800}
+    },
+    'refresh-report-facts': {
+        'task': 'apps.accounts.tasks.refresh_report_facts',
+        'schedule': crontab(minute='*/10'),
+        'options': {'expires': 600}
+    },
+    'rebuild-report-facts-nightly': {
+        'task': 'apps.accounts.tasks.refresh_report_facts',
+        'schedule': crontab(hour=3, minute=30),
+        'kwargs': {'full': True},
+        'options': {'expires': 3600}
+    },
 }# Replace your TESTING section cache configuration with this:
 # ADD THIS TO YOUR config/settings.py - COMPLETE TESTING SECTION
 
@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
+import logging
 import os
 import sys
 
@@ -20,3 +21,12 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 sys.setrecursionlimit(3000)
 
 application = get_wsgi_application()
+
+# Build the assistant's agents at worker boot so the first chat message on
+# each worker doesn't pay for compiling them. Never block the worker on it.
+if os.environ.get('ANTHROPIC_API_KEY'):
+    try:
+        from apps.assistant.graph import warm_agents
+        warm_agents()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f'Assistant agent warm-up failed: {e}')
@@ -1,9 +1,32 @@
 import os
 import django
+import pytest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
 
+@pytest.fixture(autouse=True)
+def reset_versioned_caches():
+    """Test rollbacks don't fire the signals that bump cache versions, so reset
+    the pricing snapshot and public calendar caches around every test instead of
+    leaking one test's rows into the next."""
+    from apps.bookings.availability import invalidate_all_availability
+    from apps.services.pricing import invalidate_catalog_snapshot
 
+    invalidate_catalog_snapshot()
+    invalidate_all_availability()
+    yield
+    invalidate_catalog_snapshot()
+    invalidate_all_availability()
 
+
+@pytest.fixture
+def fake_stripe():
+    """A local fake Stripe API (apps/payments/fake_stripe.py) the SDK talks to
+    over real HTTP for the duration of the test."""
+    from apps.payments.fake_stripe import FakeStripeServer
+    from apps.payments.stripe_client import stripe_api_base
+
+    with FakeStripeServer() as server, stripe_api_base(server.url):
+        yield server
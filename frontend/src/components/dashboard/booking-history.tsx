@@ -2,7 +2,7 @@
 'use client';
 
 import { useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useInfiniteQuery } from '@tanstack/react-query';
 import { useRouter } from 'next/navigation';
 import { apiClient } from '@/lib/api-client';
 import { useAuthStore } from '@/stores/auth-store';
@@ -35,6 +35,7 @@ interface Booking {
 interface BookingHistoryResponse {
   bookings: Booking[];
   total_count: number;
+  next_cursor: string | null;
 }
 
 export function BookingHistory() {
@@ -43,19 +44,34 @@ export function BookingHistory() {
   const [searchTerm, setSearchTerm] = useState('');
   const [statusFilter, setStatusFilter] = useState('');
 
-  const { data, isLoading, error, refetch } = useQuery({
+  // The API returns bookings newest first, one cursor page at a time
+  const {
+    data,
+    isLoading,
+    error,
+    refetch,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ['customer', 'bookings', user?.id, searchTerm, statusFilter],
-    queryFn: async (): Promise<BookingHistoryResponse> => {
+    queryFn: async ({ pageParam }): Promise<BookingHistoryResponse> => {
       const params = new URLSearchParams();
       if (searchTerm) params.append('search', searchTerm);
       if (statusFilter) params.append('status', statusFilter);
+      if (pageParam) params.append('cursor', pageParam);
       
       const response = await apiClient.get(`/api/customer/bookings/?${params}`);
       return response.data;
     },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
     enabled: !!user?.id,
   });
 
+  const bookings = data?.pages.flatMap((page) => page.bookings) ?? [];
+  const totalCount = data?.pages[0]?.total_count ?? 0;
+
   const getStatusColor = (status: string) => {
     switch (status.toLowerCase()) {
       case 'completed':
@@ -115,7 +131,7 @@ export function BookingHistory() {
         <div className="flex flex-col sm:flex-row sm:items-center sm:justify-between gap-4">
           <h2 className="text-xl font-semibold text-navy-900">Booking History</h2>
           <div className="text-sm text-navy-600">
-            {data?.total_count || 0} total bookings
+            {totalCount} total bookings
           </div>
         </div>
 
@@ -142,7 +158,7 @@ export function BookingHistory() {
       </CardHeader>
 
       <CardContent>
-        {!data?.bookings || data.bookings.length === 0 ? (
+        {bookings.length === 0 ? (
           <div className="text-center py-8">
             <div className="text-6xl mb-4">📦</div>
             <h3 className="text-lg font-medium text-navy-900 mb-2">No bookings yet</h3>
@@ -158,7 +174,7 @@ export function BookingHistory() {
           </div>
         ) : (
           <div className="space-y-4">
-            {data.bookings.map((booking) => (
+            {bookings.map((booking) => (
               <div
                 key={booking.id}
                 className="border border-cream-200 rounded-lg p-6 hover:shadow-md transition-shadow"
@@ -216,6 +232,17 @@ export function BookingHistory() {
                 </div>
               </div>
             ))}
+            {hasNextPage && (
+              <div className="text-center pt-2">
+                <Button
+                  variant="outline"
+                  onClick={() => fetchNextPage()}
+                  disabled={isFetchingNextPage}
+                >
+                  {isFetchingNextPage ? 'Loading...' : 'Load More Bookings'}
+                </Button>
+              </div>
+            )}
           </div>
         )}
       </CardContent>